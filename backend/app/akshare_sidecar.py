@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+# AkShare/Baostock 日线 CSV 的二进制旁路文件：首次解析 CSV 后写入 (字段 × 根数) 的 float64 列矩阵 .npy
+# 与一个 JSON 头（源文件路径/大小/mtime、根数）。之后按 mmap 打开，只拷贝末尾 window 根，
+# 不再逐行 DictReader + 中英文列名回退 + 排序。
+
+AKSHARE_SIDECAR_VERSION = 1
+AKSHARE_SIDECAR_FIELDS = ("day", "open", "high", "low", "close", "volume", "amount")
+
+
+def akshare_sidecar_enabled() -> bool:
+    raw = os.getenv("TDX_TREND_AKSHARE_SIDECAR", "").strip().lower()
+    if not raw:
+        return True
+    return raw not in {"0", "false", "no", "off"}
+
+
+def _akshare_sidecar_dir() -> Path:
+    raw = os.getenv("TDX_TREND_AKSHARE_SIDECAR_DIR", "").strip()
+    if raw:
+        return Path(os.path.expanduser(os.path.expandvars(raw)))
+    return Path.home() / ".tdx-trend" / "akshare-sidecar"
+
+
+def _sidecar_paths(source_path: Path) -> tuple[Path, Path]:
+    digest = hashlib.sha1(str(source_path).encode("utf-8")).hexdigest()[:16]
+    base = _akshare_sidecar_dir() / f"{source_path.stem}-{digest}"
+    return base.with_suffix(".npy"), base.with_suffix(".json")
+
+
+def _source_stat(source_path: Path) -> tuple[int, int] | None:
+    try:
+        stat = source_path.stat()
+    except OSError:
+        return None
+    return int(stat.st_size), int(stat.st_mtime_ns)
+
+
+def read_akshare_sidecar(source_path: Path, *, max_bars: int) -> dict[str, np.ndarray] | None:
+    """Return the last ``max_bars`` rows per field when a sidecar matching the CSV's size/mtime exists."""
+    if not akshare_sidecar_enabled():
+        return None
+    signature = _source_stat(source_path)
+    if signature is None:
+        return None
+    data_path, header_path = _sidecar_paths(source_path)
+    try:
+        header = json.loads(header_path.read_text(encoding="utf-8"))
+        if (
+            int(header.get("version", 0)) != AKSHARE_SIDECAR_VERSION
+            or header.get("source") != str(source_path)
+            or int(header.get("size", -1)) != signature[0]
+            or int(header.get("mtime_ns", -1)) != signature[1]
+            or list(header.get("fields") or []) != list(AKSHARE_SIDECAR_FIELDS)
+        ):
+            return None
+        matrix = np.load(data_path, mmap_mode="r", allow_pickle=False)
+    except Exception:
+        return None
+    bars = int(header.get("bars", -1))
+    if matrix.ndim != 2 or matrix.shape != (len(AKSHARE_SIDECAR_FIELDS), bars):
+        return None
+    start = max(0, bars - max(int(max_bars), 1))
+    tail = np.array(matrix[:, start:], dtype=np.float64)
+    del matrix
+    return {field: tail[idx] for idx, field in enumerate(AKSHARE_SIDECAR_FIELDS)}
+
+
+def write_akshare_sidecar(
+    source_path: Path,
+    signature: tuple[int, int],
+    columns: dict[str, np.ndarray],
+) -> None:
+    """Persist full-history columns parsed from ``source_path`` (stat taken before parsing)."""
+    if not akshare_sidecar_enabled():
+        return
+    matrix = np.ascontiguousarray(
+        np.vstack([np.asarray(columns[field], dtype=np.float64) for field in AKSHARE_SIDECAR_FIELDS])
+    )
+    header = {
+        "version": AKSHARE_SIDECAR_VERSION,
+        "source": str(source_path),
+        "size": int(signature[0]),
+        "mtime_ns": int(signature[1]),
+        "bars": int(matrix.shape[1]),
+        "fields": list(AKSHARE_SIDECAR_FIELDS),
+    }
+    data_path, header_path = _sidecar_paths(source_path)
+    try:
+        data_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_data = data_path.with_name(f"{data_path.stem}.tmp.npy")
+        np.save(tmp_data, matrix, allow_pickle=False)
+        os.replace(tmp_data, data_path)
+        # 头文件最后落盘：读方先比对 bars 与矩阵形状，半途替换的组合会被识别为失效。
+        tmp_header = header_path.with_name(f"{header_path.stem}.tmp.json")
+        tmp_header.write_text(json.dumps(header, ensure_ascii=True, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp_header, header_path)
+    except OSError:
+        return
@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+from collections.abc import Iterator, Sequence
+from typing import NamedTuple, overload
+
+import numpy as np
+
+from .models import CandlePoint, PriceSource
+
+# 运行期 K 线缓存的紧凑表示：int32 yyyymmdd 日期 + float64 OHLC/成交额 + int64 成交量 + int8 价格来源码，
+# 每根约 53 字节（pydantic CandlePoint 约 600 字节）。下标访问返回轻量 CandleBar，
+# 只有 API 出口（to_points）才物化 CandlePoint。
+
+PRICE_SOURCE_CODES: tuple[PriceSource | None, ...] = (None, "vwap", "approx")
+_PRICE_SOURCE_TO_CODE = {name: code for code, name in enumerate(PRICE_SOURCE_CODES)}
+
+
+def date_text_to_day_int(value: str | None) -> int | None:
+    text = str(value or "").strip()
+    if len(text) < 10:
+        return None
+    digits = f"{text[0:4]}{text[5:7]}{text[8:10]}"
+    if not digits.isdigit():
+        return None
+    return int(digits)
+
+
+def day_int_to_text(value: int) -> str:
+    day = int(value)
+    return f"{day // 10000:04d}-{day // 100 % 100:02d}-{day % 100:02d}"
+
+
+def day_ints_to_texts(days: np.ndarray) -> list[str]:
+    if days.size <= 0:
+        return []
+    # yyyymmdd -> "yyyy-mm-dd"，按字符矩阵整体拼接，避免逐条格式化。
+    chars = np.ascontiguousarray(days.astype("U8")).view("U1").reshape(-1, 8)
+    out = np.full((chars.shape[0], 10), "-", dtype="U1")
+    out[:, 0:4] = chars[:, 0:4]
+    out[:, 5:7] = chars[:, 4:6]
+    out[:, 8:10] = chars[:, 6:8]
+    return out.view("U10").ravel().tolist()
+
+
+class CandleBar(NamedTuple):
+    time: str
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: int
+    amount: float
+    price_source: PriceSource | None
+
+
+class CandleLists(NamedTuple):
+    dates: list[str]
+    opens: list[float]
+    highs: list[float]
+    lows: list[float]
+    closes: list[float]
+    volumes: list[int]
+    amounts: list[float]
+
+
+class CandleSeries(Sequence[CandleBar]):
+    """Daily bars stored as parallel NumPy arrays; slicing returns views, indexing returns a ``CandleBar``."""
+
+    __slots__ = ("day", "open", "high", "low", "close", "volume", "amount", "source")
+
+    def __init__(
+        self,
+        *,
+        day: np.ndarray,
+        open: np.ndarray,
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray,
+        volume: np.ndarray,
+        amount: np.ndarray,
+        source: np.ndarray,
+    ) -> None:
+        self.day = day
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+        self.amount = amount
+        self.source = source
+
+    @classmethod
+    def from_arrays(
+        cls,
+        *,
+        day: np.ndarray,
+        open: np.ndarray,
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray,
+        volume: np.ndarray,
+        amount: np.ndarray,
+        price_source: PriceSource | None = None,
+    ) -> "CandleSeries":
+        size = int(np.asarray(close).size)
+        return cls(
+            day=np.ascontiguousarray(day, dtype=np.int32),
+            open=np.ascontiguousarray(open, dtype=np.float64),
+            high=np.ascontiguousarray(high, dtype=np.float64),
+            low=np.ascontiguousarray(low, dtype=np.float64),
+            close=np.ascontiguousarray(close, dtype=np.float64),
+            volume=np.ascontiguousarray(volume, dtype=np.int64),
+            amount=np.ascontiguousarray(amount, dtype=np.float64),
+            source=np.full(size, _PRICE_SOURCE_TO_CODE.get(price_source, 0), dtype=np.int8),
+        )
+
+    @classmethod
+    def from_points(cls, points: Sequence[CandlePoint] | Sequence[CandleBar]) -> "CandleSeries":
+        if isinstance(points, CandleSeries):
+            return points
+        day: list[int] = []
+        for item in points:
+            day_int = date_text_to_day_int(item.time)
+            if day_int is None or item.time != day_int_to_text(day_int):
+                raise ValueError(f"unsupported candle date: {item.time!r}")
+            day.append(day_int)
+        return cls(
+            day=np.asarray(day, dtype=np.int32),
+            open=np.asarray([item.open for item in points], dtype=np.float64),
+            high=np.asarray([item.high for item in points], dtype=np.float64),
+            low=np.asarray([item.low for item in points], dtype=np.float64),
+            close=np.asarray([item.close for item in points], dtype=np.float64),
+            volume=np.asarray([item.volume for item in points], dtype=np.int64),
+            amount=np.asarray([item.amount for item in points], dtype=np.float64),
+            source=np.asarray([_PRICE_SOURCE_TO_CODE.get(item.price_source, 0) for item in points], dtype=np.int8),
+        )
+
+    @classmethod
+    def empty(cls) -> "CandleSeries":
+        return cls.from_arrays(
+            day=np.zeros(0, dtype=np.int32),
+            open=np.zeros(0),
+            high=np.zeros(0),
+            low=np.zeros(0),
+            close=np.zeros(0),
+            volume=np.zeros(0, dtype=np.int64),
+            amount=np.zeros(0),
+        )
+
+    def __len__(self) -> int:
+        return int(self.close.shape[0])
+
+    def __repr__(self) -> str:
+        if len(self) <= 0:
+            return "CandleSeries(bars=0)"
+        return f"CandleSeries(bars={len(self)}, first={self.time_at(0)}, last={self.time_at(-1)})"
+
+    @overload
+    def __getitem__(self, index: int) -> CandleBar: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "CandleSeries": ...
+
+    def __getitem__(self, index: int | slice) -> CandleBar | "CandleSeries":
+        if isinstance(index, slice):
+            return self.take(index)
+        return self.bar(index)
+
+    def __iter__(self) -> Iterator[CandleBar]:
+        sources = [PRICE_SOURCE_CODES[code] for code in self.source.tolist()]
+        return map(
+            CandleBar._make,
+            zip(
+                self.times(),
+                self.open.tolist(),
+                self.high.tolist(),
+                self.low.tolist(),
+                self.close.tolist(),
+                self.volume.tolist(),
+                self.amount.tolist(),
+                sources,
+            ),
+        )
+
+    def take(self, index: slice | np.ndarray) -> "CandleSeries":
+        """Return the bars selected by a slice (views) or an index/bool array (copies)."""
+        return CandleSeries(
+            day=self.day[index],
+            open=self.open[index],
+            high=self.high[index],
+            low=self.low[index],
+            close=self.close[index],
+            volume=self.volume[index],
+            amount=self.amount[index],
+            source=self.source[index],
+        )
+
+    def bar(self, index: int) -> CandleBar:
+        size = len(self)
+        idx = int(index)
+        if idx < 0:
+            idx += size
+        if idx < 0 or idx >= size:
+            raise IndexError("CandleSeries index out of range")
+        return CandleBar(
+            time=day_int_to_text(int(self.day[idx])),
+            open=float(self.open[idx]),
+            high=float(self.high[idx]),
+            low=float(self.low[idx]),
+            close=float(self.close[idx]),
+            volume=int(self.volume[idx]),
+            amount=float(self.amount[idx]),
+            price_source=PRICE_SOURCE_CODES[int(self.source[idx])],
+        )
+
+    def time_at(self, index: int) -> str:
+        return day_int_to_text(int(self.day[index]))
+
+    def times(self) -> list[str]:
+        return day_ints_to_texts(self.day)
+
+    def last_index_on_or_before(self, day_int: int) -> int:
+        """Largest position whose date is ``<= day_int`` (``-1`` when none); order-agnostic like a reverse scan."""
+        hits = np.flatnonzero(self.day <= int(day_int))
+        return int(hits[-1]) if hits.size > 0 else -1
+
+    def first_index_of(self, day_int: int) -> int:
+        hits = np.flatnonzero(self.day == int(day_int))
+        return int(hits[0]) if hits.size > 0 else -1
+
+    def lists(self) -> CandleLists:
+        return CandleLists(
+            dates=self.times(),
+            opens=self.open.tolist(),
+            highs=self.high.tolist(),
+            lows=self.low.tolist(),
+            closes=self.close.tolist(),
+            volumes=np.maximum(self.volume, 0).tolist(),
+            amounts=self.amount.tolist(),
+        )
+
+    def to_points(self) -> list[CandlePoint]:
+        return [
+            CandlePoint(
+                time=bar.time,
+                open=bar.open,
+                high=bar.high,
+                low=bar.low,
+                close=bar.close,
+                volume=bar.volume,
+                amount=bar.amount,
+                price_source=bar.price_source,
+            )
+            for bar in self
+        ]
+
+    @property
+    def nbytes(self) -> int:
+        return int(
+            self.day.nbytes
+            + self.open.nbytes
+            + self.high.nbytes
+            + self.low.nbytes
+            + self.close.nbytes
+            + self.volume.nbytes
+            + self.amount.nbytes
+            + self.source.nbytes
+        )
+
+
+def candle_lists(candles: Sequence[CandlePoint] | Sequence[CandleBar]) -> CandleLists:
+    """Per-field Python lists (volumes clamped at 0) for either a ``CandleSeries`` or a list of bars."""
+    if isinstance(candles, CandleSeries):
+        return candles.lists()
+    return CandleLists(
+        dates=[point.time for point in candles],
+        opens=[point.open for point in candles],
+        highs=[point.high for point in candles],
+        lows=[point.low for point in candles],
+        closes=[point.close for point in candles],
+        volumes=[max(0, int(point.volume)) for point in candles],
+        amounts=[point.amount for point in candles],
+    )
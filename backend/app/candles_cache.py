@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from threading import Event, RLock
+from typing import Callable, Generic, TypeVar
+
+# 运行期 K 线缓存：按条目真实字节数计入预算的 LRU，淘汰从最久未用端批量进行；
+# 同一标的的并发未命中只触发一次加载，其余线程等待同一结果（single-flight）。
+
+_ENTRY_OVERHEAD_BYTES = 1024
+V = TypeVar("V")
+
+
+class _Flight(Generic[V]):
+    __slots__ = ("done", "value", "failed")
+
+    def __init__(self) -> None:
+        self.done = Event()
+        self.value: V | None = None
+        self.failed = False
+
+
+class ByteBudgetLruCache(Generic[V]):
+    """LRU keyed by string whose capacity is a byte budget (``sizeof(value)`` plus a fixed per-entry overhead).
+
+    ``max_entries`` optionally caps the entry count as well; ``0`` disables either limit.
+    """
+
+    def __init__(self, *, max_bytes: int, sizeof: Callable[[V], int], max_entries: int = 0) -> None:
+        self._lock = RLock()
+        self._entries: OrderedDict[str, tuple[V, int]] = OrderedDict()
+        self._flights: dict[str, _Flight[V]] = {}
+        self._sizeof = sizeof
+        self._max_bytes = max(0, int(max_bytes))
+        self._max_entries = max(0, int(max_entries))
+        self._bytes = 0
+        self._generation = 0
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._loads = 0
+        self._load_errors = 0
+        self._evictions = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def __contains__(self, key: object) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def configure(self, *, max_bytes: int | None = None, max_entries: int | None = None) -> None:
+        with self._lock:
+            if max_bytes is not None:
+                self._max_bytes = max(0, int(max_bytes))
+            if max_entries is not None:
+                self._max_entries = max(0, int(max_entries))
+            self._evict_locked()
+
+    def _entry_bytes(self, value: V) -> int:
+        try:
+            return max(0, int(self._sizeof(value))) + _ENTRY_OVERHEAD_BYTES
+        except Exception:
+            return _ENTRY_OVERHEAD_BYTES
+
+    def _evict_locked(self) -> int:
+        removed = 0
+        # 至少保留最新写入的一项：单个超预算条目也要能被刚请求它的调用方复用。
+        while len(self._entries) > 1 and (
+            (self._max_bytes > 0 and self._bytes > self._max_bytes)
+            or (self._max_entries > 0 and len(self._entries) > self._max_entries)
+        ):
+            _key, (_value, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            removed += 1
+        self._evictions += removed
+        return removed
+
+    def get(self, key: str) -> V | None:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return item[0]
+
+    def put(self, key: str, value: V) -> None:
+        size = self._entry_bytes(value)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            self._evict_locked()
+
+    def get_or_load(self, key: str, loader: Callable[[], V]) -> V:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return item[0]
+            self._misses += 1
+            generation = self._generation
+            flight = self._flights.get(key)
+            owner = flight is None
+            if owner:
+                flight = _Flight()
+                self._flights[key] = flight
+            else:
+                self._coalesced += 1
+        assert flight is not None
+
+        if not owner:
+            flight.done.wait()
+            if not flight.failed:
+                return flight.value  # type: ignore[return-value]
+            # 加载方失败：由当前线程自行重试一次，异常照常抛给调用方。
+            return loader()
+
+        try:
+            value = loader()
+        except BaseException:
+            with self._lock:
+                self._load_errors += 1
+                if self._flights.get(key) is flight:
+                    self._flights.pop(key, None)
+            flight.failed = True
+            flight.done.set()
+            raise
+        with self._lock:
+            self._loads += 1
+            if self._flights.get(key) is flight:
+                self._flights.pop(key, None)
+            # clear() 发生在加载期间（例如切换数据源）时，结果只交给本次调用方，不回填缓存。
+            if generation == self._generation:
+                self.put(key, value)
+        flight.value = value
+        flight.done.set()
+        return value
+
+    def get_or_load_many(
+        self,
+        keys: list[str],
+        loader: Callable[[list[str]], dict[str, V]],
+    ) -> dict[str, V]:
+        """Batch form of ``get_or_load``: misses not already in flight are loaded by a single ``loader(missing)`` call.
+
+        Keys the loader leaves out are left to the caller; keys loaded concurrently by other threads are waited on.
+        """
+        out: dict[str, V] = {}
+        owned: dict[str, _Flight[V]] = {}
+        waiting: dict[str, _Flight[V]] = {}
+        with self._lock:
+            generation = self._generation
+            for key in keys:
+                if key in out or key in owned or key in waiting:
+                    continue
+                item = self._entries.get(key)
+                if item is not None:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    out[key] = item[0]
+                    continue
+                self._misses += 1
+                flight = self._flights.get(key)
+                if flight is None:
+                    flight = _Flight()
+                    self._flights[key] = flight
+                    owned[key] = flight
+                else:
+                    self._coalesced += 1
+                    waiting[key] = flight
+
+        loaded: dict[str, V] = {}
+        try:
+            if owned:
+                loaded = loader(list(owned))
+        finally:
+            with self._lock:
+                for key, flight in owned.items():
+                    if self._flights.get(key) is flight:
+                        self._flights.pop(key, None)
+                    if key not in loaded:
+                        flight.failed = True
+                        self._load_errors += 1
+                        continue
+                    self._loads += 1
+                    flight.value = loaded[key]
+                    if generation == self._generation:
+                        self.put(key, loaded[key])
+            for flight in owned.values():
+                flight.done.set()
+        out.update(loaded)
+        for key, flight in waiting.items():
+            flight.done.wait()
+            if not flight.failed:
+                out[key] = flight.value  # type: ignore[assignment]
+        return out
+
+    def trim(self, max_entries: int) -> int:
+        """Drop least recently used entries until at most ``max_entries`` remain; returns the number removed."""
+        target = max(0, int(max_entries))
+        removed = 0
+        with self._lock:
+            while len(self._entries) > target:
+                _key, (_value, size) = self._entries.popitem(last=False)
+                self._bytes -= size
+                removed += 1
+            self._evictions += removed
+        return removed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._flights.clear()
+            self._bytes = 0
+            self._generation += 1
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": int(self._bytes),
+                "max_bytes": int(self._max_bytes),
+                "max_entries": int(self._max_entries),
+                "hits": int(self._hits),
+                "misses": int(self._misses),
+                "coalesced_misses": int(self._coalesced),
+                "loads": int(self._loads),
+                "load_errors": int(self._load_errors),
+                "evictions": int(self._evictions),
+            }
@@ -0,0 +1,476 @@
+from __future__ import annotations
+
+import json
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from threading import RLock
+from typing import Iterator
+
+import numpy as np
+
+from .market_data_sync import normalize_symbol
+from .candle_series import CandleSeries
+from .tdx_loader import (
+    DAY_RECORD,
+    DayColumns,
+    _akshare_cache_root,
+    _date_text_to_day_int,
+    _load_candle_series_from_akshare_cache,
+    _normalize_symbol,
+    _parse_day_file_columns,
+    _resolve_akshare_cache_file,
+)
+
+COLUMNAR_STORE_VERSION = 1
+COLUMNAR_FIELDS: dict[str, np.dtype] = {
+    "day": np.dtype("<i4"),
+    "open": np.dtype("<f8"),
+    "high": np.dtype("<f8"),
+    "low": np.dtype("<f8"),
+    "close": np.dtype("<f8"),
+    "amount": np.dtype("<f8"),
+    "volume": np.dtype("<i8"),
+}
+# 单个标的追加段数超过该值时，把该标的合并成一个连续段（旧段留作空洞，由 compact 回收）。
+_MAX_SEGMENTS_PER_ENTRY = 64
+_SHARED_STORES: dict[str, "ColumnarMarketStore"] = {}
+_SHARED_STORES_LOCK = RLock()
+
+
+def _entry_key(kind: str, symbol: str) -> str:
+    return f"{str(kind).strip().lower()}/{str(symbol).strip().lower()}"
+
+
+def _source_signature(path: Path | None) -> tuple[str, int, int] | None:
+    if path is None:
+        return None
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return str(path), int(stat.st_size), int(stat.st_mtime_ns)
+
+
+def _candle_series_to_day_columns(symbol: str, series: CandleSeries) -> DayColumns:
+    return DayColumns(
+        symbol=symbol,
+        total_bars=len(series),
+        day=series.day.astype(np.int64),
+        open=series.open,
+        high=series.high,
+        low=series.low,
+        close=series.close,
+        amount=series.amount,
+        volume=series.volume,
+    )
+
+
+class ColumnarMarketStore:
+    """Append-only columnar daily-bar store: one raw array file per field plus a per-symbol segment index.
+
+    Entries are keyed by source kind (``tdx``/``akshare``) and symbol. Every write appends rows to the
+    end of the field files and records an ``(offset, count)`` segment, so adding a trading day never
+    rewrites existing data.
+    """
+
+    def __init__(self, root: str | Path) -> None:
+        self._root = Path(root)
+        self._lock = RLock()
+        self._rows = 0
+        self._entries: dict[str, dict[str, object]] = {}
+        self._maps: dict[str, np.ndarray] = {}
+        self._batch_depth = 0
+        self._dirty = False
+        self._load_index()
+
+    @property
+    def root(self) -> Path:
+        return self._root
+
+    def _index_file(self) -> Path:
+        return self._root / "index.json"
+
+    def _field_file(self, field: str) -> Path:
+        return self._root / f"{field}.bin"
+
+    def _load_index(self) -> None:
+        path = self._index_file()
+        if not path.exists():
+            return
+        try:
+            with path.open("r", encoding="utf-8") as fp:
+                raw = json.load(fp)
+        except Exception:
+            return
+        if not isinstance(raw, dict) or int(raw.get("version") or 0) != COLUMNAR_STORE_VERSION:
+            return
+        entries = raw.get("entries")
+        if not isinstance(entries, dict):
+            return
+        self._rows = max(0, int(raw.get("rows") or 0))
+        self._entries = {str(key): dict(value) for key, value in entries.items() if isinstance(value, dict)}
+
+    def _save_index(self) -> None:
+        path = self._index_file()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp.json")
+        payload = {"version": COLUMNAR_STORE_VERSION, "rows": self._rows, "entries": self._entries}
+        with tmp_path.open("w", encoding="utf-8") as fp:
+            json.dump(payload, fp, ensure_ascii=True, separators=(",", ":"))
+        tmp_path.replace(path)
+        self._dirty = False
+
+    def _mark_dirty(self) -> None:
+        self._dirty = True
+        if self._batch_depth <= 0:
+            self._save_index()
+
+    @contextmanager
+    def batch(self) -> Iterator["ColumnarMarketStore"]:
+        """Defer index writes until the outermost batch exits."""
+        with self._lock:
+            self._batch_depth += 1
+            try:
+                yield self
+            finally:
+                self._batch_depth -= 1
+                if self._batch_depth <= 0 and self._dirty:
+                    self._save_index()
+
+    def _field_view(self, field: str) -> np.ndarray:
+        cached = self._maps.get(field)
+        if cached is not None and int(cached.shape[0]) >= self._rows:
+            return cached
+        if self._rows <= 0:
+            return np.zeros(0, dtype=COLUMNAR_FIELDS[field])
+        view = np.memmap(self._field_file(field), dtype=COLUMNAR_FIELDS[field], mode="r", shape=(self._rows,))
+        self._maps[field] = view
+        return view
+
+    def _append_raw(self, columns: dict[str, np.ndarray], count: int) -> int:
+        offset = self._rows
+        self._root.mkdir(parents=True, exist_ok=True)
+        for field, dtype in COLUMNAR_FIELDS.items():
+            path = self._field_file(field)
+            data = np.ascontiguousarray(np.asarray(columns[field])[:count], dtype=dtype)
+            mode = "r+b" if path.exists() else "w+b"
+            with path.open(mode) as fp:
+                # 以 index 记录的行数为准：崩溃残留的未登记尾部会被覆盖。
+                fp.seek(offset * dtype.itemsize)
+                fp.write(data.tobytes())
+                fp.truncate()
+        self._maps.clear()
+        self._rows = offset + count
+        return offset
+
+    def entry(self, kind: str, symbol: str) -> dict[str, object] | None:
+        with self._lock:
+            row = self._entries.get(_entry_key(kind, symbol))
+            return dict(row) if row is not None else None
+
+    def symbols(self, kind: str) -> list[str]:
+        prefix = f"{str(kind).strip().lower()}/"
+        with self._lock:
+            return sorted(key[len(prefix):] for key in self._entries if key.startswith(prefix))
+
+    def is_fresh(self, kind: str, symbol: str, source_path: Path | None) -> bool:
+        row = self.entry(kind, symbol)
+        if row is None:
+            return False
+        signature = _source_signature(source_path)
+        if signature is None:
+            return False
+        return (
+            str(row.get("source_path") or "") == signature[0]
+            and int(row.get("source_size") or -1) == signature[1]
+            and int(row.get("source_mtime_ns") or -1) == signature[2]
+        )
+
+    def read_columns(
+        self,
+        kind: str,
+        symbol: str,
+        *,
+        max_bars: int | None = None,
+        as_of_date: str | None = None,
+    ) -> DayColumns | None:
+        with self._lock:
+            row = self._entries.get(_entry_key(kind, symbol))
+            if row is None:
+                return None
+            segments = [(int(offset), int(count)) for offset, count in row.get("segments") or []]
+            views = {field: self._field_view(field) for field in COLUMNAR_FIELDS}
+
+        to_int = _date_text_to_day_int(as_of_date)
+        if to_int is not None:
+            # 段按日期递增排列，先丢掉 as_of 之后的段再按需截断。
+            while segments:
+                offset, count = segments[-1]
+                if int(views["day"][offset]) > to_int:
+                    segments.pop()
+                    continue
+                segments[-1] = (offset, int(np.searchsorted(views["day"][offset : offset + count], to_int, side="right")))
+                break
+        if max_bars is not None:
+            need = max(1, int(max_bars))
+            picked: list[tuple[int, int]] = []
+            for offset, count in reversed(segments):
+                if need <= 0:
+                    break
+                take = min(count, need)
+                picked.append((offset + count - take, take))
+                need -= take
+            segments = list(reversed(picked))
+        segments = [(offset, count) for offset, count in segments if count > 0]
+        if not segments:
+            return None
+
+        def _gather(field: str, dtype: type) -> np.ndarray:
+            parts = [views[field][offset : offset + count] for offset, count in segments]
+            return np.concatenate(parts).astype(dtype, copy=False) if len(parts) > 1 else np.array(parts[0], dtype=dtype)
+
+        return DayColumns(
+            symbol=str(symbol).strip().lower(),
+            total_bars=int(row.get("total_bars") or 0),
+            day=_gather("day", np.int64),
+            open=_gather("open", np.float64),
+            high=_gather("high", np.float64),
+            low=_gather("low", np.float64),
+            close=_gather("close", np.float64),
+            amount=_gather("amount", np.float64),
+            volume=_gather("volume", np.int64),
+        )
+
+    def _set_entry_source(self, row: dict[str, object], source_path: Path | None, total_bars: int) -> None:
+        signature = _source_signature(source_path)
+        row["source_path"] = signature[0] if signature else ""
+        row["source_size"] = signature[1] if signature else -1
+        row["source_mtime_ns"] = signature[2] if signature else -1
+        row["total_bars"] = int(total_bars)
+
+    def write_symbol(self, kind: str, symbol: str, columns: DayColumns, *, source_path: Path | None = None) -> None:
+        count = int(columns["close"].size)
+        with self._lock:
+            key = _entry_key(kind, symbol)
+            if count <= 0:
+                if self._entries.pop(key, None) is not None:
+                    self._mark_dirty()
+                return
+            offset = self._append_raw(dict(columns), count)
+            row: dict[str, object] = {
+                "segments": [[offset, count]],
+                "first_day": int(columns["day"][0]),
+                "last_day": int(columns["day"][-1]),
+                "bars": count,
+            }
+            self._set_entry_source(row, source_path, int(columns["total_bars"]))
+            self._entries[key] = row
+            self._mark_dirty()
+
+    def append_rows(self, kind: str, symbol: str, columns: DayColumns, *, source_path: Path | None = None) -> int:
+        with self._lock:
+            key = _entry_key(kind, symbol)
+            row = self._entries.get(key)
+            if row is None:
+                self.write_symbol(kind, symbol, columns, source_path=source_path)
+                return int(columns["close"].size)
+            keep = np.asarray(columns["day"]) > int(row.get("last_day") or 0)
+            count = int(np.count_nonzero(keep))
+            if count > 0:
+                offset = self._append_raw({field: np.asarray(columns[field])[keep] for field in COLUMNAR_FIELDS}, count)
+                row["segments"] = list(row.get("segments") or []) + [[offset, count]]
+                row["last_day"] = int(np.asarray(columns["day"])[keep][-1])
+                row["bars"] = int(row.get("bars") or 0) + count
+            self._set_entry_source(row, source_path, int(columns["total_bars"]))
+            self._mark_dirty()
+            if len(row["segments"]) > _MAX_SEGMENTS_PER_ENTRY:
+                merged = self.read_columns(kind, symbol)
+                if merged is not None:
+                    self.write_symbol(kind, symbol, merged, source_path=source_path)
+            return count
+
+    def append_day(self, kind: str, day: str, rows: dict[str, tuple[float, float, float, float, float, int]]) -> int:
+        """Append one trading day for many symbols with a single write per field file.
+
+        Call after the sources gained that day: each entry's recorded source is re-stat'ed in the same
+        index write, so ``is_fresh`` keeps serving the store instead of falling back to the raw files.
+        """
+        day_int = _date_text_to_day_int(day)
+        if day_int is None or not rows:
+            return 0
+        with self._lock:
+            symbols = [
+                symbol
+                for symbol in sorted(rows)
+                if _entry_key(kind, symbol) in self._entries
+                and int(self._entries[_entry_key(kind, symbol)].get("last_day") or 0) < day_int
+            ]
+            if not symbols:
+                return 0
+            values = np.asarray([rows[symbol] for symbol in symbols], dtype=np.float64).reshape(len(symbols), 6)
+            offset = self._append_raw(
+                {
+                    "day": np.full(len(symbols), day_int, dtype=np.int64),
+                    "open": values[:, 0],
+                    "high": values[:, 1],
+                    "low": values[:, 2],
+                    "close": values[:, 3],
+                    "amount": values[:, 4],
+                    "volume": values[:, 5].astype(np.int64),
+                },
+                len(symbols),
+            )
+            for idx, symbol in enumerate(symbols):
+                row = self._entries[_entry_key(kind, symbol)]
+                row["segments"] = list(row.get("segments") or []) + [[offset + idx, 1]]
+                row["last_day"] = day_int
+                row["bars"] = int(row.get("bars") or 0) + 1
+                source_path = str(row.get("source_path") or "")
+                self._set_entry_source(
+                    row,
+                    Path(source_path) if source_path else None,
+                    int(row.get("total_bars") or 0) + 1,
+                )
+            self._mark_dirty()
+            return len(symbols)
+
+    def sync_symbol(self, kind: str, symbol: str, columns: DayColumns, *, source_path: Path | None = None) -> str:
+        """Bring one entry in line with a freshly parsed source: ``append`` when the stored history is a prefix."""
+        with self._lock:
+            row = self._entries.get(_entry_key(kind, symbol))
+            if row is None:
+                self.write_symbol(kind, symbol, columns, source_path=source_path)
+                return "write"
+            last_day = int(row.get("last_day") or 0)
+            days = np.asarray(columns["day"])
+            idx = int(np.searchsorted(days, last_day, side="left"))
+            stored_tail = self.read_columns(kind, symbol, max_bars=1)
+            same_tail = (
+                stored_tail is not None
+                and idx < days.size
+                and int(days[idx]) == last_day
+                and float(columns["close"][idx]) == float(stored_tail["close"][-1])
+                and float(columns["open"][idx]) == float(stored_tail["open"][-1])
+            )
+            if not same_tail:
+                # 复权/数据修订导致历史变化时整段重写。
+                self.write_symbol(kind, symbol, columns, source_path=source_path)
+                return "rewrite"
+            appended = self.append_rows(kind, symbol, columns, source_path=source_path)
+            return "append" if appended > 0 else "unchanged"
+
+    def compact(self) -> None:
+        """Rewrite live segments into fresh field files, dropping rows orphaned by rewrites/merges."""
+        with self._lock:
+            tmp_root = self._root.with_name(f"{self._root.name}.compact.tmp")
+            target = ColumnarMarketStore(tmp_root)
+            target._entries = {}
+            target._rows = 0
+            with target.batch():
+                for key in sorted(self._entries):
+                    kind, symbol = key.split("/", 1)
+                    columns = self.read_columns(kind, symbol)
+                    if columns is None:
+                        continue
+                    count = int(columns["close"].size)
+                    offset = target._append_raw(dict(columns), count)
+                    row = dict(self._entries[key])
+                    row["segments"] = [[offset, count]]
+                    row["bars"] = count
+                    target._entries[key] = row
+                target._dirty = True
+            self._maps.clear()
+            for field in COLUMNAR_FIELDS:
+                source = target._field_file(field)
+                if source.exists():
+                    source.replace(self._field_file(field))
+                else:
+                    self._field_file(field).unlink(missing_ok=True)
+            target._index_file().replace(self._index_file())
+            try:
+                tmp_root.rmdir()
+            except OSError:
+                pass
+            self._rows = target._rows
+            self._entries = target._entries
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            live_rows = sum(int(row.get("bars") or 0) for row in self._entries.values())
+            return {"entries": len(self._entries), "rows": self._rows, "live_rows": live_rows}
+
+
+def sync_columnar_store_from_sources(
+    store: ColumnarMarketStore,
+    *,
+    tdx_root: str,
+    markets: list[str],
+    akshare_cache_dir: str = "",
+) -> dict[str, int]:
+    """Ingest TDX .day files and AkShare/Baostock CSV caches, touching only sources that changed."""
+    counts = {"write": 0, "append": 0, "rewrite": 0, "unchanged": 0, "skipped": 0}
+    root = Path(tdx_root)
+    with store.batch():
+        for market in sorted({str(item).strip().lower() for item in markets if str(item).strip()}):
+            market_dir = root / market / "lday"
+            if not market_dir.exists():
+                continue
+            for file_path in sorted(market_dir.glob("*.day")):
+                symbol = _normalize_symbol(file_path.stem, market)
+                if not symbol:
+                    continue
+                if store.is_fresh("tdx", symbol, file_path):
+                    counts["unchanged"] += 1
+                    continue
+                try:
+                    total_bars = int(file_path.stat().st_size // DAY_RECORD.size)
+                except OSError:
+                    continue
+                columns = _parse_day_file_columns(file_path, symbol, max_bars=total_bars)
+                if columns is None:
+                    counts["skipped"] += 1
+                    continue
+                counts[store.sync_symbol("tdx", symbol, columns, source_path=file_path)] += 1
+
+        cache_root = _akshare_cache_root(akshare_cache_dir)
+        if cache_root.exists():
+            for file_path in sorted(cache_root.glob("*.csv")):
+                symbol = normalize_symbol(file_path.stem)
+                if not symbol or _resolve_akshare_cache_file(symbol, str(cache_root)) != file_path:
+                    continue
+                if store.is_fresh("akshare", symbol, file_path):
+                    counts["unchanged"] += 1
+                    continue
+                series = _load_candle_series_from_akshare_cache(symbol, window=10**9, akshare_cache_dir=str(cache_root))
+                if not series:
+                    counts["skipped"] += 1
+                    continue
+                columns = _candle_series_to_day_columns(symbol, series)
+                counts[store.sync_symbol("akshare", symbol, columns, source_path=file_path)] += 1
+    return counts
+
+
+def columnar_store_enabled() -> bool:
+    raw = os.getenv("TDX_TREND_COLUMNAR_STORE", "").strip().lower()
+    return raw in {"1", "true", "yes", "on"}
+
+
+def _columnar_store_dir() -> Path:
+    raw = os.getenv("TDX_TREND_COLUMNAR_STORE_DIR", "").strip()
+    if raw:
+        return Path(os.path.expanduser(os.path.expandvars(raw)))
+    return Path.home() / ".tdx-trend" / "columnar-store"
+
+
+def get_shared_columnar_store() -> ColumnarMarketStore | None:
+    if not columnar_store_enabled():
+        return None
+    root = _columnar_store_dir()
+    key = str(root)
+    with _SHARED_STORES_LOCK:
+        store = _SHARED_STORES.get(key)
+        if store is None:
+            store = ColumnarMarketStore(root)
+            _SHARED_STORES[key] = store
+        return store
@@ -4,7 +4,7 @@ import math
 import time
 from collections import defaultdict
 from dataclasses import dataclass
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Any, Callable
 
 import numpy as np
@@ -21,6 +21,8 @@ from ..models import (
     ReviewStats,
     SimTradingConfig,
 )
+from ..candle_series import CandleSeries, date_text_to_day_int
+from ..trading_calendar import weekday_dates
 from .backtest_matrix_engine import MatrixBundle
 from .backtest_signal_matrix import BacktestSignalMatrix
 
@@ -154,6 +156,18 @@ class BacktestEngine:
         except Exception:
             return None
 
+    @staticmethod
+    def _matrix_date_range_mask(matrix_bundle: MatrixBundle, start_date: str, end_date: str) -> np.ndarray:
+        calendar = matrix_bundle.calendar()
+        if len(calendar) == len(matrix_bundle.dates):
+            return calendar.range_mask(start_date, end_date)
+        # 非常规（未排序/重复日期）矩阵：退回逐日字符串比较。
+        return np.fromiter(
+            (start_date <= day <= end_date for day in matrix_bundle.dates),
+            dtype=bool,
+            count=len(matrix_bundle.dates),
+        )
+
     @staticmethod
     def _normalize_event_dates(raw: Any) -> dict[str, str]:
         if not isinstance(raw, dict):
@@ -636,11 +650,7 @@ class BacktestEngine:
         ):
             raise ValueError("matrix bundle / signals shape mismatch")
 
-        in_range_mask = np.fromiter(
-            (start_date <= day <= end_date for day in dates),
-            dtype=bool,
-            count=len(dates),
-        )
+        in_range_mask = self._matrix_date_range_mask(matrix_bundle, start_date, end_date)
         if int(np.count_nonzero(in_range_mask)) < 2:
             return [], 0, self._build_delay_skip_counter()
 
@@ -860,11 +870,16 @@ class BacktestEngine:
         if len(candles) < 30:
             return [], 0, self._build_delay_skip_counter()
 
-        in_range_indexes = [
-            idx
-            for idx, candle in enumerate(candles)
-            if start_date <= candle.time <= end_date
-        ]
+        if isinstance(candles, CandleSeries):
+            start_day = date_text_to_day_int(start_date) or 0
+            end_day = date_text_to_day_int(end_date) or 0
+            in_range_indexes = np.flatnonzero((candles.day >= start_day) & (candles.day <= end_day)).tolist()
+        else:
+            in_range_indexes = [
+                idx
+                for idx, candle in enumerate(candles)
+                if start_date <= candle.time <= end_date
+            ]
         if len(in_range_indexes) < 2:
             return [], 0, self._build_delay_skip_counter()
 
@@ -1132,11 +1147,7 @@ class BacktestEngine:
         ):
             raise ValueError("matrix bundle / signals shape mismatch")
 
-        in_range_mask = np.fromiter(
-            (start_date <= day <= end_date for day in dates),
-            dtype=bool,
-            count=len(dates),
-        )
+        in_range_mask = self._matrix_date_range_mask(matrix_bundle, start_date, end_date)
         if int(np.count_nonzero(in_range_mask)) < 2:
             return [], self._build_delay_skip_counter()
 
@@ -1873,9 +1884,9 @@ class BacktestEngine:
         close_map_by_symbol: dict[str, dict[str, float]] = {}
         if matrix_bundle is not None and matrix_bundle.dates:
             matrix_dates = list(matrix_bundle.dates)
-            in_range_indexes = [
-                idx for idx, day in enumerate(matrix_dates) if start_date <= day <= end_date
-            ]
+            in_range_indexes = np.flatnonzero(
+                self._matrix_date_range_mask(matrix_bundle, start_date, end_date)
+            ).tolist()
             for idx in in_range_indexes:
                 calendar_dates_set.add(matrix_dates[idx])
 
@@ -1927,11 +1938,7 @@ class BacktestEngine:
             calendar_dates_set.update(day for day in exits_by_date if start_date <= day <= end_date)
 
         if not calendar_dates_set:
-            cursor_dt = start_dt
-            while cursor_dt <= end_dt:
-                if cursor_dt.weekday() < 5:
-                    calendar_dates_set.add(cursor_dt.strftime("%Y-%m-%d"))
-                cursor_dt += timedelta(days=1)
+            calendar_dates_set.update(weekday_dates(start_date, end_date))
 
         trading_dates = sorted(calendar_dates_set) if calendar_dates_set else [start_date]
         notes.append("资金曲线按交易日盯市：周末及节假日不生成净值点。")
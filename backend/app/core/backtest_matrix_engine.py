@@ -3,17 +3,48 @@
 import hashlib
 import json
 import os
+import shutil
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from pathlib import Path
-from threading import RLock
-from typing import Any, Callable
+from threading import RLock, get_ident
+from typing import Any, Callable, NamedTuple
 
 import numpy as np
 
+from ..candle_series import CandleSeries, date_text_to_day_int, day_ints_to_texts
 from ..models import CandlePoint
+from ..trading_calendar import TradingCalendar, date_texts_to_day_ints
+from .backtest_matrix_shm import (
+    attach_shared_bundle,
+    publish_shared_bundle,
+    release_shared_bundle,
+    shared_matrix_cache_enabled,
+)
+
+# 未压缩缓存目录 <cache_key>.mx/：每个价格字段一个原生 dtype 的 .npy（可直接 mmap），
+# 有效位按 bit 打包，header.json 记录版本/形状/dtype/日期/标的。
+_NPY_CACHE_VERSION = 1
+_NPY_PRICE_FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+
+def matrix_price_dtype() -> np.dtype:
+    """Price/volume dtype for new bundles: float64 (default) or float32 via ``TDX_TREND_BACKTEST_MATRIX_PRECISION``."""
+    raw = str(os.getenv('TDX_TREND_BACKTEST_MATRIX_PRECISION', '')).strip().lower()
+    if raw in {'float32', 'fp32', 'f32', '32', 'single'}:
+        return np.dtype(np.float32)
+    return np.dtype(np.float64)
+
+
+class SymbolColumns(NamedTuple):
+    day: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
 
 
 @dataclass(slots=True)
@@ -26,13 +57,73 @@ class MatrixBundle:
     close: np.ndarray
     volume: np.ndarray
     valid_mask: np.ndarray
+    _calendar: TradingCalendar | None = field(default=None, init=False, repr=False, compare=False)
 
     def shape(self) -> tuple[int, int]:
         return int(self.close.shape[0]), int(self.close.shape[1])
 
+    def calendar(self) -> TradingCalendar:
+        # dates 已升序去重，日历下标与矩阵行号一一对应。
+        if self._calendar is None or len(self._calendar) != len(self.dates):
+            self._calendar = TradingCalendar.from_dates(self.dates)
+        return self._calendar
+
     def symbol_to_index(self) -> dict[str, int]:
         return {symbol: idx for idx, symbol in enumerate(self.symbols)}
 
+    def view(
+        self,
+        *,
+        symbols: list[str] | None = None,
+        date_from: str | None = None,
+        date_to: str | None = None,
+    ) -> MatrixBundle | None:
+        """Sub-bundle over ``symbols`` (in the given order) and ``[date_from, date_to]`` sharing this bundle's memory.
+
+        Rows are always a slice; columns are a slice when the indices are evenly spaced and a gather of only the
+        selected columns otherwise. Returns ``None`` when a symbol is not in the bundle.
+        """
+        calendar = self.calendar()
+        start = 0 if date_from is None else calendar.index_on_or_after(date_from)
+        stop = len(self.dates) if date_to is None else calendar.index_on_or_before(date_to) + 1
+        rows = slice(start, max(start, stop))
+        if symbols is None:
+            out_symbols = list(self.symbols)
+            cols: slice | np.ndarray = slice(None)
+        else:
+            index = self.symbol_to_index()
+            positions = [index.get(symbol) for symbol in symbols]
+            if any(pos is None for pos in positions):
+                return None
+            out_symbols = list(symbols)
+            cols = _column_selector(np.asarray(positions, dtype=np.intp))
+        out = MatrixBundle(
+            dates=self.dates[rows],
+            symbols=out_symbols,
+            open=self.open[rows, cols],
+            high=self.high[rows, cols],
+            low=self.low[rows, cols],
+            close=self.close[rows, cols],
+            volume=self.volume[rows, cols],
+            valid_mask=self.valid_mask[rows, cols],
+        )
+        out._calendar = TradingCalendar(calendar.days[rows])
+        return out
+
+
+def _column_selector(columns: np.ndarray) -> slice | np.ndarray:
+    # 等距列号（含连续区间）可以表示成切片，取出来是视图；其余只能按列 gather。
+    if columns.size <= 0:
+        return slice(0, 0)
+    first = int(columns[0])
+    if columns.size == 1:
+        return slice(first, first + 1)
+    steps = np.diff(columns)
+    step = int(steps[0])
+    if step > 0 and bool(np.all(steps == step)):
+        return slice(first, int(columns[-1]) + 1, step)
+    return columns
+
 
 class BacktestMatrixEngine:
     def __init__(self, cache_dir: str | Path | None = None) -> None:
@@ -40,6 +131,7 @@ class BacktestMatrixEngine:
         self._runtime_cache: dict[str, tuple[float, MatrixBundle]] = {}
         self._runtime_cache_lock = RLock()
         self._incremental_manifest_lock = RLock()
+        self._superset_manifest_lock = RLock()
         self._build_meta_lock = RLock()
         self._build_meta_by_cache_key: dict[str, dict[str, object]] = {}
 
@@ -109,6 +201,7 @@ class BacktestMatrixEngine:
             created_at, bundle = cached
             if ttl_sec > 0 and (time.time() - created_at) > ttl_sec:
                 self._runtime_cache.pop(cache_key, None)
+                self._release_shared_bundle(cache_key)
                 return None
             return bundle
 
@@ -127,10 +220,23 @@ class BacktestMatrixEngine:
                 overflow = len(self._runtime_cache) - max_items
                 for key, _value in stale_items[:overflow]:
                     self._runtime_cache.pop(key, None)
+                    self._release_shared_bundle(key)
 
     def clear_runtime_cache(self) -> None:
         with self._runtime_cache_lock:
+            keys = list(self._runtime_cache)
             self._runtime_cache.clear()
+            for key in keys:
+                self._release_shared_bundle(key)
+
+    def _release_shared_bundle(self, cache_key: str) -> None:
+        # 运行期缓存淘汰某个键时，同步释放它的共享内存段（本进程发布的 unlink，附加的 close）。
+        if not shared_matrix_cache_enabled():
+            return
+        try:
+            release_shared_bundle(str(self._cache_dir), cache_key)
+        except Exception:
+            return
 
     @staticmethod
     def _is_incremental_cache_enabled() -> bool:
@@ -233,6 +339,139 @@ class BacktestMatrixEngine:
                 manifest = {name: manifest[name] for name in keep_keys}
             self._save_incremental_manifest(manifest)
 
+    @staticmethod
+    def _is_superset_cache_enabled() -> bool:
+        raw = str(os.getenv('TDX_TREND_BACKTEST_MATRIX_SUPERSET_CACHE', '')).strip().lower()
+        if not raw:
+            return True
+        if raw in {'0', 'false', 'no', 'off', 'n'}:
+            return False
+        return True
+
+    def _superset_manifest_file(self) -> Path:
+        return self._cache_dir / '_superset_manifest.json'
+
+    def _load_superset_manifest(self) -> dict[str, dict[str, object]]:
+        path = self._superset_manifest_file()
+        if not path.exists():
+            return {}
+        try:
+            with path.open('r', encoding='utf-8') as fp:
+                raw = json.load(fp)
+        except Exception:
+            return {}
+        if not isinstance(raw, dict):
+            return {}
+        out: dict[str, dict[str, object]] = {}
+        for cache_key, row in raw.items():
+            key = str(cache_key).strip()
+            if not key or not isinstance(row, dict):
+                continue
+            try:
+                out[key] = {
+                    'group': str(row.get('group') or '').strip(),
+                    'lookback_start': str(row.get('lookback_start') or '').strip(),
+                    'date_to': str(row.get('date_to') or '').strip(),
+                    'symbol_count': int(row.get('symbol_count') or 0),
+                }
+            except Exception:
+                continue
+        return out
+
+    def _update_superset_manifest(
+        self,
+        group: str,
+        cache_key: str,
+        *,
+        lookback_start: str,
+        date_to: str,
+        symbol_count: int,
+    ) -> None:
+        key = str(cache_key).strip()
+        if not str(group).strip() or not key:
+            return
+        with self._superset_manifest_lock:
+            manifest = self._load_superset_manifest()
+            manifest.pop(key, None)
+            manifest[key] = {
+                'group': str(group).strip(),
+                'lookback_start': str(lookback_start),
+                'date_to': str(date_to),
+                'symbol_count': int(symbol_count),
+            }
+            if len(manifest) > 256:
+                keep_keys = list(manifest.keys())[-256:]
+                manifest = {name: manifest[name] for name in keep_keys}
+            path = self._superset_manifest_file()
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = path.with_suffix('.tmp.json')
+                with tmp_path.open('w', encoding='utf-8') as fp:
+                    json.dump(manifest, fp, ensure_ascii=True, sort_keys=True)
+                tmp_path.replace(path)
+            except Exception:
+                return
+
+    def _cached_bundle_meta(self, cache_key: str) -> tuple[frozenset[str], np.dtype] | None:
+        """Symbols and price dtype of a cached bundle, read without loading its matrices."""
+        with self._runtime_cache_lock:
+            cached = self._runtime_cache.get(cache_key)
+        if cached is not None:
+            bundle = cached[1]
+            return frozenset(bundle.symbols), np.dtype(bundle.close.dtype)
+        header_path = self._npy_cache_path(cache_key) / 'header.json'
+        try:
+            if header_path.exists():
+                header = json.loads(header_path.read_text(encoding='utf-8'))
+                return frozenset(str(item) for item in header['symbols']), np.dtype(str(header['dtypes']['close']))
+            path = self._cache_file(cache_key)
+            if path.exists():
+                # npz 按成员惰性解压：只读标的列表；旧格式读回时一律转为 float64。
+                with np.load(path, allow_pickle=False) as data:
+                    return frozenset(data['symbols'].astype(str).tolist()), np.dtype(np.float64)
+        except Exception:
+            return None
+        return None
+
+    def _find_superset_view(
+        self,
+        group: str,
+        *,
+        cache_key: str,
+        symbols: list[str],
+        lookback_start: str,
+        date_to: str,
+        dtype: np.dtype,
+    ) -> tuple[str, MatrixBundle] | None:
+        with self._superset_manifest_lock:
+            manifest = self._load_superset_manifest()
+        candidates = sorted(
+            (
+                (int(row['symbol_count']), key)
+                for key, row in manifest.items()
+                if key != cache_key
+                and row['group'] == group
+                and int(row['symbol_count']) >= len(symbols)
+                and str(row['lookback_start']) <= lookback_start
+                and str(row['date_to']) >= date_to
+            ),
+        )
+        wanted = set(symbols)
+        for _count, key in candidates:
+            # 先用元数据核对标的与精度，只加载真正包含所需标的的超集（加载会映射、进运行期缓存并发布共享内存）。
+            meta = self._cached_bundle_meta(key)
+            if meta is None or meta[1] != np.dtype(dtype) or not wanted.issubset(meta[0]):
+                continue
+            base = self.load_bundle_from_cache(key)
+            if base is None or base.close.dtype != dtype:
+                continue
+            view = base.view(symbols=symbols, date_from=lookback_start, date_to=date_to)
+            # 子集在某些交易日整行无数据时，重建出的日期轴会少掉这些行；此时不复用，避免滚动窗口错位。
+            if view is None or not view.dates or not bool(view.valid_mask.any(axis=1).all()):
+                continue
+            return key, view
+        return None
+
     @classmethod
     def _with_lookback_start(cls, date_from: str, max_lookback_days: int) -> str:
         if max_lookback_days <= 0:
@@ -248,6 +487,13 @@ class BacktestMatrixEngine:
         raw = '\n'.join(sorted(set(normalized)))
         return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:16]
 
+    @staticmethod
+    def _add_precision_to_key_payload(payload: dict[str, object]) -> None:
+        # 仅在非默认精度时写入，float64 下已有缓存键保持不变。
+        dtype = matrix_price_dtype()
+        if dtype != np.float64:
+            payload['precision'] = dtype.name
+
     def build_cache_key(
         self,
         *,
@@ -265,6 +511,24 @@ class BacktestMatrixEngine:
             'window_set': list(window_set),
             'algo_version': str(algo_version).strip(),
         }
+        self._add_precision_to_key_payload(payload)
+        raw = json.dumps(payload, sort_keys=True, ensure_ascii=True, separators=(',', ':'))
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:24]
+
+    def build_superset_group(
+        self,
+        *,
+        data_version: str,
+        window_set: tuple[int, ...],
+        algo_version: str,
+    ) -> str:
+        """Everything in the cache key except the symbols and dates: bundles of one group can view into each other."""
+        payload = {
+            'data_version': str(data_version).strip(),
+            'window_set': list(window_set),
+            'algo_version': str(algo_version).strip(),
+        }
+        self._add_precision_to_key_payload(payload)
         raw = json.dumps(payload, sort_keys=True, ensure_ascii=True, separators=(',', ':'))
         return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:24]
 
@@ -286,12 +550,21 @@ class BacktestMatrixEngine:
             'window_set': list(window_set),
             'algo_version': str(algo_version).strip(),
         }
+        self._add_precision_to_key_payload(payload)
         raw = json.dumps(payload, sort_keys=True, ensure_ascii=True, separators=(',', ':'))
         return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:24]
 
     def _cache_file(self, cache_key: str) -> Path:
         return self._cache_dir / f'{cache_key}.npz'
 
+    def _npy_cache_path(self, cache_key: str) -> Path:
+        return self._cache_dir / f'{cache_key}.mx'
+
+    @staticmethod
+    def _cache_format() -> str:
+        raw = str(os.getenv('TDX_TREND_BACKTEST_MATRIX_CACHE_FORMAT', '')).strip().lower()
+        return 'npz' if raw == 'npz' else 'npy'
+
     @staticmethod
     def _build_empty_bundle() -> MatrixBundle:
         empty = np.zeros((0, 0), dtype=np.float64)
@@ -312,42 +585,216 @@ class BacktestMatrixEngine:
         return sorted(set(normalized))
 
     @staticmethod
-    def _is_valid_ohlcv(o: float, h: float, l: float, c: float, v: float) -> bool:
-        if not (np.isfinite(o) and np.isfinite(h) and np.isfinite(l) and np.isfinite(c) and np.isfinite(v)):
-            return False
-        if o <= 0 or h <= 0 or l <= 0 or c <= 0:
-            return False
-        return True
+    def _valid_ohlcv_mask(
+        o: np.ndarray,
+        h: np.ndarray,
+        l: np.ndarray,
+        c: np.ndarray,
+        v: np.ndarray,
+    ) -> np.ndarray:
+        finite = np.isfinite(o) & np.isfinite(h) & np.isfinite(l) & np.isfinite(c) & np.isfinite(v)
+        with np.errstate(invalid='ignore'):
+            return finite & (o > 0) & (h > 0) & (l > 0) & (c > 0)
+
+    @staticmethod
+    def _symbol_columns(rows: list[CandlePoint] | CandleSeries) -> SymbolColumns:
+        if isinstance(rows, CandleSeries):
+            return SymbolColumns(
+                day=rows.day,
+                open=rows.open,
+                high=rows.high,
+                low=rows.low,
+                close=rows.close,
+                volume=rows.volume.astype(np.float64),
+            )
+        size = len(rows)
+        return SymbolColumns(
+            day=date_texts_to_day_ints([str(item.time).strip() for item in rows]),
+            open=np.fromiter((float(item.open) for item in rows), dtype=np.float64, count=size),
+            high=np.fromiter((float(item.high) for item in rows), dtype=np.float64, count=size),
+            low=np.fromiter((float(item.low) for item in rows), dtype=np.float64, count=size),
+            close=np.fromiter((float(item.close) for item in rows), dtype=np.float64, count=size),
+            volume=np.fromiter((float(item.volume) for item in rows), dtype=np.float64, count=size),
+        )
+
+    @classmethod
+    def _build_bundle_from_columns(
+        cls,
+        columns_by_symbol: dict[str, SymbolColumns],
+        *,
+        symbols: list[str],
+        existing_dates: list[str] | None = None,
+        existing_open: np.ndarray | None = None,
+        existing_high: np.ndarray | None = None,
+        existing_low: np.ndarray | None = None,
+        existing_close: np.ndarray | None = None,
+        existing_volume: np.ndarray | None = None,
+        existing_valid_mask: np.ndarray | None = None,
+        dtype: np.dtype | type = np.float64,
+    ) -> MatrixBundle:
+        """Scatter per-symbol columns into (T, N) matrices: rows via ``searchsorted`` on day ints, one fancy-index write per field."""
+        n = len(symbols)
+        present = [(col, columns_by_symbol[symbol]) for col, symbol in enumerate(symbols) if symbol in columns_by_symbol]
+        day_parts = [item.day for _col, item in present]
+        if existing_dates:
+            day_parts.append(date_texts_to_day_ints(existing_dates))
+        all_days = np.concatenate(day_parts).astype(np.int32) if day_parts else np.zeros(0, dtype=np.int32)
+        # 非法日期解析为 0，不进入日历。
+        day_axis = np.unique(all_days[all_days > 0])
+        dates = day_ints_to_texts(day_axis)
+        t = len(dates)
+
+        open_ = np.full((t, n), np.nan, dtype=dtype)
+        high = np.full((t, n), np.nan, dtype=dtype)
+        low = np.full((t, n), np.nan, dtype=dtype)
+        close = np.full((t, n), np.nan, dtype=dtype)
+        volume = np.full((t, n), np.nan, dtype=dtype)
+        valid_mask = np.zeros((t, n), dtype=bool)
+
+        if existing_dates and existing_open is not None:
+            existing_t = min(len(existing_dates), existing_open.shape[0])
+            if existing_t > 0:
+                open_[:existing_t, :] = existing_open[:existing_t, :]
+                high[:existing_t, :] = existing_high[:existing_t, :]
+                low[:existing_t, :] = existing_low[:existing_t, :]
+                close[:existing_t, :] = existing_close[:existing_t, :]
+                volume[:existing_t, :] = existing_volume[:existing_t, :]
+                valid_mask[:existing_t, :] = existing_valid_mask[:existing_t, :]
+
+        if present and t > 0:
+            lengths = np.asarray([item.day.shape[0] for _col, item in present], dtype=np.int64)
+            cols = np.repeat(np.asarray([col for col, _item in present], dtype=np.int64), lengths)
+            day = np.concatenate([item.day for _col, item in present])
+            o = np.concatenate([item.open for _col, item in present])
+            h = np.concatenate([item.high for _col, item in present])
+            l = np.concatenate([item.low for _col, item in present])
+            c = np.concatenate([item.close for _col, item in present])
+            v = np.concatenate([item.volume for _col, item in present])
+            pick = np.flatnonzero((day > 0) & cls._valid_ohlcv_mask(o, h, l, c, v))
+            rows = np.searchsorted(day_axis, day[pick])
+            cols = cols[pick]
+            if bool(np.any((cols[1:] == cols[:-1]) & (rows[1:] <= rows[:-1]))):
+                # 同一单元格多次出现时以最后一根有效 K 线为准（与逐行覆盖一致）；日期严格递增时无需去重。
+                flat = rows * n + cols
+                _unique, first_in_reversed = np.unique(flat[::-1], return_index=True)
+                keep = flat.shape[0] - 1 - first_in_reversed
+                rows, cols, pick = rows[keep], cols[keep], pick[keep]
+            open_[rows, cols] = o[pick]
+            high[rows, cols] = h[pick]
+            low[rows, cols] = l[pick]
+            close[rows, cols] = c[pick]
+            volume[rows, cols] = np.maximum(v[pick], 0.0)
+            valid_mask[rows, cols] = True
+
+        return MatrixBundle(
+            dates=dates,
+            symbols=list(symbols),
+            open=open_,
+            high=high,
+            low=low,
+            close=close,
+            volume=volume,
+            valid_mask=valid_mask,
+        )
 
     @staticmethod
     def _slice_bundle_by_date_to(bundle: MatrixBundle, *, date_to: str) -> MatrixBundle | None:
         if not bundle.dates:
             return None
-        end = 0
-        for idx, day in enumerate(bundle.dates):
-            if day <= date_to:
-                end = idx + 1
-            else:
-                break
+        end = bundle.calendar().index_on_or_before(date_to) + 1
         if end <= 0:
             return None
         if end >= len(bundle.dates):
             return bundle
-        return MatrixBundle(
-            dates=list(bundle.dates[:end]),
-            symbols=list(bundle.symbols),
-            open=np.array(bundle.open[:end, :], dtype=np.float64, copy=True),
-            high=np.array(bundle.high[:end, :], dtype=np.float64, copy=True),
-            low=np.array(bundle.low[:end, :], dtype=np.float64, copy=True),
-            close=np.array(bundle.close[:end, :], dtype=np.float64, copy=True),
-            volume=np.array(bundle.volume[:end, :], dtype=np.float64, copy=True),
-            valid_mask=np.array(bundle.valid_mask[:end, :], dtype=bool, copy=True),
-        )
+        return bundle.view(date_to=date_to)
+
+    def _load_npy_bundle(self, cache_key: str) -> MatrixBundle | None:
+        root = self._npy_cache_path(cache_key)
+        header_path = root / 'header.json'
+        if not header_path.exists():
+            return None
+        try:
+            header = json.loads(header_path.read_text(encoding='utf-8'))
+            if not isinstance(header, dict) or int(header.get('version') or 0) != _NPY_CACHE_VERSION:
+                return None
+            dates = [str(item) for item in header.get('dates') or []]
+            symbols = [str(item) for item in header.get('symbols') or []]
+            shape = (len(dates), len(symbols))
+            cells = shape[0] * shape[1]
+            dtypes = header.get('dtypes')
+            if not isinstance(dtypes, dict):
+                return None
+            # 'r' 只读映射，缓存命中不再解压/复制。
+            mmap_mode = 'r' if cells > 0 else None
+            arrays: dict[str, np.ndarray] = {}
+            for name in _NPY_PRICE_FIELDS:
+                array = np.load(root / f'{name}.npy', mmap_mode=mmap_mode, allow_pickle=False)
+                # 头部与数组不一致（半写入/外部替换）按未命中处理。
+                if array.shape != shape or str(array.dtype) != str(dtypes.get(name)):
+                    return None
+                arrays[name] = array
+            packed = np.load(root / 'valid_mask.npy', allow_pickle=False)
+            valid_mask = np.unpackbits(packed, count=cells).view(bool).reshape(shape)
+        except Exception:
+            return None
+        return MatrixBundle(dates=dates, symbols=symbols, valid_mask=valid_mask, **arrays)
+
+    def _save_npy_bundle(self, cache_key: str, bundle: MatrixBundle) -> None:
+        root = self._npy_cache_path(cache_key)
+        tmp = root.with_name(f'{root.name}.tmp-{os.getpid()}-{get_ident()}')
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        for name in _NPY_PRICE_FIELDS:
+            np.save(tmp / f'{name}.npy', np.ascontiguousarray(getattr(bundle, name)), allow_pickle=False)
+        np.save(tmp / 'valid_mask.npy', np.packbits(np.asarray(bundle.valid_mask, dtype=bool), axis=None), allow_pickle=False)
+        header = {
+            'version': _NPY_CACHE_VERSION,
+            'shape': list(bundle.shape()),
+            'dtypes': {name: str(getattr(bundle, name).dtype) for name in _NPY_PRICE_FIELDS},
+            'dates': list(bundle.dates),
+            'symbols': list(bundle.symbols),
+        }
+        (tmp / 'header.json').write_text(json.dumps(header, ensure_ascii=True, separators=(',', ':')), encoding='utf-8')
+        # 先把旧目录整体改名让位，再换入新目录：Windows 下被映射的文件无法删除但目录可以改名，
+        # 旧目录删不掉时留给下次写入清理，不会出现新旧文件混在同一目录。
+        retired = root.with_name(f'{root.name}.old-{os.getpid()}-{get_ident()}')
+        shutil.rmtree(retired, ignore_errors=True)
+        try:
+            if root.exists():
+                root.rename(retired)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+            return
+        try:
+            tmp.rename(root)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+            if retired.exists() and not root.exists():
+                try:
+                    retired.rename(root)
+                except OSError:
+                    pass
+            return
+        shutil.rmtree(retired, ignore_errors=True)
+        legacy = self._cache_file(cache_key)
+        if legacy.exists():
+            legacy.unlink(missing_ok=True)
 
     def load_bundle_from_cache(self, cache_key: str) -> MatrixBundle | None:
+        """Runtime -> shared memory -> ``.mx`` (mmap) -> legacy ``.npz``; returned bundles are read-only."""
         cached_runtime = self._load_runtime_cache(cache_key)
         if cached_runtime is not None:
             return cached_runtime
+        if shared_matrix_cache_enabled():
+            shared = attach_shared_bundle(str(self._cache_dir), cache_key)
+            if shared is not None:
+                self._save_runtime_cache(cache_key, shared)
+                return shared
+        mapped = self._load_npy_bundle(cache_key)
+        if mapped is not None:
+            self._save_runtime_cache(cache_key, mapped)
+            self._publish_shared_bundle(cache_key, mapped)
+            return mapped
 
         path = self._cache_file(cache_key)
         if not path.exists():
@@ -384,10 +831,19 @@ class BacktestMatrixEngine:
                 valid_mask=valid_mask,
             )
             self._save_runtime_cache(cache_key, bundle)
+            self._publish_shared_bundle(cache_key, bundle)
             return bundle
         except Exception:
             return None
 
+    def _publish_shared_bundle(self, cache_key: str, bundle: MatrixBundle) -> None:
+        if not shared_matrix_cache_enabled() or not bundle.dates:
+            return
+        try:
+            publish_shared_bundle(str(self._cache_dir), cache_key, bundle)
+        except Exception:
+            return
+
     def save_bundle_to_cache(
         self,
         cache_key: str,
@@ -395,22 +851,26 @@ class BacktestMatrixEngine:
         *,
         incremental_signature: str | None = None,
     ) -> None:
-        path = self._cache_file(cache_key)
-        path.parent.mkdir(parents=True, exist_ok=True)
-        tmp = path.with_suffix('.tmp.npz')
-        np.savez_compressed(
-            tmp,
-            dates=np.asarray(bundle.dates, dtype='U10'),
-            symbols=np.asarray(bundle.symbols, dtype='U16'),
-            open=bundle.open,
-            high=bundle.high,
-            low=bundle.low,
-            close=bundle.close,
-            volume=bundle.volume,
-            valid_mask=bundle.valid_mask.astype(np.uint8),
-        )
-        tmp.replace(path)
+        if self._cache_format() == 'npy':
+            self._save_npy_bundle(cache_key, bundle)
+        else:
+            path = self._cache_file(cache_key)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix('.tmp.npz')
+            np.savez_compressed(
+                tmp,
+                dates=np.asarray(bundle.dates, dtype='U10'),
+                symbols=np.asarray(bundle.symbols, dtype='U16'),
+                open=bundle.open,
+                high=bundle.high,
+                low=bundle.low,
+                close=bundle.close,
+                volume=bundle.volume,
+                valid_mask=bundle.valid_mask.astype(np.uint8),
+            )
+            tmp.replace(path)
         self._save_runtime_cache(cache_key, bundle)
+        self._publish_shared_bundle(cache_key, bundle)
         if incremental_signature and bundle.dates:
             self._update_incremental_manifest(
                 incremental_signature,
@@ -422,13 +882,15 @@ class BacktestMatrixEngine:
         self,
         *,
         symbols: list[str],
-        get_candles: Callable[[str], list[CandlePoint]],
+        get_candles: Callable[[str], list[CandlePoint] | CandleSeries],
         date_from: str,
         date_to: str,
         max_lookback_days: int,
         cache_key: str,
         incremental_signature: str | None = None,
+        superset_group: str | None = None,
         use_cache: bool = True,
+        prefetch_candles: Callable[[list[str]], object] | None = None,
     ) -> tuple[MatrixBundle, bool]:
         started_at = time.perf_counter()
         if use_cache:
@@ -472,14 +934,55 @@ class BacktestMatrixEngine:
                 False,
             )
 
+        price_dtype = matrix_price_dtype()
         lookback_start = self._with_lookback_start(date_from, max_lookback_days)
+        lookback_start_day = date_text_to_day_int(lookback_start)
+        date_to_day = date_text_to_day_int(date_to)
+        group = str(superset_group or '').strip()
+
+        if use_cache and group and self._is_superset_cache_enabled():
+            # 同组（数据版本/窗口/算法/精度一致）且标的与日期都覆盖本次请求的已缓存矩阵，直接切视图，不再重建。
+            found = self._find_superset_view(
+                group,
+                cache_key=cache_key,
+                symbols=deduped_symbols,
+                lookback_start=lookback_start,
+                date_to=date_to,
+                dtype=price_dtype,
+            )
+            if found is not None:
+                superset_key, view = found
+                self._save_runtime_cache(cache_key, view)
+                self._save_build_meta(
+                    cache_key,
+                    {
+                        'mode': 'superset_view',
+                        'cache_hit': True,
+                        'base_cache_key': superset_key,
+                        'elapsed_sec': max(0.0, time.perf_counter() - started_at),
+                        'shape_t': int(view.close.shape[0]),
+                        'shape_n': int(view.close.shape[1]),
+                        'last_date': str(view.dates[-1]) if view.dates else '',
+                    },
+                )
+                return view, True
 
         def _load_symbol_rows(
             symbol: str,
             *,
             lower_bound_exclusive: str | None,
-        ) -> tuple[str, list[CandlePoint], list[str]]:
+        ) -> tuple[str, list[CandlePoint] | CandleSeries, list[str]]:
             candles = get_candles(symbol)
+            lower_day = date_text_to_day_int(lower_bound_exclusive) if lower_bound_exclusive is not None else 0
+            if (
+                isinstance(candles, CandleSeries)
+                and lookback_start_day is not None
+                and date_to_day is not None
+                and lower_day is not None
+            ):
+                keep = (candles.day >= lookback_start_day) & (candles.day <= date_to_day) & (candles.day > lower_day)
+                selected = candles.take(keep)
+                return symbol, selected, selected.times()
             rows: list[CandlePoint] = []
             local_dates: list[str] = []
             for item in candles:
@@ -497,9 +1000,12 @@ class BacktestMatrixEngine:
         def _collect_rows(
             *,
             lower_bound_exclusive: str | None,
-        ) -> tuple[dict[str, list[CandlePoint]], set[str]]:
-            filtered_rows_by_symbol: dict[str, list[CandlePoint]] = {}
+        ) -> tuple[dict[str, list[CandlePoint] | CandleSeries], set[str]]:
+            filtered_rows_by_symbol: dict[str, list[CandlePoint] | CandleSeries] = {}
             all_dates: set[str] = set()
+            if prefetch_candles is not None:
+                # 先整批预热行情缓存，后面的 get_candles 只走命中路径。
+                prefetch_candles(deduped_symbols)
             workers = self._resolve_build_workers()
             if workers <= 1 or len(deduped_symbols) <= 1:
                 for symbol in deduped_symbols:
@@ -527,7 +1033,7 @@ class BacktestMatrixEngine:
             return filtered_rows_by_symbol, all_dates
 
         def _build_bundle_from_rows(
-            filtered_rows_by_symbol: dict[str, list[CandlePoint]],
+            filtered_rows_by_symbol: dict[str, list[CandlePoint] | CandleSeries],
             *,
             existing_dates: list[str] | None = None,
             existing_open: np.ndarray | None = None,
@@ -537,62 +1043,17 @@ class BacktestMatrixEngine:
             existing_volume: np.ndarray | None = None,
             existing_valid_mask: np.ndarray | None = None,
         ) -> MatrixBundle:
-            date_set: set[str] = set(existing_dates or [])
-            for rows in filtered_rows_by_symbol.values():
-                for item in rows:
-                    day = str(item.time).strip()
-                    if day:
-                        date_set.add(day)
-            dates = sorted(date_set)
-            date_to_idx = {day: idx for idx, day in enumerate(dates)}
-            t = len(dates)
-            n = len(deduped_symbols)
-
-            open_ = np.full((t, n), np.nan, dtype=np.float64)
-            high = np.full((t, n), np.nan, dtype=np.float64)
-            low = np.full((t, n), np.nan, dtype=np.float64)
-            close = np.full((t, n), np.nan, dtype=np.float64)
-            volume = np.full((t, n), np.nan, dtype=np.float64)
-            valid_mask = np.zeros((t, n), dtype=bool)
-
-            if existing_dates and existing_open is not None:
-                existing_t = min(len(existing_dates), existing_open.shape[0])
-                if existing_t > 0:
-                    open_[:existing_t, :] = existing_open[:existing_t, :]
-                    high[:existing_t, :] = existing_high[:existing_t, :]
-                    low[:existing_t, :] = existing_low[:existing_t, :]
-                    close[:existing_t, :] = existing_close[:existing_t, :]
-                    volume[:existing_t, :] = existing_volume[:existing_t, :]
-                    valid_mask[:existing_t, :] = existing_valid_mask[:existing_t, :]
-
-            for col, symbol in enumerate(deduped_symbols):
-                for row in filtered_rows_by_symbol.get(symbol, []):
-                    idx = date_to_idx.get(str(row.time).strip())
-                    if idx is None:
-                        continue
-                    o = float(row.open)
-                    h = float(row.high)
-                    l = float(row.low)
-                    c = float(row.close)
-                    v = float(row.volume)
-                    if not self._is_valid_ohlcv(o, h, l, c, v):
-                        continue
-                    open_[idx, col] = o
-                    high[idx, col] = h
-                    low[idx, col] = l
-                    close[idx, col] = c
-                    volume[idx, col] = max(0.0, v)
-                    valid_mask[idx, col] = True
-
-            return MatrixBundle(
-                dates=dates,
+            return self._build_bundle_from_columns(
+                {symbol: self._symbol_columns(rows) for symbol, rows in filtered_rows_by_symbol.items()},
                 symbols=deduped_symbols,
-                open=open_,
-                high=high,
-                low=low,
-                close=close,
-                volume=volume,
-                valid_mask=valid_mask,
+                existing_dates=existing_dates,
+                existing_open=existing_open,
+                existing_high=existing_high,
+                existing_low=existing_low,
+                existing_close=existing_close,
+                existing_volume=existing_volume,
+                existing_valid_mask=existing_valid_mask,
+                dtype=price_dtype,
             )
 
         base_cache_key: str | None = None
@@ -615,6 +1076,7 @@ class BacktestMatrixEngine:
                     cached_base is not None
                     and cached_base.symbols == deduped_symbols
                     and cached_base.dates
+                    and cached_base.close.dtype == price_dtype
                 ):
                     resolved_base = self._slice_bundle_by_date_to(cached_base, date_to=date_to)
                     if resolved_base is not None and resolved_base.dates:
@@ -656,6 +1118,14 @@ class BacktestMatrixEngine:
                 bundle,
                 incremental_signature=incremental_signature,
             )
+            if group:
+                self._update_superset_manifest(
+                    group,
+                    cache_key,
+                    lookback_start=lookback_start,
+                    date_to=date_to,
+                    symbol_count=len(bundle.symbols),
+                )
 
         self._save_build_meta(
             cache_key,
@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import atexit
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import struct
+from multiprocessing import resource_tracker, shared_memory
+from threading import RLock
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .backtest_matrix_engine import MatrixBundle
+
+# 跨进程共享的行情矩阵：每个缓存键一段具名共享内存，布局为
+#   64 字节头（magic / ready / T / N / 索引长度） + JSON 索引（cache_key、dtype、日期、标的） + 5 个 (T, N) 价格矩阵 + bool 有效位。
+# 先发布的进程负责 unlink：对应键被移出运行期缓存、超出发布总量上限或进程退出时释放；
+# 其它 API worker / 桌面实例只读附加，同样随运行期缓存淘汰而 close，已 unlink 的段在最后一个映射关闭后归还内存。
+
+_MAGIC = b"TDXMXSHM"
+_HEADER = struct.Struct("<8sIIQQQ")
+_HEADER_SIZE = 64
+_FIELDS = ("open", "high", "low", "close", "volume")
+_LOCK = RLock()
+_ATTACHED: dict[str, shared_memory.SharedMemory] = {}
+_OWNED: dict[str, shared_memory.SharedMemory] = {}
+# 仍有 ndarray 视图引用的段不能 close（BufferError）：先放在这里，之后每次发布/释放时重试 close。
+_RETIRED: list[shared_memory.SharedMemory] = []
+# Python 3.13+ 才有 SharedMemory(track=...)。
+_TRACK_PARAM_SUPPORTED = "track" in inspect.signature(shared_memory.SharedMemory.__init__).parameters
+
+
+def shared_matrix_cache_enabled() -> bool:
+    raw = os.getenv("TDX_TREND_SHARED_MATRIX_CACHE", "").strip().lower()
+    if not raw:
+        return False
+    return raw in {"1", "true", "yes", "on"}
+
+
+def _shared_matrix_max_bytes() -> int:
+    raw = os.getenv("TDX_TREND_SHARED_MATRIX_MAX_MB", "").strip()
+    if not raw:
+        return 2048 * 1024 * 1024
+    try:
+        return max(0, int(float(raw) * 1024 * 1024))
+    except Exception:
+        return 2048 * 1024 * 1024
+
+
+def _segment_name(namespace: str, cache_key: str) -> str:
+    # POSIX 共享内存名在 macOS 上限 31 字符（含前导 /）。
+    digest = hashlib.sha1(f"{namespace}|{cache_key}".encode("utf-8")).hexdigest()[:24]
+    return f"tdxmx_{digest}"
+
+
+def _untrack(block: shared_memory.SharedMemory) -> None:
+    # 生命周期由本模块管理：避免 resource_tracker 在附加方退出时把别的进程发布的段 unlink 掉。
+    try:
+        resource_tracker.unregister(getattr(block, "_name", block.name), "shared_memory")
+    except Exception:
+        pass
+
+
+def _open_segment(name: str, *, create: bool = False, size: int = 0) -> shared_memory.SharedMemory:
+    if _TRACK_PARAM_SUPPORTED:
+        return shared_memory.SharedMemory(name=name, create=create, size=size, track=False)
+    block = shared_memory.SharedMemory(name=name, create=create, size=size)
+    _untrack(block)
+    return block
+
+
+def _unlink(block: shared_memory.SharedMemory) -> None:
+    if _TRACK_PARAM_SUPPORTED:
+        block.unlink()
+        return
+    # 旧版 unlink() 会向 resource_tracker 注销；先补登记，避免 tracker 对未知名字报错。
+    name = getattr(block, "_name", block.name)
+    resource_tracker.register(name, "shared_memory")
+    block.unlink()
+
+
+def _close_or_retire(block: shared_memory.SharedMemory) -> None:
+    try:
+        block.close()
+    except BufferError:
+        _RETIRED.append(block)
+
+
+def _sweep_retired() -> None:
+    pending = list(_RETIRED)
+    _RETIRED.clear()
+    for block in pending:
+        _close_or_retire(block)
+
+
+def _release_owned(name: str) -> None:
+    block = _OWNED.pop(name, None)
+    if block is None:
+        return
+    try:
+        _unlink(block)
+    except Exception:
+        pass
+    _close_or_retire(block)
+
+
+def _align8(value: int) -> int:
+    return (int(value) + 7) & ~7
+
+
+def _shm_has_room(size: int) -> bool:
+    # Linux 的 /dev/shm 是稀疏 tmpfs，写满时按页触发 SIGBUS，发布前先确认剩余空间。
+    if not os.path.isdir("/dev/shm"):
+        return True
+    try:
+        return shutil.disk_usage("/dev/shm").free > int(size) * 2
+    except OSError:
+        return False
+
+
+def _bundle_views(block: shared_memory.SharedMemory, cache_key: str) -> MatrixBundle | None:
+    from .backtest_matrix_engine import MatrixBundle
+
+    buf = block.buf
+    if len(buf) < _HEADER_SIZE:
+        return None
+    magic, ready, _reserved, rows, cols, index_len = _HEADER.unpack_from(buf, 0)
+    if magic != _MAGIC or ready != 1:
+        return None
+    try:
+        index = json.loads(bytes(buf[_HEADER_SIZE : _HEADER_SIZE + index_len]).decode("utf-8"))
+    except Exception:
+        return None
+    if not isinstance(index, dict) or index.get("cache_key") != cache_key:
+        return None
+    dates = [str(item) for item in index.get("dates") or []]
+    symbols = [str(item) for item in index.get("symbols") or []]
+    try:
+        dtype = np.dtype(str(index.get("dtype") or "<f8"))
+    except TypeError:
+        return None
+    shape = (int(rows), int(cols))
+    if shape != (len(dates), len(symbols)) or dtype.kind != "f":
+        return None
+    cells = shape[0] * shape[1]
+    offset = _HEADER_SIZE + _align8(index_len)
+    if len(buf) < offset + cells * dtype.itemsize * len(_FIELDS) + cells:
+        return None
+    arrays: dict[str, np.ndarray] = {}
+    for field in _FIELDS:
+        arrays[field] = np.ndarray(shape, dtype=dtype, buffer=buf, offset=offset)
+        offset += cells * dtype.itemsize
+    arrays["valid_mask"] = np.ndarray(shape, dtype=np.bool_, buffer=buf, offset=offset)
+    for array in arrays.values():
+        array.flags.writeable = False
+    return MatrixBundle(dates=dates, symbols=symbols, **arrays)
+
+
+def attach_shared_bundle(namespace: str, cache_key: str) -> MatrixBundle | None:
+    """Read-only bundle backed by a segment another process published, or ``None``."""
+    name = _segment_name(namespace, cache_key)
+    with _LOCK:
+        block = _OWNED.get(name) or _ATTACHED.get(name)
+        if block is None:
+            try:
+                block = _open_segment(name)
+            except (FileNotFoundError, OSError, ValueError):
+                return None
+            _ATTACHED[name] = block
+        return _bundle_views(block, cache_key)
+
+
+def publish_shared_bundle(namespace: str, cache_key: str, bundle: MatrixBundle) -> bool:
+    name = _segment_name(namespace, cache_key)
+    dtype = np.dtype(bundle.close.dtype)
+    index = json.dumps(
+        {"cache_key": cache_key, "dtype": dtype.str, "dates": list(bundle.dates), "symbols": list(bundle.symbols)},
+        ensure_ascii=True,
+        separators=(",", ":"),
+    ).encode("utf-8")
+    rows, cols = bundle.shape()
+    cells = rows * cols
+    size = _HEADER_SIZE + _align8(len(index)) + cells * dtype.itemsize * len(_FIELDS) + cells
+    with _LOCK:
+        if name in _OWNED or name in _ATTACHED:
+            return True
+        _sweep_retired()
+        budget = _shared_matrix_max_bytes()
+        if size > budget:
+            return False
+        # 超出发布总量上限时先释放最早发布的段。
+        while _OWNED and sum(block.size for block in _OWNED.values()) + size > budget:
+            _release_owned(next(iter(_OWNED)))
+        if not _shm_has_room(size):
+            return False
+        try:
+            block = _open_segment(name, create=True, size=max(size, _HEADER_SIZE))
+        except FileExistsError:
+            # 其它进程已发布（或正在写入）同一键。
+            return True
+        except OSError:
+            return False
+        try:
+            buf = block.buf
+            _HEADER.pack_into(buf, 0, _MAGIC, 0, 0, rows, cols, len(index))
+            buf[_HEADER_SIZE : _HEADER_SIZE + len(index)] = index
+            offset = _HEADER_SIZE + _align8(len(index))
+            for field in _FIELDS:
+                target = np.ndarray((rows, cols), dtype=dtype, buffer=buf, offset=offset)
+                target[...] = getattr(bundle, field)
+                offset += cells * dtype.itemsize
+            target_mask = np.ndarray((rows, cols), dtype=np.bool_, buffer=buf, offset=offset)
+            target_mask[...] = bundle.valid_mask
+            del target, target_mask
+            # ready 最后置位：附加方看到 ready=1 时数据已完整。
+            _HEADER.pack_into(buf, 0, _MAGIC, 1, 0, rows, cols, len(index))
+        except Exception:
+            _unlink(block)
+            _RETIRED.append(block)
+            return False
+        _OWNED[name] = block
+        return True
+
+
+def release_shared_bundle(namespace: str, cache_key: str) -> None:
+    """Drop this process's hold on the key's segment: unlink it if published here, close the mapping either way."""
+    name = _segment_name(namespace, cache_key)
+    with _LOCK:
+        _release_owned(name)
+        block = _ATTACHED.pop(name, None)
+        if block is not None:
+            _close_or_retire(block)
+        _sweep_retired()
+
+
+def shared_segment_names() -> list[str]:
+    """Names of the segments this process currently publishes."""
+    with _LOCK:
+        return list(_OWNED)
+
+
+def close_shared_matrix_segments() -> None:
+    """Unlink segments this process published; mappings other processes hold stay valid until they exit."""
+    with _LOCK:
+        for block in _OWNED.values():
+            try:
+                _unlink(block)
+            except Exception:
+                pass
+        _RETIRED.extend(_OWNED.values())
+        _RETIRED.extend(_ATTACHED.values())
+        _OWNED.clear()
+        _ATTACHED.clear()
+
+
+atexit.register(close_shared_matrix_segments)
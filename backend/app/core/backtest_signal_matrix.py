@@ -1,11 +1,33 @@
 ﻿from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field, fields
 
 import numpy as np
-import pandas as pd
 
 from .backtest_matrix_engine import MatrixBundle
+from .rolling_kernels import (
+    RollingMeanState,
+    nan_where_zero,
+    pct_change_rows,
+    rolling_max,
+    rolling_mean_resume,
+    rolling_min,
+    shift_rows,
+)
+
+# 每行信号的窗口只覆盖本行及之前至多 59 行（最长窗口 ma60/vol_ma60/range60），增量计算时带上这段预热。
+# 极值、涨幅、横截面排名只看窗口本身；均值是从第 0 行起的 Kahan 累计和，低位取决于起算行，
+# 因此矩阵同时保存“预热起点之前”的均值累计状态，续算时从该状态接着累加，与全量重算逐位一致。
+SIGNAL_WARMUP_ROWS = 60
+# (名称, 价格字段, 窗口)
+_SIGNAL_MEANS: tuple[tuple[str, str, int], ...] = (
+    ("ma10", "close", 10),
+    ("ma20", "close", 20),
+    ("ma60", "close", 60),
+    ("vol_ma10", "volume", 10),
+    ("vol_ma20", "volume", 20),
+    ("vol_ma60", "volume", 60),
+)
 
 
 @dataclass(slots=True)
@@ -23,12 +45,48 @@ class BacktestSignalMatrix:
     buy_signal: np.ndarray
     sell_signal: np.ndarray
     score: np.ndarray
+    # 前 mean_state_row 行之后的均值累计状态（mean_state_row = 行数 - SIGNAL_WARMUP_ROWS，下限 0）。
+    mean_state: dict[str, RollingMeanState] | None = field(default=None, compare=False)
+    mean_state_row: int = -1
 
 
-def _to_bool_array(frame: pd.DataFrame) -> np.ndarray:
-    # Pandas/NumPy may return read-only views for some blocks; force writable copies.
-    values = frame.fillna(False).to_numpy(dtype=bool, copy=True)
-    return np.array(values, dtype=bool, copy=True)
+SIGNAL_MATRIX_FIELDS: tuple[str, ...] = tuple(
+    item.name for item in fields(BacktestSignalMatrix) if item.name not in {"mean_state", "mean_state_row"}
+)
+
+
+# 非有限值（NaN/inf）不参与排名时的名次。
+UNRANKED = np.iinfo(np.int32).max
+
+
+def cross_sectional_ranks(values: np.ndarray) -> np.ndarray:
+    """0-based descending rank of every cell within its row, for the whole (T, N) matrix at once.
+
+    Ties keep column order (stable sort); non-finite cells get ``UNRANKED``.
+    """
+    x = np.asarray(values, dtype=np.float64)
+    if x.ndim != 2:
+        return np.zeros((0, 0), dtype=np.int32)
+    t, n = x.shape
+    ranks = np.full((t, n), UNRANKED, dtype=np.int32)
+    if t <= 0 or n <= 0:
+        return ranks
+    finite = np.isfinite(x)
+    order = np.argsort(np.where(finite, -x, np.inf), axis=1, kind="stable")
+    np.put_along_axis(ranks, order, np.broadcast_to(np.arange(n, dtype=np.int32), (t, n)), axis=1)
+    ranks[~finite] = UNRANKED
+    return ranks
+
+
+def top_n_mask_from_ranks(ranks: np.ndarray, *, top_n: int) -> np.ndarray:
+    """Top ``top_n`` finite cells per row from ``cross_sectional_ranks``; one ranking serves any ``top_n``."""
+    return np.asarray(ranks) < max(1, int(top_n))
+
+
+def backtest_signal_return_ranks(bundle: MatrixBundle) -> np.ndarray:
+    """Ranks of the 40-day returns behind s3; pass to ``compute_backtest_signal_matrix`` when sweeping ``top_n``."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return cross_sectional_ranks(pct_change_rows(np.asarray(bundle.close), 40))
 
 
 def _top_n_mask_from_returns(
@@ -36,37 +94,41 @@ def _top_n_mask_from_returns(
     *,
     top_n: int,
 ) -> np.ndarray:
-    if returns.ndim != 2:
+    """Top ``top_n`` finite cells per row (value desc, column asc on ties) without a full sort.
+
+    One in-place ``partition`` over the whole matrix finds each row's k-th largest value; cells above it are
+    kept and ties at the k-th value are filled in column order. Same mask as ``top_n_mask_from_ranks``.
+    """
+    x = np.asarray(returns, dtype=np.float64)
+    if x.ndim != 2:
         return np.zeros((0, 0), dtype=bool)
-    t, n = returns.shape
+    t, n = x.shape
     if t <= 0 or n <= 0:
         return np.zeros((t, n), dtype=bool)
-
-    keep_n = max(1, int(top_n))
-    out = np.zeros((t, n), dtype=bool)
-    for row_idx in range(t):
-        row = returns[row_idx]
-        valid_idx = np.flatnonzero(np.isfinite(row))
-        valid_count = int(valid_idx.size)
-        if valid_count <= 0:
-            continue
-        k = min(keep_n, valid_count)
-        if k >= valid_count:
-            out[row_idx, valid_idx] = True
-            continue
-
-        valid_values = row[valid_idx]
-        pivot = valid_count - k
-        part = np.argpartition(valid_values, pivot)[pivot:]
-        chosen = valid_idx[part]
-
-        # 在边界存在并列时，按值降序 + 列序升序稳定收敛。
-        if chosen.size > k:
-            chosen_values = row[chosen]
-            order = np.lexsort((chosen, -chosen_values))
-            chosen = chosen[order[:k]]
-
-        out[row_idx, chosen] = True
+    finite = np.isfinite(x)
+    k = min(max(1, int(top_n)), n)
+    if k >= n:
+        return finite
+    # 取负后升序分区，NaN 自然排在末尾；±inf 不参与排名，改成 NaN。
+    key = np.negative(x)
+    if bool(np.isinf(x).any()):
+        key[~finite] = np.nan
+    key.partition(k - 1, axis=1)
+    kth = -key[:, k - 1 : k]
+    del key
+    above = (x > kth) & finite
+    tied = x == kth
+    room = k - np.count_nonzero(above, axis=1)
+    overflow = np.flatnonzero(np.count_nonzero(tied, axis=1) > room)
+    if overflow.size > 0:
+        # 仅对第 k 名存在并列且名额不够的行按列序截断。
+        tied_rows = tied[overflow]
+        tied[overflow] = tied_rows & (np.cumsum(tied_rows, axis=1) <= room[overflow, None])
+    out = above | tied
+    # 有限值不足 k 个的行，第 k 名是 NaN，上面的比较全为 False：整行有限值全部入选。
+    short = np.count_nonzero(finite, axis=1) <= k
+    if bool(short.any()):
+        out[short] = finite[short]
     return out
 
 
@@ -74,11 +136,27 @@ def compute_backtest_signal_matrix(
     bundle: MatrixBundle,
     *,
     top_n: int = 500,
+    return_ranks: np.ndarray | None = None,
 ) -> BacktestSignalMatrix:
-    t, n = bundle.shape()
+    return _compute_signal_rows(bundle, top_n=top_n, return_ranks=return_ranks)
+
+
+def _compute_signal_rows(
+    bundle: MatrixBundle,
+    *,
+    top_n: int,
+    return_ranks: np.ndarray | None = None,
+    start: int = 0,
+    mean_state: dict[str, RollingMeanState] | None = None,
+) -> BacktestSignalMatrix:
+    # 只输出 [start, T) 行；start > 0 时 mean_state 必须是前 start 行之后的均值累计状态。
+    t_all, n = bundle.shape()
+    t = t_all - start
+    # 分数精度跟随矩阵：float32 矩阵输出 float32 分数，其余一律 float64。
+    score_dtype = np.float32 if bundle.close.dtype == np.float32 else np.float64
     if t <= 0 or n <= 0:
         empty_bool = np.zeros((t, n), dtype=bool)
-        empty_score = np.zeros((t, n), dtype=np.float64)
+        empty_score = np.zeros((t, n), dtype=score_dtype)
         return BacktestSignalMatrix(
             s1=empty_bool,
             s2=empty_bool,
@@ -95,62 +173,76 @@ def compute_backtest_signal_matrix(
             score=empty_score,
         )
 
-    close = pd.DataFrame(bundle.close, index=bundle.dates, columns=bundle.symbols)
-    high = pd.DataFrame(bundle.high, index=bundle.dates, columns=bundle.symbols)
-    low = pd.DataFrame(bundle.low, index=bundle.dates, columns=bundle.symbols)
-    volume = pd.DataFrame(bundle.volume, index=bundle.dates, columns=bundle.symbols)
-
-    ma10 = close.rolling(10, min_periods=10).mean()
-    ma20 = close.rolling(20, min_periods=20).mean()
-    ma60 = close.rolling(60, min_periods=60).mean()
-    vol_ma10 = volume.rolling(10, min_periods=10).mean()
-    vol_ma20 = volume.rolling(20, min_periods=20).mean()
-    vol_ma60 = volume.rolling(60, min_periods=60).mean()
-
-    range20 = high.rolling(20, min_periods=20).max() - low.rolling(20, min_periods=20).min()
-    range60 = high.rolling(60, min_periods=60).max() - low.rolling(60, min_periods=60).min()
-    atr_ratio = range20 / range60.replace(0.0, np.nan)
-    s1 = atr_ratio < 0.7
-
-    vol_ratio = vol_ma10 / vol_ma60.replace(0.0, np.nan)
-    s2 = vol_ratio < 0.6
-
-    ret_40d = close.pct_change(40, fill_method=None)
-    s3_b = _top_n_mask_from_returns(
-        ret_40d.to_numpy(dtype=np.float64, copy=False),
-        top_n=top_n,
-    )
-
-    # 横盘识别：20日振幅收敛且价格靠近20日均线。
-    sideways_ratio = range20 / close.replace(0.0, np.nan)
-    near_ma20 = (close - ma20).abs() / ma20.replace(0.0, np.nan)
-    s4 = (sideways_ratio < 0.18) & (near_ma20 < 0.06)
-
-    high20_prev = high.rolling(20, min_periods=20).max().shift(1)
-    s5 = (close > high20_prev) & (volume > vol_ma20 * 1.2)
-
-    low10_prev = low.rolling(10, min_periods=10).min().shift(1)
-    s6 = (
-        (close > ma10)
-        & (close.shift(1) <= ma10.shift(1))
-        & (close > low10_prev)
-    )
-
-    s7 = (ma10 > ma20) & (ma20 > ma60)
+    # 价格保持矩阵原 dtype（与原 pandas 实现一致：滚动统计为 float64，40 日涨幅沿用价格精度）。
+    close = np.asarray(bundle.close)[start:]
+    high = np.asarray(bundle.high)[start:]
+    low = np.asarray(bundle.low)[start:]
+    volume = np.asarray(bundle.volume)[start:]
+
+    capture_row = max(start, t_all - SIGNAL_WARMUP_ROWS)
+    means: dict[str, np.ndarray] = {}
+    next_state: dict[str, RollingMeanState] = {}
+    for name, source, window in _SIGNAL_MEANS:
+        means[name], next_state[name] = rolling_mean_resume(
+            getattr(bundle, source),
+            window,
+            state=mean_state.get(name) if mean_state else None,
+            start=start,
+            capture_row=capture_row,
+        )
+    ma10 = means.pop("ma10")
+    ma20 = means.pop("ma20")
+    ma60 = means.pop("ma60")
+    vol_ma10 = means.pop("vol_ma10")
+    vol_ma20 = means.pop("vol_ma20")
+    vol_ma60 = means.pop("vol_ma60")
+
+    high20 = rolling_max(high, 20)
+    low20 = rolling_min(low, 20)
+    range20 = high20 - low20
+    range60 = rolling_max(high, 60) - rolling_min(low, 60)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        atr_ratio = range20 / nan_where_zero(range60)
+        s1_b = atr_ratio < 0.7
+        del atr_ratio, range60
+
+        vol_ratio = vol_ma10 / nan_where_zero(vol_ma60)
+        s2_b = vol_ratio < 0.6
+        del vol_ratio, vol_ma10, vol_ma60
+
+        ret_40d = pct_change_rows(close, 40)
+        if return_ranks is not None and np.shape(return_ranks) == (t, n):
+            s3_b = top_n_mask_from_ranks(return_ranks, top_n=top_n)
+        else:
+            s3_b = _top_n_mask_from_returns(ret_40d, top_n=top_n)
+
+        # 横盘识别：20日振幅收敛且价格靠近20日均线。
+        sideways_ratio = range20 / nan_where_zero(close)
+        near_ma20 = np.abs(close - ma20) / nan_where_zero(ma20)
+        s4_b = (sideways_ratio < 0.18) & (near_ma20 < 0.06)
+        del sideways_ratio, near_ma20, range20
+
+        high20_prev = shift_rows(high20, 1)
+        s5_b = (close > high20_prev) & (volume > vol_ma20 * 1.2)
+        del high20_prev, high20
+
+        low10_prev = shift_rows(rolling_min(low, 10), 1)
+        s6_b = (
+            (close > ma10)
+            & (shift_rows(close, 1) <= shift_rows(ma10, 1))
+            & (close > low10_prev)
+        )
+        del low10_prev
 
-    low20_prev = low.rolling(20, min_periods=20).min().shift(1)
-    s8 = (close < low20_prev) | (close < ma20 * 0.97)
+        s7_b = (ma10 > ma20) & (ma20 > ma60)
+        del ma60
 
-    s9 = (close < ma10) & (volume > vol_ma20 * 1.4) & (ret_40d < 0)
+        low20_prev = shift_rows(low20, 1)
+        s8_b = (close < low20_prev) | (close < ma20 * 0.97)
+        del low20_prev, low20
 
-    s1_b = _to_bool_array(s1)
-    s2_b = _to_bool_array(s2)
-    s4_b = _to_bool_array(s4)
-    s5_b = _to_bool_array(s5)
-    s6_b = _to_bool_array(s6)
-    s7_b = _to_bool_array(s7)
-    s8_b = _to_bool_array(s8)
-    s9_b = _to_bool_array(s9)
+        s9_b = (close < ma10) & (volume > vol_ma20 * 1.4) & (ret_40d < 0)
+        del ret_40d
 
     pool_score = s1_b.astype(np.int16) + s2_b.astype(np.int16) + s3_b.astype(np.int16) + s4_b.astype(np.int16)
     in_pool = pool_score >= 2
@@ -166,7 +258,7 @@ def compute_backtest_signal_matrix(
     )
     score = np.clip(raw_score / 8.5 * 100.0, 0.0, 100.0)
 
-    valid_mask = np.asarray(bundle.valid_mask, dtype=bool)
+    valid_mask = np.asarray(bundle.valid_mask, dtype=bool)[start:]
     s1_b = s1_b & valid_mask
     s2_b = s2_b & valid_mask
     s3_b = s3_b & valid_mask
@@ -179,7 +271,7 @@ def compute_backtest_signal_matrix(
     in_pool = in_pool & valid_mask
     buy_signal = buy_signal & valid_mask
     sell_signal = sell_signal & valid_mask
-    score = np.where(valid_mask, score, 0.0)
+    score = np.where(valid_mask, score, 0.0).astype(score_dtype, copy=False)
 
     return BacktestSignalMatrix(
         s1=s1_b,
@@ -195,4 +287,36 @@ def compute_backtest_signal_matrix(
         buy_signal=buy_signal,
         sell_signal=sell_signal,
         score=score,
+        mean_state=next_state,
+        mean_state_row=capture_row,
     )
+
+
+def extend_backtest_signal_matrix(
+    bundle: MatrixBundle,
+    previous: BacktestSignalMatrix,
+    *,
+    top_n: int = 500,
+) -> BacktestSignalMatrix:
+    """Signals for ``bundle`` whose leading rows are already in ``previous`` (same symbols, same top_n).
+
+    Only the rows after ``previous`` are computed, from ``SIGNAL_WARMUP_ROWS`` rows earlier, with the moving
+    averages resumed from ``previous.mean_state``; without a usable state the whole matrix is recomputed.
+    """
+    t, n = bundle.shape()
+    done = int(previous.score.shape[0]) if previous.score.ndim == 2 else 0
+    score_dtype = np.float32 if bundle.close.dtype == np.float32 else np.float64
+    if done <= 0 or done > t or int(previous.score.shape[1]) != n or previous.score.dtype != score_dtype:
+        return compute_backtest_signal_matrix(bundle, top_n=top_n)
+    if done == t:
+        return previous
+    start = max(0, done - SIGNAL_WARMUP_ROWS)
+    if start > 0 and (previous.mean_state is None or previous.mean_state_row != start):
+        return compute_backtest_signal_matrix(bundle, top_n=top_n)
+    tail = _compute_signal_rows(bundle, top_n=top_n, start=start, mean_state=previous.mean_state)
+    skip = done - start
+    merged = {
+        name: np.concatenate((getattr(previous, name), getattr(tail, name)[skip:]), axis=0)
+        for name in SIGNAL_MATRIX_FIELDS
+    }
+    return BacktestSignalMatrix(**merged, mean_state=tail.mean_state, mean_state_row=tail.mean_state_row)
@@ -6,10 +6,14 @@ detecting breakouts, and calculating technical metrics.
 """
 
 import logging
+from collections.abc import Sequence
 from typing import Any
 
+from ..candle_series import CandleSeries, candle_lists
 from ..models import CandlePoint
 
+CandleInput = Sequence[CandlePoint] | CandleSeries
+
 logger = logging.getLogger(__name__)
 
 
@@ -37,7 +41,7 @@ class CandleAnalyzer:
 
     @staticmethod
     def align_date_to_candles(
-        candles: list[CandlePoint],
+        candles: CandleInput,
         date_text: str,
     ) -> str:
         """
@@ -59,6 +63,11 @@ class CandleAnalyzer:
         if parsed_target is None:
             return candles[-1].time
 
+        if isinstance(candles, CandleSeries):
+            target_day = parsed_target.year * 10000 + parsed_target.month * 100 + parsed_target.day
+            idx = candles.last_index_on_or_before(target_day)
+            return candles.time_at(idx if idx >= 0 else 0)
+
         for candle in reversed(candles):
             parsed_candle = CandleAnalyzer._parse_date(candle.time)
             if parsed_candle and parsed_candle <= parsed_target:
@@ -68,9 +77,9 @@ class CandleAnalyzer:
 
     @staticmethod
     def slice_candles_as_of(
-        candles: list[CandlePoint],
+        candles: CandleInput,
         as_of_date: str | None,
-    ) -> tuple[list[CandlePoint], str | None]:
+    ) -> tuple[CandleInput, str | None]:
         """
         Slice candles to include only data up to as_of_date.
 
@@ -89,6 +98,12 @@ class CandleAnalyzer:
 
         aligned = CandleAnalyzer.align_date_to_candles(candles, as_of_date)
 
+        if isinstance(candles, CandleSeries):
+            idx = candles.first_index_of(int(aligned.replace("-", "")))
+            if idx >= 0:
+                return candles[: idx + 1], aligned
+            return candles, candles[-1].time
+
         for idx, point in enumerate(candles):
             if point.time == aligned:
                 return candles[: idx + 1], aligned
@@ -97,7 +112,7 @@ class CandleAnalyzer:
 
     @staticmethod
     def collect_volume_price_breakout_candidates(
-        candles: list[CandlePoint],
+        candles: CandleInput,
         lookback: int = 55,
         max_items: int = 4,
     ) -> list[tuple[int, float, float, bool, bool]]:
@@ -119,25 +134,26 @@ class CandleAnalyzer:
             return []
 
         start_idx = max(0, len(candles) - lookback)
-        segment = candles[start_idx:]
+        columns = candle_lists(candles)
+        closes = columns.closes
+        volumes = columns.volumes
 
         candidates = []
 
-        for i, candle in enumerate(segment):
-            idx = start_idx + i
-
+        for idx in range(start_idx, len(closes)):
             # Skip if not enough history
             if idx < 10:
                 continue
 
             # Calculate day return
-            prev = candles[idx - 1]
-            day_return = (candle.close - prev.close) / prev.close if prev.close > 0 else 0
+            close = closes[idx]
+            prev_close = closes[idx - 1]
+            day_return = (close - prev_close) / prev_close if prev_close > 0 else 0
 
             # Calculate volume ratio vs 10-day average
-            recent_volumes = [max(0, int(candles[j].volume)) for j in range(max(0, idx - 10), idx)]
+            recent_volumes = volumes[max(0, idx - 10) : idx]
             avg_volume = CandleAnalyzer.safe_mean(recent_volumes)
-            volume_ratio10 = max(0, int(candle.volume)) / avg_volume if avg_volume > 0 else 0
+            volume_ratio10 = volumes[idx] / avg_volume if avg_volume > 0 else 0
 
             # Check for breakout (high volume + significant gain)
             is_breakout = (
@@ -149,10 +165,10 @@ class CandleAnalyzer:
             is_washout_reversal = False
             if idx >= 3:
                 # Check if this follows a decline
-                prev_3_close = candles[idx - 3].close
-                if prev.close < prev_3_close * 0.95:  # 5% decline over 3 days
+                prev_3_close = closes[idx - 3]
+                if prev_close < prev_3_close * 0.95:  # 5% decline over 3 days
                     # And now recovering
-                    if candle.close > prev.close * 1.02:  # 2% recovery
+                    if close > prev_close * 1.02:  # 2% recovery
                         is_washout_reversal = True
 
             candidates.append((idx, day_return, volume_ratio10, is_breakout, is_washout_reversal))
@@ -167,7 +183,7 @@ class CandleAnalyzer:
 
     @staticmethod
     def build_recent_price_volume_snapshot(
-        candles: list[CandlePoint],
+        candles: CandleInput,
         lookback: int = 16,
     ) -> str:
         """
@@ -199,7 +215,7 @@ class CandleAnalyzer:
         return "\n".join(lines)
 
     @staticmethod
-    def infer_recent_rebreakout_index(candles: list[CandlePoint]) -> int | None:
+    def infer_recent_rebreakout_index(candles: CandleInput) -> int | None:
         """
         Infer the most recent re-breakout index.
 
@@ -219,10 +235,9 @@ class CandleAnalyzer:
         start = max(0, len(candles) - 45)
         end = len(candles) - 2
 
-        closes = [c.close for c in candles]
-        highs = [c.high for c in candles]
-        lows = [c.low for c in candles]
-        volumes = [max(0, int(c.volume)) for c in candles]
+        columns = candle_lists(candles)
+        highs = columns.highs
+        volumes = columns.volumes
 
         # Find recent highs
         recent_high = max(highs[start:])
@@ -243,7 +258,7 @@ class CandleAnalyzer:
 
     @staticmethod
     def adjust_to_cluster_lead_index(
-        candles: list[CandlePoint],
+        candles: CandleInput,
         index: int,
     ) -> int:
         """
@@ -266,7 +281,7 @@ class CandleAnalyzer:
         window_start = max(0, index - 5)
         window_end = min(len(candles), index + 5)
 
-        volumes = [max(0, int(c.volume)) for c in candles]
+        volumes = candle_lists(candles).volumes
 
         # Find highest volume day in window
         max_vol_idx = window_start
@@ -0,0 +1,327 @@
+from __future__ import annotations
+
+from typing import NamedTuple
+
+import numpy as np
+
+# 矩阵信号用的滚动窗口内核：沿 axis 0（日期）滚动，按列（标的）向量化，语义对齐
+# pandas ``rolling(window, min_periods=window)``：不足 window 行或窗口内有 NaN 时为 NaN。
+# 均值复刻 pandas 的 Kahan 增删求和（含“窗口内全为同一值时直接取该值”的修正），
+# 结果与 pandas 逐位一致；单纯的累计和相减会在恰好相等的比较（close <= ma 等）上翻转。
+
+
+class RollingMeanState(NamedTuple):
+    """Per-lane running state of ``rolling_mean`` after consuming a prefix of rows (pandas' Kahan add/remove sums)."""
+
+    nobs: np.ndarray
+    neg_ct: np.ndarray
+    sum_x: np.ndarray
+    comp_add: np.ndarray
+    comp_remove: np.ndarray
+    same_ct: np.ndarray
+    prev: np.ndarray
+
+
+def _initial_mean_state(lanes: tuple[int, ...]) -> RollingMeanState:
+    return RollingMeanState(
+        nobs=np.zeros(lanes, dtype=np.int64),
+        neg_ct=np.zeros(lanes, dtype=np.int64),
+        sum_x=np.zeros(lanes, dtype=np.float64),
+        comp_add=np.zeros(lanes, dtype=np.float64),
+        comp_remove=np.zeros(lanes, dtype=np.float64),
+        same_ct=np.zeros(lanes, dtype=np.int64),
+        prev=np.full(lanes, np.nan, dtype=np.float64),
+    )
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing mean over ``window`` rows; float64, bit-identical to pandas ``rolling(w, min_periods=w).mean()``."""
+    out, _state = rolling_mean_resume(values, window)
+    return out
+
+
+_MEAN_BLOCK_ROWS = 256
+
+
+def _mean_lanes(state: RollingMeanState) -> tuple[np.ndarray, ...]:
+    # 循环内的计数用 float64（整数精确），与数据同型运算；gap = nobs - w 在调用方换算。
+    return tuple(np.array(v, dtype=np.float64) for v in state)
+
+
+def _rolling_mean_masked(
+    span: np.ndarray, ok: np.ndarray, base: int, w: int, lo: int, hi: int, state: RollingMeanState, out: np.ndarray
+) -> RollingMeanState:
+    # 块内有 NaN 或负值的列：逐行用 where= 掩码跳过 NaN，语义与 pandas 逐项一致。
+    # 窗口内观测数不超过 w，“窗口满”即 nobs == w；记 gap = nobs - w，除数取 den = sqrt(gap) + w：
+    # 满窗为 w，不满时 sqrt(负数) 为 NaN，均值随之为 NaN，省去逐行掩码。
+    nobs, neg_ct, sum_x, comp_add, comp_remove, same_ct, prev = _mean_lanes(state)
+    gap = nobs - w
+    okf = ok.astype(np.float64)
+    neg = ok & np.signbit(span)
+    # 块内与状态里都没有负值时 neg_ct 恒为 0，符号修正只剩 mean < 0 -> 0。
+    signed = bool(neg.any() or neg_ct.any())
+    negf = neg.astype(np.float64) if signed else okf
+    u = np.empty_like(sum_x)
+    total = np.empty_like(sum_x)
+    comp = np.empty_like(sum_x)
+    den = np.empty_like(sum_x)
+    keep = np.empty_like(sum_x)
+    hit = np.empty(sum_x.shape, dtype=bool)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for row in range(lo, hi):
+            if row >= w:
+                # 移出：y = -val - c 与 -(val + c) 舍入相同，total = sum + y 即 sum - (val + c)。
+                k = row - w - base
+                m = ok[k]
+                np.add(span[k], comp_remove, out=u)
+                np.subtract(sum_x, u, out=total)
+                np.subtract(total, sum_x, out=comp)
+                comp += u
+                np.copyto(comp_remove, comp, where=m)
+                np.copyto(sum_x, total, where=m)
+                gap -= okf[k]
+                if signed:
+                    neg_ct -= negf[k]
+            k = row - base
+            m = ok[k]
+            val = span[k]
+            np.subtract(val, comp_add, out=u)
+            np.add(sum_x, u, out=total)
+            np.subtract(total, sum_x, out=comp)
+            comp -= u
+            np.copyto(comp_add, comp, where=m)
+            np.copyto(sum_x, total, where=m)
+            gap += okf[k]
+            if signed:
+                neg_ct += negf[k]
+            # 有效值等于上一有效值则 same_ct+1，否则重置为 1；无效行（NaN 与任何值都不等）保持不变：
+            # same_ct = same_ct * (相等 或 无效) + 有效。
+            np.equal(val, prev, out=hit)
+            np.less_equal(m, hit, out=keep)
+            same_ct *= keep
+            same_ct += okf[k]
+            np.copyto(prev, val, where=m)
+            if row < w - 1:
+                continue
+            mean = out[row - lo]
+            np.sqrt(gap, out=den)
+            den += w
+            np.divide(sum_x, den, out=mean)
+            # 满窗时窗口内全部有效，same_ct >= nobs 即窗口内全为同一值，取当行值（即 prev）；
+            # 与 den 比较，不满窗时 den 为 NaN，比较为假。
+            np.greater_equal(same_ct, den, out=hit)
+            np.copyto(mean, val, where=hit)
+            # 符号修正：窗口内无负值却得到负均值、或全为负值却得到正均值时取 0（Kahan 残差）；先判断是否存在再改。
+            if np.less(mean, 0.0, out=hit).any():
+                if signed:
+                    hit &= neg_ct == 0
+                np.copyto(mean, 0.0, where=hit)
+            if signed and np.equal(neg_ct, den, out=hit).any():
+                hit &= mean > 0
+                np.copyto(mean, 0.0, where=hit)
+    return RollingMeanState(gap + w, neg_ct, sum_x, comp_add, comp_remove, same_ct, prev)
+
+
+def _rolling_mean_dense(
+    span: np.ndarray, base: int, w: int, lo: int, hi: int, state: RollingMeanState, out: np.ndarray
+) -> RollingMeanState:
+    # 块内（连同要移出的前 w 行）全部有效且非负的列：不需要 where= 掩码，Kahan 的新旧和/补偿直接换缓冲；
+    # nobs 只在前 w 行增长，neg_ct 恒为 0，same_ct 只比较相邻两行。
+    nobs, neg_ct, sum_x, comp_add, comp_remove, same_ct, prev = _mean_lanes(state)
+    gap = nobs - w
+    full = not gap.any()
+    u = np.empty_like(sum_x)
+    total = np.empty_like(sum_x)
+    den = np.empty_like(sum_x)
+    hit = np.empty(sum_x.shape, dtype=bool)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for row in range(lo, hi):
+            if row >= w:
+                np.add(span[row - w - base], comp_remove, out=u)
+                np.subtract(sum_x, u, out=total)
+                np.subtract(total, sum_x, out=comp_remove)
+                comp_remove += u
+                sum_x, total = total, sum_x
+            else:
+                gap += 1.0
+                full = not gap.any()
+            val = span[row - base]
+            np.subtract(val, comp_add, out=u)
+            np.add(sum_x, u, out=total)
+            np.subtract(total, sum_x, out=comp_add)
+            comp_add -= u
+            sum_x, total = total, sum_x
+            np.equal(val, prev, out=hit)
+            same_ct *= hit
+            same_ct += 1.0
+            prev = val
+            if row < w - 1:
+                continue
+            mean = out[row - lo]
+            if full:
+                np.divide(sum_x, w, out=mean)
+                np.greater_equal(same_ct, w, out=hit)
+            else:
+                np.sqrt(gap, out=den)
+                den += w
+                np.divide(sum_x, den, out=mean)
+                np.greater_equal(same_ct, den, out=hit)
+            np.copyto(mean, val, where=hit)
+            if np.less(mean, 0.0, out=hit).any():
+                np.copyto(mean, 0.0, where=hit)
+    return RollingMeanState(gap + w, neg_ct, sum_x, comp_add, comp_remove, same_ct, np.array(prev))
+
+
+def _rolling_mean_block(
+    x: np.ndarray, w: int, lo: int, hi: int, state: RollingMeanState, out: np.ndarray
+) -> RollingMeanState:
+    # 行 [lo, hi) 连同要移出的 [lo - w, lo) 按列分组：全部有效且非负的走无掩码路径；全为 NaN 的（未上市、
+    # 已退市）状态不变、输出保持 NaN，直接跳过；其余走掩码路径。分组有拆列/回填开销，组太小时并入掩码路径。
+    base = max(0, lo - w)
+    span = x[base:hi]
+    ok = span == span
+    width = span.shape[1]
+    least = max(64, width // 8)
+    dense = ok.all(axis=0)
+    if np.count_nonzero(dense) >= least:
+        dense &= ~np.signbit(span).any(axis=0) & (np.asarray(state.neg_ct) == 0)
+    if np.count_nonzero(dense) < least:
+        dense[:] = False
+    idle = ~ok.any(axis=0)
+    if np.count_nonzero(idle) < least:
+        idle[:] = False
+    masked = ~(dense | idle)
+    if dense.all():
+        return _rolling_mean_dense(span, base, w, lo, hi, state, out)
+    if masked.all():
+        return _rolling_mean_masked(span, ok, base, w, lo, hi, state, out)
+    # 列重排成 [无掩码 | 掩码 | 跳过] 三段，各段是按行连续的列区间；算完再按逆排列一次取回。
+    # （span[:, cols] 式的拆列/回填会得到跨步数组或逐列散写，比整块 take 慢得多。）
+    order = np.concatenate((np.flatnonzero(dense), np.flatnonzero(masked), np.flatnonzero(idle)))
+    a = int(np.count_nonzero(dense))
+    b = a + int(np.count_nonzero(masked))
+    block = np.take(span, order, axis=1)
+    moved = [np.take(v, order) for v in _mean_lanes(state)]
+    result = np.full((hi - lo, order.size), np.nan, dtype=np.float64)
+    if a:
+        done = _rolling_mean_dense(
+            block[:, :a], base, w, lo, hi, RollingMeanState(*(v[:a] for v in moved)), result[:, :a]
+        )
+        for v, part in zip(moved, done):
+            v[:a] = part
+    if b > a:
+        sub_ok = np.take(ok, order[a:b], axis=1)
+        done = _rolling_mean_masked(
+            block[:, a:b], sub_ok, base, w, lo, hi, RollingMeanState(*(v[a:b] for v in moved)), result[:, a:b]
+        )
+        for v, part in zip(moved, done):
+            v[a:b] = part
+    np.take(result, np.argsort(order), axis=1, out=out, mode='clip')
+    merged = RollingMeanState(*(np.empty_like(v) for v in moved))
+    for full_v, v in zip(merged, moved):
+        full_v[order] = v
+    return merged
+
+
+def _export_mean_state(state: RollingMeanState, lanes: tuple[int, ...]) -> RollingMeanState:
+    # 循环内的 float64 计数转回 int64，并还原列形状。
+    counts = ('nobs', 'neg_ct', 'same_ct')
+    return RollingMeanState(
+        *(
+            (np.asarray(v).astype(np.int64) if name in counts else np.array(v, dtype=np.float64)).reshape(lanes)
+            for name, v in zip(RollingMeanState._fields, state)
+        )
+    )
+
+
+def rolling_mean_resume(
+    values: np.ndarray,
+    window: int,
+    *,
+    state: RollingMeanState | None = None,
+    start: int = 0,
+    capture_row: int | None = None,
+) -> tuple[np.ndarray, RollingMeanState | None]:
+    """``rolling_mean(values, window)[start:]`` continued from ``state`` (the state after rows ``[0, start)``).
+
+    The running Kahan sums depend on every row since row 0, so restarting from a later row changes low-order
+    bits; resuming from the captured state does not. ``capture_row`` returns the state after rows
+    ``[0, capture_row)`` (``start <= capture_row <= len(values)``), to resume a later extension from.
+    """
+    x = np.asarray(values, dtype=np.float64)
+    w = max(1, int(window))
+    t = x.shape[0]
+    begin = max(0, min(int(start), t))
+    lanes = x.shape[1:]
+    width = int(np.prod(lanes, dtype=np.int64))
+    flat = x.reshape(t, width)
+    out = np.full((t - begin, width), np.nan, dtype=np.float64)
+    if state is None or begin == 0:
+        state = _initial_mean_state(lanes)
+    capture = int(capture_row) if capture_row is not None else None
+    captured = state if capture == begin else None
+    running = RollingMeanState(*(np.reshape(v, width) for v in state))
+    # 按 _MEAN_BLOCK_ROWS 行分块推进（按块给列分组、限制块内掩码的内存），capture_row 处切块以取出状态。
+    lo = begin
+    while lo < t:
+        hi = min(t, lo + _MEAN_BLOCK_ROWS)
+        if captured is None and capture is not None and lo < capture < hi:
+            hi = capture
+        running = _rolling_mean_block(flat, w, lo, hi, running, out[lo - begin : hi - begin])
+        if hi == capture:
+            captured = _export_mean_state(running, lanes)
+        lo = hi
+    return out.reshape((t - begin, *lanes)), captured
+
+
+
+def _rolling_extreme(values: np.ndarray, window: int, *, op: np.ufunc, pad: float) -> np.ndarray:
+    # van Herk / Gil-Werman：按 window 分块，块内前缀极值 + 块内后缀极值，每行两次取极值，O(T) 与窗口长度无关。
+    # NaN 在 maximum/minimum 中传播，窗口内有 NaN 即为 NaN，与 min_periods=window 一致。
+    x = np.asarray(values, dtype=np.float64)
+    w = max(1, int(window))
+    t = x.shape[0]
+    out = np.full(x.shape, np.nan, dtype=np.float64)
+    if t < w:
+        return out
+    blocks = -(-t // w)
+    padded = np.full((blocks * w, *x.shape[1:]), pad, dtype=np.float64)
+    padded[:t] = x
+    shaped = padded.reshape(blocks, w, *x.shape[1:])
+    prefix = op.accumulate(shaped, axis=1).reshape(padded.shape)
+    suffix = op.accumulate(shaped[:, ::-1], axis=1)[:, ::-1].reshape(padded.shape)
+    out[w - 1 :] = op(suffix[: t - w + 1], prefix[w - 1 : t])
+    return out
+
+
+def rolling_max(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing max over ``window`` rows (NaN when the window is short or holds a NaN)."""
+    return _rolling_extreme(values, window, op=np.maximum, pad=-np.inf)
+
+
+def rolling_min(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing min over ``window`` rows (NaN when the window is short or holds a NaN)."""
+    return _rolling_extreme(values, window, op=np.minimum, pad=np.inf)
+
+
+def shift_rows(values: np.ndarray, periods: int = 1) -> np.ndarray:
+    """``values`` moved down by ``periods`` rows, NaN-filled on top (``DataFrame.shift``); keeps float dtype."""
+    x = np.asarray(values)
+    out = np.full(x.shape, np.nan, dtype=x.dtype if x.dtype.kind == 'f' else np.float64)
+    k = max(0, int(periods))
+    if k < x.shape[0]:
+        out[k:] = x[: x.shape[0] - k]
+    return out
+
+
+def pct_change_rows(values: np.ndarray, periods: int) -> np.ndarray:
+    """``values / values.shift(periods) - 1`` in the input's float dtype (``pct_change(fill_method=None)``)."""
+    x = np.asarray(values)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return x / shift_rows(x, periods) - 1
+
+
+def nan_where_zero(values: np.ndarray) -> np.ndarray:
+    """``DataFrame.replace(0.0, np.nan)`` for float arrays."""
+    x = np.asarray(values)
+    return np.where(x == 0, np.nan, x).astype(x.dtype if x.dtype.kind == 'f' else np.float64, copy=False)
@@ -6,10 +6,30 @@ and distribution patterns in stock price movements.
 """
 
 import math
+import os
 from datetime import datetime
-from typing import Callable, Optional
+from typing import TYPE_CHECKING, Callable, Optional, Sequence
 
+import numpy as np
+
+from ..candle_series import CandleSeries, candle_lists, day_ints_to_texts
 from ..models import CandlePoint, ScreenerResult, Stage, ThemeStage
+from ..screener_metrics import compute_bundle_row_metrics, screener_results_from_matrix_metrics
+from .wyckoff_event_engine import (
+    CONFIRMATION_STATUSES,
+    build_wyckoff_event_series,
+    detect_wyckoff_event_indices,
+    detect_wyckoff_events,
+    event_confirmation_codes,
+    iso_week_keys,
+    resolve_wyckoff_event_rules,
+    trading_day_keys,
+    wyckoff_event_chain,
+    wyckoff_window_stats,
+)
+
+if TYPE_CHECKING:
+    from .backtest_matrix_engine import MatrixBundle
 
 
 # Wyckoff event constants
@@ -33,6 +53,8 @@ EVENT_DECAY_MAX_AGE_DAYS = 45
 VOLUME_CALENDAR_BASE_LOOKBACK = 20
 VOLUME_CALENDAR_EXT_LOOKBACK = 60
 COST_CENTER_EMA_WINDOW = 20
+# 批量快照每块堆叠的 (窗口行 × 单元格) 元素上限，约束中间序列的内存。
+SNAPSHOT_BATCH_ELEMENTS = 1 << 21
 EVENT_DECAY_LAMBDA_MAP: dict[str, float] = {
     "PS": 0.08,
     "SC": 0.08,
@@ -433,32 +455,20 @@ class SignalAnalyzer:
         return cls.clamp_score(score)
 
     @classmethod
-    def _calculate_candle_quality_score(
+    def _candle_quality_from_event_indices(
         cls,
         *,
-        events: list[str],
-        risk_events: list[str],
-        event_dates: dict[str, str],
-        dates: list[str],
-        opens: list[float],
-        highs: list[float],
-        lows: list[float],
-        closes: list[float],
+        event_index: dict[str, int],
+        last_idx: int,
+        opens: Sequence[float],
+        highs: Sequence[float],
+        lows: Sequence[float],
+        closes: Sequence[float],
     ) -> float:
-        if not dates:
-            return 45.0
-        index_by_date = {str(day): idx for idx, day in enumerate(dates)}
-        last_idx = len(dates) - 1
+        """Decay-weighted candle quality of the events at ``event_index`` (in insertion order)."""
         weighted_scores: list[float] = []
         weights: list[float] = []
-        for event_name in [*events, *risk_events]:
-            event_text = str(event_name).strip()
-            if not event_text:
-                continue
-            event_date = str(event_dates.get(event_text, "")).strip()
-            idx = index_by_date.get(event_date)
-            if idx is None:
-                continue
+        for event_text, idx in event_index.items():
             age_days = max(0, last_idx - int(idx))
             decay_weight = max(0.1, cls._event_decay_weight(event_text, age_days))
             if event_text in set(WYCKOFF_RISK_EVENTS):
@@ -525,7 +535,22 @@ class SignalAnalyzer:
             close_px = max(float(closes[idx]), 0.01)
             spread_series.append((float(closes[idx]) - float(cost_center_series[idx])) / close_px)
         spread_std = cls.safe_std(spread_series)
+        return cls._cost_center_score_from_stats(
+            cost_shift=cost_shift,
+            divergence=divergence,
+            spread_std=spread_std,
+            row=row,
+        )
 
+    @classmethod
+    def _cost_center_score_from_stats(
+        cls,
+        *,
+        cost_shift: float,
+        divergence: float,
+        spread_std: float,
+        row: ScreenerResult,
+    ) -> float:
         score = (
             56.0
             + cost_shift * 210.0
@@ -601,7 +626,24 @@ class SignalAnalyzer:
         recent_high = max(weekly_highs[-range_window:])
         recent_low = min(weekly_lows[-range_window:])
         weekly_pos = (latest_close - recent_low) / max(recent_high - recent_low, 0.01)
+        return cls._weekly_context_from_stats(
+            latest_close=latest_close,
+            weekly_ma_fast=weekly_ma_fast,
+            weekly_ma_slow=weekly_ma_slow,
+            weekly_ret=weekly_ret,
+            weekly_pos=weekly_pos,
+        )
 
+    @classmethod
+    def _weekly_context_from_stats(
+        cls,
+        *,
+        latest_close: float,
+        weekly_ma_fast: float,
+        weekly_ma_slow: float,
+        weekly_ret: float,
+        weekly_pos: float,
+    ) -> tuple[float, float]:
         score = 50.0
         score += 10.0 if latest_close > weekly_ma_fast else -8.0
         score += 12.0 if weekly_ma_fast > weekly_ma_slow else -10.0
@@ -616,7 +658,7 @@ class SignalAnalyzer:
     def calculate_wyckoff_snapshot(
         cls,
         row: ScreenerResult,
-        candles: list[CandlePoint],
+        candles: list[CandlePoint] | CandleSeries,
         window_days: int,
         *,
         event_judgment_profile: dict[str, object] | None = None,
@@ -642,12 +684,13 @@ class SignalAnalyzer:
         segment = candles[-window:]
 
         # Extract price and volume data
-        dates = [point.time for point in segment]
-        opens = [point.open for point in segment]
-        highs = [point.high for point in segment]
-        lows = [point.low for point in segment]
-        closes = [point.close for point in segment]
-        volumes = [max(0, int(point.volume)) for point in segment]
+        columns = candle_lists(segment)
+        dates = columns.dates
+        opens = columns.opens
+        highs = columns.highs
+        lows = columns.lows
+        closes = columns.closes
+        volumes = columns.volumes
 
         # Pass opens to event detection
         opens_list = opens  # For use in event detection
@@ -698,12 +741,358 @@ class SignalAnalyzer:
             volumes=volumes,
         )
 
-        # Categorize events
-        events = [event for event in WYCKOFF_ACC_EVENTS if event in event_dates]
-        risk_events = [event for event in WYCKOFF_RISK_EVENTS if event in event_dates]
+        index_by_date = {str(day): idx for idx, day in enumerate(dates)}
+        event_index = {
+            event: int(index_by_date[event_dates[event]])
+            for event in WYCKOFF_EVENT_ORDER
+            if event in event_dates and event_dates[event] in index_by_date
+        }
+        return cls._assemble_wyckoff_snapshot(
+            row=row,
+            event_dates=event_dates,
+            event_chain=event_chain,
+            event_age_days=cls._build_event_age_days(dates=dates, event_chain=cls._order_event_chain(event_chain)),
+            event_confirmation_map=event_confirmation_map,
+            structure_hhh=cls._analyze_structure(highs, lows, closes),
+            health_metrics=cls._calculate_health_metrics(
+                closes=closes,
+                highs=highs,
+                lows=lows,
+                ma20=ma20,
+                row=row,
+            ),
+            candle_quality_score=cls._candle_quality_from_event_indices(
+                event_index=event_index,
+                last_idx=len(dates) - 1,
+                opens=opens,
+                highs=highs,
+                lows=lows,
+                closes=closes,
+            ),
+            cost_center_shift_score=cls._calculate_cost_center_shift_score(
+                closes=closes,
+                volumes=volumes,
+                row=row,
+            ),
+            weekly_context=cls._calculate_weekly_context_metrics(
+                dates=dates,
+                opens=opens,
+                highs=highs,
+                lows=lows,
+                closes=closes,
+                volumes=volumes,
+            ),
+            ret20=ret20,
+            ret10=ret10,
+            tr_pos=tr_pos,
+            ma20=ma20,
+            last_date=dates[-1],
+            event_judgment_profile=event_judgment_profile,
+        )
 
-        # Check sequence validity
-        ordered_events = sorted(
+    @classmethod
+    def calculate_wyckoff_snapshots(
+        cls,
+        bundle: "MatrixBundle",
+        dates: list[str],
+        window_days: int,
+        *,
+        rows: list[dict[str, ScreenerResult]] | None = None,
+        event_judgment_profile: dict[str, object] | None = None,
+        return_window_days: int = 40,
+    ) -> list[dict[str, dict]]:
+        """
+        Calculate Wyckoff snapshots for many symbols of a matrix bundle at one or many dates.
+
+        Every (date, symbol) cell equals ``calculate_wyckoff_snapshot`` on the symbol's valid bars
+        up to that date. Cells with the same window length are stacked column-wise and evaluated by
+        the vectorized event engine and window kernels; only the per-event scoring runs per cell.
+
+        Args:
+            bundle: Date-by-symbol OHLCV matrices
+            dates: As-of dates; a date between bundle rows uses the last row before it
+            window_days: Number of days to analyze
+            rows: One ``{symbol: row}`` mapping per date selecting the cells to evaluate; defaults
+                to every cell the input-pool row builder accepts, with rows derived from the bundle
+            return_window_days: Return window of the derived rows (ignored when ``rows`` is given)
+
+        Returns:
+            One ``{symbol: snapshot}`` dictionary per requested date
+        """
+        requested = [str(day) for day in dates]
+        if rows is None:
+            _, metrics, ok = compute_bundle_row_metrics(bundle, return_window_days=return_window_days, dates=requested)
+            rows = [
+                {row.symbol: row for row in day_rows}
+                for day_rows in screener_results_from_matrix_metrics(metrics, ok, symbols=bundle.symbols)
+            ]
+        out: list[dict[str, dict]] = [{} for _ in requested]
+        symbol_index = bundle.symbol_to_index()
+        cell_day: list[int] = []
+        cell_col: list[int] = []
+        cell_rows: list[ScreenerResult] = []
+        for day_pos, mapping in enumerate(rows[: len(requested)]):
+            for symbol, row in mapping.items():
+                col = symbol_index.get(symbol)
+                if col is not None:
+                    cell_day.append(day_pos)
+                    cell_col.append(col)
+                    cell_rows.append(row)
+        if not cell_rows:
+            return out
+
+        # 只对用到的列做有效K线压缩：order[k, j] 是第 j 列第 k 根有效K线所在的矩阵行。
+        date_rows = np.searchsorted(np.asarray(bundle.dates, dtype=str), np.asarray(requested, dtype=str), side="right") - 1
+        day_arr = np.asarray(cell_day, dtype=np.int64)
+        used_cols, local_col = np.unique(np.asarray(cell_col, dtype=np.int64), return_inverse=True)
+        horizon = int(max(0, date_rows.max()) + 1)
+        valid = np.asarray(bundle.valid_mask[:horizon][:, used_cols], dtype=bool)
+        order = np.argsort(~valid, axis=0, kind="stable")
+        cell_date_row = date_rows[day_arr]
+        bars = np.where(cell_date_row >= 0, np.cumsum(valid, axis=0)[np.maximum(cell_date_row, 0), local_col], 0)
+
+        weekday, ordinal = trading_day_keys(bundle.dates[:horizon])
+        week_keys = iso_week_keys(bundle.dates[:horizon])
+        rules = resolve_wyckoff_event_rules(cls._extract_event_rule_values(event_judgment_profile))
+
+        short = np.flatnonzero(bars < 25)
+        for cell in short.tolist():
+            count = int(bars[cell])
+            last_row = int(order[count - 1, local_col[cell]]) if count > 0 else -1
+            snapshot = cls._insufficient_data_snapshot([])
+            snapshot["trigger_date"] = bundle.dates[last_row] if last_row >= 0 else ""
+            out[cell_day[cell]][bundle.symbols[cell_col[cell]]] = snapshot
+
+        windows = np.maximum(20, np.minimum(int(window_days), bars))
+        for window in np.unique(windows[bars >= 25]).tolist():
+            group = np.flatnonzero((windows == window) & (bars >= 25))
+            step = max(1, SNAPSHOT_BATCH_ELEMENTS // window)
+            for start in range(0, group.size, step):
+                cells = group[start : start + step]
+                offsets = np.arange(window)[:, None]
+                stack_rows = order[bars[cells] - window + offsets, local_col[cells]]
+                stack_cols = used_cols[local_col[cells]]
+                series = build_wyckoff_event_series(
+                    opens=np.asarray(bundle.open[stack_rows, stack_cols], dtype=np.float64),
+                    highs=np.asarray(bundle.high[stack_rows, stack_cols], dtype=np.float64),
+                    lows=np.asarray(bundle.low[stack_rows, stack_cols], dtype=np.float64),
+                    closes=np.asarray(bundle.close[stack_rows, stack_cols], dtype=np.float64),
+                    volumes=np.asarray(bundle.volume[stack_rows, stack_cols], dtype=np.float64),
+                    weekday=weekday[stack_rows],
+                    ordinal=ordinal[stack_rows],
+                )
+                indices = detect_wyckoff_event_indices(series, rules)
+                confirmations = {
+                    name: codes.tolist() for name, codes in event_confirmation_codes(series, indices).items()
+                }
+                stats = {key: values.tolist() for key, values in wyckoff_window_stats(series, week_keys[stack_rows]).items()}
+                positions = {name: idx.tolist() for name, idx in indices.items()}
+                columns = np.arange(cells.size)
+                event_rows = {
+                    name: stack_rows[np.maximum(idx, 0), columns].tolist() for name, idx in indices.items()
+                }
+                last_rows = stack_rows[-1].tolist()
+                for pos, cell in enumerate(cells.tolist()):
+                    out[cell_day[cell]][bundle.symbols[cell_col[cell]]] = cls._assemble_stacked_snapshot(
+                        row=cell_rows[cell],
+                        series_column=(
+                            series.opens[:, pos],
+                            series.highs[:, pos],
+                            series.lows[:, pos],
+                            series.closes[:, pos],
+                        ),
+                        positions={name: values[pos] for name, values in positions.items()},
+                        event_days={name: bundle.dates[values[pos]] for name, values in event_rows.items()},
+                        confirmations={name: codes[pos] for name, codes in confirmations.items()},
+                        stats={key: values[pos] for key, values in stats.items()},
+                        last_date=bundle.dates[last_rows[pos]],
+                        event_judgment_profile=event_judgment_profile,
+                    )
+        return out
+
+    @classmethod
+    def calculate_wyckoff_snapshot_series(
+        cls,
+        candles: list[CandlePoint] | CandleSeries,
+        points: Sequence[tuple[str, ScreenerResult]],
+        window_days: int,
+        *,
+        event_judgment_profile: dict[str, object] | None = None,
+    ) -> list[dict]:
+        """
+        Calculate Wyckoff snapshots of one symbol at many as-of dates in one pass.
+
+        Consecutive dates share all but one bar of their windows; instead of re-running
+        ``calculate_wyckoff_snapshot`` per day, the sliding windows are stacked and evaluated
+        together by ``calculate_wyckoff_snapshots``. Each result equals the single-date snapshot
+        on the candles up to that date.
+
+        Args:
+            candles: Full daily history of the symbol
+            points: ``(as_of_date, row)`` pairs; dates may repeat and need not be sorted
+            window_days: Number of days to analyze
+
+        Returns:
+            One snapshot per point, in input order
+        """
+        from .backtest_matrix_engine import MatrixBundle
+
+        if not points:
+            return []
+        series = candles if isinstance(candles, CandleSeries) else CandleSeries.from_points(candles)
+        count = len(series)
+        bundle = MatrixBundle(
+            dates=series.times(),
+            symbols=[""],
+            open=np.asarray(series.open, dtype=np.float64).reshape(count, 1),
+            high=np.asarray(series.high, dtype=np.float64).reshape(count, 1),
+            low=np.asarray(series.low, dtype=np.float64).reshape(count, 1),
+            close=np.asarray(series.close, dtype=np.float64).reshape(count, 1),
+            volume=np.maximum(series.volume, 0).astype(np.float64).reshape(count, 1),
+            valid_mask=np.ones((count, 1), dtype=bool),
+        )
+        batch = cls.calculate_wyckoff_snapshots(
+            bundle,
+            [str(day) for day, _ in points],
+            window_days,
+            rows=[{"": row} for _, row in points],
+            event_judgment_profile=event_judgment_profile,
+        )
+        return [cells[""] for cells in batch]
+
+    @classmethod
+    def calculate_wyckoff_snapshots_for_candles(
+        cls,
+        candles_by_symbol: dict[str, list[CandlePoint] | CandleSeries],
+        rows: dict[str, ScreenerResult],
+        window_days: int,
+        *,
+        event_judgment_profile: dict[str, object] | None = None,
+    ) -> dict[str, dict]:
+        """
+        Calculate Wyckoff snapshots of many symbols, each on its own candles, in one batch.
+
+        The candles are scattered into one date-by-symbol bundle (union calendar, gaps masked)
+        and evaluated by ``calculate_wyckoff_snapshots`` at the last date. Each result equals
+        ``calculate_wyckoff_snapshot(rows[symbol], candles_by_symbol[symbol], window_days)``.
+
+        Args:
+            candles_by_symbol: Daily bars of each symbol, already cut at the as-of date
+            rows: Screener row of each symbol; symbols without candles are skipped
+            window_days: Number of days to analyze
+
+        Returns:
+            ``{symbol: snapshot}`` for every symbol with candles
+        """
+        from .backtest_matrix_engine import MatrixBundle
+
+        series_by_symbol = {
+            symbol: candles if isinstance(candles, CandleSeries) else CandleSeries.from_points(candles)
+            for symbol, candles in candles_by_symbol.items()
+            if symbol in rows and len(candles) > 0
+        }
+        if not series_by_symbol:
+            return {}
+        symbols = list(series_by_symbol)
+        day_axis = np.unique(np.concatenate([series.day for series in series_by_symbol.values()]))
+        shape = (int(day_axis.size), len(symbols))
+        fields = {key: np.full(shape, np.nan, dtype=np.float64) for key in ("open", "high", "low", "close", "volume")}
+        valid = np.zeros(shape, dtype=bool)
+        for col, series in enumerate(series_by_symbol.values()):
+            at = np.searchsorted(day_axis, series.day)
+            fields["open"][at, col] = series.open
+            fields["high"][at, col] = series.high
+            fields["low"][at, col] = series.low
+            fields["close"][at, col] = series.close
+            fields["volume"][at, col] = np.maximum(series.volume, 0)
+            valid[at, col] = True
+        bundle = MatrixBundle(
+            dates=day_ints_to_texts(day_axis),
+            symbols=symbols,
+            valid_mask=valid,
+            **fields,
+        )
+        batch = cls.calculate_wyckoff_snapshots(
+            bundle,
+            [bundle.dates[-1]],
+            window_days,
+            rows=[{symbol: rows[symbol] for symbol in symbols}],
+            event_judgment_profile=event_judgment_profile,
+        )
+        return batch[0]
+
+    @classmethod
+    def _assemble_stacked_snapshot(
+        cls,
+        *,
+        row: ScreenerResult,
+        series_column: tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray],
+        positions: dict[str, int],
+        event_days: dict[str, str],
+        confirmations: dict[str, int],
+        stats: dict[str, float | int | bool],
+        last_date: str,
+        event_judgment_profile: dict[str, object] | None,
+    ) -> dict:
+        """One cell of ``calculate_wyckoff_snapshots`` from its stacked event positions and window stats."""
+        opens, highs, lows, closes = series_column
+        last_idx = int(closes.shape[0]) - 1
+        event_dates = {name: event_days[name] for name, idx in positions.items() if idx >= 0}
+        event_index = {event: positions[event] for event in WYCKOFF_EVENT_ORDER if event in event_dates}
+        weeks = int(stats["weeks"])
+        return cls._assemble_wyckoff_snapshot(
+            row=row,
+            event_dates=event_dates,
+            event_chain=wyckoff_event_chain(event_dates),
+            event_age_days={event: last_idx - idx for event, idx in event_index.items()},
+            event_confirmation_map={
+                name: CONFIRMATION_STATUSES[code] for name, code in confirmations.items() if code > 0
+            },
+            structure_hhh=cls._format_structure(bool(stats["hh"]), bool(stats["hl"]), bool(stats["hc"])),
+            health_metrics=cls._health_metrics_from_stats(
+                slope_std=float(stats["slope_std"]),
+                range_mean=float(stats["range_mean"]),
+                latest_close=float(stats["latest_close"]),
+                ma20=float(stats["ma20"]),
+                rebound=bool(stats["rebound"]),
+                row=row,
+            ),
+            candle_quality_score=cls._candle_quality_from_event_indices(
+                event_index=event_index,
+                last_idx=last_idx,
+                opens=opens,
+                highs=highs,
+                lows=lows,
+                closes=closes,
+            ),
+            cost_center_shift_score=cls._cost_center_score_from_stats(
+                cost_shift=float(stats["cost_shift"]),
+                divergence=float(stats["divergence"]),
+                spread_std=float(stats["spread_std"]),
+                row=row,
+            ),
+            weekly_context=(
+                cls._weekly_context_from_stats(
+                    latest_close=float(stats["weekly_latest"]),
+                    weekly_ma_fast=float(stats["weekly_ma_fast"]),
+                    weekly_ma_slow=float(stats["weekly_ma_slow"]),
+                    weekly_ret=float(stats["weekly_ret"]),
+                    weekly_pos=float(stats["weekly_pos"]),
+                )
+                if weeks >= 4
+                else (50.0, 1.0)
+            ),
+            ret20=float(stats["ret20"]),
+            ret10=float(stats["ret10"]),
+            tr_pos=float(stats["tr_pos"]),
+            ma20=float(stats["ma20"]),
+            last_date=last_date,
+            event_judgment_profile=event_judgment_profile,
+        )
+
+    @staticmethod
+    def _order_event_chain(event_chain: list[dict[str, str]]) -> list[dict[str, str]]:
+        return sorted(
             event_chain,
             key=lambda item: (
                 str(item.get("date", "")),
@@ -712,52 +1101,46 @@ class SignalAnalyzer:
                 else len(WYCKOFF_EVENT_ORDER),
             ),
         )
+
+    @classmethod
+    def _assemble_wyckoff_snapshot(
+        cls,
+        *,
+        row: ScreenerResult,
+        event_dates: dict[str, str],
+        event_chain: list[dict[str, str]],
+        event_age_days: dict[str, int],
+        event_confirmation_map: dict[str, str],
+        structure_hhh: str,
+        health_metrics: dict[str, float],
+        candle_quality_score: float,
+        cost_center_shift_score: float,
+        weekly_context: tuple[float, float],
+        ret20: float,
+        ret10: float,
+        tr_pos: float,
+        ma20: float,
+        last_date: str,
+        event_judgment_profile: dict[str, object] | None,
+    ) -> dict:
+        """Phase, sequence and scores of one snapshot from its detected events and window metrics."""
+        # Categorize events
+        events = [event for event in WYCKOFF_ACC_EVENTS if event in event_dates]
+        risk_events = [event for event in WYCKOFF_RISK_EVENTS if event in event_dates]
+
+        # Check sequence validity
+        ordered_events = cls._order_event_chain(event_chain)
         sequence = [str(item["event"]) for item in ordered_events if str(item.get("event", "")) in WYCKOFF_ACC_EVENTS]
         sequence_ok = cls.is_subsequence(sequence, WYCKOFF_ACC_EVENTS)
-        event_age_days = cls._build_event_age_days(dates=dates, event_chain=ordered_events)
         phase_context_score = cls._calculate_phase_context_score(
             events=events,
             risk_events=risk_events,
             event_age_days=event_age_days,
         )
 
-        # Analyze structure (HH/HL/HC)
-        structure_hhh = cls._analyze_structure(highs, lows, closes)
-
         # Determine phase
         phase = cls._determine_phase(events, risk_events, ret20, ma20, row)
-
-        # Trend health diagnostics (M2)
-        health_metrics = cls._calculate_health_metrics(
-            closes=closes,
-            highs=highs,
-            lows=lows,
-            ma20=ma20,
-            row=row,
-        )
-        candle_quality_score = cls._calculate_candle_quality_score(
-            events=events,
-            risk_events=risk_events,
-            event_dates=event_dates,
-            dates=dates,
-            opens=opens,
-            highs=highs,
-            lows=lows,
-            closes=closes,
-        )
-        cost_center_shift_score = cls._calculate_cost_center_shift_score(
-            closes=closes,
-            volumes=volumes,
-            row=row,
-        )
-        weekly_context_score, weekly_context_multiplier = cls._calculate_weekly_context_metrics(
-            dates=dates,
-            opens=opens,
-            highs=highs,
-            lows=lows,
-            closes=closes,
-            volumes=volumes,
-        )
+        weekly_context_score, weekly_context_multiplier = weekly_context
 
         # Calculate scores
         scores = cls._calculate_scores(
@@ -783,7 +1166,7 @@ class SignalAnalyzer:
 
         # Determine primary signal
         wyckoff_signal = cls._resolve_primary_signal(event_dates)
-        trigger_date = event_dates.get(wyckoff_signal, dates[-1])
+        trigger_date = event_dates.get(wyckoff_signal, last_date)
 
         return {
             "events": events,
@@ -893,7 +1276,7 @@ class SignalAnalyzer:
         return out
 
     @classmethod
-    def _insufficient_data_snapshot(cls, candles: list[CandlePoint]) -> dict:
+    def _insufficient_data_snapshot(cls, candles: list[CandlePoint] | CandleSeries) -> dict:
         """Return snapshot for insufficient data case."""
         fallback_date = candles[-1].time if candles else ""
         return {
@@ -935,6 +1318,12 @@ class SignalAnalyzer:
             "entry_quality_score": 0.0,
             "trigger_date": fallback_date,
         }
+
+    @staticmethod
+    def _is_vectorized_event_engine_enabled() -> bool:
+        raw = str(os.getenv("TDX_TREND_WYCKOFF_VECTOR_EVENTS", "")).strip().lower()
+        return raw not in {"0", "false", "no", "off", "n"}
+
     @classmethod
     def _detect_wyckoff_events(
         cls,
@@ -953,6 +1342,39 @@ class SignalAnalyzer:
         event_rule_values: dict[str, object] | None = None,
     ) -> tuple[dict[str, str], list[dict[str, str]]]:
         """Detect Wyckoff events from price and volume data."""
+        if not cls._is_vectorized_event_engine_enabled():
+            return cls._detect_wyckoff_events_legacy(
+                highs, lows, closes, volumes, dates, ma20, avg_v5, avg_v20, row, tr_pos, ret10, opens,
+                event_rule_values=event_rule_values,
+            )
+        return detect_wyckoff_events(
+            opens=opens,
+            highs=highs,
+            lows=lows,
+            closes=closes,
+            volumes=volumes,
+            dates=dates,
+            rules=resolve_wyckoff_event_rules(event_rule_values),
+        )
+
+    @classmethod
+    def _detect_wyckoff_events_legacy(
+        cls,
+        highs: list[float],
+        lows: list[float],
+        closes: list[float],
+        volumes: list[int],
+        dates: list[str],
+        ma20: float,
+        avg_v5: float,
+        avg_v20: float,
+        row: ScreenerResult,
+        tr_pos: float,
+        ret10: float,
+        opens: list[float],
+        event_rule_values: dict[str, object] | None = None,
+    ) -> tuple[dict[str, str], list[dict[str, str]]]:
+        """Closure-based event detection, kept as the parity reference for the mask engine."""
         event_dates: dict[str, str] = {}
         event_chain: list[dict[str, str]] = []
         last_idx = len(dates) - 1
@@ -1446,6 +1868,10 @@ class SignalAnalyzer:
         )
         hc = closes[-1] > closes[-5] > closes[-10] if len(closes) >= 10 else closes[-1] > closes[-2]
 
+        return cls._format_structure(hh, hl, hc)
+
+    @staticmethod
+    def _format_structure(hh: bool, hl: bool, hc: bool) -> str:
         return f"{'HH' if hh else '-'}|{'HL' if hl else '-'}|{'HC' if hc else '-'}"
 
     @classmethod
@@ -1518,21 +1944,39 @@ class SignalAnalyzer:
             prev = max(float(closes[idx - 1]), 0.01)
             daily_returns.append((float(closes[idx]) - float(closes[idx - 1])) / prev)
         slope_std = cls.safe_std(daily_returns[-20:])
-        slope_stability = cls.clamp_score(100.0 - slope_std * 900.0)
 
         range_ratios: list[float] = []
         for idx in range(len(closes)):
             close_px = max(float(closes[idx]), 0.01)
             range_ratios.append(max(0.0, float(highs[idx]) - float(lows[idx])) / close_px)
         range_mean = cls.safe_mean(range_ratios[-20:])
+        return cls._health_metrics_from_stats(
+            slope_std=slope_std,
+            range_mean=range_mean,
+            latest_close=closes[-1],
+            ma20=ma20,
+            rebound=len(closes) >= 6 and closes[-1] >= closes[-6],
+            row=row,
+        )
+
+    @classmethod
+    def _health_metrics_from_stats(
+        cls,
+        *,
+        slope_std: float,
+        range_mean: float,
+        latest_close: float,
+        ma20: float,
+        rebound: bool,
+        row: ScreenerResult,
+    ) -> dict[str, float]:
+        slope_stability = cls.clamp_score(100.0 - slope_std * 900.0)
         volatility_stability = cls.clamp_score(100.0 - range_mean * 700.0)
 
         retrace_center = abs(float(row.retrace20) - 0.12)
         retrace_component = cls.clamp_score(100.0 - retrace_center / 0.12 * 100.0)
-        ma_hold_bonus = 10.0 if closes[-1] >= ma20 * 0.99 else -10.0
-        rebound_bonus = 0.0
-        if len(closes) >= 6 and closes[-1] >= closes[-6]:
-            rebound_bonus = 8.0
+        ma_hold_bonus = 10.0 if latest_close >= ma20 * 0.99 else -10.0
+        rebound_bonus = 8.0 if rebound else 0.0
         pullback_quality = cls.clamp_score(25.0 + retrace_component * 0.75 + ma_hold_bonus + rebound_bonus)
 
         health_score = cls.clamp_score(
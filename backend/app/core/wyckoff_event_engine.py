@@ -0,0 +1,961 @@
+from __future__ import annotations
+
+import sys
+from bisect import bisect_left
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+
+import numpy as np
+
+from .rolling_kernels import rolling_max, rolling_min
+
+# 威科夫事件检测引擎：每个快照只把逐日序列（MA20、量比、区间位置、前高前低、10 日涨幅等）
+# 计算一次，再把 PS/SC/AR/ST/Spring/SOS/JOC/LPS 及派发侧条件写成整段布尔掩码，
+# 扫描窗口内取首个/最后一个命中位置。
+# 序列按 (窗口行, 标的) 二维存放：各列都是“该标的截至目标日的最后 W 根有效 K 线”，
+# 行 0 即窗口起点，因此按窗口起点截断的回看（量比、区间位置等）对所有列一致，
+# 单个快照就是 N=1 的特例。
+# 浮点均值仍按切片顺序逐项求和（与 SignalAnalyzer.safe_mean 逐位一致），
+# 累计和相减会让 close <= ma20 * k 这类恰好相等的比较翻转，事件日期随之漂移。
+# 按列向量化的求和复刻当前解释器内置 sum 的舍入：3.12 起浮点 sum 为 Neumaier 补偿求和。
+# 平方与开方（safe_std 的 ``** 2`` / ``** 0.5``）走 libm pow，与 NumPy 的乘法/sqrt 偶有 1 ulp 差异，
+# 因此逐元素交给 Python 计算。
+
+VOLUME_RATIO_WINDOW = 20
+VOLUME_RATIO_EXT_LOOKBACK = 60
+TR_POS_LOOKBACK = 40
+PRIOR_EXTREME_LOOKBACK = 20
+RET_LOOKBACK = 10
+MA_WINDOW = 20
+LPS_VOLUME_WINDOW = 5
+COST_CENTER_EMA_WINDOW = 20
+_COMPENSATED_SUM = sys.version_info >= (3, 12)
+
+_EVENT_ORDER = ("PS", "SC", "AR", "ST", "TSO", "Spring", "SOS", "JOC", "LPS", "PSY", "BC", "AR(d)", "ST(d)", "UTAD", "SOW", "LPSY")
+_RISK_EVENTS = frozenset(("PSY", "BC", "AR(d)", "ST(d)", "UTAD", "SOW", "LPSY"))
+
+# (rule_key, default, min, max)
+_INT_RULES: tuple[tuple[str, int, int, int], ...] = (
+    ("lookback_core_days", 40, 20, 120),
+    ("sc_scan_lookback_days", 35, 5, 120),
+    ("bc_scan_lookback_days", 35, 5, 120),
+    ("pattern_window_days", 28, 8, 80),
+    ("pattern_extra_spring_days", 8, 0, 30),
+    ("ps_window_before_sc_days", 25, 3, 80),
+    ("ar_window_after_sc_days", 18, 3, 80),
+    ("st_window_after_ar_days", 12, 3, 80),
+    ("st_window_after_sc_days", 18, 3, 80),
+    ("lps_window_after_anchor_days", 12, 3, 60),
+    ("lps_anchor_max_gap_days", 6, 1, 30),
+    ("psy_window_before_bc_days", 20, 3, 80),
+    ("ard_window_after_bc_days", 18, 3, 80),
+    ("std_window_after_bc_days", 24, 3, 120),
+    ("lpsy_window_after_anchor_days", 16, 3, 120),
+    ("lpsy_short_window_days", 5, 2, 20),
+    ("lpsy_long_window_days", 10, 4, 40),
+)
+_FLOAT_RULES: tuple[tuple[str, float, float, float], ...] = (
+    ("sc_anchor_tr_pos_max", 0.45, 0.05, 0.95),
+    ("sc_anchor_close_open_max", 1.02, 0.7, 1.5),
+    ("sc_anchor_vol_ratio_min", 1.2, 0.1, 5.0),
+    ("sc_close_near_low_ratio_max", 0.38, 0.0, 1.0),
+    ("sc_tr_pos_max", 0.55, 0.05, 0.99),
+    ("sc_vol_ratio_min", 1.05, 0.1, 5.0),
+    ("ps_tr_pos_max", 0.42, 0.05, 0.95),
+    ("ps_vol_ratio_min", 1.08, 0.1, 5.0),
+    ("ps_close_ma20_max", 1.02, 0.6, 1.6),
+    ("ar_rebound_min", 1.05, 0.8, 2.0),
+    ("st_low_near_sc_tol", 0.04, 0.0, 0.4),
+    ("st_vol_vs_sc_max", 0.85, 0.05, 2.0),
+    ("spring_break_prior_low_max", 0.985, 0.6, 1.2),
+    ("spring_close_reclaim_min", 1.0, 0.6, 1.4),
+    ("spring_vol_ratio_min", 1.15, 0.1, 5.0),
+    ("tso_break_prior_low_max", 0.99, 0.6, 1.3),
+    ("tso_close_reclaim_min", 1.0, 0.6, 1.4),
+    ("tso_vol_ratio_min", 1.0, 0.1, 5.0),
+    ("sos_close_ma20_min", 1.01, 0.6, 1.5),
+    ("sos_ret10_min", 0.05, -0.8, 1.2),
+    ("sos_vol_ratio_min", 1.05, 0.1, 5.0),
+    ("joc_close_break_prior_high_min", 1.005, 0.6, 1.5),
+    ("joc_vol_ratio_min", 1.2, 0.1, 5.0),
+    ("lps_close_ma20_min", 0.995, 0.6, 1.5),
+    ("lps_vol_vs_prev5_max", 0.95, 0.05, 2.0),
+    ("bc_anchor_tr_pos_min", 0.62, 0.0, 1.0),
+    ("bc_anchor_close_open_min", 0.98, 0.5, 1.5),
+    ("bc_anchor_vol_ratio_min", 1.2, 0.1, 5.0),
+    ("bc_anchor_high_prior_high_min", 0.995, 0.6, 1.5),
+    ("bc_close_near_high_ratio_max", 0.32, 0.0, 1.0),
+    ("bc_tr_pos_min", 0.58, 0.0, 1.0),
+    ("bc_vol_ratio_min", 1.05, 0.1, 5.0),
+    ("bc_high_recent_high_min", 0.995, 0.6, 1.5),
+    ("psy_tr_pos_min", 0.62, 0.0, 1.0),
+    ("psy_vol_ratio_min", 1.05, 0.1, 5.0),
+    ("psy_close_ma20_min", 0.98, 0.6, 1.5),
+    ("ard_decline_close_bc_max", 0.94, 0.2, 1.2),
+    ("std_high_near_bc_tol", 0.04, 0.0, 0.4),
+    ("std_vol_vs_bc_max", 0.9, 0.05, 2.0),
+    ("std_close_high_max", 0.985, 0.5, 1.5),
+    ("utad_high_break_prior_high_min", 1.01, 0.6, 1.8),
+    ("utad_close_back_below_prior_high_max", 1.0, 0.6, 1.8),
+    ("utad_upper_shadow_min", 0.5, 0.0, 1.0),
+    ("utad_vol_ratio_min", 1.2, 0.1, 5.0),
+    ("sow_ret10_max", -0.05, -1.0, 1.0),
+    ("sow_close_ma20_max", 0.995, 0.6, 1.5),
+    ("sow_vol_ratio_min", 1.1, 0.1, 5.0),
+    ("lpsy_close_ma20_max", 1.0, 0.6, 1.5),
+    ("lpsy_lower_high_max", 0.99, 0.6, 1.5),
+)
+_BOOL_RULES: tuple[str, ...] = (
+    "enable_ps",
+    "enable_sc",
+    "enable_ar",
+    "enable_st",
+    "enable_tso",
+    "enable_spring",
+    "enable_sos",
+    "enable_joc",
+    "enable_lps",
+    "enable_psy",
+    "enable_bc",
+    "enable_ar_d",
+    "enable_st_d",
+    "enable_utad",
+    "enable_sow",
+    "enable_lpsy",
+)
+
+
+def _rule_bool(raw_value: object, default: bool) -> bool:
+    if isinstance(raw_value, bool):
+        return raw_value
+    if isinstance(raw_value, (int, float)):
+        return bool(raw_value)
+    if isinstance(raw_value, str):
+        text = raw_value.strip().lower()
+        if text in {"1", "true", "yes", "y", "on"}:
+            return True
+        if text in {"0", "false", "no", "n", "off"}:
+            return False
+    return bool(default)
+
+
+def _rule_float(raw_value: object, default: float, min_value: float, max_value: float) -> float:
+    try:
+        value = float(raw_value)  # type: ignore[arg-type]
+    except Exception:
+        value = float(default)
+    return float(min(float(max_value), max(float(min_value), value)))
+
+
+def _rule_int(raw_value: object, default: int, min_value: int, max_value: int) -> int:
+    try:
+        value = int(round(float(raw_value)))  # type: ignore[arg-type]
+    except Exception:
+        value = int(default)
+    return int(min(int(max_value), max(int(min_value), value)))
+
+
+def resolve_wyckoff_event_rules(event_rule_values: dict[str, object] | None) -> dict[str, float | int | bool]:
+    """Clamp a profile's event rule values to the detector's ranges, filling defaults."""
+    rules = event_rule_values if isinstance(event_rule_values, dict) else {}
+    out: dict[str, float | int | bool] = {}
+    for key, default, min_value, max_value in _INT_RULES:
+        out[key] = _rule_int(rules.get(key, default), default, min_value, max_value)
+    out["lpsy_long_window_days"] = max(int(out["lpsy_short_window_days"]) + 1, int(out["lpsy_long_window_days"]))
+    for key, default, min_value, max_value in _FLOAT_RULES:
+        out[key] = _rule_float(rules.get(key, default), default, min_value, max_value)
+    for key in _BOOL_RULES:
+        out[key] = _rule_bool(rules.get(key, True), True)
+    return out
+
+
+@lru_cache(maxsize=16384)
+def _trading_day(text: str) -> tuple[int, int] | None:
+    # (weekday, ordinal)；同一交易日历在不同标的间反复出现，解析结果按字符串缓存。
+    raw = str(text or "").strip()
+    if not raw:
+        return None
+    try:
+        parsed = datetime.strptime(raw, "%Y-%m-%d")
+    except Exception:
+        return None
+    return parsed.weekday(), parsed.toordinal()
+
+
+@lru_cache(maxsize=16384)
+def _iso_week(text: str) -> int:
+    raw = str(text or "").strip()
+    if not raw:
+        return -1
+    try:
+        week_info = datetime.strptime(raw, "%Y-%m-%d").isocalendar()
+    except Exception:
+        return -1
+    return int(week_info.year) * 100 + int(week_info.week)
+
+
+def iso_week_keys(dates: list[str]) -> np.ndarray:
+    """``year * 100 + ISO week`` int64 array for ``dates``; ``-1`` where the text does not parse."""
+    return np.asarray([_iso_week(text) for text in dates], dtype=np.int64)
+
+
+def trading_day_keys(dates: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """(weekday, ordinal) int64 arrays for ``dates``; weekday is ``-1`` where the text does not parse."""
+    days = [_trading_day(text) for text in dates]
+    weekday = np.asarray([day[0] if day is not None else -1 for day in days], dtype=np.int64)
+    ordinal = np.asarray([day[1] if day is not None else 0 for day in days], dtype=np.int64)
+    return weekday, ordinal
+
+
+def _volume_ratio_column_loop(samples: list[float], weekday: list[int], ordinal: list[int], window: int) -> list[float]:
+    # 逐点复刻 SignalAnalyzer._volume_ratio_with_calendar_adjustment（成交量含小数时使用）。
+    recent_span = max(5, int(window))
+    short_span = max(8, int(window))
+    ext_span = max(int(window) * 3, VOLUME_RATIO_EXT_LOOKBACK)
+    weekday_positions: dict[int, list[int]] = {}
+    out: list[float] = []
+    for idx, current in enumerate(samples):
+        day = weekday[idx]
+        recent = samples[max(0, idx - recent_span):idx]
+        if not recent:
+            baseline = max(1.0, current)
+        else:
+            ma_base = max(1.0, sum(recent) / len(recent))
+            weekday_base = 0.0
+            if day >= 0:
+                positions = weekday_positions.get(day, [])
+                left = bisect_left(positions, max(0, idx - ext_span))
+                picked = [samples[pos] for pos in positions[max(left, len(positions) - 8):]]
+                if picked:
+                    weekday_base = sum(picked) / len(picked)
+            baseline = ma_base if weekday_base <= 0 else ma_base * 0.55 + weekday_base * 0.45
+            if day >= 0 and weekday[idx - 1] >= 0:
+                gap_days = ordinal[idx] - ordinal[idx - 1]
+                if gap_days > 4:
+                    baseline *= min(1.35, 1.0 + float(gap_days - 4) * 0.045)
+            baseline = max(1.0, float(baseline))
+        if day >= 0:
+            weekday_positions.setdefault(day, []).append(idx)
+        ratio = current / max(1.0, baseline)
+        short = samples[max(0, idx - short_span):idx]
+        if len(short) >= 8:
+            ratio *= _zscore_factor(short, current)
+        out.append(max(0.0, float(ratio)))
+    return out
+
+
+def _zscore_factor(short: list[float], current: float) -> float:
+    z_mean = sum(short) / len(short)
+    z_var = sum([(value - z_mean) ** 2 for value in short]) / len(short)
+    zscore = (current - z_mean) / max(1.0, z_var ** 0.5)
+    if zscore >= 2.5:
+        return 0.92
+    if zscore <= -2.0:
+        return 1.05
+    return 1.0
+
+
+def _prefix_sums(values: np.ndarray) -> np.ndarray:
+    out = np.zeros((values.shape[0] + 1, *values.shape[1:]), dtype=np.float64)
+    np.cumsum(values, axis=0, out=out[1:])
+    return out
+
+
+def _exact_sum_columns(values: np.ndarray, prefix: np.ndarray) -> np.ndarray:
+    # 整数值且总和 < 2**53 的列，窗口和按任意顺序累加都精确，可用前缀和相减。
+    with np.errstate(invalid="ignore"):
+        return np.all(np.floor(values) == values, axis=0) & (prefix[-1] < 2.0**53)
+
+
+def volume_ratio_matrix(
+    volumes: np.ndarray,
+    weekday: np.ndarray,
+    ordinal: np.ndarray,
+    window: int = VOLUME_RATIO_WINDOW,
+) -> np.ndarray:
+    """Calendar-adjusted volume ratio for every ``(row, column)`` of stacked ``(W, N)`` segments."""
+    x = np.asarray(volumes, dtype=np.float64)
+    t, n = x.shape
+    out = np.zeros((t, n), dtype=np.float64)
+    if t == 0 or n == 0:
+        return out
+    recent_span = max(5, int(window))
+    short_span = max(8, int(window))
+    ext_span = max(int(window) * 3, VOLUME_RATIO_EXT_LOOKBACK)
+    rows = np.arange(t)
+    prefix = _prefix_sums(x)
+    exact = _exact_sum_columns(x, prefix)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        recent_left = np.maximum(rows - recent_span, 0)
+        recent_count = (rows - recent_left)[:, None]
+        ma_base = np.maximum(1.0, (prefix[:t] - prefix[recent_left]) / recent_count)
+
+        # 同星期样本：[row - ext_span, row) 内同星期的最近 8 个。按“该星期第几次出现”建前缀和，
+        # 第 r 次之前的个数即排名，窗口左端的排名由左端行的出现次数给出。
+        weekday_base = np.zeros((t, n), dtype=np.float64)
+        ext_left = np.maximum(rows - ext_span, 0)
+        for day_of_week in range(7):
+            hits = weekday == day_of_week
+            if not hits.any():
+                continue
+            seen = np.cumsum(hits, axis=0)
+            before = seen - hits
+            by_rank = np.zeros((int(seen[-1].max()) + 1, n), dtype=np.float64)
+            hit_rows, hit_cols = np.nonzero(hits)
+            by_rank[seen[hit_rows, hit_cols], hit_cols] = np.cumsum(np.where(hits, x, 0.0), axis=0)[hit_rows, hit_cols]
+            upper = before[hit_rows, hit_cols]
+            lower = np.maximum(upper - 8, before[ext_left[hit_rows], hit_cols])
+            count = upper - lower
+            total = by_rank[upper, hit_cols] - by_rank[lower, hit_cols]
+            weekday_base[hit_rows, hit_cols] = np.where(count > 0, total / np.maximum(count, 1), 0.0)
+
+        baseline = np.where(weekday_base <= 0, ma_base, ma_base * 0.55 + weekday_base * 0.45)
+        gap_days = ordinal[1:] - ordinal[:-1]
+        holiday = (weekday[1:] >= 0) & (weekday[:-1] >= 0) & (gap_days > 4)
+        baseline[1:] = np.where(
+            holiday,
+            baseline[1:] * np.minimum(1.35, 1.0 + (gap_days - 4).astype(np.float64) * 0.045),
+            baseline[1:],
+        )
+        baseline = np.maximum(1.0, baseline)
+        baseline[0] = np.maximum(1.0, x[0])
+        ratio = x / np.maximum(1.0, baseline)
+
+        if t > 8:
+            scored = rows[8:]
+            short_left = np.maximum(scored - short_span, 0)
+            short_count = (scored - short_left)[:, None]
+            z_mean = (prefix[scored] - prefix[short_left]) / short_count
+            squares = np.zeros((scored.size, n), dtype=np.float64)
+            for offset in range(short_span):
+                probe = scored - short_span + offset
+                deviation = x[np.maximum(probe, 0)] - z_mean
+                squares += np.where((probe >= short_left)[:, None], deviation * deviation, 0.0)
+            zscore = (x[scored] - z_mean) / np.maximum(1.0, np.sqrt(squares / short_count))
+            factor = np.where(zscore >= 2.5, 0.92, np.where(zscore <= -2.0, 1.05, 1.0))
+            # 方差求和顺序与逐点实现不同，只差几个 ulp；落在阈值附近的点按原公式重算。
+            near_rows, near_cols = np.nonzero(((np.abs(zscore - 2.5) <= 1e-9) | (np.abs(zscore + 2.0) <= 1e-9)) & exact)
+            for pos, col in zip(near_rows.tolist(), near_cols.tolist()):
+                at = int(scored[pos])
+                factor[pos, col] = _zscore_factor(x[short_left[pos]:at, col].tolist(), float(x[at, col]))
+            ratio[8:] *= factor
+        out[:] = np.maximum(0.0, ratio)
+
+    for col in np.flatnonzero(~exact).tolist():
+        out[:, col] = _volume_ratio_column_loop(x[:, col].tolist(), weekday[:, col].tolist(), ordinal[:, col].tolist(), window)
+    return out
+
+
+def volume_ratio_series(volumes: list[int] | list[float], dates: list[str], window: int = VOLUME_RATIO_WINDOW) -> np.ndarray:
+    """``SignalAnalyzer._volume_ratio_with_calendar_adjustment`` for every index of one segment."""
+    samples = np.asarray(volumes, dtype=np.float64).reshape(-1, 1)
+    padded = [*dates[: samples.shape[0]], *([""] * max(0, samples.shape[0] - len(dates)))]
+    weekday, ordinal = trading_day_keys(padded)
+    return volume_ratio_matrix(samples, weekday[:, None], ordinal[:, None], window)[:, 0]
+
+
+def _trailing_means(values: list[int] | list[float], window: int) -> list[float]:
+    # safe_mean(values[max(0, i - window + 1):i + 1])，求和顺序与原实现一致。
+    w = max(1, int(window))
+    head = [sum(values[:idx + 1]) / (idx + 1) for idx in range(min(w - 1, len(values)))]
+    return head + [sum(values[idx:idx + w]) / w for idx in range(len(values) - w + 1)]
+
+
+def _sum_step(total: np.ndarray, comp: np.ndarray, value: np.ndarray, take: np.ndarray | bool) -> tuple[np.ndarray, np.ndarray]:
+    step = total + value
+    if _COMPENSATED_SUM:
+        lost = np.where(np.abs(total) >= np.abs(value), (total - step) + value, (value - step) + total)
+        comp = np.where(take, comp + lost, comp)
+    return np.where(take, step, total), comp
+
+
+def _sum_finish(total: np.ndarray, comp: np.ndarray) -> np.ndarray:
+    if not _COMPENSATED_SUM:
+        return total
+    return np.where((comp != 0) & np.isfinite(comp), total + comp, total)
+
+
+def builtin_sum_rows(values: np.ndarray, count: np.ndarray | int | None = None) -> np.ndarray:
+    """Per-column sum of the first ``count`` rows of float ``values``, rounded exactly like builtin ``sum``."""
+    x = np.asarray(values, dtype=np.float64)
+    limit = x.shape[0] if count is None else np.asarray(count)
+    total = np.zeros(x.shape[1:], dtype=np.float64)
+    comp = np.zeros_like(total)
+    with np.errstate(invalid="ignore", over="ignore"):
+        for pos in range(x.shape[0]):
+            total, comp = _sum_step(total, comp, x[pos], pos < limit)
+        return _sum_finish(total, comp)
+
+
+def _trailing_means_rows(values: np.ndarray, window: int) -> np.ndarray:
+    # 按列的 _trailing_means：每个窗口从左到右按内置 sum 的舍入累加。
+    x = np.asarray(values, dtype=np.float64)
+    t = x.shape[0]
+    w = max(1, int(window))
+    rows = np.arange(t)
+    left = np.maximum(rows - w + 1, 0)
+    count = (rows - left + 1)[:, None]
+    total = np.zeros(x.shape, dtype=np.float64)
+    comp = np.zeros_like(total)
+    with np.errstate(invalid="ignore", over="ignore"):
+        for offset in range(min(w, t)):
+            total, comp = _sum_step(total, comp, x[np.minimum(left + offset, t - 1)], offset < count)
+        return _sum_finish(total, comp) / count
+
+
+def _py_pow(values: np.ndarray, exponent: float) -> np.ndarray:
+    # 逐元素用 Python 浮点幂（libm pow），与 safe_std 的舍入一致。
+    flat = [value ** exponent for value in np.asarray(values, dtype=np.float64).ravel().tolist()]
+    return np.asarray(flat, dtype=np.float64).reshape(np.shape(values))
+
+
+def _safe_std_rows(values: np.ndarray) -> np.ndarray:
+    # SignalAnalyzer.safe_std 沿行（k 行全部参与）。
+    x = np.asarray(values, dtype=np.float64)
+    k = x.shape[0]
+    mean = builtin_sum_rows(x) / k
+    variance = builtin_sum_rows(_py_pow(x - mean, 2)) / k
+    return _py_pow(variance, 0.5)
+
+
+def _trailing_extreme(values: np.ndarray, window: int, *, high: bool) -> np.ndarray:
+    # values[max(0, i - window + 1):i + 1] 的极值（沿行）；开头不足 window 行时窗口从 0 开始。
+    if values.shape[0] == 0:
+        return values.astype(np.float64, copy=True)
+    w = max(1, int(window))
+    padded = np.concatenate([np.repeat(values[:1], w - 1, axis=0), values], axis=0)
+    return (rolling_max if high else rolling_min)(padded, w)[w - 1 :]
+
+
+def _shift_down(values: np.ndarray, periods: int, fill: np.ndarray) -> np.ndarray:
+    out = np.array(fill, dtype=np.float64, copy=True)
+    if periods < values.shape[0]:
+        out[periods:] = values[: values.shape[0] - periods]
+    return out
+
+
+@dataclass(slots=True)
+class WyckoffEventSeries:
+    """Per-row inputs of the event predicates for stacked ``(W, N)`` snapshot segments."""
+
+    opens: np.ndarray
+    highs: np.ndarray
+    lows: np.ndarray
+    closes: np.ndarray
+    volumes: np.ndarray
+    ma20: np.ndarray
+    prev_vol_avg5: np.ndarray
+    vol_ratio: np.ndarray
+    tr_pos: np.ndarray
+    prior_high: np.ndarray
+    prior_low: np.ndarray
+    ret10: np.ndarray
+    upper_shadow: np.ndarray
+
+    def shape(self) -> tuple[int, int]:
+        return int(self.closes.shape[0]), int(self.closes.shape[1])
+
+
+def build_wyckoff_event_series(
+    *,
+    opens: np.ndarray,
+    highs: np.ndarray,
+    lows: np.ndarray,
+    closes: np.ndarray,
+    volumes: np.ndarray,
+    weekday: np.ndarray,
+    ordinal: np.ndarray,
+) -> WyckoffEventSeries:
+    """Precompute every rolling series the event predicates read, once per ``(W, N)`` segment stack."""
+    open_arr = np.asarray(opens, dtype=np.float64)
+    high_arr = np.asarray(highs, dtype=np.float64)
+    low_arr = np.asarray(lows, dtype=np.float64)
+    close_arr = np.asarray(closes, dtype=np.float64)
+    volume_arr = np.asarray(volumes, dtype=np.float64)
+    t, n = close_arr.shape
+
+    segment_high = _trailing_extreme(high_arr, TR_POS_LOOKBACK, high=True)
+    segment_low = _trailing_extreme(low_arr, TR_POS_LOOKBACK, high=False)
+    tr_pos = (close_arr - segment_low) / np.maximum(segment_high - segment_low, 0.01)
+
+    # prior_high_at(idx) = max(highs[max(0, idx - 20):idx])，idx == 0 时取当日。
+    prior_high = _shift_down(_trailing_extreme(high_arr, PRIOR_EXTREME_LOOKBACK, high=True), 1, high_arr)
+    prior_low = _shift_down(_trailing_extreme(low_arr, PRIOR_EXTREME_LOOKBACK, high=False), 1, low_arr)
+
+    base_close = close_arr[np.maximum(np.arange(t) - RET_LOOKBACK, 0)]
+    ret10 = (close_arr - base_close) / np.maximum(base_close, 0.01)
+
+    body_high = np.maximum(open_arr, close_arr)
+    upper_shadow = (high_arr - body_high) / np.maximum(high_arr - low_arr, 0.01)
+
+    # 前 5 日均量：整数成交量列用前缀和，其余列逐窗口求和。
+    prefix = _prefix_sums(volume_arr)
+    exact = _exact_sum_columns(volume_arr, prefix)
+    rows = np.arange(t)
+    left = np.maximum(rows - LPS_VOLUME_WINDOW + 1, 0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        vol_avg5 = (prefix[rows + 1] - prefix[left]) / (rows + 1 - left)[:, None]
+    for col in np.flatnonzero(~exact).tolist():
+        vol_avg5[:, col] = _trailing_means(volume_arr[:, col].tolist(), LPS_VOLUME_WINDOW)
+    prev_vol_avg5 = _shift_down(vol_avg5, 1, np.zeros((t, n), dtype=np.float64))
+
+    return WyckoffEventSeries(
+        opens=open_arr,
+        highs=high_arr,
+        lows=low_arr,
+        closes=close_arr,
+        volumes=volume_arr,
+        ma20=_trailing_means_rows(close_arr, MA_WINDOW),
+        prev_vol_avg5=prev_vol_avg5,
+        vol_ratio=volume_ratio_matrix(volume_arr, weekday, ordinal),
+        tr_pos=tr_pos,
+        prior_high=prior_high,
+        prior_low=prior_low,
+        ret10=ret10,
+        upper_shadow=upper_shadow,
+    )
+
+
+def detect_wyckoff_event_indices(
+    series: WyckoffEventSeries,
+    rules: dict[str, float | int | bool],
+) -> dict[str, np.ndarray]:
+    """Row index of every detected event per column (``-1`` when absent), in detection order.
+
+    Column-wise twin of ``SignalAnalyzer._detect_wyckoff_events_legacy``: every scan is a mask over the whole
+    stack restricted to each column's ``[start, end]`` window.
+    """
+    t, n = series.shape()
+    if t == 0:
+        return {}
+    last = t - 1
+    rows = np.arange(t)[:, None]
+    cols = np.arange(n)
+    none = np.full(n, -1, dtype=np.int64)
+
+    opens = series.opens
+    highs = series.highs
+    lows = series.lows
+    closes = series.closes
+    volumes = series.volumes
+    ma20 = series.ma20
+    vol_ratio = series.vol_ratio
+    tr_pos = series.tr_pos
+    prior_high = series.prior_high
+    prior_low = series.prior_low
+    ret10 = series.ret10
+    r = rules
+
+    def at(values: np.ndarray, idx: np.ndarray) -> np.ndarray:
+        return values[np.clip(idx, 0, last), cols]
+
+    def within(start: np.ndarray | int, end: np.ndarray | int) -> np.ndarray:
+        return (rows >= np.maximum(start, 0)) & (rows <= np.minimum(end, last))
+
+    def latest_index_where(start: np.ndarray | int, end: np.ndarray | int, mask: np.ndarray) -> np.ndarray:
+        hits = mask & within(start, end)
+        return np.where(hits.any(axis=0), last - np.argmax(hits[::-1], axis=0), -1)
+
+    def first_index_where(start: np.ndarray | int, end: np.ndarray | int, mask: np.ndarray) -> np.ndarray:
+        hits = mask & within(start, end)
+        return np.where(hits.any(axis=0), np.argmax(hits, axis=0), -1)
+
+    def argmax_from(values: np.ndarray, start: int) -> np.ndarray:
+        # 与 max(range(...), key=...) 一致：并列取最早的一天。
+        return start + np.argmax(values[start:], axis=0)
+
+    out: dict[str, np.ndarray] = {}
+
+    def push_event(name: str, present: np.ndarray, idx: np.ndarray) -> None:
+        out[name] = np.where(present, idx, -1)
+
+    lookback_start = max(0, last - int(r["lookback_core_days"]))
+
+    # SC：近期放量、低位的恐慌性下跌K线，找不到时退回区间内成交量最大的一天。
+    look_sc_start = max(0, t - int(r["sc_scan_lookback_days"]))
+    sc_idx = latest_index_where(
+        look_sc_start,
+        last,
+        (tr_pos <= r["sc_anchor_tr_pos_max"])
+        & (closes <= opens * r["sc_anchor_close_open_max"])
+        & (vol_ratio >= r["sc_anchor_vol_ratio_min"]),
+    )
+    sc_idx = np.where(sc_idx < 0, argmax_from(volumes, look_sc_start), sc_idx)
+    sc_range = np.maximum(at(highs, sc_idx) - at(lows, sc_idx), 0.01)
+    has_sc = bool(r["enable_sc"]) & (
+        (at(closes, sc_idx) <= at(lows, sc_idx) + sc_range * r["sc_close_near_low_ratio_max"])
+        & (at(tr_pos, sc_idx) <= r["sc_tr_pos_max"])
+        & (at(vol_ratio, sc_idx) >= r["sc_vol_ratio_min"])
+    )
+    push_event("SC", has_sc, sc_idx)
+
+    ps_idx = latest_index_where(
+        np.maximum(0, sc_idx - int(r["ps_window_before_sc_days"])),
+        np.maximum(0, sc_idx - 1),
+        (tr_pos <= r["ps_tr_pos_max"]) & (vol_ratio >= r["ps_vol_ratio_min"]) & (closes <= ma20 * r["ps_close_ma20_max"]),
+    )
+    push_event("PS", bool(r["enable_ps"]) & (ps_idx >= 0), ps_idx)
+
+    # AR：SC 之后窗口内的最高收盘（并列取最早）。
+    rebound_end = np.minimum(last, sc_idx + int(r["ar_window_after_sc_days"]))
+    rebound_rows = within(sc_idx + 1, rebound_end)
+    rebound = np.where(rebound_rows, closes, -np.inf)
+    rebound_max = rebound.max(axis=0)
+    ar_idx = np.where(
+        has_sc & (sc_idx < last - 1) & (rebound_max >= at(closes, sc_idx) * r["ar_rebound_min"]),
+        np.argmax(rebound_rows & (closes == rebound_max), axis=0),
+        -1,
+    )
+    push_event("AR", bool(r["enable_ar"]) & (ar_idx >= 0), ar_idx)
+
+    has_ar = ar_idx >= 0
+    st_idx = first_index_where(
+        np.where(has_ar, ar_idx + 1, sc_idx + 2),
+        np.minimum(last, np.where(has_ar, ar_idx + int(r["st_window_after_ar_days"]), sc_idx + int(r["st_window_after_sc_days"]))),
+        (np.abs(lows - at(lows, sc_idx)) / np.maximum(at(lows, sc_idx), 0.01) <= r["st_low_near_sc_tol"])
+        & (volumes <= at(volumes, sc_idx) * r["st_vol_vs_sc_max"]),
+    )
+    st_idx = np.where(has_sc & (sc_idx < last), st_idx, -1)
+    push_event("ST", bool(r["enable_st"]) & (st_idx >= 0), st_idx)
+
+    # TSO / Spring / SOS / JOC / LPS（sc_idx 总有值，max 的默认值用不到）
+    pattern_start = np.maximum(1, np.maximum.reduce([st_idx, ar_idx, sc_idx]) + 1)
+    pattern_end = np.minimum(last, pattern_start + int(r["pattern_window_days"]))
+    spring_idx = first_index_where(
+        pattern_start,
+        np.minimum(last, pattern_end + int(r["pattern_extra_spring_days"])),
+        (lows < prior_low * r["spring_break_prior_low_max"])
+        & (closes > prior_low * r["spring_close_reclaim_min"])
+        & (vol_ratio >= r["spring_vol_ratio_min"]),
+    )
+    tso_idx = first_index_where(
+        pattern_start,
+        np.where(spring_idx >= 0, spring_idx - 1, pattern_end),
+        (lows < prior_low * r["tso_break_prior_low_max"])
+        & (closes > prior_low * r["tso_close_reclaim_min"])
+        & (vol_ratio >= r["tso_vol_ratio_min"]),
+    )
+    push_event("TSO", bool(r["enable_tso"]) & (tso_idx >= 0), tso_idx)
+    push_event("Spring", bool(r["enable_spring"]) & (spring_idx >= 0), spring_idx)
+
+    signal_start = np.maximum(lookback_start, np.maximum.reduce([spring_idx, tso_idx, st_idx, ar_idx, sc_idx]) + 1)
+    sos_idx = first_index_where(
+        signal_start,
+        last,
+        (closes > ma20 * r["sos_close_ma20_min"]) & (ret10 > r["sos_ret10_min"]) & (vol_ratio >= r["sos_vol_ratio_min"]),
+    )
+    push_event("SOS", bool(r["enable_sos"]) & (sos_idx >= 0), sos_idx)
+
+    joc_start = np.maximum(signal_start, np.where(sos_idx >= 0, sos_idx + 1, signal_start))
+    joc_idx = first_index_where(
+        np.maximum(1, joc_start),
+        last,
+        (closes >= prior_high * r["joc_close_break_prior_high_min"]) & (vol_ratio >= r["joc_vol_ratio_min"]),
+    )
+    push_event("JOC", bool(r["enable_joc"]) & (joc_idx >= 0), joc_idx)
+
+    # (idx - anchor) <= gap 等价于把扫描终点截到 anchor + gap。
+    lps_anchor = np.maximum(sos_idx, joc_idx)
+    lps_idx = first_index_where(
+        lps_anchor + 1,
+        np.minimum.reduce(
+            [
+                np.full(n, last),
+                lps_anchor + int(r["lps_window_after_anchor_days"]),
+                lps_anchor + int(r["lps_anchor_max_gap_days"]),
+            ]
+        ),
+        (closes > ma20 * r["lps_close_ma20_min"])
+        & (volumes <= np.maximum(series.prev_vol_avg5, 1.0) * r["lps_vol_vs_prev5_max"]),
+    )
+    lps_idx = np.where((lps_anchor >= 0) & (lps_anchor < last), lps_idx, -1)
+    push_event("LPS", bool(r["enable_lps"]) & (lps_idx >= 0), lps_idx)
+
+    # 派发侧：PSY / BC / AR(d) / ST(d)
+    look_bc_start = max(0, t - int(r["bc_scan_lookback_days"]))
+    bc_idx = latest_index_where(
+        look_bc_start,
+        last,
+        (tr_pos >= r["bc_anchor_tr_pos_min"])
+        & (closes >= opens * r["bc_anchor_close_open_min"])
+        & (vol_ratio >= r["bc_anchor_vol_ratio_min"])
+        & (highs >= prior_high * r["bc_anchor_high_prior_high_min"]),
+    )
+    bc_at = np.where(bc_idx < 0, argmax_from(volumes, look_bc_start), bc_idx)
+    bc_range = np.maximum(at(highs, bc_at) - at(lows, bc_at), 0.01)
+    recent_high = np.where(within(bc_at - 20, bc_at), highs, -np.inf).max(axis=0)
+    bc_condition = (
+        (bc_idx >= 0)
+        & (at(closes, bc_at) >= at(highs, bc_at) - bc_range * r["bc_close_near_high_ratio_max"])
+        & (at(tr_pos, bc_at) >= r["bc_tr_pos_min"])
+        & (at(vol_ratio, bc_at) >= r["bc_vol_ratio_min"])
+        & (at(highs, bc_at) >= recent_high * r["bc_high_recent_high_min"])
+    )
+
+    psy_idx = first_index_where(
+        np.maximum(0, bc_at - int(r["psy_window_before_bc_days"])),
+        np.maximum(0, bc_at - 1),
+        (tr_pos >= r["psy_tr_pos_min"]) & (vol_ratio >= r["psy_vol_ratio_min"]) & (closes >= ma20 * r["psy_close_ma20_min"]),
+    )
+    psy_idx = np.where(bc_at > 0, psy_idx, -1)
+    push_event("PSY", bool(r["enable_psy"]) & (psy_idx >= 0) & bc_condition, psy_idx)
+    has_bc = bool(r["enable_bc"]) & bc_condition
+    push_event("BC", has_bc, bc_at)
+
+    decline_rows = within(bc_at + 1, np.minimum(last, bc_at + int(r["ard_window_after_bc_days"])))
+    decline_min = np.where(decline_rows, closes, np.inf).min(axis=0)
+    ar_d_idx = np.where(
+        has_bc & (bc_at < last - 1) & (decline_min <= at(closes, bc_at) * r["ard_decline_close_bc_max"]),
+        np.argmax(decline_rows & (closes == decline_min), axis=0),
+        -1,
+    )
+    push_event("AR(d)", bool(r["enable_ar_d"]) & (ar_d_idx >= 0), ar_d_idx)
+
+    bc_high = at(highs, bc_at)
+    st_d_idx = first_index_where(
+        np.where(ar_d_idx >= 0, ar_d_idx + 1, bc_at + 2),
+        np.minimum(last, bc_at + int(r["std_window_after_bc_days"])),
+        (np.abs(highs - bc_high) / np.maximum(bc_high, 0.01) <= r["std_high_near_bc_tol"])
+        & (volumes <= at(volumes, bc_at) * r["std_vol_vs_bc_max"])
+        & (closes <= highs * r["std_close_high_max"]),
+    )
+    st_d_idx = np.where(has_bc & (bc_at < last), st_d_idx, -1)
+    has_st_d = bool(r["enable_st_d"]) & (st_d_idx >= 0)
+    push_event("ST(d)", has_st_d, st_d_idx)
+
+    # 风险侧：UTAD / SOW / LPSY
+    utad_start = np.maximum(lookback_start, np.where(has_st_d, st_d_idx + 1, bc_at + 1))
+    utad_idx = first_index_where(
+        np.maximum(1, utad_start),
+        last,
+        (highs >= prior_high * r["utad_high_break_prior_high_min"])
+        & (closes < prior_high * r["utad_close_back_below_prior_high_max"])
+        & (series.upper_shadow >= r["utad_upper_shadow_min"])
+        & (vol_ratio >= r["utad_vol_ratio_min"]),
+    )
+    push_event("UTAD", bool(r["enable_utad"]) & (utad_idx >= 0), utad_idx)
+
+    sow_start = np.maximum(
+        lookback_start,
+        np.where(utad_idx >= 0, utad_idx + 1, np.where(ar_d_idx >= 0, ar_d_idx + 1, bc_at + 1)),
+    )
+    sow_idx = first_index_where(
+        sow_start,
+        last,
+        (ret10 <= r["sow_ret10_max"]) & (closes < ma20 * r["sow_close_ma20_max"]) & (vol_ratio >= r["sow_vol_ratio_min"]),
+    )
+    push_event("SOW", bool(r["enable_sow"]) & (sow_idx >= 0), sow_idx)
+
+    lpsy_anchor = np.maximum(sow_idx, utad_idx)
+    short_window = int(r["lpsy_short_window_days"])
+    long_window = int(r["lpsy_long_window_days"])
+    short_high = _trailing_extreme(highs, short_window, high=True)
+    # 长窗口取 highs[idx - long + 1 : idx - short + 1]，该段为空（idx < short）时退回短窗口。
+    long_high = _shift_down(_trailing_extreme(highs, long_window - short_window, high=True), short_window, short_high)
+    lpsy_idx = first_index_where(
+        lpsy_anchor + 1,
+        np.minimum(last, lpsy_anchor + int(r["lpsy_window_after_anchor_days"])),
+        (closes < ma20 * r["lpsy_close_ma20_max"]) & (short_high <= long_high * r["lpsy_lower_high_max"]),
+    )
+    lpsy_idx = np.where((lpsy_anchor >= 0) & (lpsy_anchor < last), lpsy_idx, -1)
+    push_event("LPSY", bool(r["enable_lpsy"]) & (lpsy_idx >= 0), lpsy_idx)
+    return out
+
+
+def wyckoff_event_chain(event_dates: dict[str, str]) -> list[dict[str, str]]:
+    """``event_chain`` for ``event_dates``, ordered by date and then by event order."""
+    event_chain = [
+        {"event": name, "date": day, "category": "distributionRisk" if name in _RISK_EVENTS else "accumulation"}
+        for name, day in event_dates.items()
+    ]
+    event_chain.sort(key=lambda item: (item["date"], _EVENT_ORDER.index(item["event"])))
+    return event_chain
+
+
+def detect_wyckoff_events(
+    *,
+    opens: list[float],
+    highs: list[float],
+    lows: list[float],
+    closes: list[float],
+    volumes: list[int],
+    dates: list[str],
+    rules: dict[str, float | int | bool],
+) -> tuple[dict[str, str], list[dict[str, str]]]:
+    """Events of a single segment (the ``N == 1`` case)."""
+    if not dates:
+        return {}, []
+    weekday, ordinal = trading_day_keys(dates)
+    series = build_wyckoff_event_series(
+        opens=np.asarray(opens, dtype=np.float64)[:, None],
+        highs=np.asarray(highs, dtype=np.float64)[:, None],
+        lows=np.asarray(lows, dtype=np.float64)[:, None],
+        closes=np.asarray(closes, dtype=np.float64)[:, None],
+        volumes=np.asarray(volumes, dtype=np.float64)[:, None],
+        weekday=weekday[:, None],
+        ordinal=ordinal[:, None],
+    )
+    event_dates = {
+        name: dates[int(idx[0])] for name, idx in detect_wyckoff_event_indices(series, rules).items() if idx[0] >= 0
+    }
+    return event_dates, wyckoff_event_chain(event_dates)
+
+
+CONFIRMATION_STATUSES = ("", "pending", "confirmed", "failed")
+_PENDING, _CONFIRMED, _FAILED = 1, 2, 3
+
+
+def event_confirmation_codes(series: WyckoffEventSeries, indices: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+    """Column-wise ``SignalAnalyzer._evaluate_event_confirmation_map``; codes index ``CONFIRMATION_STATUSES``."""
+    t, n = series.shape()
+    last = t - 1
+    cols = np.arange(n)
+    closes = series.closes
+    opens = series.opens
+
+    def at(values: np.ndarray, idx: np.ndarray) -> np.ndarray:
+        return values[np.clip(idx, 0, last), cols]
+
+    def future_min(idx: np.ndarray, span: int) -> np.ndarray:
+        # min(closes[idx + 1 : min(last, idx + span) + 1])；idx < last 时至少有一根。
+        out = np.full(n, np.inf)
+        for offset in range(1, span + 1):
+            out = np.where(idx + offset <= last, np.minimum(out, at(closes, idx + offset)), out)
+        return out
+
+    out: dict[str, np.ndarray] = {}
+    for name in ("SOS", "LPS", "Spring", "JOC"):
+        idx = indices.get(name)
+        if idx is None:
+            continue
+        if name == "SOS":
+            breakout = np.maximum(at(series.prior_high, idx), at(series.ma20, idx))
+            passed = future_min(idx, 3) >= breakout * 0.995
+        elif name == "Spring":
+            following = idx + 1
+            passed = (at(series.lows, following) >= at(series.lows, idx) * 0.997) & (
+                at(closes, following) >= np.maximum(at(opens, following), at(closes, idx) * 0.998)
+            )
+        elif name == "JOC":
+            passed = future_min(idx, 2) >= at(series.prior_high, idx) * 0.99
+        else:
+            prev_vol = np.maximum(1.0, np.where(idx <= 0, at(series.volumes, idx), at(series.prev_vol_avg5, idx)))
+            reversal = np.zeros(n, dtype=bool)
+            for offset in range(3):
+                probe = idx + offset
+                reversal |= (
+                    (probe <= last)
+                    & (at(closes, probe) >= at(opens, probe) * 1.002)
+                    & (at(closes, probe) >= at(series.ma20, probe) * 0.995)
+                )
+            passed = (at(series.volumes, idx) <= prev_vol * 0.95) & reversal
+        code = np.where(idx >= last, _PENDING, np.where(passed, _CONFIRMED, _FAILED))
+        out[name] = np.where(idx >= 0, code, 0).astype(np.int8)
+    return out
+
+
+def _weekly_bars(series: WyckoffEventSeries, week_keys: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    # 逐行聚合周K（同 _calculate_weekly_context_metrics）：ISO 周变化时开新周，无法解析的日期跳过。
+    t, n = series.shape()
+    cols = np.arange(n)
+    week_close = np.zeros((t, n), dtype=np.float64)
+    week_high = np.zeros((t, n), dtype=np.float64)
+    week_low = np.zeros((t, n), dtype=np.float64)
+    count = np.zeros(n, dtype=np.int64)
+    current = np.full(n, -2, dtype=np.int64)
+    high = np.zeros(n, dtype=np.float64)
+    low = np.zeros(n, dtype=np.float64)
+    for row in range(t):
+        key = week_keys[row]
+        valid = key >= 0
+        fresh = valid & (key != current)
+        count += fresh
+        high = np.where(fresh, series.highs[row], np.where(valid, np.maximum(high, series.highs[row]), high))
+        low = np.where(fresh, series.lows[row], np.where(valid, np.minimum(low, series.lows[row]), low))
+        current = np.where(valid, key, current)
+        slot = np.maximum(count - 1, 0)
+        hit = cols[valid]
+        week_close[slot[valid], hit] = series.closes[row, valid]
+        week_high[slot[valid], hit] = high[valid]
+        week_low[slot[valid], hit] = low[valid]
+    return week_close, week_high, week_low, count
+
+
+def wyckoff_window_stats(series: WyckoffEventSeries, week_keys: np.ndarray) -> dict[str, np.ndarray]:
+    """Per-column inputs of the snapshot scores for whole ``(W, N)`` windows (``W >= 20``).
+
+    Covers the latest-bar metrics of ``calculate_wyckoff_snapshot``, the HH/HL/HC structure, the health
+    statistics, the cost-center shift and the weekly context; every float is rounded like the per-list code.
+    """
+    t, n = series.shape()
+    closes = series.closes
+    highs = series.highs
+    lows = series.lows
+    latest = closes[-1]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        tr_high = highs.max(axis=0)
+        tr_low = lows.min(axis=0)
+        ret10 = (latest - closes[-11]) / np.maximum(closes[-11], 0.01)
+        ret20 = (latest - closes[-21]) / np.maximum(closes[-21], 0.01) if t > 20 else ret10
+
+        returns = (closes[1:] - closes[:-1]) / np.maximum(closes[:-1], 0.01)
+        range_ratio = np.maximum(0.0, highs[-20:] - lows[-20:]) / np.maximum(closes[-20:], 0.01)
+
+        # 成本中心：成交量加权收盘价的 EMA / 成交量 EMA，逐行递推。
+        alpha = 2.0 / (float(COST_CENTER_EMA_WINDOW) + 1.0)
+        volume = np.maximum(0.0, series.volumes)
+        ema_weighted = closes[0] * volume[0]
+        ema_volume = volume[0]
+        cost_center = np.empty((t, n), dtype=np.float64)
+        cost_center[0] = ema_weighted / np.maximum(ema_volume, 1.0)
+        for row in range(1, t):
+            ema_weighted = alpha * (closes[row] * volume[row]) + (1.0 - alpha) * ema_weighted
+            ema_volume = alpha * volume[row] + (1.0 - alpha) * ema_volume
+            cost_center[row] = ema_weighted / np.maximum(ema_volume, 1.0)
+        base = t - 1 - min(10, t - 1)
+        cost_shift = (cost_center[-1] - cost_center[base]) / np.maximum(np.abs(cost_center[base]), 0.01)
+        price_shift = (latest - closes[base]) / np.maximum(np.abs(closes[base]), 0.01)
+        spread = (closes[base:] - cost_center[base:]) / np.maximum(closes[base:], 0.01)
+
+        week_close, week_high, week_low, weeks = _weekly_bars(series, week_keys)
+        cols = np.arange(n)
+        last_week = np.maximum(weeks - 1, 0)
+        fast = np.minimum(5, weeks)
+        slow = np.minimum(10, weeks)
+        weekly_latest = week_close[last_week, cols]
+
+        def tail(values: np.ndarray, span: int, size: np.ndarray) -> np.ndarray:
+            # 每列最后 size 周按时间顺序排在前 size 行，其余行是占位。
+            offsets = np.arange(span)[:, None]
+            return values[np.clip(weeks - size + offsets, 0, t - 1), cols]
+
+        weekly_base = week_close[np.maximum(0, weeks - 5), cols]
+        span = np.minimum(20, weeks)
+        in_range = np.arange(20)[:, None] < span
+        recent_high = np.where(in_range, tail(week_high, 20, span), -np.inf).max(axis=0)
+        recent_low = np.where(in_range, tail(week_low, 20, span), np.inf).min(axis=0)
+
+        return {
+            "latest_close": latest,
+            "tr_pos": (latest - tr_low) / np.maximum(tr_high - tr_low, 0.01),
+            "ma20": series.ma20[-1],
+            "ret10": ret10,
+            "ret20": ret20,
+            "hh": highs[-1] >= highs[-10:-1].max(axis=0) * 1.003,
+            "hl": lows[-5:].min(axis=0) >= lows[-15:-5].min(axis=0) * 1.01,
+            "hc": (latest > closes[-5]) & (closes[-5] > closes[-10]),
+            "slope_std": _safe_std_rows(returns[-20:]),
+            "range_mean": builtin_sum_rows(range_ratio) / range_ratio.shape[0],
+            "rebound": latest >= closes[-6],
+            "cost_shift": cost_shift,
+            "divergence": price_shift - cost_shift,
+            "spread_std": _safe_std_rows(spread),
+            "weeks": weeks,
+            "weekly_latest": weekly_latest,
+            "weekly_ma_fast": builtin_sum_rows(tail(week_close, 5, fast), fast) / np.maximum(fast, 1),
+            "weekly_ma_slow": builtin_sum_rows(tail(week_close, 10, slow), slow) / np.maximum(slow, 1),
+            "weekly_ret": (weekly_latest - weekly_base) / np.maximum(weekly_base, 0.01),
+            "weekly_pos": (weekly_latest - recent_low) / np.maximum(recent_high - recent_low, 0.01),
+        }
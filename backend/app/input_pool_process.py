@@ -0,0 +1,323 @@
+from __future__ import annotations
+
+import atexit
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FuturesTimeoutError, as_completed
+from multiprocessing import shared_memory
+from pathlib import Path
+
+import numpy as np
+
+from .models import ScreenerResult
+from .screener_metrics import MIN_TOTAL_BARS, compute_row_metrics, resolve_row_ends, screener_result_from_metrics
+from .tdx_loader import _date_text_to_day_int, _load_day_columns_through
+
+# 进程池输入池加载：按市场+代码前缀分片，子进程把数值指标写入父进程创建的共享内存表
+# （shape = 字段 × 日期 × 候选），只回传完成计数；父进程仅为通过的单元格构建 ScreenerResult。
+
+METRIC_FIELDS = (
+    "latest",
+    "prev",
+    "ret_window",
+    "turnover20",
+    "amount20",
+    "amplitude20",
+    "retrace20",
+    "pullback_days",
+    "ma10_above_ma20_days",
+    "ma5_above_ma10_days",
+    "price_vs_ma20",
+    "vol_slope20",
+    "up_down_volume_ratio",
+    "pullback_volume_ratio",
+    "limit_up_days",
+    "has_blowoff_top",
+    "has_divergence_5d",
+    "has_upper_shadow_risk",
+)
+_INT_FIELDS = {"pullback_days", "ma10_above_ma20_days", "ma5_above_ma10_days", "limit_up_days"}
+_BOOL_FIELDS = {"has_blowoff_top", "has_divergence_5d", "has_upper_shadow_risk"}
+_OK_FIELD = len(METRIC_FIELDS)
+_SHARD_MAX_FILES = 256
+INPUT_POOL_PROCESS_MIN_CANDIDATES = 200
+
+# 进程池在多次调用间复用：spawn 子进程启动（导入 numpy/pydantic）远比单次分片计算昂贵。
+_POOL_LOCK = threading.Lock()
+_POOL: ProcessPoolExecutor | None = None
+_POOL_WORKERS = 0
+
+
+def input_pool_process_pool_enabled() -> bool:
+    raw = os.getenv("TDX_TREND_INPUT_POOL_PROCESS_POOL", "").strip().lower()
+    if not raw:
+        return False
+    return raw in {"1", "true", "yes", "on"}
+
+
+def _input_pool_process_workers() -> int:
+    raw = os.getenv("TDX_TREND_INPUT_POOL_PROCESS_WORKERS", "").strip()
+    if raw:
+        try:
+            return max(1, int(raw))
+        except Exception:
+            pass
+    cpu_count = os.cpu_count() or 4
+    return max(1, min(8, int(cpu_count)))
+
+
+def _shared_process_pool(workers: int) -> ProcessPoolExecutor:
+    global _POOL, _POOL_WORKERS
+    with _POOL_LOCK:
+        pool = _POOL
+        if pool is not None and _POOL_WORKERS == workers and not getattr(pool, "_broken", False):
+            return pool
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+        _POOL = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        _POOL_WORKERS = workers
+        return _POOL
+
+
+def shutdown_input_pool_process_pool() -> None:
+    global _POOL, _POOL_WORKERS
+    with _POOL_LOCK:
+        pool = _POOL
+        _POOL = None
+        _POOL_WORKERS = 0
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _shard_candidates(candidates: list[tuple[str, Path]]) -> list[tuple[int, list[tuple[str, str]]]]:
+    groups: dict[str, list[tuple[str, str]]] = {}
+    for symbol, path in candidates:
+        # sh600 / sz000 / sz300 / bj8xx ...：同前缀文件位于同一目录、体量相近。
+        groups.setdefault(symbol[:5], []).append((symbol, str(path)))
+    shards: list[tuple[int, list[tuple[str, str]]]] = []
+    offset = 0
+    for key in sorted(groups):
+        items = groups[key]
+        for start in range(0, len(items), _SHARD_MAX_FILES):
+            chunk = items[start : start + _SHARD_MAX_FILES]
+            shards.append((offset, chunk))
+            offset += len(chunk)
+    return shards
+
+
+def _attach_shared_block(name: str) -> shared_memory.SharedMemory:
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 无 track 参数；子进程与父进程共用同一个 resource_tracker，重复登记无副作用。
+        return shared_memory.SharedMemory(name=name)
+
+
+def _fill_shard(
+    table: np.ndarray,
+    *,
+    offset: int,
+    items: list[tuple[str, str]],
+    as_of_days: np.ndarray,
+    latest_needed: str | None,
+    return_window_days: int,
+    float_shares: dict[str, float | None],
+    deadline_wall: float | None = None,
+) -> int:
+    done = 0
+    for local_idx, (symbol, path_text) in enumerate(items):
+        if deadline_wall is not None and time.time() >= deadline_wall:
+            # 父进程已超时（随后释放共享段）：不再继续解析，返回 -1 表示分片未完成。
+            return -1
+        column = offset + local_idx
+        done += 1
+        columns = _load_day_columns_through(Path(path_text), symbol, as_of_date=latest_needed, reader=None)
+        if columns is None or int(columns["total_bars"]) < MIN_TOTAL_BARS:
+            continue
+        ends = resolve_row_ends(columns["day"], as_of_days, return_window_days=return_window_days)
+        picked = np.flatnonzero(ends >= 0)
+        if picked.size <= 0:
+            continue
+        metrics = compute_row_metrics(
+            close=columns["close"],
+            high=columns["high"],
+            low=columns["low"],
+            open_=columns["open"],
+            volume=columns["volume"],
+            amount=columns["amount"],
+            ends=ends[picked],
+            return_window_days=return_window_days,
+            float_shares=float_shares.get(symbol),
+        )
+        for field_idx, key in enumerate(METRIC_FIELDS):
+            table[field_idx, picked, column] = metrics[key]
+        table[_OK_FIELD, picked, column] = 1.0
+    return done
+
+
+def _run_input_pool_shard(
+    block_name: str,
+    shape: tuple[int, int, int],
+    offset: int,
+    items: list[tuple[str, str]],
+    as_of_days: np.ndarray,
+    latest_needed: str | None,
+    return_window_days: int,
+    float_shares: dict[str, float | None],
+    deadline_wall: float | None = None,
+) -> int:
+    if deadline_wall is not None and time.time() >= deadline_wall:
+        return -1
+    try:
+        block = _attach_shared_block(block_name)
+    except FileNotFoundError:
+        # 父进程已超时并释放共享段。
+        return -1
+    try:
+        return _fill_shard(
+            np.ndarray(shape, dtype=np.float64, buffer=block.buf),
+            offset=offset,
+            items=items,
+            as_of_days=as_of_days,
+            latest_needed=latest_needed,
+            return_window_days=return_window_days,
+            float_shares=float_shares,
+            deadline_wall=deadline_wall,
+        )
+    finally:
+        try:
+            block.close()
+        except BufferError:
+            pass
+
+
+def _rows_from_table(
+    table: np.ndarray,
+    *,
+    day_pos: int,
+    columns: np.ndarray,
+    ordered: list[tuple[str, str]],
+    float_shares_map: dict[str, float],
+    symbol_name_map: dict[str, str],
+) -> tuple[list[ScreenerResult], int]:
+    rows: list[ScreenerResult] = []
+    missing_float_shares = 0
+    accepted = columns[table[_OK_FIELD, day_pos, columns] > 0]
+    if accepted.size <= 0:
+        return rows, 0
+    values = {key: table[field_idx, day_pos, accepted].tolist() for field_idx, key in enumerate(METRIC_FIELDS)}
+    for pos, column in enumerate(accepted.tolist()):
+        symbol = ordered[column][0]
+        float_shares = float_shares_map.get(symbol)
+        degraded = not (float_shares is not None and float_shares > 0)
+        if degraded:
+            missing_float_shares += 1
+        fields: dict[str, object] = {}
+        for key in METRIC_FIELDS:
+            value = values[key][pos]
+            if key in _INT_FIELDS:
+                fields[key] = int(value)
+            elif key in _BOOL_FIELDS:
+                fields[key] = bool(value)
+            else:
+                fields[key] = value
+        rows.append(
+            screener_result_from_metrics(
+                symbol=symbol,
+                name=symbol_name_map.get(symbol),
+                degraded=degraded,
+                degraded_reason="FLOAT_SHARES_NOT_FOUND" if degraded else None,
+                **fields,  # type: ignore[arg-type]
+            )
+        )
+    return rows, missing_float_shares
+
+
+def collect_input_pool_rows_in_processes(
+    candidates: list[tuple[str, Path]],
+    *,
+    as_of_dates: list[str | None],
+    return_window_days: int,
+    float_shares_map: dict[str, float],
+    symbol_name_map: dict[str, str],
+    deadline_ts: float | None,
+) -> tuple[list[list[ScreenerResult]], list[int], bool]:
+    """Evaluate input-pool rows for ``as_of_dates`` in worker processes.
+
+    Returns ``(rows_by_date, missing_float_shares_by_date, timed_out)``. When ``deadline_ts``
+    passes, shards that already finished still contribute rows (partial result); running
+    shards see the same deadline and stop before their next symbol.
+    """
+    shards = _shard_candidates(candidates)
+    ordered = [item for _offset, chunk in shards for item in chunk]
+    as_of_days = np.asarray([_date_text_to_day_int(day) or 99_999_999 for day in as_of_dates], dtype=np.int64)
+    latest_needed = None if any(not day for day in as_of_dates) else max(str(day) for day in as_of_dates)
+    # 子进程无法共享 perf_counter 基准，截止时间换算成墙钟时间传入。
+    deadline_wall = None if deadline_ts is None else time.time() + (deadline_ts - time.perf_counter())
+    shape = (len(METRIC_FIELDS) + 1, len(as_of_dates), len(ordered))
+    block = shared_memory.SharedMemory(create=True, size=max(8, int(np.prod(shape)) * 8))
+    timed_out = False
+    table: np.ndarray | None = None
+    try:
+        table = np.ndarray(shape, dtype=np.float64, buffer=block.buf)
+        table[_OK_FIELD] = 0.0
+        finished: list[np.ndarray] = []
+        executor = _shared_process_pool(_input_pool_process_workers())
+        future_map = {
+            executor.submit(
+                _run_input_pool_shard,
+                block.name,
+                shape,
+                offset,
+                chunk,
+                as_of_days,
+                latest_needed,
+                int(return_window_days),
+                {symbol: float_shares_map.get(symbol) for symbol, _path in chunk},
+                deadline_wall,
+            ): np.arange(offset, offset + len(chunk), dtype=np.int64)
+            for offset, chunk in shards
+        }
+        try:
+            timeout_left = None
+            if deadline_ts is not None:
+                timeout_left = max(0.0, deadline_ts - time.perf_counter())
+            for future in as_completed(future_map, timeout=timeout_left):
+                try:
+                    done = future.result()
+                except Exception:
+                    continue
+                if done < 0:
+                    timed_out = True
+                    continue
+                finished.append(future_map[future])
+        except FuturesTimeoutError:
+            timed_out = True
+            # 池是共享的，不能 shutdown；未开始的分片直接取消，已在运行的分片按截止时间自行退出。
+            for future in future_map:
+                future.cancel()
+
+        finished_columns = np.sort(np.concatenate(finished)) if finished else np.zeros(0, dtype=np.int64)
+        rows_by_date: list[list[ScreenerResult]] = []
+        missing_by_date: list[int] = []
+        for day_pos in range(len(as_of_dates)):
+            rows, missing = _rows_from_table(
+                table,
+                day_pos=day_pos,
+                columns=finished_columns,
+                ordered=ordered,
+                float_shares_map=float_shares_map,
+                symbol_name_map=symbol_name_map,
+            )
+            rows_by_date.append(rows)
+            missing_by_date.append(missing)
+    finally:
+        table = None
+        block.close()
+        block.unlink()
+    return rows_by_date, missing_by_date, timed_out
+
+
+atexit.register(shutdown_input_pool_process_pool)
@@ -37,6 +37,7 @@ from .models import (
     AnnotationUpdateResponse,
     ApiErrorPayload,
     AppConfig,
+    CandlesCacheStatsResponse,
     CreateOrderRequest,
     CreateOrderResponse,
     DeleteAIRecordResponse,
@@ -916,6 +917,11 @@ def get_system_storage() -> SystemStorageStatus:
     return store.get_system_storage_status()
 
 
+@app.get("/api/system/candles-cache/stats", response_model=CandlesCacheStatsResponse)
+def get_candles_cache_stats() -> CandlesCacheStatsResponse:
+    return store.get_candles_cache_stats()
+
+
 @app.get("/api/system/wyckoff-event-store/stats", response_model=WyckoffEventStoreStatsResponse)
 def get_wyckoff_event_store_stats() -> WyckoffEventStoreStatsResponse:
     return store.get_wyckoff_event_store_stats()
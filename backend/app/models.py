@@ -1309,6 +1309,20 @@ class SystemStorageStatus(BaseModel):
     wyckoff_event_store_read_only: bool = False
 
 
+class CandlesCacheStatsResponse(BaseModel):
+    entries: int
+    bytes: int
+    max_bytes: int
+    max_entries: int = 0
+    hits: int
+    misses: int
+    coalesced_misses: int = 0
+    loads: int = 0
+    load_errors: int = 0
+    evictions: int
+    hit_rate: float = 0.0
+
+
 class WyckoffEventStoreStatsResponse(BaseModel):
     enabled: bool
     read_only: bool
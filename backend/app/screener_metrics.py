@@ -0,0 +1,430 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from .models import ScreenerResult, Stage, ThemeStage, TrendClass
+
+if TYPE_CHECKING:
+    from .core.backtest_matrix_engine import MatrixBundle
+
+# 输入池行指标（与 tdx_loader._build_row 同口径）的数组化计算。
+# 所有数组沿 axis 0 为“该标的自身的有效K线序列”，既可是一维 (L,)，也可是二维 (L, N)。
+# 窗口求和按与 Python sum() 相同的从左到右顺序逐项累加，保证与逐行实现逐位一致。
+
+MIN_ROW_BARS = 40
+MIN_TOTAL_BARS = 251
+
+
+def _clamp(value: float, lower: float, upper: float) -> float:
+    return max(lower, min(upper, value))
+
+
+def rolling_seq_mean(values: np.ndarray, width: int) -> np.ndarray:
+    """Trailing mean over ``width`` bars (NaN before the window fills), summed left to right like ``sum()``."""
+    data = np.asarray(values, dtype=np.float64)
+    out = np.full(data.shape, np.nan, dtype=np.float64)
+    length = int(data.shape[0])
+    if width <= 0 or length < width:
+        return out
+    span = length - width + 1
+    acc = data[0:span].copy()
+    for offset in range(1, width):
+        acc += data[offset : offset + span]
+    out[width - 1 :] = acc / width
+    return out
+
+
+def _prefix_sum(values: np.ndarray) -> np.ndarray:
+    data = np.asarray(values)
+    dtype = np.int64 if data.dtype.kind in {"b", "i", "u"} else np.float64
+    zeros = np.zeros((1,) + data.shape[1:], dtype=dtype)
+    return np.concatenate([zeros, np.cumsum(data, axis=0, dtype=dtype)], axis=0)
+
+
+def _window_total(prefix: np.ndarray, ends: np.ndarray, width: int) -> np.ndarray:
+    return _take(prefix, ends + 1) - _take(prefix, ends + 1 - width)
+
+
+def _take(values: np.ndarray, index: np.ndarray) -> np.ndarray:
+    return np.take_along_axis(values, index, axis=0)
+
+
+def resolve_row_ends(
+    day: np.ndarray,
+    as_of_days: np.ndarray,
+    *,
+    return_window_days: int,
+) -> np.ndarray:
+    """Map each as-of ``yyyymmdd`` to the last bar index on or before it; ``-1`` when the row would be rejected."""
+    ends = np.searchsorted(np.asarray(day), np.asarray(as_of_days), side="right") - 1
+    min_bars = max(int(return_window_days) + 1, MIN_ROW_BARS)
+    return np.where(ends + 1 >= min_bars, ends, -1)
+
+
+def compute_row_metrics(
+    *,
+    close: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    open_: np.ndarray,
+    volume: np.ndarray,
+    amount: np.ndarray,
+    ends: np.ndarray,
+    return_window_days: int,
+    float_shares: float | np.ndarray | None,
+) -> dict[str, np.ndarray]:
+    """Evaluate every numeric input-pool field at bar indices ``ends``.
+
+    ``ends`` must only hold indices accepted by :func:`resolve_row_ends` (at least 40 bars and
+    ``return_window_days + 1`` bars of history). Its shape is ``(D,)`` for 1-D series or ``(D, N)``
+    for column-stacked series; every returned array has the same shape as ``ends``.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    open_ = np.asarray(open_, dtype=np.float64)
+    volume_int = np.asarray(volume, dtype=np.int64)
+    volume_f = volume_int.astype(np.float64)
+    amount = np.asarray(amount, dtype=np.float64)
+    ends = np.asarray(ends, dtype=np.int64)
+    window = max(1, int(return_window_days))
+
+    prev_close = np.empty_like(close)
+    prev_close[0] = np.nan
+    prev_close[1:] = close[:-1]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        up_bar = close >= prev_close
+        limit_bar = (close - prev_close) / np.maximum(prev_close, 0.01) >= 0.095
+        bar_range = high - low
+        upper_shadow = high - np.maximum(open_, close)
+        shadow_bar = (bar_range > 0) & (upper_shadow / np.where(bar_range > 0, bar_range, 1.0) > 0.5) & (close <= open_)
+    amp_bar = (high - low) / np.maximum(close, 0.01)
+
+    ma5 = rolling_seq_mean(close, 5)
+    ma10 = rolling_seq_mean(close, 10)
+    ma20 = rolling_seq_mean(close, 20)
+    amp20 = rolling_seq_mean(amp_bar, 20)
+    amount20 = rolling_seq_mean(amount, 20)
+    vol20 = rolling_seq_mean(volume_f, 20)
+
+    latest = _take(close, ends)
+    prev = _take(close, ends - 1)
+    start_close = _take(close, ends + 1 - window)
+    ret_window = (latest / np.maximum(start_close, 0.01)) - 1
+
+    if float_shares is None:
+        turnover20 = np.zeros(ends.shape, dtype=np.float64)
+    else:
+        # 标量或按列 (N,) 的流通股本；无股本的列换手率记 0（与逐行实现的降级口径一致）。
+        shares = np.asarray(float_shares, dtype=np.float64)
+        usable = shares > 0
+        ratio = np.maximum(volume_int, 0) / np.where(usable, shares, 1.0)
+        turnover20 = np.where(usable, _take(rolling_seq_mean(ratio, 20), ends), 0.0)
+
+    peak20 = _take(high, ends)
+    stacked_close = []
+    blowoff = np.zeros(ends.shape, dtype=bool)
+    avg_volume20 = _take(vol20, ends)
+    for back in range(19, -1, -1):
+        idx = ends - back
+        peak20 = np.maximum(peak20, _take(high, idx))
+        stacked_close.append(_take(close, idx))
+        blowoff |= (_take(volume_f, idx) > avg_volume20 * 2.5) & (_take(close, idx) <= _take(open_, idx))
+    pullback_days = 19 - np.argmax(np.stack(stacked_close, axis=0), axis=0)
+    retrace20 = (peak20 - latest) / np.maximum(peak20, 0.01)
+
+    ma20_last = _take(ma20, ends)
+    price_vs_ma20 = (latest - ma20_last) / np.maximum(ma20_last, 0.01)
+
+    ma10_above_ma20_days = _window_total(_prefix_sum(ma10 > ma20), ends, 20)
+    ma5_above_ma10_days = _window_total(_prefix_sum(ma5 > ma10), ends, 20)
+
+    first20 = _take(volume_f, ends - 19)
+    vol_slope20 = (_take(volume_f, ends) - first20) / np.maximum(first20, 1)
+
+    up_volume = _window_total(_prefix_sum(np.where(up_bar, volume_int, 0)), ends, 20)
+    up_count = _window_total(_prefix_sum(up_bar), ends, 20)
+    down_volume = _window_total(_prefix_sum(np.where(up_bar, 0, volume_int)), ends, 20)
+    down_count = 20 - up_count
+    mean_up = np.where(up_count > 0, up_volume / np.maximum(up_count, 1), 0.0)
+    mean_down = np.where(down_count > 0, down_volume / np.maximum(down_count, 1), 0.0)
+    up_down_volume_ratio = mean_up / np.maximum(mean_down, 1.0)
+    pullback_volume_ratio = np.where(down_count > 0, mean_down / np.maximum(avg_volume20, 1.0), 0.6)
+
+    limit_up_days = _window_total(_prefix_sum(limit_bar), ends, 20)
+
+    volume_prefix = _prefix_sum(volume_int)
+    avg_v5 = _window_total(volume_prefix, ends, 5) / 5
+    avg_prev5 = _window_total(volume_prefix, ends - 5, 5) / 5
+    has_divergence_5d = (latest > _take(close, ends - 5)) & (avg_v5 < avg_prev5 * 0.9)
+    has_upper_shadow_risk = _window_total(_prefix_sum(shadow_bar), ends, 5) > 0
+
+    return {
+        "latest": latest,
+        "prev": prev,
+        "ret_window": ret_window,
+        "turnover20": turnover20,
+        "amount20": _take(amount20, ends),
+        "amplitude20": _take(amp20, ends),
+        "retrace20": retrace20,
+        "pullback_days": pullback_days.astype(np.int64),
+        "ma10_above_ma20_days": ma10_above_ma20_days.astype(np.int64),
+        "ma5_above_ma10_days": ma5_above_ma10_days.astype(np.int64),
+        "price_vs_ma20": price_vs_ma20,
+        "vol_slope20": vol_slope20,
+        "up_down_volume_ratio": up_down_volume_ratio,
+        "pullback_volume_ratio": pullback_volume_ratio,
+        "limit_up_days": limit_up_days.astype(np.int64),
+        "has_blowoff_top": blowoff,
+        "has_divergence_5d": has_divergence_5d,
+        "has_upper_shadow_risk": has_upper_shadow_risk,
+    }
+
+
+def screener_result_from_metrics(
+    *,
+    symbol: str,
+    latest: float,
+    prev: float,
+    ret_window: float,
+    turnover20: float,
+    amount20: float,
+    amplitude20: float,
+    retrace20: float,
+    pullback_days: int,
+    ma10_above_ma20_days: int,
+    ma5_above_ma10_days: int,
+    price_vs_ma20: float,
+    vol_slope20: float,
+    up_down_volume_ratio: float,
+    pullback_volume_ratio: float,
+    limit_up_days: int,
+    has_blowoff_top: bool,
+    has_divergence_5d: bool,
+    has_upper_shadow_risk: bool,
+    degraded: bool,
+    degraded_reason: str | None,
+    name: str | None = None,
+) -> ScreenerResult:
+    trend_class: TrendClass
+    if limit_up_days >= 2:
+        trend_class = "B"
+    elif ret_window >= 0.5:
+        trend_class = "A_B"
+    elif ret_window > 0:
+        trend_class = "A"
+    else:
+        trend_class = "Unknown"
+
+    stage: Stage
+    if ret_window < 0.30:
+        stage = "Early"
+    elif ret_window <= 0.80:
+        stage = "Mid"
+    else:
+        stage = "Late"
+
+    theme_stage: ThemeStage
+    if ret_window < 0.30:
+        theme_stage = "发酵中"
+    elif ret_window < 0.80 and up_down_volume_ratio >= 1.0:
+        theme_stage = "高潮"
+    else:
+        theme_stage = "退潮"
+
+    score_raw = (
+        45
+        + ret_window * 90
+        + up_down_volume_ratio * 8
+        - pullback_volume_ratio * 15
+        + max(0.0, (0.08 - abs(price_vs_ma20)) * 200)
+    )
+    score = int(round(_clamp(score_raw, 0, 100)))
+    ai_confidence = round(
+        _clamp(
+            0.50 + ret_window * 0.30 + (up_down_volume_ratio - 1.0) * 0.10 - max(0.0, pullback_volume_ratio - 0.8) * 0.2,
+            0.35,
+            0.95,
+        ),
+        2,
+    )
+
+    labels = ["真实数据", "高波动" if trend_class == "B" else "趋势延续"]
+
+    return ScreenerResult(
+        symbol=symbol,
+        name=name or symbol.upper(),
+        latest_price=round(latest, 2),
+        day_change=round(latest - prev, 2),
+        day_change_pct=round((latest - prev) / max(prev, 0.01), 4),
+        score=score,
+        ret40=round(ret_window, 4),
+        turnover20=round(turnover20, 4),
+        amount20=float(amount20),
+        amplitude20=round(amplitude20, 4),
+        retrace20=round(retrace20, 4),
+        pullback_days=int(pullback_days),
+        ma10_above_ma20_days=int(ma10_above_ma20_days),
+        ma5_above_ma10_days=int(ma5_above_ma10_days),
+        price_vs_ma20=round(price_vs_ma20, 4),
+        vol_slope20=round(vol_slope20, 4),
+        up_down_volume_ratio=round(up_down_volume_ratio, 4),
+        pullback_volume_ratio=round(pullback_volume_ratio, 4),
+        has_blowoff_top=bool(has_blowoff_top),
+        has_divergence_5d=bool(has_divergence_5d),
+        has_upper_shadow_risk=bool(has_upper_shadow_risk),
+        ai_confidence=ai_confidence,
+        theme_stage=theme_stage,
+        trend_class=trend_class,
+        stage=stage,
+        labels=labels,
+        reject_reasons=[],
+        degraded=degraded,
+        degraded_reason=degraded_reason,
+    )
+
+
+def screener_results_from_metric_arrays(
+    metrics: dict[str, np.ndarray],
+    *,
+    symbol: str,
+    positions: list[int],
+    float_shares: float | None,
+    name: str | None = None,
+) -> list[ScreenerResult]:
+    """Materialize pydantic rows only for the selected positions of 1-D metric arrays."""
+    degraded = not (float_shares is not None and float_shares > 0)
+    columns = {key: value.tolist() for key, value in metrics.items()}
+    return [
+        screener_result_from_metrics(
+            symbol=symbol,
+            name=name,
+            degraded=degraded,
+            degraded_reason="FLOAT_SHARES_NOT_FOUND" if degraded else None,
+            **{key: values[pos] for key, values in columns.items()},
+        )
+        for pos in positions
+    ]
+
+
+def compute_matrix_row_metrics(
+    *,
+    close: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    open_: np.ndarray,
+    volume: np.ndarray,
+    valid_mask: np.ndarray,
+    date_rows: np.ndarray,
+    return_window_days: int,
+    amount: np.ndarray | None = None,
+    float_shares: np.ndarray | None = None,
+    total_bars: np.ndarray | None = None,
+) -> tuple[dict[str, np.ndarray], np.ndarray]:
+    """Evaluate input-pool metrics for every symbol at matrix rows ``date_rows``.
+
+    Inputs are ``(T, N)`` date-by-symbol matrices where ``valid_mask`` marks real bars. Each
+    column is first compacted to the symbol's own bar sequence, so suspended days are skipped
+    exactly like the per-file loader does. Returns ``(metrics, ok)`` where every array has shape
+    ``(D, N)`` and ``ok`` marks the cells the per-symbol ``_build_row`` would accept.
+    """
+    valid = np.asarray(valid_mask, dtype=bool)
+    rows = np.asarray(date_rows, dtype=np.int64).reshape(-1)
+    if amount is None:
+        # MatrixBundle 不含成交额：按 收盘价×成交量 估算。
+        amount = np.asarray(close, dtype=np.float64) * np.asarray(volume, dtype=np.float64)
+
+    order = np.argsort(~valid, axis=0, kind="stable")
+
+    def _compact(values: np.ndarray) -> np.ndarray:
+        data = np.nan_to_num(np.asarray(values, dtype=np.float64), nan=0.0, posinf=0.0, neginf=0.0)
+        return np.take_along_axis(data, order, axis=0)
+
+    bars_seen = np.cumsum(valid, axis=0, dtype=np.int64)[rows]
+    min_bars = max(int(return_window_days) + 1, MIN_ROW_BARS)
+    ok = bars_seen >= min_bars
+    if total_bars is not None:
+        ok &= np.asarray(total_bars, dtype=np.int64)[np.newaxis, :] >= MIN_TOTAL_BARS
+    # 未通过的单元格指向一个安全下标，结果随后由 ok 屏蔽。
+    ends = np.where(ok, bars_seen - 1, min_bars - 1)
+
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        metrics = compute_row_metrics(
+            close=_compact(close),
+            high=_compact(high),
+            low=_compact(low),
+            open_=_compact(open_),
+            volume=_compact(volume).astype(np.int64),
+            amount=_compact(amount),
+            ends=ends,
+            return_window_days=return_window_days,
+            float_shares=float_shares,
+        )
+    return metrics, ok
+
+
+def compute_bundle_row_metrics(
+    bundle: MatrixBundle,
+    *,
+    return_window_days: int,
+    dates: list[str] | None = None,
+    amount: np.ndarray | None = None,
+    float_shares: np.ndarray | None = None,
+    total_bars: np.ndarray | None = None,
+) -> tuple[list[str], dict[str, np.ndarray], np.ndarray]:
+    """:func:`compute_matrix_row_metrics` over a ``MatrixBundle``; ``dates`` defaults to every bundle date.
+
+    A date that is not a bundle row is evaluated at the last bundle row on or before it.
+    """
+    bundle_dates = np.asarray(bundle.dates, dtype=str)
+    requested = list(bundle.dates) if dates is None else [str(day) for day in dates]
+    rows = np.searchsorted(bundle_dates, np.asarray(requested, dtype=str), side="right") - 1
+    known = rows >= 0
+    metrics, ok = compute_matrix_row_metrics(
+        close=bundle.close,
+        high=bundle.high,
+        low=bundle.low,
+        open_=bundle.open,
+        volume=bundle.volume,
+        valid_mask=bundle.valid_mask,
+        date_rows=np.maximum(rows, 0),
+        return_window_days=return_window_days,
+        amount=amount,
+        float_shares=float_shares,
+        total_bars=total_bars,
+    )
+    ok &= known[:, np.newaxis]
+    return requested, metrics, ok
+
+
+def screener_results_from_matrix_metrics(
+    metrics: dict[str, np.ndarray],
+    selected: np.ndarray,
+    *,
+    symbols: list[str],
+    float_shares: np.ndarray | None = None,
+    names: dict[str, str] | None = None,
+) -> list[list[ScreenerResult]]:
+    """Materialize pydantic rows only for ``selected`` ``(D, N)`` cells; one list per date row."""
+    selected = np.asarray(selected, dtype=bool)
+    shares = None if float_shares is None else np.asarray(float_shares, dtype=np.float64)
+    out: list[list[ScreenerResult]] = [[] for _ in range(int(selected.shape[0]))]
+    day_idx, sym_idx = np.nonzero(selected)
+    if day_idx.size <= 0:
+        return out
+    picked = {key: value[day_idx, sym_idx].tolist() for key, value in metrics.items()}
+    for pos, (day_pos, symbol_pos) in enumerate(zip(day_idx.tolist(), sym_idx.tolist())):
+        symbol = symbols[symbol_pos]
+        degraded = shares is None or not bool(shares[symbol_pos] > 0)
+        out[day_pos].append(
+            screener_result_from_metrics(
+                symbol=symbol,
+                name=(names or {}).get(symbol),
+                degraded=degraded,
+                degraded_reason="FLOAT_SHARES_NOT_FOUND" if degraded else None,
+                **{key: values[pos] for key, values in picked.items()},
+            )
+        )
+    return out
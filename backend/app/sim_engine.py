@@ -9,6 +9,9 @@ from threading import RLock
 from typing import Callable, Literal
 from uuid import uuid4
 
+import numpy as np
+
+from .candle_series import CandleSeries
 from .models import (
     CandlePoint,
     CreateOrderRequest,
@@ -47,7 +50,7 @@ class SimAccountEngine:
 
     def __init__(
         self,
-        get_candles: Callable[[str], list[CandlePoint]],
+        get_candles: Callable[[str], list[CandlePoint] | CandleSeries],
         resolve_symbol_name: Callable[[str], str],
         now_date: Callable[[], str],
         now_datetime: Callable[[], str],
@@ -181,17 +184,25 @@ class SimAccountEngine:
     def _normalize_symbol(symbol: str) -> str:
         return symbol.strip().lower()
 
-    def _get_symbol_candles_or_raise(self, symbol: str) -> list[CandlePoint]:
+    def _get_symbol_candles_or_raise(self, symbol: str) -> list[CandlePoint] | CandleSeries:
         candles = self._get_candles(symbol)
         if not candles:
             raise SimEngineError("SIM_PRICE_NOT_FOUND", f"未找到 {symbol} 的行情数据")
         return candles
 
-    def _align_index_to_submit_date(self, candles: list[CandlePoint], submit_date: str) -> int:
+    def _align_index_to_submit_date(self, candles: list[CandlePoint] | CandleSeries, submit_date: str) -> int:
         target = self._parse_date(submit_date)
         if target is None:
             raise SimEngineError("VALIDATION_ERROR", "submit_date 格式需为 YYYY-MM-DD")
         aligned_idx: int | None = None
+        if isinstance(candles, CandleSeries):
+            # 与逐根扫描一致：遇到第一根晚于提交日的 K 线即停止。
+            later = np.flatnonzero(candles.day > target.year * 10000 + target.month * 100 + target.day)
+            stop = int(later[0]) if later.size > 0 else len(candles)
+            aligned_idx = stop - 1 if stop > 0 else None
+            if aligned_idx is None:
+                raise SimEngineError("SIM_PRICE_NOT_FOUND", "提交日期早于可用行情起始日")
+            return aligned_idx
         for idx, candle in enumerate(candles):
             candle_dt = self._parse_date(candle.time)
             if candle_dt is None:
@@ -204,7 +215,7 @@ class SimAccountEngine:
             raise SimEngineError("SIM_PRICE_NOT_FOUND", "提交日期早于可用行情起始日")
         return aligned_idx
 
-    def _next_trading_date(self, candles: list[CandlePoint], index: int) -> str | None:
+    def _next_trading_date(self, candles: list[CandlePoint] | CandleSeries, index: int) -> str | None:
         next_idx = index + 1
         if 0 <= next_idx < len(candles):
             return candles[next_idx].time
@@ -35,6 +35,7 @@ from .models import (
     AIProviderConfig,
     AppConfig,
     CandlePoint,
+    CandlesCacheStatsResponse,
     BacktestRunRequest,
     BacktestPlateauRunRequest,
     BacktestPlateauResponse,
@@ -157,11 +158,18 @@ from .models import (
     WyckoffEventStoreBackfillResponse,
     WyckoffEventStoreStatsResponse,
 )
+from .columnar_store import get_shared_columnar_store, sync_columnar_store_from_sources
 from .market_data_sync import sync_baostock_daily
 from .sim_engine import SimAccountEngine
+from .candle_series import CandleSeries, candle_lists
+from .candles_cache import ByteBudgetLruCache
+from .trading_calendar import TradingCalendar, weekday_dates
 from .tdx_loader import (
+    load_candle_series_batch,
+    load_candle_series_for_symbol,
     load_candles_for_symbol,
     load_input_pool_from_tdx,
+    load_input_pool_from_tdx_by_dates,
     load_intraday_for_symbol_date,
 )
 
@@ -171,7 +179,13 @@ from .core.signal_analyzer import SignalAnalyzer, WYCKOFF_ACC_EVENTS, WYCKOFF_RI
 from .core.ai_analyzer import AIAnalyzer, create_ai_analyzer
 from .core.backtest_engine import BacktestEngine, CandidateTrade
 from .core.backtest_matrix_engine import BacktestMatrixEngine, MatrixBundle
-from .core.backtest_signal_matrix import BacktestSignalMatrix, compute_backtest_signal_matrix
+from .core.backtest_signal_matrix import (
+    BacktestSignalMatrix,
+    backtest_signal_return_ranks,
+    compute_backtest_signal_matrix,
+    extend_backtest_signal_matrix,
+)
+from .core.rolling_kernels import RollingMeanState
 from .core.strategy_registry import StrategyRegistry
 from .core.wyckoff_event_store import WyckoffEventStore, build_wyckoff_params_hash
 from .core.screener import ScreenerEngine, create_screener_engine, THEME_STAGES
@@ -241,8 +255,11 @@ class InMemoryStore:
 
     def __init__(self, app_state_path: str | None = None, sim_state_path: str | None = None) -> None:
         self._lock = RLock()
-        self._candles_lock = RLock()
-        self._candles_map: dict[str, list[CandlePoint]] = {}
+        self._candles_cache: ByteBudgetLruCache[CandleSeries] = ByteBudgetLruCache(
+            max_bytes=self._candles_runtime_cache_max_bytes(),
+            max_entries=self._candles_runtime_cache_max_symbols(),
+            sizeof=lambda series: series.nbytes,
+        )
         self._run_store: dict[str, ScreenerRunDetail] = {}
         self._annotation_store: dict[str, StockAnnotation] = {}
         self._config: AppConfig = self._default_config()
@@ -257,6 +274,10 @@ class InMemoryStore:
         self._market_news_last_success: tuple[float, list[dict[str, str]], dict[str, str]] | None = None
         self._quote_profile_cache: dict[str, tuple[float, dict[str, str]]] = {}
         self._signals_cache: dict[str, tuple[float, SignalsResponse]] = {}
+        # 列式行情库全量同步在后台线程执行；运行中再次请求只排队一轮。
+        self._columnar_sync_lock = RLock()
+        self._columnar_sync_running = False
+        self._columnar_sync_pending: str | None = None
         self._backtest_tasks: dict[str, BacktestTaskStatusResponse] = {}
         self._backtest_task_payloads: dict[str, BacktestRunRequest] = {}
         self._backtest_task_lock = RLock()
@@ -274,6 +295,8 @@ class InMemoryStore:
         self._strategy_registry = StrategyRegistry()
         self._backtest_matrix_algo_version = os.getenv("TDX_TREND_BACKTEST_MATRIX_ALGO_VERSION", "").strip() or "matrix-v1"
         self._backtest_signal_matrix_runtime_cache: dict[str, tuple[float, BacktestSignalMatrix]] = {}
+        # 按矩阵缓存键（不含 top_n）保存 40 日涨幅的横截面排名，同一矩阵换 top_n 时直接切出 s3。
+        self._backtest_signal_rank_runtime_cache: dict[str, tuple[float, np.ndarray]] = {}
         self._backtest_signal_matrix_runtime_cache_lock = RLock()
         self._backtest_input_pool_runtime_cache: dict[str, tuple[float, list[ScreenerResult], str | None]] = {}
         self._backtest_input_pool_runtime_cache_lock = RLock()
@@ -2876,7 +2899,9 @@ class InMemoryStore:
         except ValueError:
             return None
 
-    def _align_date_to_candles(self, candles: list[CandlePoint], date_text: str) -> str:
+    def _align_date_to_candles(self, candles: list[CandlePoint] | CandleSeries, date_text: str) -> str:
+        if isinstance(candles, CandleSeries):
+            return CandleAnalyzer.align_date_to_candles(candles, date_text)
         if not candles:
             return date_text
         parsed_target = self._parse_date(date_text)
@@ -2890,9 +2915,11 @@ class InMemoryStore:
 
     def _slice_candles_as_of(
         self,
-        candles: list[CandlePoint],
+        candles: list[CandlePoint] | CandleSeries,
         as_of_date: str | None,
-    ) -> tuple[list[CandlePoint], str | None]:
+    ) -> tuple[list[CandlePoint] | CandleSeries, str | None]:
+        if isinstance(candles, CandleSeries):
+            return CandleAnalyzer.slice_candles_as_of(candles, as_of_date)
         if not candles:
             return [], None
         if not as_of_date:
@@ -2905,13 +2932,15 @@ class InMemoryStore:
 
     @staticmethod
     def _trading_days_diff(
-        candles: list[CandlePoint],
+        candles: list[CandlePoint] | CandleSeries,
         *,
         start_date: str,
         end_date: str,
     ) -> int:
         if not candles:
             return 0
+        if isinstance(candles, CandleSeries):
+            return TradingCalendar(candles.day).diff(str(start_date), str(end_date))
         trade_days = [str(point.time) for point in candles if str(point.time).strip()]
         if not trade_days:
             return 0
@@ -3248,12 +3277,13 @@ class InMemoryStore:
         if len(candles) < 30:
             return None
 
-        closes = [item.close for item in candles]
-        highs = [item.high for item in candles]
-        lows = [item.low for item in candles]
-        opens = [item.open for item in candles]
-        volumes = [max(0, int(item.volume)) for item in candles]
-        amounts = [max(0.0, float(item.amount)) for item in candles]
+        columns = candle_lists(candles)
+        closes = columns.closes
+        highs = columns.highs
+        lows = columns.lows
+        opens = columns.opens
+        volumes = columns.volumes
+        amounts = [max(0.0, float(value)) for value in columns.amounts]
 
         latest = closes[-1]
         prev = closes[-2]
@@ -4159,8 +4189,22 @@ class InMemoryStore:
             )
         return points
 
+    @staticmethod
+    def _candles_runtime_cache_max_bytes() -> int:
+        raw = os.getenv("TDX_TREND_CANDLES_RUNTIME_CACHE_MAX_MB", "").strip()
+        if not raw:
+            return 512 * 1024 * 1024
+        try:
+            value = float(raw)
+        except Exception:
+            return 512 * 1024 * 1024
+        if value <= 0:
+            return 0
+        return max(16 * 1024 * 1024, int(value * 1024 * 1024))
+
     @staticmethod
     def _candles_runtime_cache_max_symbols() -> int:
+        # 字节预算之外仍保留标的数上限（默认 1500），`0` 表示只按字节预算淘汰。
         raw = os.getenv("TDX_TREND_CANDLES_RUNTIME_CACHE_MAX_SYMBOLS", "").strip()
         if not raw:
             return 1500
@@ -4184,31 +4228,19 @@ class InMemoryStore:
         return max(0, int(value))
 
     def _trim_candles_runtime_cache(self, *, target_max_symbols: int) -> int:
-        target = max(0, int(target_max_symbols))
-        removed = 0
-        with self._candles_lock:
-            if target <= 0:
-                removed = len(self._candles_map)
-                self._candles_map.clear()
-                return removed
-            while len(self._candles_map) > target:
-                oldest_key = next(iter(self._candles_map))
-                self._candles_map.pop(oldest_key, None)
-                removed += 1
-        return removed
-
-    def _ensure_candles(self, symbol: str) -> list[CandlePoint]:
-        symbol_key = str(symbol).strip().lower()
-        with self._candles_lock:
-            cached = self._candles_map.get(symbol_key)
-            if cached is not None:
-                # LRU touch: move to tail.
-                self._candles_map.pop(symbol_key, None)
-                self._candles_map[symbol_key] = cached
-                return cached
+        return self._candles_cache.trim(target_max_symbols)
 
+    def get_candles_cache_stats(self) -> CandlesCacheStatsResponse:
+        stats = self._candles_cache.stats()
+        lookups = stats["hits"] + stats["misses"]
+        return CandlesCacheStatsResponse(
+            **stats,
+            hit_rate=round(stats["hits"] / lookups, 6) if lookups > 0 else 0.0,
+        )
+
+    def _load_candles_for_cache(self, symbol_key: str) -> CandleSeries:
         window_bars = max(120, int(self._config.candles_window_bars))
-        real_candles = load_candles_for_symbol(
+        real_candles = load_candle_series_for_symbol(
             self._config.tdx_data_path,
             symbol_key,
             window=window_bars,
@@ -4216,26 +4248,41 @@ class InMemoryStore:
             akshare_cache_dir=self._config.akshare_cache_dir,
         )
         if real_candles:
-            resolved = real_candles
-        else:
-            seed = self._hash_seed(symbol_key)
-            resolved = self._gen_candles(seed, 20.0 + (seed % 70))
-
-        with self._candles_lock:
-            existing = self._candles_map.get(symbol_key)
-            if existing is not None:
-                self._candles_map.pop(symbol_key, None)
-                self._candles_map[symbol_key] = existing
-                return existing
-
-            self._candles_map[symbol_key] = resolved
-            max_symbols = self._candles_runtime_cache_max_symbols()
-            if max_symbols > 0 and len(self._candles_map) > max_symbols:
-                trim_to = max(1, int(max_symbols * 0.9))
-                while len(self._candles_map) > trim_to:
-                    oldest_key = next(iter(self._candles_map))
-                    self._candles_map.pop(oldest_key, None)
-            return resolved
+            return real_candles
+        return self._synthetic_candles(symbol_key)
+
+    def _synthetic_candles(self, symbol_key: str) -> CandleSeries:
+        seed = self._hash_seed(symbol_key)
+        return CandleSeries.from_points(self._gen_candles(seed, 20.0 + (seed % 70)))
+
+    def _ensure_candles(self, symbol: str) -> CandleSeries:
+        symbol_key = str(symbol).strip().lower()
+
+        return self._candles_cache.get_or_load(symbol_key, lambda: self._load_candles_for_cache(symbol_key))
+
+    def get_candles_batch(self, symbols: list[str]) -> dict[str, CandleSeries]:
+        keys = list(dict.fromkeys(str(item).strip().lower() for item in symbols if str(item or "").strip()))
+        if not keys:
+            return {}
+
+        def _load_many(missing: list[str]) -> dict[str, CandleSeries]:
+            window_bars = max(120, int(self._config.candles_window_bars))
+            loaded = load_candle_series_batch(
+                self._config.tdx_data_path,
+                missing,
+                window=window_bars,
+                market_data_source=self._config.market_data_source,
+                akshare_cache_dir=self._config.akshare_cache_dir,
+            )
+            return {key: loaded.get(key) or self._synthetic_candles(key) for key in missing}
+
+        found = self._candles_cache.get_or_load_many(keys, _load_many)
+        # 并发加载方失败的标的按单只路径补齐（异常照常抛出）。
+        return {key: found[key] if key in found else self._ensure_candles(key) for key in keys}
+
+    def prefetch_candles(self, symbols: list[str]) -> int:
+        """Warm the runtime candle cache for ``symbols`` in one bulk pass; returns the number of symbols resolved."""
+        return len(self.get_candles_batch(symbols))
 
     @staticmethod
     def _intraday_axis() -> list[str]:
@@ -4667,7 +4714,7 @@ class InMemoryStore:
         return max(self._run_store.values(), key=lambda run: run.created_at)
 
     def get_candles_payload(self, symbol: str) -> dict[str, object]:
-        candles = self._ensure_candles(symbol)
+        candles = self._ensure_candles(symbol).to_points()
         degraded = any(point.price_source == "approx" for point in candles)
         return {
             "symbol": symbol,
@@ -5211,6 +5258,114 @@ class InMemoryStore:
                 self._bump_wyckoff_metric("lazy_fill_writes", 1)
         return snapshot
 
+    @staticmethod
+    def _wyckoff_batch_min_symbols() -> int:
+        raw = os.getenv("TDX_TREND_WYCKOFF_BATCH_MIN_SYMBOLS", "").strip()
+        if not raw:
+            return 32
+        try:
+            return max(1, int(raw))
+        except Exception:
+            return 32
+
+    def _prefill_wyckoff_snapshots(
+        self,
+        rows: list[ScreenerResult],
+        window_days: int,
+        *,
+        as_of_date: str | None = None,
+    ) -> dict[str, dict[str, object]]:
+        """Read ``rows`` from the event store once and batch-compute the misses; returns ``{symbol: snapshot}``.
+
+        Hits are always returned. Misses are computed in one vectorized batch and written back once there are at
+        least ``_wyckoff_batch_min_symbols()`` of them; otherwise they are left out, like symbols the store cannot
+        serve (disabled, read-only, blank symbol or trade date), for ``_calc_wyckoff_snapshot``.
+        """
+        store = self._wyckoff_event_store
+        if not store.enabled or store.read_only:
+            return {}
+        data_source = str(self._config.market_data_source).strip() or "unknown"
+        event_judgment_profile = self._active_event_judgment_profile()
+        params_hash = build_wyckoff_params_hash(
+            window_days,
+            profile_hash=self._active_event_judgment_profile_hash(),
+        )
+        resolved: dict[str, dict[str, object]] = {}
+        pending_rows: dict[str, ScreenerResult] = {}
+        pending_candles: dict[str, Any] = {}
+        trade_dates: dict[str, str] = {}
+        for row in rows:
+            symbol = str(row.symbol).strip().lower()
+            if not symbol or symbol in trade_dates:
+                continue
+            candles, resolved_as_of_date = self._slice_candles_as_of(self._ensure_candles(row.symbol), as_of_date)
+            trade_date = str(resolved_as_of_date or "").strip()
+            if not trade_date:
+                continue
+            trade_dates[symbol] = trade_date
+            read_started = time.perf_counter()
+            cached = store.get_snapshot(
+                symbol=symbol,
+                trade_date=trade_date,
+                window_days=window_days,
+                algo_version=self._wyckoff_event_algo_version,
+                data_source=data_source,
+                data_version=self._wyckoff_event_data_version,
+                params_hash=params_hash,
+            )
+            self._record_wyckoff_snapshot_read_latency((time.perf_counter() - read_started) * 1000.0)
+            if cached is not None:
+                resolved[symbol] = cached
+            else:
+                pending_rows[symbol] = row
+                pending_candles[symbol] = candles
+        self._bump_wyckoff_metric("cache_hits", len(resolved))
+        # 未命中较少时留给逐只路径（由它记未命中），整批散布到统一日历的开销不划算。
+        if len(pending_rows) < self._wyckoff_batch_min_symbols():
+            return resolved
+
+        batch_candles: dict[str, CandleSeries] = {}
+        for symbol, candles in pending_candles.items():
+            series = candles if isinstance(candles, CandleSeries) else CandleSeries.from_points(candles)
+            # 日期不严格递增的序列无法散布到统一日历，留给下方逐只计算。
+            if series.day.size > 0 and not bool(np.any(np.diff(series.day) <= 0)):
+                batch_candles[symbol] = series
+        batch = SignalAnalyzer.calculate_wyckoff_snapshots_for_candles(
+            batch_candles,
+            {symbol: pending_rows[symbol] for symbol in batch_candles},
+            window_days,
+            event_judgment_profile=event_judgment_profile,
+        )
+        self._bump_wyckoff_metric("cache_misses", len(pending_rows))
+        write_count = 0
+        for symbol, row in pending_rows.items():
+            snapshot = batch.get(symbol)
+            if snapshot is None:
+                snapshot = SignalAnalyzer.calculate_wyckoff_snapshot(
+                    row,
+                    pending_candles[symbol],
+                    window_days,
+                    event_judgment_profile=event_judgment_profile,
+                )
+            resolved[symbol] = snapshot
+            trade_date = trade_dates[symbol]
+            self._record_wyckoff_snapshot_quality(
+                self._inspect_wyckoff_snapshot_quality(snapshot, trade_date=trade_date)
+            )
+            if store.upsert_snapshot(
+                symbol=symbol,
+                trade_date=trade_date,
+                window_days=window_days,
+                algo_version=self._wyckoff_event_algo_version,
+                data_source=data_source,
+                data_version=self._wyckoff_event_data_version,
+                params_hash=params_hash,
+                snapshot=snapshot,
+            ):
+                write_count += 1
+        self._bump_wyckoff_metric("lazy_fill_writes", write_count)
+        return resolved
+
     def _is_signals_disk_cache_enabled(self) -> bool:
         return self._env_flag("TDX_TREND_SIGNALS_DISK_CACHE", True)
 
@@ -5566,11 +5721,17 @@ class InMemoryStore:
         seen_symbols: set[str] = set()
         resolved_signal_as_of_date = resolved_as_of_date
         row_by_symbol = {str(row.symbol).strip().lower(): row for row in candidates}
+        self.prefetch_candles(list(row_by_symbol))
+        # 一次性从事件库读出全部候选的快照，未命中够多时整批向量化计算并写回；下方直接使用，不再逐只重读，
+        # 只有预填没给出的标的才走逐只路径。
+        prefilled = self._prefill_wyckoff_snapshots(candidates, window_days, as_of_date=resolved_as_of_date)
 
         for row in candidates:
             if row.symbol in seen_symbols:
                 continue
-            snapshot = self._calc_wyckoff_snapshot(row, window_days=window_days, as_of_date=resolved_as_of_date)
+            snapshot = prefilled.get(str(row.symbol).strip().lower())
+            if snapshot is None:
+                snapshot = self._calc_wyckoff_snapshot(row, window_days=window_days, as_of_date=resolved_as_of_date)
             if not self._strategy_registry.generate_signals(
                 strategy_id=strategy_id_text,
                 row=row,
@@ -6076,19 +6237,9 @@ class InMemoryStore:
         return step1_pool, step2_pool, step3_pool, step4_pool
 
     def _build_backtest_scan_dates(self, date_from: str, date_to: str) -> list[str]:
-        start_dt = self._parse_date(date_from)
-        end_dt = self._parse_date(date_to)
-        if start_dt is None or end_dt is None:
+        if self._parse_date(date_from) is None or self._parse_date(date_to) is None:
             return []
-        if start_dt > end_dt:
-            start_dt, end_dt = end_dt, start_dt
-        out: list[str] = []
-        cursor = start_dt
-        while cursor <= end_dt:
-            if cursor.weekday() < 5:
-                out.append(cursor.strftime("%Y-%m-%d"))
-            cursor += timedelta(days=1)
-        return out
+        return weekday_dates(date_from, date_to)
 
     def _build_weekly_refresh_dates(self, scan_dates: list[str]) -> list[str]:
         out: list[str] = []
@@ -6108,10 +6259,9 @@ class InMemoryStore:
 
     @staticmethod
     def _next_scan_date(scan_dates: list[str], current_date: str) -> str | None:
-        for day in scan_dates:
-            if day > current_date:
-                return day
-        return None
+        # scan_dates 为升序交易日列表。
+        idx = bisect_right(scan_dates, current_date)
+        return scan_dates[idx] if idx < len(scan_dates) else None
 
     def _resolve_backtest_refresh_dates(
         self,
@@ -6138,6 +6288,9 @@ class InMemoryStore:
     def _is_backtest_input_pool_cache_enabled(self) -> bool:
         return self._env_flag("TDX_TREND_BACKTEST_INPUT_POOL_CACHE", True)
 
+    def _is_backtest_input_pool_multi_date_enabled(self) -> bool:
+        return self._env_flag("TDX_TREND_BACKTEST_INPUT_POOL_MULTI_DATE", True)
+
     @staticmethod
     def _backtest_input_pool_preload_workers() -> int:
         raw = os.getenv("TDX_TREND_BACKTEST_INPUT_POOL_WORKERS", "").strip()
@@ -6633,6 +6786,17 @@ class InMemoryStore:
         else:
             pending_days = list(refresh_unique)
 
+        def _typed_rows_or_fallback(
+            rows: list[object],
+            load_error: str | None,
+        ) -> tuple[list[object], str | None]:
+            typed_rows = [row for row in rows if isinstance(row, ScreenerResult)]
+            if not typed_rows and str(load_error or "").strip() == "TDX_PATH_NOT_FOUND":
+                fallback_rows = self._build_backtest_input_pool_fallback_rows(markets=markets)
+                if fallback_rows:
+                    return list(fallback_rows), "TDX_PATH_NOT_FOUND_FALLBACK_MOCK_POOL"
+            return typed_rows, load_error
+
         def _load_for_day(as_of_date: str) -> tuple[str, list[object], str | None]:
             rows, load_error = load_input_pool_from_tdx(
                 tdx_root=tdx_root,
@@ -6640,48 +6804,79 @@ class InMemoryStore:
                 return_window_days=return_window_days,
                 as_of_date=as_of_date,
             )
-            typed_rows = [row for row in rows if isinstance(row, ScreenerResult)]
-            if not typed_rows and str(load_error or "").strip() == "TDX_PATH_NOT_FOUND":
-                fallback_rows = self._build_backtest_input_pool_fallback_rows(markets=markets)
-                if fallback_rows:
-                    return as_of_date, list(fallback_rows), "TDX_PATH_NOT_FOUND_FALLBACK_MOCK_POOL"
+            typed_rows, load_error = _typed_rows_or_fallback(rows, load_error)
             return as_of_date, typed_rows, load_error
 
-        if len(pending_days) <= 1:
-            for day in pending_days:
-                as_of_date, rows, load_error = _load_for_day(day)
-                out[as_of_date] = (rows, load_error)
-                if cache_enabled:
-                    cache_key = self._build_backtest_input_pool_cache_key(
-                        tdx_root=tdx_root,
-                        markets=markets,
-                        return_window_days=return_window_days,
-                        as_of_date=as_of_date,
-                    )
-                    typed_rows = [row for row in rows if isinstance(row, ScreenerResult)]
-                    self._save_backtest_input_pool_runtime_cache(cache_key, typed_rows, load_error)
-                    if self._save_backtest_input_pool_cache(
-                        tdx_root=tdx_root,
-                        markets=markets,
-                        return_window_days=return_window_days,
-                        as_of_date=as_of_date,
-                        rows=typed_rows,
-                        load_error=load_error,
-                    ):
-                        cache_write_days += 1
-                done_days_progress += 1
-                _emit_progress(
-                    as_of_date,
-                    done_days_progress,
-                    total_days,
-                    f"滚动筛选准备：输入池预加载 {done_days_progress}/{total_days}",
+        def _finish_day(
+            as_of_date: str,
+            rows: list[object],
+            load_error: str | None,
+            *,
+            write_cache: bool = True,
+        ) -> None:
+            nonlocal cache_write_days, done_days_progress
+            out[as_of_date] = (rows, load_error)
+            if cache_enabled and write_cache:
+                cache_key = self._build_backtest_input_pool_cache_key(
+                    tdx_root=tdx_root,
+                    markets=markets,
+                    return_window_days=return_window_days,
+                    as_of_date=as_of_date,
                 )
-            return out, {
+                typed_rows = [row for row in rows if isinstance(row, ScreenerResult)]
+                self._save_backtest_input_pool_runtime_cache(cache_key, typed_rows, load_error)
+                if self._save_backtest_input_pool_cache(
+                    tdx_root=tdx_root,
+                    markets=markets,
+                    return_window_days=return_window_days,
+                    as_of_date=as_of_date,
+                    rows=typed_rows,
+                    load_error=load_error,
+                ):
+                    cache_write_days += 1
+            done_days_progress += 1
+            _emit_progress(
+                as_of_date,
+                done_days_progress,
+                total_days,
+                f"滚动筛选准备：输入池预加载 {done_days_progress}/{total_days}",
+            )
+
+        def _stats() -> dict[str, int]:
+            return {
                 "cache_hit_days": int(cache_hit_days if cache_enabled else 0),
                 "cache_miss_days": int(len(pending_days)),
                 "cache_write_days": int(cache_write_days),
             }
 
+        if len(pending_days) <= 1:
+            for day in pending_days:
+                _finish_day(*_load_for_day(day))
+            return out, _stats()
+
+        if self._is_backtest_input_pool_multi_date_enabled() and Path(tdx_root).exists():
+            # 多个刷新日一次扫描：每个 .day 文件只解析一次，按日期批量计算输入池指标。
+            _emit_progress(
+                pending_days[0],
+                done_days_progress,
+                total_days,
+                f"滚动筛选准备：输入池批量预加载 {len(pending_days)} 个刷新日",
+            )
+            try:
+                by_date = load_input_pool_from_tdx_by_dates(
+                    tdx_root=tdx_root,
+                    markets=markets,
+                    return_window_days=return_window_days,
+                    as_of_dates=list(pending_days),
+                )
+            except Exception:
+                by_date = {}
+            if by_date:
+                for day in pending_days:
+                    rows, load_error = by_date.get(day, ([], "TDX_VALID_SERIES_NOT_FOUND"))
+                    _finish_day(day, *_typed_rows_or_fallback(list(rows), load_error))
+                return out, _stats()
+
         workers = max(1, min(self._backtest_input_pool_preload_workers(), len(pending_days)))
         with ThreadPoolExecutor(max_workers=workers) as executor:
             future_map = {
@@ -6692,40 +6887,11 @@ class InMemoryStore:
                 day = future_map[future]
                 try:
                     as_of_date, rows, load_error = future.result()
-                    out[as_of_date] = (rows, load_error)
-                    if cache_enabled:
-                        cache_key = self._build_backtest_input_pool_cache_key(
-                            tdx_root=tdx_root,
-                            markets=markets,
-                            return_window_days=return_window_days,
-                            as_of_date=as_of_date,
-                        )
-                        typed_rows = [row for row in rows if isinstance(row, ScreenerResult)]
-                        self._save_backtest_input_pool_runtime_cache(cache_key, typed_rows, load_error)
-                        if self._save_backtest_input_pool_cache(
-                            tdx_root=tdx_root,
-                            markets=markets,
-                            return_window_days=return_window_days,
-                            as_of_date=as_of_date,
-                            rows=typed_rows,
-                            load_error=load_error,
-                        ):
-                            cache_write_days += 1
                 except Exception as exc:  # noqa: BLE001
-                    out[day] = ([], f"LOADER_EXCEPTION:{type(exc).__name__}")
-                    as_of_date = day
-                done_days_progress += 1
-                _emit_progress(
-                    as_of_date,
-                    done_days_progress,
-                    total_days,
-                    f"滚动筛选准备：输入池预加载 {done_days_progress}/{total_days}",
-                )
-        return out, {
-            "cache_hit_days": int(cache_hit_days if cache_enabled else 0),
-            "cache_miss_days": int(len(pending_days)),
-            "cache_write_days": int(cache_write_days),
-        }
+                    _finish_day(day, [], f"LOADER_EXCEPTION:{type(exc).__name__}", write_cache=False)
+                    continue
+                _finish_day(as_of_date, rows, load_error)
+        return out, _stats()
 
     @staticmethod
     def _build_allowed_symbols_by_date(
@@ -7362,9 +7528,40 @@ class InMemoryStore:
                 for key, _value in stale_items[:overflow]:
                     self._backtest_signal_matrix_runtime_cache.pop(key, None)
 
+    def _load_backtest_signal_rank_runtime_cache(self, matrix_cache_key: str) -> np.ndarray | None:
+        if not self._is_backtest_signal_matrix_runtime_cache_enabled():
+            return None
+        ttl_sec = self._backtest_signal_matrix_runtime_ttl_sec()
+        with self._backtest_signal_matrix_runtime_cache_lock:
+            cached = self._backtest_signal_rank_runtime_cache.get(matrix_cache_key)
+            if cached is None:
+                return None
+            created_at, ranks = cached
+            if ttl_sec > 0 and (time.time() - created_at) > ttl_sec:
+                self._backtest_signal_rank_runtime_cache.pop(matrix_cache_key, None)
+                return None
+            return ranks
+
+    def _save_backtest_signal_rank_runtime_cache(self, matrix_cache_key: str, ranks: np.ndarray) -> None:
+        if not self._is_backtest_signal_matrix_runtime_cache_enabled():
+            return
+        now_ts = time.time()
+        with self._backtest_signal_matrix_runtime_cache_lock:
+            self._backtest_signal_rank_runtime_cache[matrix_cache_key] = (now_ts, ranks)
+            max_items = self._backtest_signal_matrix_runtime_max_items()
+            if len(self._backtest_signal_rank_runtime_cache) > max_items:
+                stale_items = sorted(
+                    self._backtest_signal_rank_runtime_cache.items(),
+                    key=lambda item: float(item[1][0]),
+                )
+                overflow = len(self._backtest_signal_rank_runtime_cache) - max_items
+                for key, _value in stale_items[:overflow]:
+                    self._backtest_signal_rank_runtime_cache.pop(key, None)
+
     def _clear_backtest_signal_matrix_runtime_cache(self) -> None:
         with self._backtest_signal_matrix_runtime_cache_lock:
             self._backtest_signal_matrix_runtime_cache.clear()
+            self._backtest_signal_rank_runtime_cache.clear()
 
     def _is_backtest_signal_matrix_disk_cache_enabled(self) -> bool:
         return self._env_flag("TDX_TREND_BACKTEST_SIGNAL_MATRIX_DISK_CACHE", True)
@@ -7397,7 +7594,10 @@ class InMemoryStore:
         *,
         cache_key: str,
         expected_shape: tuple[int, int],
+        expected_dates: list[str] | None = None,
+        prefix_only: bool = False,
     ) -> BacktestSignalMatrix | None:
+        # prefix_only：只取与 expected_dates 开头一致的若干行，供矩阵增量追加后复用旧信号。
         if not self._is_backtest_signal_matrix_disk_cache_enabled():
             return None
         path = self._backtest_signal_matrix_disk_cache_file(cache_key)
@@ -7427,19 +7627,38 @@ class InMemoryStore:
         )
         try:
             with np.load(path, allow_pickle=False) as data:
+                rows = slice(None)
+                if "dates" in data and expected_dates is not None:
+                    cached_dates = data["dates"].astype(str)
+                    wanted = np.asarray(expected_dates[: cached_dates.shape[0]], dtype=str)
+                    same = cached_dates[: wanted.shape[0]] == wanted
+                    matched = int(same.shape[0]) if bool(same.all()) else int(np.argmin(same))
+                    if prefix_only:
+                        if matched <= 0:
+                            return None
+                        rows = slice(0, matched)
+                        expected_shape = (matched, int(expected_shape[1]))
+                    elif matched != len(expected_dates) or cached_dates.shape[0] != len(expected_dates):
+                        return None
+                elif prefix_only:
+                    return None
                 out_bool: dict[str, np.ndarray] = {}
                 for field in bool_fields:
                     if field not in data:
                         return None
-                    arr = np.array(data[field], dtype=bool, copy=True)
+                    arr = np.array(data[field][rows], dtype=bool, copy=True)
                     if arr.shape != expected_shape:
                         return None
                     out_bool[field] = arr
                 if "score" not in data:
                     return None
-                score = np.array(data["score"], dtype=np.float64, copy=True)
+                # 分数按写入时的精度（float64 / float32 矩阵模式）原样读回。
+                score = np.array(data["score"][rows], copy=True)
+                if score.dtype not in (np.float32, np.float64):
+                    score = score.astype(np.float64)
                 if score.shape != expected_shape:
                     return None
+                mean_state, mean_state_row = self._unpack_backtest_signal_mean_state(data)
             return BacktestSignalMatrix(
                 s1=out_bool["s1"],
                 s2=out_bool["s2"],
@@ -7454,15 +7673,44 @@ class InMemoryStore:
                 buy_signal=out_bool["buy_signal"],
                 sell_signal=out_bool["sell_signal"],
                 score=score,
+                mean_state=mean_state,
+                mean_state_row=mean_state_row,
             )
         except Exception:
             return None
 
+    @staticmethod
+    def _pack_backtest_signal_mean_state(matrix: BacktestSignalMatrix) -> dict[str, np.ndarray]:
+        # 均值累计状态随信号一起落盘，增量续算才能与全量重算逐位一致。
+        if not matrix.mean_state:
+            return {}
+        out: dict[str, np.ndarray] = {"mean_state_row": np.asarray(int(matrix.mean_state_row), dtype=np.int64)}
+        for name, state in matrix.mean_state.items():
+            for part, values in state._asdict().items():
+                out[f"mean_state__{name}__{part}"] = np.asarray(values)
+        return out
+
+    @staticmethod
+    def _unpack_backtest_signal_mean_state(data: Any) -> tuple[dict[str, RollingMeanState] | None, int]:
+        if "mean_state_row" not in data:
+            return None, -1
+        parts: dict[str, dict[str, np.ndarray]] = {}
+        for key in data.files:
+            if key.startswith("mean_state__"):
+                _prefix, name, part = key.split("__", 2)
+                parts.setdefault(name, {})[part] = np.array(data[key], copy=True)
+        try:
+            state = {name: RollingMeanState(**values) for name, values in parts.items()}
+        except TypeError:
+            return None, -1
+        return state, int(data["mean_state_row"])
+
     def _save_backtest_signal_matrix_disk_cache(
         self,
         *,
         cache_key: str,
         matrix: BacktestSignalMatrix,
+        dates: list[str] | None = None,
     ) -> bool:
         if not self._is_backtest_signal_matrix_disk_cache_enabled():
             return False
@@ -7484,7 +7732,9 @@ class InMemoryStore:
                 in_pool=matrix.in_pool.astype(np.uint8),
                 buy_signal=matrix.buy_signal.astype(np.uint8),
                 sell_signal=matrix.sell_signal.astype(np.uint8),
-                score=matrix.score.astype(np.float64),
+                score=matrix.score if matrix.score.dtype == np.float32 else matrix.score.astype(np.float64),
+                **({"dates": np.asarray(dates, dtype="U10")} if dates is not None else {}),
+                **self._pack_backtest_signal_mean_state(matrix),
             )
             tmp_path.replace(path)
             return True
@@ -7540,6 +7790,11 @@ class InMemoryStore:
             window_set=matrix_windows,
             algo_version=self._backtest_matrix_algo_version,
         )
+        superset_group = self._backtest_matrix_engine.build_superset_group(
+            data_version=data_version,
+            window_set=matrix_windows,
+            algo_version=self._backtest_matrix_algo_version,
+        )
         bundle_start_ts = time.perf_counter()
         bundle, cache_hit = self._backtest_matrix_engine.build_bundle(
             symbols=symbols,
@@ -7549,7 +7804,9 @@ class InMemoryStore:
             max_lookback_days=matrix_max_lookback_days,
             cache_key=cache_key,
             incremental_signature=incremental_signature,
+            superset_group=superset_group,
             use_cache=True,
+            prefetch_candles=self.prefetch_candles,
         )
         bundle_elapsed = time.perf_counter() - bundle_start_ts
         if not lightweight_probe:
@@ -7587,19 +7844,47 @@ class InMemoryStore:
             signal_matrix = self._load_backtest_signal_matrix_disk_cache(
                 cache_key=signal_disk_cache_key,
                 expected_shape=bundle.shape(),
+                expected_dates=bundle.dates,
             )
             if signal_matrix is not None:
                 signal_cache_source = "disk"
                 self._save_backtest_signal_matrix_runtime_cache(signal_runtime_cache_key, signal_matrix)
             else:
-                signal_matrix = compute_backtest_signal_matrix(
-                    bundle,
-                    top_n=signal_top_n,
-                )
+                base_signal_matrix = None
+                if bundle_base_key and bundle_mode in {"incremental_append", "incremental_reuse"}:
+                    # 矩阵是在旧矩阵后追加若干天得到的：复用旧矩阵的信号，只算新增日期。
+                    base_signal_matrix = self._load_backtest_signal_matrix_disk_cache(
+                        cache_key=self._build_backtest_signal_matrix_disk_cache_key(
+                            matrix_cache_key=bundle_base_key,
+                            top_n=signal_top_n,
+                        ),
+                        expected_shape=bundle.shape(),
+                        expected_dates=bundle.dates,
+                        prefix_only=True,
+                    )
+                if base_signal_matrix is not None:
+                    signal_cache_source = "incremental"
+                    signal_matrix = extend_backtest_signal_matrix(
+                        bundle,
+                        base_signal_matrix,
+                        top_n=signal_top_n,
+                    )
+                else:
+                    # 排名随矩阵缓存：同一矩阵只换 top_n 的多次回测（含参数平台各点）都从这一份排名切出 s3。
+                    return_ranks = self._load_backtest_signal_rank_runtime_cache(cache_key)
+                    if return_ranks is None:
+                        return_ranks = backtest_signal_return_ranks(bundle)
+                        self._save_backtest_signal_rank_runtime_cache(cache_key, return_ranks)
+                    signal_matrix = compute_backtest_signal_matrix(
+                        bundle,
+                        top_n=signal_top_n,
+                        return_ranks=return_ranks,
+                    )
                 self._save_backtest_signal_matrix_runtime_cache(signal_runtime_cache_key, signal_matrix)
                 self._save_backtest_signal_matrix_disk_cache(
                     cache_key=signal_disk_cache_key,
                     matrix=signal_matrix,
+                    dates=bundle.dates,
                 )
         signal_elapsed = time.perf_counter() - signal_start_ts
         if not lightweight_probe:
@@ -12741,6 +13026,36 @@ class InMemoryStore:
         candle_cache[key] = resolved
         return resolved
 
+    def _prefetch_signal_etf_candles(
+        self,
+        symbols: list[str],
+        *,
+        window_bars: int,
+        candle_cache: dict[str, list[CandlePoint]],
+    ) -> None:
+        missing = [
+            key
+            for key in dict.fromkeys(str(symbol or "").strip().lower() for symbol in symbols)
+            if key and key not in candle_cache
+        ]
+        if len(missing) <= 1:
+            return
+        loaded = load_candle_series_batch(
+            self._config.tdx_data_path,
+            missing,
+            window=max(120, int(window_bars)),
+            market_data_source=self._config.market_data_source,
+            akshare_cache_dir=self._config.akshare_cache_dir,
+        )
+        for key in missing:
+            series = loaded.get(key)
+            if not series:
+                # 读不到的标的留给 _load_signal_etf_candles 按单只路径处理。
+                continue
+            resolved = series.to_points()
+            resolved.sort(key=lambda item: item.time)
+            candle_cache[key] = resolved
+
     def _resolve_signal_etf_buy_price(
         self,
         *,
@@ -12819,6 +13134,11 @@ class InMemoryStore:
 
         stock_frames: dict[str, dict[str, object]] = {}
         all_symbol_dates: set[str] = set()
+        self._prefetch_signal_etf_candles(
+            [item.symbol for item in constituents],
+            window_bars=window_bars,
+            candle_cache=candle_cache,
+        )
         for item in constituents:
             symbol = item.symbol
             candles = self._load_signal_etf_candles(
@@ -14586,7 +14906,7 @@ class InMemoryStore:
 
     def set_config(self, payload: AppConfig) -> AppConfig:
         self._config = payload
-        self._candles_map = {}
+        self._candles_cache.clear()
         self._latest_rows = {}
         self._signals_cache = {}
         self._backtest_matrix_engine.clear_runtime_cache()
@@ -14651,6 +14971,16 @@ class InMemoryStore:
             ),
         )
 
+    @staticmethod
+    def _wyckoff_backfill_date_block() -> int:
+        raw = os.getenv("TDX_TREND_WYCKOFF_BACKFILL_DATE_BLOCK", "").strip()
+        if not raw:
+            return 20
+        try:
+            return max(1, int(raw))
+        except Exception:
+            return 20
+
     def backfill_wyckoff_event_store(
         self,
         payload: WyckoffEventStoreBackfillRequest,
@@ -14700,93 +15030,111 @@ class InMemoryStore:
         event_judgment_profile = self._active_event_judgment_profile()
         event_judgment_profile_hash = self._active_event_judgment_profile_hash()
 
-        for as_of_date in scan_dates:
-            input_rows, load_error = load_input_pool_from_tdx(
-                tdx_root=self._config.tdx_data_path,
-                markets=markets,
-                return_window_days=max(5, min(120, int(self._config.return_window_days))),
-                as_of_date=as_of_date,
-            )
-            if load_error:
-                loader_error_counter[load_error] = loader_error_counter.get(load_error, 0) + 1
-            loaded_rows_total += len(input_rows)
+        data_source = str(self._config.market_data_source).strip() or "unknown"
+        params_hash_by_window = {
+            window_days: build_wyckoff_params_hash(window_days, profile_hash=event_judgment_profile_hash)
+            for window_days in window_days_list
+        }
+        block_size = self._wyckoff_backfill_date_block()
+        for block_start in range(0, len(scan_dates), block_size):
+            # 按日期块收集未命中的 (标的, 窗口)，再逐标的把连续交易日的滑动窗口一次批量计算。
+            pending: dict[str, dict[int, list[tuple[str, ScreenerResult]]]] = {}
+            for as_of_date in scan_dates[block_start : block_start + block_size]:
+                input_rows, load_error = load_input_pool_from_tdx(
+                    tdx_root=self._config.tdx_data_path,
+                    markets=markets,
+                    return_window_days=max(5, min(120, int(self._config.return_window_days))),
+                    as_of_date=as_of_date,
+                )
+                if load_error:
+                    loader_error_counter[load_error] = loader_error_counter.get(load_error, 0) + 1
+                loaded_rows_total += len(input_rows)
 
-            unique_rows: list[ScreenerResult] = []
-            seen_symbols: set[str] = set()
-            for row in input_rows:
-                symbol = str(row.symbol).strip().lower()
-                if not symbol or symbol in seen_symbols:
-                    continue
-                seen_symbols.add(symbol)
-                unique_rows.append(row)
-                if len(unique_rows) >= payload.max_symbols_per_day:
-                    break
+                unique_rows: list[ScreenerResult] = []
+                seen_symbols: set[str] = set()
+                for row in input_rows:
+                    symbol = str(row.symbol).strip().lower()
+                    if not symbol or symbol in seen_symbols:
+                        continue
+                    seen_symbols.add(symbol)
+                    unique_rows.append(row)
+                    if len(unique_rows) >= payload.max_symbols_per_day:
+                        break
 
-            for row in unique_rows:
-                symbol = str(row.symbol).strip().lower()
-                if not symbol:
-                    continue
-                symbols_scanned += 1
-                data_source = str(self._config.market_data_source).strip() or "unknown"
-                for window_days in window_days_list:
-                    params_hash = build_wyckoff_params_hash(
+                for row in unique_rows:
+                    symbol = str(row.symbol).strip().lower()
+                    if not symbol:
+                        continue
+                    symbols_scanned += 1
+                    for window_days in window_days_list:
+                        if not payload.force_rebuild:
+                            read_started = time.perf_counter()
+                            cached = self._wyckoff_event_store.get_snapshot(
+                                symbol=symbol,
+                                trade_date=as_of_date,
+                                window_days=window_days,
+                                algo_version=self._wyckoff_event_algo_version,
+                                data_source=data_source,
+                                data_version=self._wyckoff_event_data_version,
+                                params_hash=params_hash_by_window[window_days],
+                            )
+                            read_duration_ms = (time.perf_counter() - read_started) * 1000.0
+                            self._record_wyckoff_snapshot_read_latency(read_duration_ms)
+                            if cached is not None:
+                                cache_hits += 1
+                                self._bump_wyckoff_metric("cache_hits", 1)
+                                continue
+
+                        cache_misses += 1
+                        self._bump_wyckoff_metric("cache_misses", 1)
+                        pending.setdefault(symbol, {}).setdefault(window_days, []).append((as_of_date, row))
+
+            if payload.force_rebuild:
+                # 强制重算时每只都要读行情，先整批预热；否则大多命中事件库，按需单只读取。
+                self.prefetch_candles(list(pending))
+
+            for symbol, by_window in pending.items():
+                history = self._ensure_candles(symbol)
+                resolved_by_date: dict[str, str | None] = {}
+                for window_days, items in by_window.items():
+                    points: list[tuple[str, ScreenerResult]] = []
+                    for as_of_date, row in items:
+                        if as_of_date not in resolved_by_date:
+                            candles, resolved_by_date[as_of_date] = self._slice_candles_as_of(history, as_of_date)
+                            if not candles:
+                                resolved_by_date[as_of_date] = None
+                        resolved_as_of_date = resolved_by_date[as_of_date]
+                        if resolved_as_of_date:
+                            points.append((resolved_as_of_date, row))
+                    snapshots = SignalAnalyzer.calculate_wyckoff_snapshot_series(
+                        history,
+                        points,
                         window_days,
-                        profile_hash=event_judgment_profile_hash,
+                        event_judgment_profile=event_judgment_profile,
                     )
-                    if not payload.force_rebuild:
-                        read_started = time.perf_counter()
-                        cached = self._wyckoff_event_store.get_snapshot(
+                    for (resolved_as_of_date, _row), snapshot in zip(points, snapshots):
+                        quality_flags = self._inspect_wyckoff_snapshot_quality(
+                            snapshot,
+                            trade_date=resolved_as_of_date,
+                        )
+                        self._record_wyckoff_snapshot_quality(quality_flags)
+                        quality_empty_events += int(max(0, quality_flags.get("empty_events", 0)))
+                        quality_score_outliers += int(max(0, quality_flags.get("score_outliers", 0)))
+                        quality_date_misaligned += int(max(0, quality_flags.get("date_misaligned", 0)))
+                        computed_count += 1
+                        write_ok = self._wyckoff_event_store.upsert_snapshot(
                             symbol=symbol,
-                            trade_date=as_of_date,
+                            trade_date=resolved_as_of_date,
                             window_days=window_days,
                             algo_version=self._wyckoff_event_algo_version,
                             data_source=data_source,
                             data_version=self._wyckoff_event_data_version,
-                            params_hash=params_hash,
+                            params_hash=params_hash_by_window[window_days],
+                            snapshot=snapshot,
                         )
-                        read_duration_ms = (time.perf_counter() - read_started) * 1000.0
-                        self._record_wyckoff_snapshot_read_latency(read_duration_ms)
-                        if cached is not None:
-                            cache_hits += 1
-                            self._bump_wyckoff_metric("cache_hits", 1)
-                            continue
-
-                    cache_misses += 1
-                    self._bump_wyckoff_metric("cache_misses", 1)
-                    candles, resolved_as_of_date = self._slice_candles_as_of(
-                        self._ensure_candles(symbol),
-                        as_of_date,
-                    )
-                    if not candles or not resolved_as_of_date:
-                        continue
-                    snapshot = SignalAnalyzer.calculate_wyckoff_snapshot(
-                        row,
-                        candles,
-                        window_days,
-                        event_judgment_profile=event_judgment_profile,
-                    )
-                    quality_flags = self._inspect_wyckoff_snapshot_quality(
-                        snapshot,
-                        trade_date=resolved_as_of_date,
-                    )
-                    self._record_wyckoff_snapshot_quality(quality_flags)
-                    quality_empty_events += int(max(0, quality_flags.get("empty_events", 0)))
-                    quality_score_outliers += int(max(0, quality_flags.get("score_outliers", 0)))
-                    quality_date_misaligned += int(max(0, quality_flags.get("date_misaligned", 0)))
-                    computed_count += 1
-                    write_ok = self._wyckoff_event_store.upsert_snapshot(
-                        symbol=symbol,
-                        trade_date=resolved_as_of_date,
-                        window_days=window_days,
-                        algo_version=self._wyckoff_event_algo_version,
-                        data_source=data_source,
-                        data_version=self._wyckoff_event_data_version,
-                        params_hash=params_hash,
-                        snapshot=snapshot,
-                    )
-                    if write_ok:
-                        write_count += 1
-                        self._bump_wyckoff_metric("backfill_writes", 1)
+                        if write_ok:
+                            write_count += 1
+                            self._bump_wyckoff_metric("backfill_writes", 1)
 
         finished_at = self._now_datetime()
         duration_sec = round(max(0.0, time.perf_counter() - started_ts), 4)
@@ -15489,6 +15837,50 @@ class InMemoryStore:
             wyckoff_event_store_read_only=self._wyckoff_event_store.read_only,
         )
 
+    def _sync_columnar_market_store(self, *, akshare_cache_dir: str) -> dict[str, int] | None:
+        columnar_store = get_shared_columnar_store()
+        if columnar_store is None:
+            return None
+        try:
+            return sync_columnar_store_from_sources(
+                columnar_store,
+                tdx_root=self._config.tdx_data_path,
+                markets=["sh", "sz", "bj"],
+                akshare_cache_dir=akshare_cache_dir,
+            )
+        except Exception:
+            return None
+
+    def _schedule_columnar_market_store_sync(self, *, akshare_cache_dir: str) -> bool:
+        """Run the full columnar-store sync off the request path; returns whether a sync is queued or running."""
+        if get_shared_columnar_store() is None:
+            return False
+        with self._columnar_sync_lock:
+            self._columnar_sync_pending = akshare_cache_dir
+            if self._columnar_sync_running:
+                return True
+            self._columnar_sync_running = True
+
+        def _worker() -> None:
+            while True:
+                with self._columnar_sync_lock:
+                    cache_dir = self._columnar_sync_pending
+                    self._columnar_sync_pending = None
+                    if cache_dir is None:
+                        self._columnar_sync_running = False
+                        return
+                # 同步期间读取方按源文件签名判断新鲜度，未同步的标的自动回退到 .day/CSV。
+                self._sync_columnar_market_store(akshare_cache_dir=cache_dir)
+
+        try:
+            Thread(target=_worker, name="columnar-store-sync", daemon=True).start()
+        except Exception:
+            with self._columnar_sync_lock:
+                self._columnar_sync_running = False
+                self._columnar_sync_pending = None
+            return False
+        return True
+
     def sync_market_data(self, payload: MarketDataSyncRequest) -> MarketDataSyncResponse:
         out_dir = (payload.out_dir or "").strip() or (self._config.akshare_cache_dir or "").strip()
         if not out_dir:
@@ -15508,8 +15900,9 @@ class InMemoryStore:
                 out_dir=out_dir,
             )
             if int(summary.get("ok_count", 0)) > 0:
+                self._schedule_columnar_market_store_sync(akshare_cache_dir=out_dir)
                 # Ensure subsequent APIs reload latest local files after sync.
-                self._candles_map = {}
+                self._candles_cache.clear()
                 self._latest_rows = {}
                 self._signals_cache = {}
                 self._backtest_matrix_engine.clear_runtime_cache()
@@ -6,17 +6,60 @@ import json
 import os
 import struct
 import time
+from collections import OrderedDict
 from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError, as_completed
+from dataclasses import dataclass
 from datetime import datetime
-from functools import lru_cache
 from pathlib import Path
 from threading import RLock
-from typing import TypedDict
-
-from .models import CandlePoint, IntradayPoint, ScreenerResult, Stage, ThemeStage, TrendClass
+from typing import TYPE_CHECKING, TypedDict
+
+import numpy as np
+
+from .candle_series import CandleSeries
+from .candle_series import date_text_to_day_int as _date_text_to_day_int
+from .candle_series import day_ints_to_texts as _day_ints_to_texts
+from .models import CandlePoint, IntradayPoint, PriceSource, ScreenerResult
+from .screener_metrics import (
+    MIN_ROW_BARS,
+    MIN_TOTAL_BARS,
+    compute_row_metrics,
+    resolve_row_ends,
+    screener_result_from_metrics,
+    screener_results_from_metric_arrays,
+)
+
+if TYPE_CHECKING:
+    from .tdx_mmap_reader import TdxMmapReader
+    from .tdx_scan_index import TdxScanIndex
 
 DAY_RECORD = struct.Struct("<IIIIIfII")
+DAY_RECORD_DTYPE = np.dtype(
+    [
+        ("date", "<u4"),
+        ("open", "<u4"),
+        ("high", "<u4"),
+        ("low", "<u4"),
+        ("close", "<u4"),
+        ("amount", "<f4"),
+        ("volume", "<u4"),
+        ("reserved", "<u4"),
+    ]
+)
 LC1_RECORD = struct.Struct("<HHfffffII")
+LC1_RECORD_DTYPE = np.dtype(
+    [
+        ("date", "<u2"),
+        ("time", "<u2"),
+        ("open", "<f4"),
+        ("high", "<f4"),
+        ("low", "<f4"),
+        ("close", "<f4"),
+        ("amount", "<f4"),
+        ("volume", "<u4"),
+        ("reserved", "<u4"),
+    ]
+)
 TNF_HEADER_SIZE = 50
 TNF_RECORD_SIZE = 360
 DBF_HEADER = struct.Struct("<BBBBIHH20x")
@@ -25,6 +68,9 @@ DBF_TERMINATOR = 0x0D
 _INPUT_POOL_RUNTIME_CACHE: dict[str, tuple[float, tuple[dict[str, object], ...], str | None]] = {}
 _INPUT_POOL_RUNTIME_CACHE_LOCK = RLock()
 _INPUT_POOL_RUNTIME_CACHE_MAX_KEYS = 16
+_LC1_INDEX_CACHE: OrderedDict[str, "Lc1DateIndex"] = OrderedDict()
+_LC1_INDEX_LOCK = RLock()
+_LC1_INDEX_CACHE_MAX_FILES = 256
 
 
 class ParsedSeries(TypedDict):
@@ -39,6 +85,26 @@ class ParsedSeries(TypedDict):
     volume: list[int]
 
 
+class DayColumns(TypedDict):
+    symbol: str
+    total_bars: int
+    day: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    amount: np.ndarray
+    volume: np.ndarray
+
+
+@dataclass(slots=True)
+class Lc1DateIndex:
+    size: int
+    mtime_ns: int
+    day_ints: list[int]
+    runs: dict[int, list[tuple[int, int]]]
+
+
 class DbfField(TypedDict):
     offset: int
     length: int
@@ -50,10 +116,6 @@ def _safe_mean(values: list[float] | list[int]) -> float:
     return float(sum(values) / len(values))
 
 
-def _clamp(value: float, lower: float, upper: float) -> float:
-    return max(lower, min(upper, value))
-
-
 def _resolve_tdx_base_dir(tdx_root: str) -> Path:
     base = Path(tdx_root)
     if base.name.lower() == "vipdoc":
@@ -96,12 +158,21 @@ def _tnf_file_for_market(market: str) -> str:
     return ""
 
 
-@lru_cache(maxsize=16)
 def _cached_symbol_name_map_from_tnf(tdx_root: str, markets_key: tuple[str, ...]) -> dict[str, str]:
-    return _load_symbol_name_map_from_tnf(tdx_root, list(markets_key))
+    from .tdx_meta_cache import memoize_by_sources
+
+    root = _resolve_tdx_base_dir(tdx_root) / "T0002" / "hq_cache"
+    sources = [root / _tnf_file_for_market(market) for market in markets_key if _tnf_file_for_market(market)]
+    return memoize_by_sources(
+        ("tnf", str(tdx_root), *markets_key),
+        sources,
+        lambda: _load_symbol_name_map_from_tnf(tdx_root, list(markets_key)),
+    )
 
 
 def _load_symbol_name_map_from_tnf(tdx_root: str, markets: list[str]) -> dict[str, str]:
+    from .tdx_meta_cache import load_cached_file_map
+
     base = _resolve_tdx_base_dir(tdx_root)
     root = base / "T0002" / "hq_cache"
     if not root.exists():
@@ -115,29 +186,34 @@ def _load_symbol_name_map_from_tnf(tdx_root: str, markets: list[str]) -> dict[st
         path = root / tnf_file
         if not path.exists():
             continue
-        try:
-            data = path.read_bytes()
-        except OSError:
-            continue
-
-        if len(data) <= TNF_HEADER_SIZE + TNF_RECORD_SIZE:
-            continue
-
-        for offset in range(TNF_HEADER_SIZE, len(data) - TNF_RECORD_SIZE + 1, TNF_RECORD_SIZE):
-            record = data[offset : offset + TNF_RECORD_SIZE]
-            code = record[0:6].decode("ascii", "ignore").strip("\x00").strip()
-            if len(code) != 6 or not code.isdigit():
-                continue
+        loaded = load_cached_file_map(
+            f"tnf-{market}",
+            path,
+            lambda data, market=market: (_decode_tnf_names(data, market), None),
+        )
+        if loaded is not None:
+            symbol_name_map.update({str(key): str(value) for key, value in loaded[0].items()})
 
-            raw_name = record[31 : 31 + 16]
-            name = raw_name.split(b"\x00", 1)[0].decode("gbk", "ignore").strip()
-            if not name:
-                continue
+    return symbol_name_map
 
-            symbol = f"{market}{code}"
-            symbol_name_map[symbol] = name
 
-    return symbol_name_map
+def _decode_tnf_names(data: bytes, market: str) -> dict[str, object]:
+    if len(data) <= TNF_HEADER_SIZE + TNF_RECORD_SIZE:
+        return {}
+    count = (len(data) - TNF_HEADER_SIZE) // TNF_RECORD_SIZE
+    records = np.frombuffer(data, dtype=np.uint8, count=count * TNF_RECORD_SIZE, offset=TNF_HEADER_SIZE)
+    records = records.reshape(count, TNF_RECORD_SIZE)
+    # 代码列必须是 6 位 ASCII 数字；名称只为通过的记录做 GBK 解码。
+    code_bytes = records[:, 0:6]
+    keep = np.all((code_bytes >= ord("0")) & (code_bytes <= ord("9")), axis=1)
+    codes = np.ascontiguousarray(code_bytes[keep]).view("S6").ravel()
+    names = np.ascontiguousarray(records[keep, 31 : 31 + 16]).view("S16").ravel()
+    result: dict[str, object] = {}
+    for code, raw_name in zip(codes.tolist(), names.tolist()):
+        name = raw_name.split(b"\x00", 1)[0].decode("gbk", "ignore").strip()
+        if name:
+            result[f"{market}{code.decode('ascii')}"] = name
+    return result
 
 
 def _decode_ascii_field(raw: bytes) -> str:
@@ -180,12 +256,18 @@ def _market_from_dbf_sc(sc_value: str) -> str | None:
     return None
 
 
+def _base_dbf_candidates(tdx_root: str) -> list[Path]:
+    base = _resolve_tdx_base_dir(tdx_root)
+    return [base / "T0002" / "hq_cache" / "base.dbf", base / "base.dbf"]
+
+
 def _load_float_shares_from_base_dbf(
     tdx_root: str,
     markets: list[str],
 ) -> tuple[dict[str, float], str | None]:
-    base = _resolve_tdx_base_dir(tdx_root)
-    candidates = [base / "T0002" / "hq_cache" / "base.dbf", base / "base.dbf"]
+    from .tdx_meta_cache import load_cached_file_map
+
+    candidates = _base_dbf_candidates(tdx_root)
     requested_markets = set(markets)
     last_error = "FLOAT_SHARES_DBF_NOT_FOUND"
 
@@ -193,79 +275,111 @@ def _load_float_shares_from_base_dbf(
         if not file_path.exists():
             continue
 
-        try:
-            raw = file_path.read_bytes()
-        except OSError:
+        # 缓存全市场结果，按本次请求的市场过滤；换市场组合不必重新解析。
+        loaded = load_cached_file_map("base-dbf", file_path, _decode_base_dbf_float_shares)
+        if loaded is None:
             last_error = "FLOAT_SHARES_DBF_READ_FAILED"
             continue
-
-        if len(raw) < DBF_HEADER.size:
-            last_error = "FLOAT_SHARES_DBF_INVALID"
+        all_markets, parse_error = loaded
+        if parse_error:
+            last_error = parse_error
             continue
 
-        try:
-            _, _, _, _, record_count, header_len, record_len = DBF_HEADER.unpack(raw[: DBF_HEADER.size])
-        except struct.error:
-            last_error = "FLOAT_SHARES_DBF_INVALID"
-            continue
-
-        if record_count <= 0 or header_len <= DBF_HEADER.size or record_len <= 1:
-            last_error = "FLOAT_SHARES_DBF_EMPTY"
-            continue
+        result = {
+            str(symbol): float(value)  # type: ignore[arg-type]
+            for symbol, value in all_markets.items()
+            if str(symbol)[:2] in requested_markets
+        }
+        if result:
+            return result, None
 
-        fields = _parse_dbf_fields(raw)
-        sc_field = fields.get("SC")
-        code_field = fields.get("GPDM")
-        ltag_field = fields.get("LTAG")
-        if not sc_field or not code_field or not ltag_field:
-            last_error = "FLOAT_SHARES_FIELDS_MISSING"
-            continue
+        last_error = "FLOAT_SHARES_DBF_EMPTY"
 
-        result: dict[str, float] = {}
-        for i in range(record_count):
-            start = header_len + i * record_len
-            record = raw[start : start + record_len]
-            if len(record) < record_len:
-                break
-            if record[0] == 0x2A:  # Deleted record marker.
-                continue
+    return {}, last_error
 
-            sc_value = _decode_ascii_field(
-                record[sc_field["offset"] : sc_field["offset"] + sc_field["length"]]
-            )
-            market = _market_from_dbf_sc(sc_value)
-            if market is None or market not in requested_markets:
-                continue
 
-            code = _decode_ascii_field(
-                record[code_field["offset"] : code_field["offset"] + code_field["length"]]
-            )
-            if len(code) != 6 or not code.isdigit():
-                continue
+def _dbf_text_column(records: np.ndarray, field: DbfField) -> np.ndarray:
+    start = field["offset"]
+    column = np.ascontiguousarray(records[:, start : start + field["length"]])
+    # 等价于逐条 decode("ascii").strip("\x00").strip()：S 类型自动去掉尾部 \x00。
+    return np.char.strip(np.char.strip(column.view(f"S{field['length']}").ravel(), b"\x00"))
 
-            float_shares_10k = _parse_dbf_numeric(
-                record[ltag_field["offset"] : ltag_field["offset"] + ltag_field["length"]]
-            )
-            if float_shares_10k is None or float_shares_10k <= 0:
-                continue
 
-            symbol = f"{market}{code}"
-            result[symbol] = float_shares_10k * 10000.0
+def _dbf_numeric_column(texts: np.ndarray) -> np.ndarray:
+    values = np.full(texts.shape, np.nan, dtype=np.float64)
+    present = np.char.str_len(texts) > 0
+    try:
+        values[present] = texts[present].astype(np.float64)
+    except ValueError:
+        for idx in np.flatnonzero(present).tolist():
+            parsed = _parse_dbf_numeric(bytes(texts[idx]))
+            if parsed is not None:
+                values[idx] = parsed
+    return values
 
-        if result:
-            return result, None
 
-        last_error = "FLOAT_SHARES_DBF_EMPTY"
+def _decode_base_dbf_float_shares(raw: bytes) -> tuple[dict[str, object], str | None]:
+    """Decode every market's float shares from base.dbf; returns ``(map, error)``."""
+    if len(raw) < DBF_HEADER.size:
+        return {}, "FLOAT_SHARES_DBF_INVALID"
 
-    return {}, last_error
+    try:
+        _, _, _, _, record_count, header_len, record_len = DBF_HEADER.unpack(raw[: DBF_HEADER.size])
+    except struct.error:
+        return {}, "FLOAT_SHARES_DBF_INVALID"
+
+    if record_count <= 0 or header_len <= DBF_HEADER.size or record_len <= 1:
+        return {}, "FLOAT_SHARES_DBF_EMPTY"
+
+    fields = _parse_dbf_fields(raw)
+    sc_field = fields.get("SC")
+    code_field = fields.get("GPDM")
+    ltag_field = fields.get("LTAG")
+    if not sc_field or not code_field or not ltag_field:
+        return {}, "FLOAT_SHARES_FIELDS_MISSING"
+
+    complete = max(0, min(int(record_count), (len(raw) - int(header_len)) // int(record_len)))
+    if complete <= 0:
+        return {}, "FLOAT_SHARES_DBF_EMPTY"
+    records = np.frombuffer(raw, dtype=np.uint8, count=complete * record_len, offset=header_len)
+    records = records.reshape(complete, record_len)
+    live = records[:, 0] != 0x2A  # Deleted record marker.
+
+    sc_values = _dbf_text_column(records, sc_field)
+    market_codes = np.full(complete, "", dtype="U2")
+    for sc_value in np.unique(sc_values).tolist():
+        market = _market_from_dbf_sc(sc_value.decode("ascii", "ignore"))
+        if market is not None:
+            market_codes[sc_values == sc_value] = market
+
+    codes = _dbf_text_column(records, code_field)
+    valid_code = (np.char.str_len(codes) == 6) & np.char.isdigit(codes)
+    float_shares_10k = _dbf_numeric_column(_dbf_text_column(records, ltag_field))
+    keep = live & (market_codes != "") & valid_code & (float_shares_10k > 0)
+
+    result: dict[str, object] = {}
+    for market, code, value in zip(
+        market_codes[keep].tolist(),
+        codes[keep].tolist(),
+        (float_shares_10k[keep] * 10000.0).tolist(),
+    ):
+        result[f"{market}{code.decode('ascii')}"] = value
+    if not result:
+        return {}, "FLOAT_SHARES_DBF_EMPTY"
+    return result, None
 
 
-@lru_cache(maxsize=16)
 def _cached_float_shares_from_base_dbf(
     tdx_root: str,
     markets_key: tuple[str, ...],
 ) -> tuple[dict[str, float], str | None]:
-    return _load_float_shares_from_base_dbf(tdx_root, list(markets_key))
+    from .tdx_meta_cache import memoize_by_sources
+
+    return memoize_by_sources(
+        ("base-dbf", str(tdx_root), *markets_key),
+        _base_dbf_candidates(tdx_root),
+        lambda: _load_float_shares_from_base_dbf(tdx_root, list(markets_key)),
+    )
 
 
 def _is_a_share_symbol(symbol: str) -> bool:
@@ -280,7 +394,52 @@ def _is_a_share_symbol(symbol: str) -> bool:
     return False
 
 
-def _parse_day_file(file_path: Path, symbol: str, *, max_bars: int = 360) -> ParsedSeries | None:
+def _decode_day_records(
+    raw: bytes | memoryview | np.ndarray,
+    *,
+    date_to: int | None = None,
+) -> dict[str, np.ndarray]:
+    if isinstance(raw, np.ndarray) and raw.dtype == DAY_RECORD_DTYPE:
+        records = raw
+    else:
+        usable = (len(raw) // DAY_RECORD.size) * DAY_RECORD.size
+        records = np.frombuffer(raw, dtype=DAY_RECORD_DTYPE, count=usable // DAY_RECORD.size)
+
+    days = records["date"].astype(np.int64)
+    close_raw = records["close"]
+    high_raw = records["high"]
+    low_raw = records["low"]
+    keep = (days > 19900101) & (days < 100000000) & (close_raw > 0) & (high_raw > 0) & (low_raw > 0)
+    if date_to is not None:
+        keep &= days <= int(date_to)
+    if not bool(keep.all()):
+        records = records[keep]
+        days = days[keep]
+
+    high = records["high"].astype(np.float64) / 100.0
+    low = records["low"].astype(np.float64) / 100.0
+    swapped = high < low
+    if bool(swapped.any()):
+        high, low = np.where(swapped, low, high), np.where(swapped, high, low)
+
+    return {
+        "day": days,
+        "open": records["open"].astype(np.float64) / 100.0,
+        "high": high,
+        "low": low,
+        "close": records["close"].astype(np.float64) / 100.0,
+        "amount": records["amount"].astype(np.float64),
+        "volume": records["volume"].astype(np.int64),
+    }
+
+
+def _parse_day_file_columns(
+    file_path: Path,
+    symbol: str,
+    *,
+    max_bars: int = 360,
+    as_of_date: str | None = None,
+) -> DayColumns | None:
     try:
         size = file_path.stat().st_size
     except OSError:
@@ -293,14 +452,6 @@ def _parse_day_file(file_path: Path, symbol: str, *, max_bars: int = 360) -> Par
     read_bars = min(total_bars, max(60, int(max_bars)))
     start_offset = (total_bars - read_bars) * DAY_RECORD.size
 
-    dates: list[str] = []
-    open_list: list[float] = []
-    high_list: list[float] = []
-    low_list: list[float] = []
-    close_list: list[float] = []
-    amount_list: list[float] = []
-    volume_list: list[int] = []
-
     try:
         with file_path.open("rb") as fp:
             fp.seek(start_offset)
@@ -308,50 +459,44 @@ def _parse_day_file(file_path: Path, symbol: str, *, max_bars: int = 360) -> Par
     except OSError:
         return None
 
-    for offset in range(0, len(raw), DAY_RECORD.size):
-        chunk = raw[offset : offset + DAY_RECORD.size]
-        if len(chunk) < DAY_RECORD.size:
-            continue
-        day, open_raw, high_raw, low_raw, close_raw, amount_raw, volume_raw, _ = DAY_RECORD.unpack(chunk)
-        if day <= 19900101 or close_raw <= 0 or high_raw <= 0 or low_raw <= 0:
-            continue
-
-        day_text = str(day)
-        if len(day_text) != 8:
-            continue
-        date_text = f"{day_text[0:4]}-{day_text[4:6]}-{day_text[6:8]}"
-
-        open_price = open_raw / 100.0
-        high_price = high_raw / 100.0
-        low_price = low_raw / 100.0
-        close_price = close_raw / 100.0
-        if high_price < low_price:
-            high_price, low_price = low_price, high_price
-
-        dates.append(date_text)
-        open_list.append(round(open_price, 2))
-        high_list.append(round(high_price, 2))
-        low_list.append(round(low_price, 2))
-        close_list.append(round(close_price, 2))
-        amount_list.append(float(amount_raw))
-        volume_list.append(int(volume_raw))
-
-    if len(close_list) < 60:
+    columns = _decode_day_records(raw, date_to=_date_text_to_day_int(as_of_date))
+    if int(columns["close"].size) < 60:
         return None
 
-    return ParsedSeries(
+    return DayColumns(
         symbol=symbol,
         total_bars=int(total_bars),
-        dates=dates,
-        open=open_list,
-        high=high_list,
-        low=low_list,
-        close=close_list,
-        amount=amount_list,
-        volume=volume_list,
+        day=columns["day"],
+        open=columns["open"],
+        high=columns["high"],
+        low=columns["low"],
+        close=columns["close"],
+        amount=columns["amount"],
+        volume=columns["volume"],
+    )
+
+
+def _day_columns_to_series(columns: DayColumns) -> ParsedSeries:
+    return ParsedSeries(
+        symbol=columns["symbol"],
+        total_bars=int(columns["total_bars"]),
+        dates=_day_ints_to_texts(columns["day"]),
+        open=columns["open"].tolist(),
+        high=columns["high"].tolist(),
+        low=columns["low"].tolist(),
+        close=columns["close"].tolist(),
+        amount=columns["amount"].tolist(),
+        volume=columns["volume"].tolist(),
     )
 
 
+def _parse_day_file(file_path: Path, symbol: str, *, max_bars: int = 360) -> ParsedSeries | None:
+    columns = _parse_day_file_columns(file_path, symbol, max_bars=max_bars)
+    if columns is None:
+        return None
+    return _day_columns_to_series(columns)
+
+
 def _to_float(value: str | None) -> float | None:
     if value is None:
         return None
@@ -365,22 +510,21 @@ def _to_float(value: str | None) -> float | None:
         return None
 
 
-def _load_candles_from_akshare_cache(
-    symbol: str,
-    window: int = 120,
-    akshare_cache_dir: str = "",
-) -> list[CandlePoint] | None:
+def _resolve_akshare_cache_file(symbol: str, akshare_cache_dir: str = "") -> Path | None:
     root = _akshare_cache_root(akshare_cache_dir)
     if len(symbol) < 8:
         return None
     symbol = symbol.lower()
     code = symbol[2:]
     candidates = [root / f"{symbol}.csv", root / f"{code}.csv"]
-    target = next((path for path in candidates if path.exists()), None)
-    if target is None:
-        return None
+    return next((path for path in candidates if path.exists()), None)
+
+
+AkshareCsvRow = tuple[str, float, float, float, float, int, float]
 
-    rows: list[CandlePoint] = []
+
+def _parse_akshare_csv_rows(target: Path) -> list[AkshareCsvRow] | None:
+    rows: list[AkshareCsvRow] = []
     try:
         with target.open("r", encoding="utf-8-sig") as fp:
             reader = csv.DictReader(fp)
@@ -411,25 +555,88 @@ def _load_candles_from_akshare_cache(
                 volume = int(max(0.0, volume_value or 0.0))
                 amount = float(amount_value) if amount_value is not None else float(close_price * max(volume, 1))
                 rows.append(
-                    CandlePoint(
-                        time=date_text,
-                        open=round(open_price, 2),
-                        high=round(high_price, 2),
-                        low=round(low_price, 2),
-                        close=round(close_price, 2),
-                        volume=volume,
-                        amount=float(amount),
-                        price_source="approx",
+                    (
+                        date_text,
+                        round(open_price, 2),
+                        round(high_price, 2),
+                        round(low_price, 2),
+                        round(close_price, 2),
+                        volume,
+                        amount,
                     )
                 )
     except OSError:
         return None
+    rows.sort(key=lambda item: item[0])
+    return rows
+
+
+def _akshare_rows_to_columns(rows: list[AkshareCsvRow]) -> dict[str, np.ndarray]:
+    # 日期统一成 yyyymmdd 整数（无法解析的行丢弃），按日期稳定排序。
+    keyed = [(day_int, item) for item in rows if (day_int := _date_text_to_day_int(item[0])) is not None]
+    keyed.sort(key=lambda pair: pair[0])
+    fields = list(zip(*(item for _day_int, item in keyed))) if keyed else [()] * 7
+    return {
+        "day": np.asarray([day_int for day_int, _item in keyed], dtype=np.float64),
+        "open": np.asarray(fields[1], dtype=np.float64),
+        "high": np.asarray(fields[2], dtype=np.float64),
+        "low": np.asarray(fields[3], dtype=np.float64),
+        "close": np.asarray(fields[4], dtype=np.float64),
+        "volume": np.asarray(fields[5], dtype=np.float64),
+        "amount": np.asarray(fields[6], dtype=np.float64),
+    }
 
-    if not rows:
+
+def _load_candle_series_from_akshare_cache(
+    symbol: str,
+    window: int = 120,
+    akshare_cache_dir: str = "",
+) -> CandleSeries | None:
+    from .akshare_sidecar import read_akshare_sidecar, write_akshare_sidecar
+
+    target = _resolve_akshare_cache_file(symbol, akshare_cache_dir)
+    if target is None:
         return None
-    rows.sort(key=lambda item: item.time)
-    start = max(0, len(rows) - max(window, 1))
-    return rows[start:]
+    symbol = symbol.lower()
+
+    stored = _load_columnar_store_columns("akshare", symbol, target, max_bars=max(window, 1), min_bars=1)
+    if stored is not None:
+        return _day_columns_to_candle_series(stored, window=window, price_source="approx")
+
+    columns = read_akshare_sidecar(target, max_bars=max(window, 1))
+    if columns is None:
+        try:
+            stat = target.stat()
+        except OSError:
+            return None
+        rows = _parse_akshare_csv_rows(target)
+        if rows is None:
+            return None
+        columns = _akshare_rows_to_columns(rows)
+        write_akshare_sidecar(target, (int(stat.st_size), int(stat.st_mtime_ns)), columns)
+
+    if columns["close"].size <= 0:
+        return None
+    start = max(0, int(columns["close"].size) - max(window, 1))
+    return CandleSeries.from_arrays(
+        day=columns["day"][start:].astype(np.int32),
+        open=columns["open"][start:],
+        high=columns["high"][start:],
+        low=columns["low"][start:],
+        close=columns["close"][start:],
+        volume=columns["volume"][start:].astype(np.int64),
+        amount=columns["amount"][start:],
+        price_source="approx",
+    )
+
+
+def _load_candles_from_akshare_cache(
+    symbol: str,
+    window: int = 120,
+    akshare_cache_dir: str = "",
+) -> list[CandlePoint] | None:
+    series = _load_candle_series_from_akshare_cache(symbol, window, akshare_cache_dir)
+    return series.to_points() if series is not None else None
 
 
 def _ma_at(prices: list[float], idx: int, period: int) -> float | None:
@@ -566,32 +773,6 @@ def _build_row(
         if pct >= 0.095:
             limit_up_days += 1
 
-    trend_class: TrendClass
-    if limit_up_days >= 2:
-        trend_class = "B"
-    elif ret_window >= 0.5:
-        trend_class = "A_B"
-    elif ret_window > 0:
-        trend_class = "A"
-    else:
-        trend_class = "Unknown"
-
-    stage: Stage
-    if ret_window < 0.30:
-        stage = "Early"
-    elif ret_window <= 0.80:
-        stage = "Mid"
-    else:
-        stage = "Late"
-
-    theme_stage: ThemeStage
-    if ret_window < 0.30:
-        theme_stage = "发酵中"
-    elif ret_window < 0.80 and up_down_volume_ratio >= 1.0:
-        theme_stage = "高潮"
-    else:
-        theme_stage = "退潮"
-
     avg_volume20 = _safe_mean(volume20)
     has_blowoff_top = False
     for idx in range(start20, len(closes)):
@@ -617,121 +798,244 @@ def _build_row(
             has_upper_shadow_risk = True
             break
 
-    score_raw = (
-        45
-        + ret_window * 90
-        + up_down_volume_ratio * 8
-        - pullback_volume_ratio * 15
-        + max(0.0, (0.08 - abs(price_vs_ma20)) * 200)
-    )
-    score = int(round(_clamp(score_raw, 0, 100)))
-    ai_confidence = round(
-        _clamp(
-            0.50 + ret_window * 0.30 + (up_down_volume_ratio - 1.0) * 0.10 - max(0.0, pullback_volume_ratio - 0.8) * 0.2,
-            0.35,
-            0.95,
-        ),
-        2,
-    )
-
-    labels = ["真实数据", "高波动" if trend_class == "B" else "趋势延续"]
-
-    return ScreenerResult(
+    return screener_result_from_metrics(
         symbol=series["symbol"],
-        name=series["symbol"].upper(),
-        latest_price=round(latest, 2),
-        day_change=round(latest - prev, 2),
-        day_change_pct=round((latest - prev) / max(prev, 0.01), 4),
-        score=score,
-        ret40=round(ret_window, 4),
-        turnover20=round(turnover20, 4),
-        amount20=float(_safe_mean(amount20)),
-        amplitude20=round(amplitude20, 4),
-        retrace20=round(retrace20, 4),
+        latest=latest,
+        prev=prev,
+        ret_window=ret_window,
+        turnover20=turnover20,
+        amount20=_safe_mean(amount20),
+        amplitude20=amplitude20,
+        retrace20=retrace20,
         pullback_days=_count_pullback_days(closes),
         ma10_above_ma20_days=ma10_above_ma20_days,
         ma5_above_ma10_days=ma5_above_ma10_days,
-        price_vs_ma20=round(price_vs_ma20, 4),
-        vol_slope20=round(vol_slope20, 4),
-        up_down_volume_ratio=round(up_down_volume_ratio, 4),
-        pullback_volume_ratio=round(pullback_volume_ratio, 4),
+        price_vs_ma20=price_vs_ma20,
+        vol_slope20=vol_slope20,
+        up_down_volume_ratio=up_down_volume_ratio,
+        pullback_volume_ratio=pullback_volume_ratio,
+        limit_up_days=limit_up_days,
         has_blowoff_top=has_blowoff_top,
         has_divergence_5d=has_divergence_5d,
         has_upper_shadow_risk=has_upper_shadow_risk,
-        ai_confidence=ai_confidence,
-        theme_stage=theme_stage,
-        trend_class=trend_class,
-        stage=stage,
-        labels=labels,
-        reject_reasons=[],
         degraded=degraded,
         degraded_reason=degraded_reason,
     )
 
 
-def load_candles_for_symbol(
+def load_candle_series_for_symbol(
     tdx_root: str,
     symbol: str,
     window: int = 120,
     market_data_source: str = "tdx_then_akshare",
     akshare_cache_dir: str = "",
-) -> list[CandlePoint] | None:
+) -> CandleSeries | None:
     if market_data_source not in {"tdx_only", "tdx_then_akshare", "akshare_only"}:
         market_data_source = "tdx_then_akshare"
     use_tdx = market_data_source in {"tdx_only", "tdx_then_akshare"}
     use_akshare = market_data_source in {"akshare_only", "tdx_then_akshare"}
     if not use_tdx:
-        return _load_candles_from_akshare_cache(symbol, window, akshare_cache_dir) if use_akshare else None
+        return _load_candle_series_from_akshare_cache(symbol, window, akshare_cache_dir) if use_akshare else None
 
     root = Path(tdx_root)
     if not root.exists() or len(symbol) < 8:
         if use_akshare:
-            return _load_candles_from_akshare_cache(symbol, window, akshare_cache_dir)
+            return _load_candle_series_from_akshare_cache(symbol, window, akshare_cache_dir)
         return None
 
     market = symbol[:2]
     market_dir = root / market / "lday"
     if not market_dir.exists():
         if use_akshare:
-            return _load_candles_from_akshare_cache(symbol, window, akshare_cache_dir)
+            return _load_candle_series_from_akshare_cache(symbol, window, akshare_cache_dir)
         return None
 
-    file_path = market_dir / f"{symbol}.day"
-    if not file_path.exists() and symbol[2:].isdigit():
-        file_path = market_dir / f"{symbol[2:]}.day"
-    if not file_path.exists():
-        if use_akshare:
-            return _load_candles_from_akshare_cache(symbol, window, akshare_cache_dir)
-        return None
+    reader = _shared_day_reader(tdx_root)
+    file_path = reader.path_of(symbol) if reader is not None else None
+    if file_path is None:
+        file_path = market_dir / f"{symbol}.day"
+        if not file_path.exists() and symbol[2:].isdigit():
+            file_path = market_dir / f"{symbol[2:]}.day"
+        if not file_path.exists():
+            if use_akshare:
+                return _load_candle_series_from_akshare_cache(symbol, window, akshare_cache_dir)
+            return None
 
-    parsed = _parse_day_file(file_path, symbol, max_bars=max(60, int(window)))
-    if not parsed:
+    parse_bars = max(60, int(window))
+    columns = _load_columnar_store_columns("tdx", symbol, file_path, max_bars=parse_bars)
+    if columns is None:
+        if reader is not None and reader.records(symbol) is not None:
+            columns = reader.read_columns(symbol, max_bars=parse_bars)
+        else:
+            columns = _parse_day_file_columns(file_path, symbol, max_bars=parse_bars)
+    if not columns:
         if use_akshare:
-            return _load_candles_from_akshare_cache(symbol, window, akshare_cache_dir)
+            return _load_candle_series_from_akshare_cache(symbol, window, akshare_cache_dir)
         return None
 
-    start = max(0, len(parsed["close"]) - window)
-    points: list[CandlePoint] = []
-    for i in range(start, len(parsed["close"])):
-        points.append(
-            CandlePoint(
-                time=parsed["dates"][i],
-                open=parsed["open"][i],
-                high=parsed["high"][i],
-                low=parsed["low"][i],
-                close=parsed["close"][i],
-                volume=parsed["volume"][i],
-                amount=parsed["amount"][i],
-                price_source="vwap",
-            )
-        )
-    if points:
-        return points
+    series = _day_columns_to_candle_series(columns, window=window, price_source="vwap")
+    if len(series) > 0:
+        return series
     if use_akshare:
-        return _load_candles_from_akshare_cache(symbol, window, akshare_cache_dir)
+        return _load_candle_series_from_akshare_cache(symbol, window, akshare_cache_dir)
     return None
 
 
+def load_candles_for_symbol(
+    tdx_root: str,
+    symbol: str,
+    window: int = 120,
+    market_data_source: str = "tdx_then_akshare",
+    akshare_cache_dir: str = "",
+) -> list[CandlePoint] | None:
+    series = load_candle_series_for_symbol(
+        tdx_root,
+        symbol,
+        window=window,
+        market_data_source=market_data_source,
+        akshare_cache_dir=akshare_cache_dir,
+    )
+    return series.to_points() if series is not None else None
+
+
+def _candles_prefetch_workers() -> int:
+    raw = os.getenv("TDX_TREND_CANDLES_PREFETCH_WORKERS", "").strip()
+    if raw:
+        try:
+            return max(1, int(raw))
+        except Exception:
+            pass
+    cpu_count = os.cpu_count() or 4
+    return max(1, min(8, int(cpu_count)))
+
+
+def _day_file_disk_order(tdx_root: Path, symbol: str, reader: TdxMmapReader | None) -> tuple[int, str]:
+    # 同一目录下按 inode 顺序读取，近似文件在磁盘上的物理顺序，减少机械盘/网络盘上的随机寻道。
+    path = reader.path_of(symbol) if reader is not None else None
+    if path is None:
+        path = tdx_root / symbol[:2] / "lday" / f"{symbol}.day"
+    try:
+        return int(path.stat().st_ino), symbol
+    except OSError:
+        return 0, symbol
+
+
+def load_candle_series_batch(
+    tdx_root: str,
+    symbols: list[str],
+    window: int = 120,
+    market_data_source: str = "tdx_then_akshare",
+    akshare_cache_dir: str = "",
+    max_workers: int | None = None,
+) -> dict[str, CandleSeries | None]:
+    """Load many symbols in one pass: grouped by market directory, walked in on-disk order, chunks read in parallel."""
+    ordered: list[str] = []
+    seen: set[str] = set()
+    for raw in symbols:
+        symbol = str(raw or "").strip().lower()
+        if symbol and symbol not in seen:
+            seen.add(symbol)
+            ordered.append(symbol)
+    if not ordered:
+        return {}
+
+    root = Path(tdx_root)
+    reader = _shared_day_reader(tdx_root) if market_data_source != "akshare_only" else None
+    by_market: dict[str, list[str]] = {}
+    for symbol in ordered:
+        by_market.setdefault(symbol[:2], []).append(symbol)
+    if market_data_source != "akshare_only" and root.exists():
+        for market, items in by_market.items():
+            by_market[market] = [item for _, item in sorted(_day_file_disk_order(root, item, reader) for item in items)]
+
+    def _load_chunk(chunk: list[str]) -> list[tuple[str, CandleSeries | None]]:
+        return [
+            (
+                symbol,
+                load_candle_series_for_symbol(
+                    tdx_root,
+                    symbol,
+                    window=window,
+                    market_data_source=market_data_source,
+                    akshare_cache_dir=akshare_cache_dir,
+                ),
+            )
+            for symbol in chunk
+        ]
+
+    workers = max(1, int(max_workers) if max_workers is not None else _candles_prefetch_workers())
+    # 每个市场目录切成连续分块，每个线程顺序扫过一段相邻文件。
+    chunks: list[list[str]] = []
+    for items in by_market.values():
+        per_chunk = max(1, -(-len(items) // workers))
+        chunks.extend(items[start : start + per_chunk] for start in range(0, len(items), per_chunk))
+
+    out: dict[str, CandleSeries | None] = {}
+    if workers <= 1 or len(chunks) <= 1:
+        for chunk in chunks:
+            out.update(_load_chunk(chunk))
+        return out
+    with ThreadPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+        for loaded in executor.map(_load_chunk, chunks):
+            out.update(loaded)
+    return out
+
+
+def _day_columns_to_candle_series(columns: DayColumns, *, window: int, price_source: PriceSource) -> CandleSeries:
+    start = max(0, int(columns["close"].size) - max(int(window), 1))
+    return CandleSeries.from_arrays(
+        day=columns["day"][start:],
+        open=columns["open"][start:],
+        high=columns["high"][start:],
+        low=columns["low"][start:],
+        close=columns["close"][start:],
+        volume=columns["volume"][start:],
+        amount=columns["amount"][start:],
+        price_source=price_source,
+    )
+
+
+def _load_columnar_store_columns(
+    kind: str,
+    symbol: str,
+    source_path: Path,
+    *,
+    max_bars: int,
+    as_of_date: str | None = None,
+    min_bars: int = 60,
+) -> DayColumns | None:
+    from .columnar_store import get_shared_columnar_store
+
+    try:
+        store = get_shared_columnar_store()
+        if store is None or not store.is_fresh(kind, symbol, source_path):
+            return None
+        columns = store.read_columns(kind, symbol, max_bars=max_bars, as_of_date=as_of_date)
+    except Exception:
+        return None
+    if columns is None or int(columns["close"].size) < min_bars:
+        return None
+    return columns
+
+
+def _shared_scan_index(tdx_root: str | Path) -> TdxScanIndex | None:
+    from .tdx_scan_index import get_shared_tdx_scan_index
+
+    try:
+        return get_shared_tdx_scan_index(tdx_root)
+    except Exception:
+        return None
+
+
+def _shared_day_reader(tdx_root: str) -> TdxMmapReader | None:
+    from .tdx_mmap_reader import get_shared_tdx_mmap_reader
+
+    try:
+        return get_shared_tdx_mmap_reader(tdx_root)
+    except Exception:
+        return None
+
+
 def _input_pool_runtime_cache_enabled() -> bool:
     raw = os.getenv("TDX_TREND_INPUT_POOL_RUNTIME_CACHE", "").strip().lower()
     if not raw:
@@ -794,6 +1098,13 @@ def _decode_day_int_to_text(raw_day: int) -> str | None:
 
 
 def _probe_day_file_bounds(file_path: Path) -> tuple[int, str | None, str | None] | None:
+    index = _shared_scan_index(file_path.parent.parent.parent)
+    if index is not None:
+        bounds = index.bounds(file_path)
+        if bounds is None or bounds[0] < 60:
+            return None
+        return bounds
+
     try:
         size = file_path.stat().st_size
     except OSError:
@@ -877,23 +1188,20 @@ def _save_input_pool_runtime_cache(
                 _INPUT_POOL_RUNTIME_CACHE.pop(old_key, None)
 
 
-def _parse_input_pool_day_file_to_row(
-    *,
+def _parse_day_file_for_as_of(
     file_path: Path,
     symbol: str,
+    *,
     parse_bars: int,
-    return_window_days: int,
     as_of_date: str | None,
-    float_shares: float | None,
-    mapped_name: str | None,
-) -> tuple[ScreenerResult | None, bool]:
+) -> ParsedSeries | None:
     if as_of_date and parse_bars < 3000:
         probed = _probe_day_file_bounds(file_path)
         if probed is None:
-            return None, False
+            return None
         _total_bars, first_day, _last_day = probed
         if first_day and first_day > as_of_date:
-            return None, False
+            return None
 
     parsed = _parse_day_file(file_path, symbol, max_bars=parse_bars)
     if as_of_date and parse_bars < 3000:
@@ -906,6 +1214,42 @@ def _parse_input_pool_day_file_to_row(
                 need_retry_full = True
         if need_retry_full:
             parsed = _parse_day_file(file_path, symbol, max_bars=3000)
+    return parsed
+
+
+def _parse_input_pool_day_file_to_row(
+    *,
+    file_path: Path,
+    symbol: str,
+    parse_bars: int,
+    return_window_days: int,
+    as_of_date: str | None,
+    float_shares: float | None,
+    mapped_name: str | None,
+    reader: TdxMmapReader | None = None,
+) -> tuple[ScreenerResult | None, bool]:
+    window_bars = max(360, int(return_window_days) * 2 + 40)
+    columns = _load_columnar_store_columns(
+        "tdx",
+        symbol,
+        file_path,
+        max_bars=window_bars,
+        as_of_date=as_of_date,
+        min_bars=MIN_ROW_BARS,
+    )
+    mapped = reader is not None and reader.records(symbol) is not None
+    if columns is None and mapped:
+        # mmap 视图可直接按 as_of 定位，无需探测首尾日期或以 3000 根重试。
+        # 文件整体不足 60 根的标的在候选列表阶段已剔除；截断到 as_of 之后只需满足 _build_row 的 40 根下限。
+        columns = reader.read_columns(symbol, max_bars=window_bars, as_of_date=as_of_date, min_bars=MIN_ROW_BARS)
+
+    parsed: ParsedSeries | None
+    if columns is not None:
+        parsed = _day_columns_to_series(columns)
+    elif mapped:
+        parsed = None
+    else:
+        parsed = _parse_day_file_for_as_of(file_path, symbol, parse_bars=parse_bars, as_of_date=as_of_date)
     if not parsed:
         return None, False
 
@@ -917,6 +1261,88 @@ def _parse_input_pool_day_file_to_row(
     return row, bool(row.degraded)
 
 
+def _list_input_pool_candidates(
+    market_dir: Path,
+    market: str,
+    reader: TdxMmapReader | None,
+) -> list[tuple[str, Path]]:
+    candidates: list[tuple[str, Path]] = []
+    if reader is not None:
+        for symbol in reader.symbols(market):
+            records = reader.records(symbol)
+            path = reader.path_of(symbol)
+            if path is None or records is None or records.size < 60 or not _is_a_share_symbol(symbol):
+                continue
+            candidates.append((symbol, path))
+        for symbol, path in reader.unmapped_files(market):
+            # 未映射的文件（超出 fd 预算或映射失败）照常入选，由路径读取兜底。
+            try:
+                if path.stat().st_size < DAY_RECORD.size * 60 or not _is_a_share_symbol(symbol):
+                    continue
+            except OSError:
+                continue
+            candidates.append((symbol, path))
+        return candidates
+    index = _shared_scan_index(market_dir.parent.parent)
+    if index is not None:
+        for entry in index.market_entries(market):
+            if entry.bars < 60 or not _is_a_share_symbol(entry.symbol):
+                continue
+            candidates.append((entry.symbol, Path(entry.path)))
+        return candidates
+    for file_path in market_dir.glob("*.day"):
+        symbol = _normalize_symbol(file_path.stem, market)
+        if not symbol or not _is_a_share_symbol(symbol):
+            continue
+        try:
+            if file_path.stat().st_size < DAY_RECORD.size * 60:
+                continue
+        except OSError:
+            continue
+        candidates.append((symbol, file_path))
+    return candidates
+
+
+def _collect_input_pool_rows_with_processes(
+    root: Path,
+    markets_key: tuple[str, ...],
+    reader: TdxMmapReader | None,
+    *,
+    as_of_dates: list[str | None],
+    return_window_days: int,
+    float_shares_map: dict[str, float],
+    symbol_name_map: dict[str, str],
+    deadline_ts: float | None,
+) -> tuple[list[list[ScreenerResult]], list[int], bool] | None:
+    from .input_pool_process import (
+        INPUT_POOL_PROCESS_MIN_CANDIDATES,
+        collect_input_pool_rows_in_processes,
+        input_pool_process_pool_enabled,
+    )
+
+    if not input_pool_process_pool_enabled():
+        return None
+    candidates: list[tuple[str, Path]] = []
+    for market in markets_key:
+        market_dir = root / market / "lday"
+        if market_dir.exists():
+            candidates.extend(_list_input_pool_candidates(market_dir, market, reader))
+    if len(candidates) < INPUT_POOL_PROCESS_MIN_CANDIDATES:
+        return None
+    try:
+        return collect_input_pool_rows_in_processes(
+            candidates,
+            as_of_dates=as_of_dates,
+            return_window_days=return_window_days,
+            float_shares_map=float_shares_map,
+            symbol_name_map=symbol_name_map,
+            deadline_ts=deadline_ts,
+        )
+    except (OSError, RuntimeError):
+        # 共享内存/进程池不可用（受限容器等）时回退线程池。
+        return None
+
+
 def load_input_pool_from_tdx(
     tdx_root: str,
     markets: list[str],
@@ -950,79 +1376,106 @@ def load_input_pool_from_tdx(
     deadline_ts = (time.perf_counter() + timeout_sec) if timeout_sec is not None else None
     timed_out = False
     load_workers = _input_pool_load_workers()
-    for market in markets_key:
-        if deadline_ts is not None and time.perf_counter() >= deadline_ts:
-            timed_out = True
-            break
-        market_dir = root / market / "lday"
-        if not market_dir.exists():
-            continue
-
-        candidates: list[tuple[str, Path]] = []
-        for file_path in market_dir.glob("*.day"):
-            symbol = _normalize_symbol(file_path.stem, market)
-            if not symbol or not _is_a_share_symbol(symbol):
+    reader = _shared_day_reader(tdx_root)
+    process_result = _collect_input_pool_rows_with_processes(
+        root,
+        markets_key,
+        reader,
+        as_of_dates=[as_of_date],
+        return_window_days=return_window_days,
+        float_shares_map=float_shares_map,
+        symbol_name_map=symbol_name_map,
+        deadline_ts=deadline_ts,
+    )
+    if process_result is not None:
+        rows_by_pos, missing_by_pos, timed_out = process_result
+        rows = rows_by_pos[0]
+        missing_float_shares = missing_by_pos[0]
+    else:
+        for market in markets_key:
+            if deadline_ts is not None and time.perf_counter() >= deadline_ts:
+                timed_out = True
+                break
+            market_dir = root / market / "lday"
+            if not market_dir.exists():
                 continue
-            try:
-                if file_path.stat().st_size < DAY_RECORD.size * 60:
-                    continue
-            except OSError:
+
+            candidates = _list_input_pool_candidates(market_dir, market, reader)
+            if not candidates:
                 continue
-            candidates.append((symbol, file_path))
-        if not candidates:
-            continue
 
-        def _parse_candidate(candidate: tuple[str, Path]) -> tuple[ScreenerResult | None, bool]:
-            symbol_local, path_local = candidate
-            return _parse_input_pool_day_file_to_row(
-                file_path=path_local,
-                symbol=symbol_local,
-                parse_bars=parse_bars,
-                return_window_days=return_window_days,
-                as_of_date=as_of_date,
-                float_shares=float_shares_map.get(symbol_local),
-                mapped_name=symbol_name_map.get(symbol_local),
-            )
+            def _parse_candidate(candidate: tuple[str, Path]) -> tuple[ScreenerResult | None, bool]:
+                symbol_local, path_local = candidate
+                return _parse_input_pool_day_file_to_row(
+                    file_path=path_local,
+                    symbol=symbol_local,
+                    parse_bars=parse_bars,
+                    return_window_days=return_window_days,
+                    as_of_date=as_of_date,
+                    float_shares=float_shares_map.get(symbol_local),
+                    mapped_name=symbol_name_map.get(symbol_local),
+                    reader=reader,
+                )
 
-        if load_workers <= 1 or len(candidates) <= 1:
-            for candidate in candidates:
-                if deadline_ts is not None and time.perf_counter() >= deadline_ts:
-                    timed_out = True
-                    break
-                row, degraded = _parse_candidate(candidate)
-                if row is None:
-                    continue
-                if degraded:
-                    missing_float_shares += 1
-                rows.append(row)
-        else:
-            worker_count = max(1, min(load_workers, len(candidates)))
-            executor = ThreadPoolExecutor(max_workers=worker_count)
-            future_map = {
-                executor.submit(_parse_candidate, candidate): candidate[0]
-                for candidate in candidates
-            }
-            try:
-                timeout_left = None
-                if deadline_ts is not None:
-                    timeout_left = max(0.0, deadline_ts - time.perf_counter())
-                for future in as_completed(future_map, timeout=timeout_left):
-                    try:
-                        row, degraded = future.result()
-                    except Exception:
-                        continue
+            if load_workers <= 1 or len(candidates) <= 1:
+                for candidate in candidates:
+                    if deadline_ts is not None and time.perf_counter() >= deadline_ts:
+                        timed_out = True
+                        break
+                    row, degraded = _parse_candidate(candidate)
                     if row is None:
                         continue
                     if degraded:
                         missing_float_shares += 1
                     rows.append(row)
-            except FuturesTimeoutError:
-                timed_out = True
-            finally:
-                executor.shutdown(wait=not timed_out, cancel_futures=timed_out)
-        if timed_out:
-            break
+            else:
+                worker_count = max(1, min(load_workers, len(candidates)))
+                executor = ThreadPoolExecutor(max_workers=worker_count)
+                future_map = {
+                    executor.submit(_parse_candidate, candidate): candidate[0]
+                    for candidate in candidates
+                }
+                try:
+                    timeout_left = None
+                    if deadline_ts is not None:
+                        timeout_left = max(0.0, deadline_ts - time.perf_counter())
+                    for future in as_completed(future_map, timeout=timeout_left):
+                        try:
+                            row, degraded = future.result()
+                        except Exception:
+                            continue
+                        if row is None:
+                            continue
+                        if degraded:
+                            missing_float_shares += 1
+                        rows.append(row)
+                except FuturesTimeoutError:
+                    timed_out = True
+                finally:
+                    executor.shutdown(wait=not timed_out, cancel_futures=timed_out)
+            if timed_out:
+                break
 
+    rows, result_error = _finalize_input_pool_rows(
+        rows,
+        float_shares_map=float_shares_map,
+        float_shares_error=float_shares_error,
+        missing_float_shares=missing_float_shares,
+        timed_out=timed_out,
+    )
+    if rows and _input_pool_runtime_cache_enabled():
+        _save_input_pool_runtime_cache(cache_key, rows, result_error)
+    return rows, result_error
+
+
+def _finalize_input_pool_rows(
+    rows: list[ScreenerResult],
+    *,
+    float_shares_map: dict[str, float],
+    float_shares_error: str | None,
+    missing_float_shares: int,
+    timed_out: bool,
+) -> tuple[list[ScreenerResult], str | None]:
     if not rows:
         if timed_out:
             return [], "INPUT_POOL_LOAD_TIMEOUT"
@@ -1038,116 +1491,384 @@ def load_input_pool_from_tdx(
     if timed_out:
         timeout_error = "INPUT_POOL_LOAD_TIMEOUT_PARTIAL"
         result_error = f"{result_error}|{timeout_error}" if result_error else timeout_error
-
-    if _input_pool_runtime_cache_enabled():
-        _save_input_pool_runtime_cache(cache_key, rows, result_error)
     return rows, result_error
 
 
-def _decode_lc1_date(raw_date: int) -> str | None:
-    date_part = raw_date & 0x07FF
-    year = (raw_date >> 11) + 2004
-    month = date_part // 100
-    day = date_part % 100
-    if year < 2004 or not (1 <= month <= 12) or not (1 <= day <= 31):
+def _load_day_columns_through(
+    file_path: Path,
+    symbol: str,
+    *,
+    as_of_date: str | None,
+    reader: TdxMmapReader | None,
+) -> DayColumns | None:
+    try:
+        total_bars = int(file_path.stat().st_size // DAY_RECORD.size)
+    except OSError:
         return None
-    return f"{year:04d}-{month:02d}-{day:02d}"
+    columns = _load_columnar_store_columns(
+        "tdx",
+        symbol,
+        file_path,
+        max_bars=total_bars,
+        as_of_date=as_of_date,
+        min_bars=MIN_ROW_BARS,
+    )
+    if columns is not None:
+        return columns
+    if reader is not None and reader.records(symbol) is not None:
+        return reader.read_columns(symbol, max_bars=total_bars, as_of_date=as_of_date, min_bars=MIN_ROW_BARS)
+    return _parse_day_file_columns(file_path, symbol, max_bars=total_bars, as_of_date=as_of_date)
 
 
-def _decode_lc1_time(raw_time: int) -> str | None:
-    hour = raw_time // 60
-    minute = raw_time % 60
-    if not (0 <= hour <= 23 and 0 <= minute <= 59):
-        return None
-    return f"{hour:02d}:{minute:02d}"
+def _build_rows_for_dates(
+    columns: DayColumns,
+    as_of_days: np.ndarray,
+    *,
+    return_window_days: int,
+    float_shares: float | None,
+    mapped_name: str | None,
+) -> list[ScreenerResult | None]:
+    out: list[ScreenerResult | None] = [None] * int(as_of_days.size)
+    if int(columns["total_bars"]) < MIN_TOTAL_BARS:
+        return out
+    ends = resolve_row_ends(columns["day"], as_of_days, return_window_days=return_window_days)
+    picked = np.flatnonzero(ends >= 0)
+    if picked.size <= 0:
+        return out
+    metrics = compute_row_metrics(
+        close=columns["close"],
+        high=columns["high"],
+        low=columns["low"],
+        open_=columns["open"],
+        volume=columns["volume"],
+        amount=columns["amount"],
+        ends=ends[picked],
+        return_window_days=return_window_days,
+        float_shares=float_shares,
+    )
+    rows = screener_results_from_metric_arrays(
+        metrics,
+        symbol=columns["symbol"],
+        positions=list(range(int(picked.size))),
+        float_shares=float_shares,
+        name=mapped_name,
+    )
+    for pos, row in zip(picked.tolist(), rows):
+        out[pos] = row
+    return out
 
 
-def load_intraday_for_symbol_date(
+def load_input_pool_from_tdx_by_dates(
     tdx_root: str,
-    symbol: str,
-    target_date: str,
-) -> tuple[list[IntradayPoint] | None, str | None]:
+    markets: list[str],
+    return_window_days: int,
+    as_of_dates: list[str | None],
+    load_timeout_sec: float | None = None,
+) -> dict[str | None, tuple[list[ScreenerResult], str | None]]:
+    """Build the input pool for many as-of dates, parsing each symbol's .day file once.
+
+    Row metrics for all requested dates are evaluated in one array sweep per symbol, with the
+    same outputs as calling :func:`load_input_pool_from_tdx` once per date.
+    """
+    requested = list(dict.fromkeys(as_of_dates))
+    if not requested:
+        return {}
+    root = Path(tdx_root)
+    if not root.exists():
+        return {day: ([], "TDX_PATH_NOT_FOUND") for day in requested}
+
+    normalized_markets = [str(market).strip().lower() for market in markets if str(market).strip()]
+    markets_key = tuple(sorted(set(normalized_markets)))
+    symbol_name_map = _cached_symbol_name_map_from_tnf(tdx_root, markets_key)
+    float_shares_map, float_shares_error = _cached_float_shares_from_base_dbf(tdx_root, markets_key)
+    as_of_days = np.asarray(
+        [_date_text_to_day_int(day) or 99_999_999 for day in requested],
+        dtype=np.int64,
+    )
+    latest_needed = None if any(not day for day in requested) else max(str(day) for day in requested)
+    timeout_sec = _normalize_input_pool_load_timeout_sec(load_timeout_sec)
+    deadline_ts = (time.perf_counter() + timeout_sec) if timeout_sec is not None else None
+    timed_out = False
+    load_workers = _input_pool_load_workers()
+    reader = _shared_day_reader(tdx_root)
+
+    rows_by_pos: list[list[ScreenerResult]] = [[] for _ in requested]
+    missing_by_pos = [0] * len(requested)
+
+    def _parse_candidate(candidate: tuple[str, Path]) -> list[ScreenerResult | None]:
+        symbol_local, path_local = candidate
+        columns = _load_day_columns_through(path_local, symbol_local, as_of_date=latest_needed, reader=reader)
+        if columns is None:
+            return [None] * len(requested)
+        return _build_rows_for_dates(
+            columns,
+            as_of_days,
+            return_window_days=return_window_days,
+            float_shares=float_shares_map.get(symbol_local),
+            mapped_name=symbol_name_map.get(symbol_local),
+        )
+
+    def _collect(per_date: list[ScreenerResult | None]) -> None:
+        for pos, row in enumerate(per_date):
+            if row is None:
+                continue
+            if row.degraded:
+                missing_by_pos[pos] += 1
+            rows_by_pos[pos].append(row)
+
+    process_result = _collect_input_pool_rows_with_processes(
+        root,
+        markets_key,
+        reader,
+        as_of_dates=requested,
+        return_window_days=return_window_days,
+        float_shares_map=float_shares_map,
+        symbol_name_map=symbol_name_map,
+        deadline_ts=deadline_ts,
+    )
+    if process_result is not None:
+        rows_by_pos, missing_by_pos, timed_out = process_result
+    else:
+        for market in markets_key:
+            if deadline_ts is not None and time.perf_counter() >= deadline_ts:
+                timed_out = True
+                break
+            market_dir = root / market / "lday"
+            if not market_dir.exists():
+                continue
+            candidates = _list_input_pool_candidates(market_dir, market, reader)
+            if not candidates:
+                continue
+
+            if load_workers <= 1 or len(candidates) <= 1:
+                for candidate in candidates:
+                    if deadline_ts is not None and time.perf_counter() >= deadline_ts:
+                        timed_out = True
+                        break
+                    _collect(_parse_candidate(candidate))
+            else:
+                executor = ThreadPoolExecutor(max_workers=max(1, min(load_workers, len(candidates))))
+                futures = [executor.submit(_parse_candidate, candidate) for candidate in candidates]
+                try:
+                    timeout_left = None
+                    if deadline_ts is not None:
+                        timeout_left = max(0.0, deadline_ts - time.perf_counter())
+                    for future in as_completed(futures, timeout=timeout_left):
+                        try:
+                            _collect(future.result())
+                        except Exception:
+                            continue
+                except FuturesTimeoutError:
+                    timed_out = True
+                finally:
+                    executor.shutdown(wait=not timed_out, cancel_futures=timed_out)
+            if timed_out:
+                break
+
+    out: dict[str | None, tuple[list[ScreenerResult], str | None]] = {}
+    for pos, day in enumerate(requested):
+        rows, result_error = _finalize_input_pool_rows(
+            rows_by_pos[pos],
+            float_shares_map=float_shares_map,
+            float_shares_error=float_shares_error,
+            missing_float_shares=missing_by_pos[pos],
+            timed_out=timed_out,
+        )
+        if rows and _input_pool_runtime_cache_enabled():
+            cache_key = _input_pool_runtime_cache_key(
+                tdx_root=tdx_root,
+                markets=normalized_markets,
+                return_window_days=return_window_days,
+                as_of_date=day,
+            )
+            _save_input_pool_runtime_cache(cache_key, rows, result_error)
+        out[day] = (rows, result_error)
+    return out
+
+
+def _resolve_lc1_file(tdx_root: str, symbol: str) -> Path | None:
     root = Path(tdx_root)
     if not root.exists() or len(symbol) < 8:
-        return None, None
+        return None
 
     market = symbol[:2]
     market_dir = root / market / "minline"
     if not market_dir.exists():
-        return None, None
+        return None
 
     file_path = market_dir / f"{symbol}.lc1"
     if not file_path.exists() and symbol[2:].isdigit():
         file_path = market_dir / f"{symbol[2:]}.lc1"
     if not file_path.exists():
-        return None, None
+        return None
+    return file_path
+
 
+def _decode_lc1_day_ints(raw_dates: np.ndarray) -> np.ndarray:
+    """Decode packed .lc1 dates (``(year - 2004) << 11 | month * 100 + day``) to ``yyyymmdd``; ``0`` when invalid."""
+    raw = raw_dates.astype(np.int64)
+    date_part = raw & 0x07FF
+    year = (raw >> 11) + 2004
+    month = date_part // 100
+    day = date_part % 100
+    valid = (year >= 2004) & (month >= 1) & (month <= 12) & (day >= 1) & (day <= 31)
+    return np.where(valid, year * 10000 + month * 100 + day, 0)
+
+
+def _lc1_index_for_file(file_path: Path) -> Lc1DateIndex | None:
     try:
-        raw = file_path.read_bytes()
+        stat = file_path.stat()
     except OSError:
-        return None, None
-
-    if len(raw) < LC1_RECORD.size:
-        return None, None
+        return None
+    key = str(file_path)
+    with _LC1_INDEX_LOCK:
+        cached = _LC1_INDEX_CACHE.get(key)
+        if cached is not None and cached.size == stat.st_size and cached.mtime_ns == stat.st_mtime_ns:
+            _LC1_INDEX_CACHE.move_to_end(key)
+            return cached
 
-    by_date: dict[str, list[tuple[str, float, float, int]]] = {}
-    for offset in range(0, len(raw), LC1_RECORD.size):
-        chunk = raw[offset : offset + LC1_RECORD.size]
-        if len(chunk) < LC1_RECORD.size:
-            continue
-        (
-            raw_date,
-            raw_time,
-            _open_price,
-            _high_price,
-            _low_price,
-            close_price,
-            amount,
-            volume,
-            _reserved,
-        ) = LC1_RECORD.unpack(chunk)
-
-        date_text = _decode_lc1_date(raw_date)
-        time_text = _decode_lc1_time(raw_time)
-        if date_text is None or time_text is None:
-            continue
+    total = int(stat.st_size // LC1_RECORD.size)
+    if total <= 0:
+        return None
+    try:
+        raw_dates = np.fromfile(file_path, dtype=LC1_RECORD_DTYPE, count=total)["date"]
+    except (OSError, ValueError):
+        return None
+    day_ints = _decode_lc1_day_ints(raw_dates)
+    # 以连续同日记录为一段：date -> [(起始记录号, 记录数), ...]，通常每日只有一段。
+    breaks = np.flatnonzero(np.diff(day_ints)) + 1
+    starts = np.concatenate([[0], breaks]).astype(np.int64)
+    counts = np.diff(np.concatenate([starts, [day_ints.size]])).astype(np.int64)
+    runs: dict[int, list[tuple[int, int]]] = {}
+    for start, count, day_int in zip(starts.tolist(), counts.tolist(), day_ints[starts].tolist()):
+        if day_int > 0:
+            runs.setdefault(int(day_int), []).append((int(start), int(count)))
+    index = Lc1DateIndex(
+        size=int(stat.st_size),
+        mtime_ns=int(stat.st_mtime_ns),
+        day_ints=sorted(runs),
+        runs=runs,
+    )
+    with _LC1_INDEX_LOCK:
+        _LC1_INDEX_CACHE[key] = index
+        _LC1_INDEX_CACHE.move_to_end(key)
+        while len(_LC1_INDEX_CACHE) > _LC1_INDEX_CACHE_MAX_FILES:
+            _LC1_INDEX_CACHE.popitem(last=False)
+    return index
 
-        if close_price <= 0:
-            continue
 
-        by_date.setdefault(date_text, []).append(
-            (time_text, float(close_price), float(amount), max(0, int(volume)))
+def _read_lc1_runs(file_path: Path, runs: list[tuple[int, int]]) -> np.ndarray | None:
+    chunks: list[bytes] = []
+    try:
+        with file_path.open("rb") as fp:
+            for start, count in runs:
+                fp.seek(start * LC1_RECORD.size)
+                chunks.append(fp.read(count * LC1_RECORD.size))
+    except OSError:
+        return None
+    raw = b"".join(chunks)
+    return np.frombuffer(raw, dtype=LC1_RECORD_DTYPE, count=len(raw) // LC1_RECORD.size)
+
+
+def _lc1_records_to_points(records: np.ndarray) -> list[IntradayPoint]:
+    raw_time = records["time"].astype(np.int64)
+    close = records["close"].astype(np.float64)
+    keep = (raw_time // 60 <= 23) & (close > 0)
+    if not bool(np.any(keep)):
+        return []
+    raw_time = raw_time[keep]
+    order = np.argsort(raw_time, kind="stable")
+    raw_time = raw_time[order]
+    close = close[keep][order]
+    amount = records["amount"][keep][order].astype(np.float64)
+    volume = records["volume"][keep][order].astype(np.int64)
+
+    counted_volume = np.maximum(volume, 1)
+    effective_amount = np.where(amount > 0, amount, close * counted_volume)
+    avg_price = np.cumsum(effective_amount) / np.maximum(np.cumsum(counted_volume), 1)
+
+    times = [f"{minute // 60:02d}:{minute % 60:02d}" for minute in raw_time.tolist()]
+    points = [
+        IntradayPoint(
+            time=time_text,
+            price=round(price, 2),
+            avg_price=round(avg, 2),
+            volume=max(vol, 0),
+            price_source="vwap",
         )
+        for time_text, price, avg, vol in zip(times, close.tolist(), avg_price.tolist(), volume.tolist())
+    ]
+    if points:
+        last_avg = float(avg_price[-1])
+        points[0] = points[0].model_copy(update={"avg_price": round(last_avg if len(points) == 1 else points[0].price, 2)})
+    return points
 
-    if not by_date:
-        return None, None
 
-    selected_date = target_date if target_date and target_date in by_date else max(by_date.keys())
-    day_rows = sorted(by_date[selected_date], key=lambda item: item[0])
-    if not day_rows:
-        return None, None
+def list_intraday_dates(tdx_root: str, symbol: str) -> list[str]:
+    file_path = _resolve_lc1_file(tdx_root, symbol)
+    index = _lc1_index_for_file(file_path) if file_path is not None else None
+    if index is None:
+        return []
+    return _day_ints_to_texts(np.asarray(index.day_ints, dtype=np.int64))
 
-    points: list[IntradayPoint] = []
-    turnover = 0.0
-    total_volume = 0
-    last_avg = day_rows[0][1]
-    for time_text, close_price, amount, volume in day_rows:
-        effective_amount = amount if amount > 0 else close_price * max(volume, 1)
-        turnover += effective_amount
-        total_volume += max(volume, 1)
-        avg_price = turnover / max(total_volume, 1)
-        last_avg = avg_price
-        points.append(
-            IntradayPoint(
-                time=time_text,
-                price=round(close_price, 2),
-                avg_price=round(avg_price, 2),
-                volume=max(volume, 0),
-                price_source="vwap",
-            )
-        )
 
-    if points:
-        points[0] = points[0].model_copy(update={"avg_price": round(last_avg if len(points) == 1 else points[0].price, 2)})
+def load_intraday_for_symbol_dates(
+    tdx_root: str,
+    symbol: str,
+    dates: list[str] | None = None,
+    *,
+    date_from: str | None = None,
+    date_to: str | None = None,
+) -> dict[str, list[IntradayPoint]]:
+    """Load minute points for several days of one ``.lc1`` file, reading only the indexed records.
+
+    ``dates`` selects explicit days; otherwise every indexed day within ``[date_from, date_to]``.
+    Days without usable records are omitted.
+    """
+    file_path = _resolve_lc1_file(tdx_root, symbol)
+    index = _lc1_index_for_file(file_path) if file_path is not None else None
+    if file_path is None or index is None:
+        return {}
+    if dates is not None:
+        wanted = [day_int for day_int in (_date_text_to_day_int(day) for day in dates) if day_int in index.runs]
+    else:
+        from_int = _date_text_to_day_int(date_from) or 0
+        to_int = _date_text_to_day_int(date_to) or 99_999_999
+        wanted = [day_int for day_int in index.day_ints if from_int <= day_int <= to_int]
+
+    out: dict[str, list[IntradayPoint]] = {}
+    for day_int in sorted(set(wanted)):
+        records = _read_lc1_runs(file_path, index.runs[day_int])
+        if records is None:
+            continue
+        points = _lc1_records_to_points(records)
+        if points:
+            out[_day_ints_to_texts(np.asarray([day_int], dtype=np.int64))[0]] = points
+    return out
+
+
+def load_intraday_for_symbol_date(
+    tdx_root: str,
+    symbol: str,
+    target_date: str,
+) -> tuple[list[IntradayPoint] | None, str | None]:
+    file_path = _resolve_lc1_file(tdx_root, symbol)
+    if file_path is None:
+        return None, None
+    index = _lc1_index_for_file(file_path)
+    if index is None or not index.day_ints:
+        return None, None
 
-    return points, selected_date
+    # 目标日无有效分时记录时，回退到最近一个有有效记录的交易日。
+    target_int = _date_text_to_day_int(target_date) if target_date else None
+    order = list(reversed(index.day_ints))
+    if target_int in index.runs:
+        order.insert(0, target_int)
+    for selected_int in order:
+        records = _read_lc1_runs(file_path, index.runs[selected_int])
+        if records is None:
+            return None, None
+        points = _lc1_records_to_points(records)
+        if points:
+            return points, _day_ints_to_texts(np.asarray([selected_int], dtype=np.int64))[0]
+    return None, None
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from threading import RLock
+from typing import Callable, TypeVar
+
+import numpy as np
+
+# 通达信静态元数据（shs/szs/bjs.tnf 名称表、base.dbf 流通股本）的磁盘缓存。
+# 每个源文件对应一个 .npz（keys + values 两列 + meta JSON），以源文件路径/大小/mtime 校验，
+# 冷启动或切换市场组合时不必重新解析多 MB 的 DBF。
+
+_META_CACHE_VERSION = 1
+_MEMORY_CACHE: dict[tuple[str, str], tuple[int, int, dict[str, object], str | None]] = {}
+_MEMORY_CACHE_LOCK = RLock()
+# 由源文件表派生的结果（按市场过滤/合并后的映射）：以全部源文件的路径/大小/mtime 为签名的进程内备忘。
+_DERIVED_MEMO: dict[tuple[str, ...], tuple[tuple[tuple[str, int, int], ...], object]] = {}
+_DERIVED_MEMO_MAX_ITEMS = 16
+
+T = TypeVar("T")
+
+
+def tdx_meta_cache_enabled() -> bool:
+    raw = os.getenv("TDX_TREND_TDX_META_CACHE", "").strip().lower()
+    if not raw:
+        return True
+    return raw not in {"0", "false", "no", "off"}
+
+
+def _tdx_meta_cache_dir() -> Path:
+    raw = os.getenv("TDX_TREND_TDX_META_CACHE_DIR", "").strip()
+    if raw:
+        return Path(os.path.expanduser(os.path.expandvars(raw)))
+    return Path.home() / ".tdx-trend" / "tdx-meta-cache"
+
+
+def _cache_file(kind: str, source_path: Path) -> Path:
+    digest = hashlib.sha1(f"{kind}|{source_path}".encode("utf-8")).hexdigest()[:20]
+    return _tdx_meta_cache_dir() / f"{kind}-{digest}.npz"
+
+
+def _read_disk_cache(
+    cache_path: Path,
+    *,
+    kind: str,
+    source_path: Path,
+    size: int,
+    mtime_ns: int,
+) -> tuple[dict[str, object], str | None] | None:
+    if not cache_path.exists():
+        return None
+    try:
+        with np.load(cache_path, allow_pickle=False) as payload:
+            meta = json.loads(str(payload["meta"]))
+            if (
+                int(meta.get("version", 0)) != _META_CACHE_VERSION
+                or meta.get("kind") != kind
+                or meta.get("source") != str(source_path)
+                or int(meta.get("size", -1)) != size
+                or int(meta.get("mtime_ns", -1)) != mtime_ns
+            ):
+                return None
+            keys = payload["keys"].tolist()
+            values = payload["values"].tolist()
+    except Exception:
+        return None
+    error = meta.get("error")
+    return dict(zip(keys, values)), (str(error) if error else None)
+
+
+def _write_disk_cache(
+    cache_path: Path,
+    *,
+    kind: str,
+    source_path: Path,
+    size: int,
+    mtime_ns: int,
+    mapping: dict[str, object],
+    error: str | None,
+) -> None:
+    meta = {
+        "version": _META_CACHE_VERSION,
+        "kind": kind,
+        "source": str(source_path),
+        "size": size,
+        "mtime_ns": mtime_ns,
+        "error": error,
+    }
+    keys = np.asarray(list(mapping.keys()), dtype=str)
+    values = np.asarray(list(mapping.values()))
+    if values.dtype == object:
+        values = values.astype(str)
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_name(f"{cache_path.stem}.tmp.npz")
+        np.savez(tmp_path, meta=np.asarray(json.dumps(meta)), keys=keys, values=values)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        return
+
+
+def load_cached_file_map(
+    kind: str,
+    source_path: Path,
+    parse: Callable[[bytes], tuple[dict[str, object], str | None]],
+) -> tuple[dict[str, object], str | None] | None:
+    """Return ``parse(source bytes)`` for ``source_path``, reusing memory/disk copies while size and mtime match.
+
+    Returns ``None`` when the source file cannot be read.
+    """
+    try:
+        stat = source_path.stat()
+    except OSError:
+        return None
+    size = int(stat.st_size)
+    mtime_ns = int(stat.st_mtime_ns)
+    memory_key = (kind, str(source_path))
+    with _MEMORY_CACHE_LOCK:
+        cached = _MEMORY_CACHE.get(memory_key)
+    if cached is not None and cached[0] == size and cached[1] == mtime_ns:
+        return cached[2], cached[3]
+
+    use_disk = tdx_meta_cache_enabled()
+    cache_path = _cache_file(kind, source_path)
+    result = (
+        _read_disk_cache(cache_path, kind=kind, source_path=source_path, size=size, mtime_ns=mtime_ns)
+        if use_disk
+        else None
+    )
+    if result is None:
+        try:
+            raw = source_path.read_bytes()
+        except OSError:
+            return None
+        result = parse(raw)
+        if use_disk:
+            _write_disk_cache(
+                cache_path,
+                kind=kind,
+                source_path=source_path,
+                size=size,
+                mtime_ns=mtime_ns,
+                mapping=result[0],
+                error=result[1],
+            )
+    with _MEMORY_CACHE_LOCK:
+        _MEMORY_CACHE[memory_key] = (size, mtime_ns, result[0], result[1])
+    return result
+
+
+def _sources_signature(paths: list[Path]) -> tuple[tuple[str, int, int], ...]:
+    signature: list[tuple[str, int, int]] = []
+    for path in paths:
+        try:
+            stat = path.stat()
+        except OSError:
+            signature.append((str(path), -1, -1))
+            continue
+        signature.append((str(path), int(stat.st_size), int(stat.st_mtime_ns)))
+    return tuple(signature)
+
+
+def memoize_by_sources(key: tuple[str, ...], paths: list[Path], load: Callable[[], T]) -> T:
+    """Return ``load()``, reusing the in-process result while every path keeps its size and mtime."""
+    signature = _sources_signature(paths)
+    with _MEMORY_CACHE_LOCK:
+        cached = _DERIVED_MEMO.get(key)
+    if cached is not None and cached[0] == signature:
+        return cached[1]  # type: ignore[return-value]
+    value = load()
+    with _MEMORY_CACHE_LOCK:
+        _DERIVED_MEMO.pop(key, None)
+        _DERIVED_MEMO[key] = (signature, value)
+        while len(_DERIVED_MEMO) > _DERIVED_MEMO_MAX_ITEMS:
+            _DERIVED_MEMO.pop(next(iter(_DERIVED_MEMO)))
+    return value
+
+
+def clear_tdx_meta_memory_cache() -> None:
+    with _MEMORY_CACHE_LOCK:
+        _MEMORY_CACHE.clear()
+        _DERIVED_MEMO.clear()
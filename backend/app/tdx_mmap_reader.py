@@ -0,0 +1,357 @@
+from __future__ import annotations
+
+import logging
+import mmap
+import os
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from threading import Lock, RLock, Thread
+
+import numpy as np
+
+from .tdx_loader import (
+    DAY_RECORD,
+    DAY_RECORD_DTYPE,
+    DayColumns,
+    _date_text_to_day_int,
+    _decode_day_records,
+    _normalize_symbol,
+)
+
+logger = logging.getLogger(__name__)
+
+_SHARED_READERS: dict[str, "TdxMmapReader"] = {}
+_SHARED_READERS_LOCK = RLock()
+
+# Python 3.13+ 的 mmap 支持 trackfd=False，映射不再占用 dup 出来的文件句柄；
+# 更早的版本每个映射常驻一个 fd，全市场 5000+ 文件会耗尽 ulimit，因此只映射 fd 上限的一部分。
+MMAP_TRACKFD_SUPPORTED = sys.version_info >= (3, 13)
+
+
+@dataclass(slots=True)
+class _MappedDayFile:
+    symbol: str
+    path: Path
+    size: int
+    mtime_ns: int
+    buffer: mmap.mmap
+    records: np.ndarray
+
+
+def _open_readonly_map(path: Path) -> mmap.mmap | None:
+    try:
+        with path.open("rb") as fp:
+            if MMAP_TRACKFD_SUPPORTED:
+                return mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ, trackfd=False)
+            return mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+
+def _mapped_file_budget() -> int | None:
+    """How many files one reader may keep mapped; ``None`` when mappings hold no descriptors."""
+    raw = os.getenv("TDX_TREND_TDX_MMAP_MAX_FILES", "").strip()
+    if raw:
+        try:
+            return max(0, int(raw))
+        except Exception:
+            pass
+    if MMAP_TRACKFD_SUPPORTED:
+        return None
+    try:
+        import resource
+
+        soft, _hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    except (ImportError, OSError, ValueError):
+        return 256
+    if soft == resource.RLIM_INFINITY:
+        return None
+    # 留一半给 socket、sqlite 与普通文件读写。
+    return max(0, int(soft) // 2)
+
+
+class TdxMmapReader:
+    """Read-only mmap table over every ``{market}/lday/*.day`` file of a TDX root."""
+
+    def __init__(self, tdx_root: str, markets: tuple[str, ...] = ("sh", "sz", "bj")) -> None:
+        self._root = Path(tdx_root)
+        self._markets = tuple(sorted({str(item).strip().lower() for item in markets if str(item).strip()}))
+        self._lock = RLock()
+        self._files: dict[str, _MappedDayFile] = {}
+        # 超出映射预算或映射失败的文件：不在映射表里，调用方按路径读取。
+        self._unmapped: dict[str, Path] = {}
+        self._refreshed_at = 0.0
+        # 目录重扫互斥（非重入：后台线程释放调用方获取的锁）。
+        self._refresh_lock = Lock()
+        self._closed = False
+
+    @property
+    def refreshed_at(self) -> float:
+        return self._refreshed_at
+
+    def refresh(self) -> None:
+        # 目录遍历与 stat 不持锁；只在比对/换入映射时持有本 reader 的锁。
+        listing: list[tuple[str, Path, int, int]] = []
+        seen: set[str] = set()
+        for market in self._markets:
+            market_dir = self._root / market / "lday"
+            if not market_dir.exists():
+                continue
+            for file_path in market_dir.glob("*.day"):
+                symbol = _normalize_symbol(file_path.stem, market)
+                if not symbol or symbol in seen:
+                    continue
+                try:
+                    stat = file_path.stat()
+                except OSError:
+                    continue
+                seen.add(symbol)
+                listing.append((symbol, file_path, int(stat.st_size), int(stat.st_mtime_ns)))
+        unmapped: dict[str, Path] = {}
+        budget = _mapped_file_budget()
+        with self._lock:
+            if self._closed:
+                return
+            for symbol, file_path, size, mtime_ns in listing:
+                current = self._files.get(symbol)
+                if current is not None and current.size == size and current.mtime_ns == mtime_ns:
+                    continue
+                if current is not None:
+                    self._release(current)
+                    self._files.pop(symbol, None)
+                mapped = None
+                if budget is None or len(self._files) < budget:
+                    mapped = self._map_file(symbol, file_path, size, mtime_ns)
+                if mapped is not None:
+                    self._files[symbol] = mapped
+                elif size >= DAY_RECORD.size:
+                    unmapped[symbol] = file_path
+            for symbol in [item for item in self._files if item not in seen]:
+                self._release(self._files.pop(symbol))
+            if unmapped and len(unmapped) != len(self._unmapped):
+                logger.warning(
+                    "TDX mmap reader: %d of %d .day files under %s not mapped (budget=%s); reading them by path.",
+                    len(unmapped),
+                    len(unmapped) + len(self._files),
+                    self._root,
+                    budget,
+                )
+            self._unmapped = unmapped
+            self._refreshed_at = time.time()
+
+    def refresh_if_stale(self, max_age_sec: float) -> None:
+        """First scan runs in the caller; later rescans run in one background thread at a time."""
+        if self._refreshed_at > 0 and max(0.0, time.time() - self._refreshed_at) <= max_age_sec:
+            return
+        if self._refreshed_at <= 0:
+            # 尚无文件表：调用方必须等首轮扫描完成。
+            with self._refresh_lock:
+                if self._refreshed_at <= 0:
+                    self.refresh()
+            return
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+        Thread(target=self._refresh_then_release, name="tdx-mmap-refresh", daemon=True).start()
+
+    def _refresh_then_release(self) -> None:
+        try:
+            self.refresh()
+        except Exception:
+            logger.exception("TDX mmap reader: directory rescan of %s failed", self._root)
+        finally:
+            self._refresh_lock.release()
+
+    @property
+    def unmapped_count(self) -> int:
+        return len(self._unmapped)
+
+    def unmapped_files(self, market: str | None = None) -> list[tuple[str, Path]]:
+        """``(symbol, path)`` of day files the reader saw but does not map; read these through the path loader."""
+        with self._lock:
+            prefix = str(market or "").strip().lower()
+            return sorted(item for item in self._unmapped.items() if item[0].startswith(prefix))
+
+    @staticmethod
+    def _map_file(symbol: str, path: Path, size: int, mtime_ns: int) -> _MappedDayFile | None:
+        total_bars = int(size // DAY_RECORD.size)
+        if total_bars <= 0:
+            return None
+        buffer = _open_readonly_map(path)
+        if buffer is None:
+            return None
+        records = np.frombuffer(buffer, dtype=DAY_RECORD_DTYPE, count=total_bars)
+        return _MappedDayFile(
+            symbol=symbol,
+            path=path,
+            size=int(size),
+            mtime_ns=int(mtime_ns),
+            buffer=buffer,
+            records=records,
+        )
+
+    @staticmethod
+    def _release(item: _MappedDayFile) -> None:
+        item.records = np.zeros(0, dtype=DAY_RECORD_DTYPE)
+        try:
+            item.buffer.close()
+        except BufferError:
+            # 仍有外部视图引用该映射；交给 GC 在视图释放后回收。
+            pass
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            for item in self._files.values():
+                self._release(item)
+            self._files.clear()
+            self._unmapped = {}
+            self._refreshed_at = 0.0
+
+    def symbols(self, market: str | None = None) -> list[str]:
+        with self._lock:
+            if market is None:
+                return sorted(self._files)
+            prefix = str(market).strip().lower()
+            return sorted(symbol for symbol in self._files if symbol.startswith(prefix))
+
+    def path_of(self, symbol: str) -> Path | None:
+        key = str(symbol).strip().lower()
+        item = self._files.get(key)
+        return item.path if item is not None else self._unmapped.get(key)
+
+    def records(self, symbol: str) -> np.ndarray | None:
+        key = str(symbol).strip().lower()
+        item = self._files.get(key)
+        if item is None:
+            return None
+        # 只复核本次读取的文件：通达信追加/改写后立即换入新映射，不等目录重扫。
+        try:
+            stat = item.path.stat()
+        except OSError:
+            stat = None
+        if stat is None or stat.st_size != item.size or stat.st_mtime_ns != item.mtime_ns:
+            item = self._remap(key, item, stat)
+            if item is None:
+                return None
+        return item.records
+
+    def _remap(self, symbol: str, stale: _MappedDayFile, stat: os.stat_result | None) -> _MappedDayFile | None:
+        with self._lock:
+            current = self._files.get(symbol)
+            if current is not None and current is not stale and stat is not None:
+                if current.size == stat.st_size and current.mtime_ns == stat.st_mtime_ns:
+                    return current
+            if current is not None:
+                self._release(current)
+                self._files.pop(symbol, None)
+            if stat is None or self._closed:
+                return None
+            mapped = self._map_file(symbol, stale.path, int(stat.st_size), int(stat.st_mtime_ns))
+            if mapped is None:
+                if stat.st_size >= DAY_RECORD.size:
+                    self._unmapped[symbol] = stale.path
+                return None
+            self._files[symbol] = mapped
+            return mapped
+
+    def bounds(self, symbol: str) -> tuple[int, int | None, int | None] | None:
+        records = self.records(symbol)
+        if records is None or records.size <= 0:
+            return None
+        return int(records.size), int(records["date"][0]), int(records["date"][-1])
+
+    def slice(
+        self,
+        symbol: str,
+        *,
+        date_from: str | None = None,
+        date_to: str | None = None,
+    ) -> np.ndarray | None:
+        records = self.records(symbol)
+        if records is None:
+            return None
+        days = records["date"]
+        start = 0
+        end = int(records.size)
+        from_int = _date_text_to_day_int(date_from)
+        to_int = _date_text_to_day_int(date_to)
+        if from_int is not None:
+            start = int(np.searchsorted(days, from_int, side="left"))
+        if to_int is not None:
+            end = int(np.searchsorted(days, to_int, side="right"))
+        return records[start:max(start, end)]
+
+    def read_columns(
+        self,
+        symbol: str,
+        *,
+        max_bars: int = 360,
+        as_of_date: str | None = None,
+        min_bars: int = 60,
+    ) -> DayColumns | None:
+        records = self.records(symbol)
+        if records is None or records.size < min_bars:
+            return None
+        end = int(records.size)
+        to_int = _date_text_to_day_int(as_of_date)
+        if to_int is not None:
+            end = int(np.searchsorted(records["date"], to_int, side="right"))
+        start = max(0, end - max(min_bars, int(max_bars)))
+        columns = _decode_day_records(records[start:end], date_to=to_int)
+        if int(columns["close"].size) < min_bars:
+            return None
+        return DayColumns(
+            symbol=str(symbol).strip().lower(),
+            total_bars=int(records.size),
+            day=columns["day"],
+            open=columns["open"],
+            high=columns["high"],
+            low=columns["low"],
+            close=columns["close"],
+            amount=columns["amount"],
+            volume=columns["volume"],
+        )
+
+
+def tdx_mmap_reader_enabled() -> bool:
+    raw = os.getenv("TDX_TREND_TDX_MMAP_READER", "").strip().lower()
+    if not raw:
+        # Windows 下被映射的文件无法被通达信截断/覆盖；3.13 之前每个映射占一个 fd。两种情况默认关闭。
+        return os.name != "nt" and MMAP_TRACKFD_SUPPORTED
+    if raw in {"0", "false", "no", "off"}:
+        return False
+    return True
+
+
+def _tdx_mmap_refresh_sec() -> float:
+    raw = os.getenv("TDX_TREND_TDX_MMAP_REFRESH_SEC", "").strip()
+    if not raw:
+        return 30.0
+    try:
+        return max(0.0, float(raw))
+    except Exception:
+        return 30.0
+
+
+def get_shared_tdx_mmap_reader(tdx_root: str) -> TdxMmapReader | None:
+    root = Path(tdx_root)
+    if not tdx_mmap_reader_enabled() or not root.exists():
+        return None
+    key = str(root)
+    with _SHARED_READERS_LOCK:
+        reader = _SHARED_READERS.get(key)
+        if reader is None:
+            reader = TdxMmapReader(key)
+            _SHARED_READERS[key] = reader
+    # 全局锁只保护注册表；目录重扫在锁外进行，单个文件的新鲜度由 records() 逐次复核。
+    reader.refresh_if_stale(_tdx_mmap_refresh_sec())
+    return reader
+
+
+def close_shared_tdx_mmap_readers() -> None:
+    with _SHARED_READERS_LOCK:
+        for reader in _SHARED_READERS.values():
+            reader.close()
+        _SHARED_READERS.clear()
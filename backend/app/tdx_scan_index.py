@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from threading import RLock
+
+from .tdx_loader import DAY_RECORD, _decode_day_int_to_text, _normalize_symbol
+
+# 通达信 lday 目录扫描索引：按目录 mtime 判定是否需要重新 scandir，
+# 目录未变化时候选列表与首尾日期直接查表，不再逐文件 stat/open/seek。
+# 注意：通达信原地追加 .day 时目录 mtime 不变，因此 bounds() 仍会 stat 单个文件校验大小/mtime。
+
+_INDEX_VERSION = 1
+_MIN_LISTED_BARS = 60
+_SHARED_INDEXES: dict[str, "TdxScanIndex"] = {}
+_SHARED_INDEXES_LOCK = RLock()
+
+
+@dataclass(slots=True)
+class DayFileEntry:
+    symbol: str
+    path: str
+    size: int
+    mtime_ns: int
+    first_day: str | None
+    last_day: str | None
+    bars: int
+
+    def to_row(self) -> list[object]:
+        return [self.path, self.size, self.mtime_ns, self.first_day, self.last_day, self.bars]
+
+    @classmethod
+    def from_row(cls, symbol: str, row: list[object]) -> "DayFileEntry":
+        path, size, mtime_ns, first_day, last_day, bars = row
+        return cls(
+            symbol=symbol,
+            path=str(path),
+            size=int(size),  # type: ignore[arg-type]
+            mtime_ns=int(mtime_ns),  # type: ignore[arg-type]
+            first_day=str(first_day) if first_day else None,
+            last_day=str(last_day) if last_day else None,
+            bars=int(bars),  # type: ignore[arg-type]
+        )
+
+
+@dataclass(slots=True)
+class _DirListing:
+    mtime_ns: int
+    entries: dict[str, DayFileEntry]
+
+
+def _probe_entry(symbol: str, path: Path, size: int, mtime_ns: int) -> DayFileEntry:
+    bars = int(size // DAY_RECORD.size)
+    first_day: str | None = None
+    last_day: str | None = None
+    if bars > 0:
+        try:
+            with path.open("rb") as fp:
+                first_chunk = fp.read(DAY_RECORD.size)
+                fp.seek((bars - 1) * DAY_RECORD.size)
+                last_chunk = fp.read(DAY_RECORD.size)
+            if len(first_chunk) == DAY_RECORD.size and len(last_chunk) == DAY_RECORD.size:
+                first_day = _decode_day_int_to_text(int(DAY_RECORD.unpack(first_chunk)[0]))
+                last_day = _decode_day_int_to_text(int(DAY_RECORD.unpack(last_chunk)[0]))
+        except OSError:
+            pass
+    return DayFileEntry(
+        symbol=symbol,
+        path=str(path),
+        size=int(size),
+        mtime_ns=int(mtime_ns),
+        first_day=first_day,
+        last_day=last_day,
+        bars=bars,
+    )
+
+
+class TdxScanIndex:
+    """Persistent ``{market}/lday`` listing with per-file size/mtime/bounds, keyed by directory mtime."""
+
+    def __init__(self, tdx_root: str, index_path: Path | None = None) -> None:
+        self._root = Path(tdx_root)
+        self._index_path = index_path
+        self._lock = RLock()
+        self._dirs: dict[str, _DirListing] = {}
+        self._by_path: dict[str, DayFileEntry] = {}
+        self._dirty = False
+        self._load()
+
+    def _load(self) -> None:
+        if self._index_path is None or not self._index_path.exists():
+            return
+        try:
+            payload = json.loads(self._index_path.read_text(encoding="utf-8"))
+        except Exception:
+            return
+        if not isinstance(payload, dict) or int(payload.get("version", 0)) != _INDEX_VERSION:
+            return
+        dirs = payload.get("dirs")
+        if not isinstance(dirs, dict):
+            return
+        for dir_key, item in dirs.items():
+            try:
+                entries = {
+                    symbol: DayFileEntry.from_row(symbol, row)
+                    for symbol, row in dict(item["entries"]).items()
+                }
+                self._dirs[str(dir_key)] = _DirListing(mtime_ns=int(item["mtime_ns"]), entries=entries)
+            except Exception:
+                continue
+            for entry in entries.values():
+                self._by_path[entry.path] = entry
+
+    def save(self) -> None:
+        with self._lock:
+            if self._index_path is None or not self._dirty:
+                return
+            payload = {
+                "version": _INDEX_VERSION,
+                "tdx_root": str(self._root),
+                "dirs": {
+                    dir_key: {
+                        "mtime_ns": listing.mtime_ns,
+                        "entries": {symbol: entry.to_row() for symbol, entry in listing.entries.items()},
+                    }
+                    for dir_key, listing in self._dirs.items()
+                },
+            }
+            try:
+                self._index_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self._index_path.with_suffix(".tmp")
+                tmp_path.write_text(json.dumps(payload, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+                os.replace(tmp_path, self._index_path)
+                self._dirty = False
+            except OSError:
+                return
+
+    def market_entries(self, market: str) -> list[DayFileEntry]:
+        market_key = str(market).strip().lower()
+        market_dir = self._root / market_key / "lday"
+        try:
+            dir_mtime_ns = int(market_dir.stat().st_mtime_ns)
+        except OSError:
+            return []
+        dir_key = str(market_dir)
+        with self._lock:
+            cached = self._dirs.get(dir_key)
+            if cached is None or cached.mtime_ns != dir_mtime_ns:
+                self._rescan(dir_key, market_dir, market_key, dir_mtime_ns)
+            else:
+                self._refresh_short_files(dict(cached.entries))
+            entries = dict(self._dirs[dir_key].entries)
+        self.save()
+        return sorted(entries.values(), key=lambda item: item.symbol)
+
+    def _rescan(self, dir_key: str, market_dir: Path, market: str, dir_mtime_ns: int) -> None:
+        cached = self._dirs.get(dir_key)
+        previous = dict(cached.entries) if cached is not None else {}
+        entries: dict[str, DayFileEntry] = {}
+        try:
+            iterator = list(os.scandir(market_dir))
+        except OSError:
+            iterator = []
+        for item in iterator:
+            if not item.name.lower().endswith(".day"):
+                continue
+            symbol = _normalize_symbol(Path(item.name).stem, market)
+            if not symbol or symbol in entries:
+                continue
+            try:
+                stat = item.stat()
+            except OSError:
+                continue
+            old = previous.get(symbol)
+            if old is not None and old.path == item.path and old.size == stat.st_size and old.mtime_ns == stat.st_mtime_ns:
+                entries[symbol] = old
+                continue
+            entries[symbol] = _probe_entry(symbol, Path(item.path), int(stat.st_size), int(stat.st_mtime_ns))
+        for old in previous.values():
+            self._by_path.pop(old.path, None)
+        for entry in entries.values():
+            self._by_path[entry.path] = entry
+        self._dirs[dir_key] = _DirListing(mtime_ns=dir_mtime_ns, entries=entries)
+        self._dirty = True
+
+    def _refresh_short_files(self, entries: dict[str, DayFileEntry]) -> None:
+        # 目录未变化时，只复查不足 60 根的新股文件：它们原地追加后可能达到候选门槛。
+        for symbol, entry in entries.items():
+            if entry.bars >= _MIN_LISTED_BARS:
+                continue
+            self._revalidate(entry.path, symbol)
+
+    def _revalidate(self, path_text: str, symbol: str) -> DayFileEntry | None:
+        path = Path(path_text)
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        entry = self._by_path.get(path_text)
+        if entry is not None and entry.size == stat.st_size and entry.mtime_ns == stat.st_mtime_ns:
+            return entry
+        fresh = _probe_entry(symbol, path, int(stat.st_size), int(stat.st_mtime_ns))
+        self._by_path[path_text] = fresh
+        listing = self._dirs.get(str(path.parent))
+        if listing is not None and symbol in listing.entries:
+            listing.entries[symbol] = fresh
+        self._dirty = True
+        return fresh
+
+    def bounds(self, file_path: Path) -> tuple[int, str | None, str | None] | None:
+        path_text = str(file_path)
+        with self._lock:
+            entry = self._by_path.get(path_text)
+            symbol = entry.symbol if entry is not None else file_path.stem.lower()
+            fresh = self._revalidate(path_text, symbol)
+        if fresh is None:
+            return None
+        return fresh.bars, fresh.first_day, fresh.last_day
+
+
+def tdx_scan_index_enabled() -> bool:
+    raw = os.getenv("TDX_TREND_TDX_SCAN_INDEX", "").strip().lower()
+    if not raw:
+        return True
+    return raw not in {"0", "false", "no", "off"}
+
+
+def _tdx_scan_index_dir() -> Path:
+    raw = os.getenv("TDX_TREND_TDX_SCAN_INDEX_DIR", "").strip()
+    if raw:
+        return Path(os.path.expanduser(os.path.expandvars(raw)))
+    return Path.home() / ".tdx-trend" / "tdx-scan-index"
+
+
+def get_shared_tdx_scan_index(tdx_root: str | Path) -> TdxScanIndex | None:
+    root = Path(tdx_root)
+    if not tdx_scan_index_enabled() or not root.exists():
+        return None
+    key = str(root)
+    with _SHARED_INDEXES_LOCK:
+        index = _SHARED_INDEXES.get(key)
+        if index is None:
+            digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+            index = TdxScanIndex(key, _tdx_scan_index_dir() / f"{digest}.json")
+            _SHARED_INDEXES[key] = index
+        return index
+
+
+def reset_shared_tdx_scan_indexes() -> None:
+    with _SHARED_INDEXES_LOCK:
+        _SHARED_INDEXES.clear()
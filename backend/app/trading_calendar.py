@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import numpy as np
+
+from .candle_series import date_text_to_day_int, day_int_to_text, day_ints_to_texts
+
+# 交易日历：升序去重的 int32 yyyymmdd 数组。下标即交易日序号，日期 -> 下标走 dict（O(1)），
+# 对齐/区间/交易日差走 searchsorted，整段流程不再做字符串比较或 strptime。
+
+DateLike = str | int | np.integer
+
+
+def date_texts_to_day_ints(dates: Sequence[str] | np.ndarray) -> np.ndarray:
+    """Vectorized ``"YYYY-MM-DD"`` -> int32 ``yyyymmdd``; malformed entries become ``0``."""
+    texts = np.asarray(dates, dtype="U10")
+    if texts.size <= 0:
+        return np.zeros(0, dtype=np.int32)
+    chars = np.ascontiguousarray(texts.ravel()).view("U1").reshape(-1, 10)
+    digits = np.concatenate((chars[:, 0:4], chars[:, 5:7], chars[:, 8:10]), axis=1)
+    packed = np.ascontiguousarray(digits).view("U8").ravel()
+    ok = np.char.isdigit(packed) & (chars[:, 4] == "-") & (chars[:, 7] == "-")
+    out = np.zeros(packed.shape[0], dtype=np.int32)
+    if bool(ok.any()):
+        out[ok] = packed[ok].astype(np.int32)
+    return out
+
+
+def _to_day_int(value: DateLike | None) -> int | None:
+    if value is None:
+        return None
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    return date_text_to_day_int(value)
+
+
+def weekday_dates(date_from: str, date_to: str) -> list[str]:
+    """Mon-Fri dates in ``[date_from, date_to]`` (either order); ``[]`` for malformed input."""
+    try:
+        start = np.datetime64(str(date_from).strip(), "D")
+        end = np.datetime64(str(date_to).strip(), "D")
+    except ValueError:
+        return []
+    if np.isnat(start) or np.isnat(end):
+        return []
+    if start > end:
+        start, end = end, start
+    days = np.arange(start, end + np.timedelta64(1, "D"), dtype="datetime64[D]")
+    return days[np.is_busday(days)].astype(str).tolist()
+
+
+class TradingCalendar:
+    """Sorted, de-duplicated trading days as int32 ``yyyymmdd`` with O(1) date <-> index maps."""
+
+    __slots__ = ("days", "_dates", "_index")
+
+    def __init__(self, days: np.ndarray) -> None:
+        self.days = np.ascontiguousarray(days, dtype=np.int32)
+        self._dates: list[str] | None = None
+        self._index: dict[int, int] | None = None
+
+    @classmethod
+    def from_day_ints(cls, days: Sequence[int] | np.ndarray) -> "TradingCalendar":
+        values = np.asarray(days, dtype=np.int64)
+        return cls(np.unique(values[values > 0]).astype(np.int32))
+
+    @classmethod
+    def from_dates(cls, dates: Sequence[str]) -> "TradingCalendar":
+        return cls.from_day_ints(date_texts_to_day_ints(dates))
+
+    def __len__(self) -> int:
+        return int(self.days.shape[0])
+
+    def __repr__(self) -> str:
+        if len(self) <= 0:
+            return "TradingCalendar(days=0)"
+        return f"TradingCalendar(days={len(self)}, first={self.date_at(0)}, last={self.date_at(-1)})"
+
+    @property
+    def dates(self) -> list[str]:
+        if self._dates is None:
+            self._dates = day_ints_to_texts(self.days)
+        return self._dates
+
+    def date_at(self, index: int) -> str:
+        return day_int_to_text(int(self.days[index]))
+
+    def index_of(self, value: DateLike) -> int:
+        """Exact position of a trading day, ``-1`` when it is not in the calendar."""
+        if self._index is None:
+            self._index = {int(day): idx for idx, day in enumerate(self.days.tolist())}
+        day = _to_day_int(value)
+        return -1 if day is None else self._index.get(day, -1)
+
+    def index_on_or_before(self, value: DateLike) -> int:
+        day = _to_day_int(value)
+        if day is None:
+            return -1
+        return int(np.searchsorted(self.days, day, side="right")) - 1
+
+    def index_on_or_after(self, value: DateLike) -> int:
+        """First position whose day is ``>= value``; ``len(self)`` when none."""
+        day = _to_day_int(value)
+        if day is None:
+            return len(self)
+        return int(np.searchsorted(self.days, day, side="left"))
+
+    def range(self, date_from: DateLike, date_to: DateLike) -> tuple[int, int]:
+        """Half-open ``[start, stop)`` index range covering ``date_from <= day <= date_to``."""
+        start = self.index_on_or_after(date_from)
+        stop = self.index_on_or_before(date_to) + 1
+        return start, max(start, stop)
+
+    def range_mask(self, date_from: DateLike, date_to: DateLike) -> np.ndarray:
+        start, stop = self.range(date_from, date_to)
+        mask = np.zeros(len(self), dtype=bool)
+        mask[start:stop] = True
+        return mask
+
+    def align_on_or_before(self, days: np.ndarray) -> np.ndarray:
+        """Vectorized ``index_on_or_before`` for an array of ``yyyymmdd`` ints (``-1`` where none)."""
+        return np.searchsorted(self.days, np.asarray(days, dtype=np.int64), side="right").astype(np.int64) - 1
+
+    def diff(self, start_date: DateLike, end_date: DateLike) -> int:
+        """Trading days from the session on/before ``start_date`` to the one on/before ``end_date``.
+
+        A ``start_date`` before the first session counts from the first session; ``0`` when either end is unusable.
+        """
+        end_idx = self.index_on_or_before(end_date)
+        if end_idx < 0:
+            return 0
+        start_idx = max(0, self.index_on_or_before(start_date))
+        if start_idx > end_idx:
+            return 0
+        return int(end_idx - start_idx)
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import os
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app import akshare_sidecar
+from app.tdx_loader import _load_candles_from_akshare_cache
+
+
+def _write_csv(path: Path, count: int, *, chinese: bool = False) -> None:
+    header = "日期,开盘,最高,最低,收盘,成交量,成交额" if chinese else "date,open,high,low,close,volume,amount"
+    lines = [header]
+    day = date(2023, 1, 2)
+    rows: list[str] = []
+    for idx in range(count):
+        while day.weekday() >= 5:
+            day += timedelta(days=1)
+        close = 10 + (idx * 7 % 31) / 7
+        high = close + 0.333
+        low = close - 0.257
+        amount = "" if idx % 9 == 0 else f"{close * 1000 * (idx + 1):.3f}"
+        # 高低价颠倒、非正价格、短日期都应与逐行解析同样处理。
+        if idx % 13 == 0:
+            high, low = low, high
+        open_text = "0" if idx % 29 == 5 else f"{close - 0.011:.4f}"
+        date_text = day.isoformat() if idx % 37 != 3 else "2023-1-2"
+        rows.append(f"{date_text},{open_text},{high:.4f},{low:.4f},{close:.4f},{1000 + idx * 3.7:.1f},{amount}")
+        day += timedelta(days=1)
+    # 乱序写入：读取端需要按日期排序。
+    lines.extend(rows[1::2] + rows[0::2])
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+@pytest.mark.parametrize("chinese", [False, True])
+def test_sidecar_reads_match_csv_parse(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, chinese: bool) -> None:
+    monkeypatch.setenv("TDX_TREND_COLUMNAR_STORE", "0")
+    monkeypatch.setenv("TDX_TREND_AKSHARE_SIDECAR_DIR", str(tmp_path / "sidecar"))
+    csv_root = tmp_path / "akshare"
+    csv_root.mkdir()
+    _write_csv(csv_root / "600000.csv", 400, chinese=chinese)
+
+    monkeypatch.setenv("TDX_TREND_AKSHARE_SIDECAR", "0")
+    expected = {window: _load_candles_from_akshare_cache("sh600000", window, str(csv_root)) for window in (1, 120, 1000)}
+    assert not (tmp_path / "sidecar").exists()
+
+    monkeypatch.setenv("TDX_TREND_AKSHARE_SIDECAR", "1")
+    first = _load_candles_from_akshare_cache("sh600000", 120, str(csv_root))
+    assert first is not None and [item.model_dump() for item in first] == [item.model_dump() for item in expected[120] or []]
+    assert len(list((tmp_path / "sidecar").glob("*.npy"))) == 1
+
+    def _fail_parse(*_args: object) -> None:
+        raise AssertionError("fresh sidecar must skip CSV parsing")
+
+    with monkeypatch.context() as patch:
+        patch.setattr("app.tdx_loader._parse_akshare_csv_rows", _fail_parse)
+        for window, rows in expected.items():
+            got = _load_candles_from_akshare_cache("sh600000", window, str(csv_root))
+            assert rows is not None and got is not None
+            assert [item.model_dump() for item in got] == [item.model_dump() for item in rows]
+
+
+def test_sidecar_invalidates_on_source_change(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("TDX_TREND_COLUMNAR_STORE", "0")
+    monkeypatch.setenv("TDX_TREND_AKSHARE_SIDECAR_DIR", str(tmp_path / "sidecar"))
+    csv_root = tmp_path / "akshare"
+    csv_root.mkdir()
+    target = csv_root / "sz000001.csv"
+    _write_csv(target, 50)
+    assert len(_load_candles_from_akshare_cache("sz000001", 500, str(csv_root)) or []) > 0
+    before = akshare_sidecar.read_akshare_sidecar(target, max_bars=500)
+    assert before is not None
+
+    _write_csv(target, 80)
+    stat = target.stat()
+    os.utime(target, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert akshare_sidecar.read_akshare_sidecar(target, max_bars=500) is None
+    rows = _load_candles_from_akshare_cache("sz000001", 500, str(csv_root)) or []
+    after = akshare_sidecar.read_akshare_sidecar(target, max_bars=500)
+    assert after is not None and after["close"].size == len(rows) > before["close"].size
@@ -820,6 +820,8 @@ def test_signals_cache_isolated_by_event_judgment_profile(monkeypatch: pytest.Mo
 
     monkeypatch.setattr(store, "_resolve_signal_candidates", fake_resolve_signal_candidates)
     monkeypatch.setattr(store, "_calc_wyckoff_snapshot", fake_calc_wyckoff_snapshot)
+    # 预填会直接用事件库命中的快照；关掉它，让伪造快照成为唯一来源。
+    monkeypatch.setattr(store, "_prefill_wyckoff_snapshots", lambda *args, **kwargs: {})
     monkeypatch.setenv("TDX_TREND_SIGNALS_DISK_CACHE", "0")
     store._signals_cache.clear()
 
@@ -1013,6 +1015,8 @@ def test_signals_endpoint_supports_signal_age_filter(monkeypatch: pytest.MonkeyP
 
     monkeypatch.setattr(store, "_resolve_signal_candidates", fake_resolve_signal_candidates)
     monkeypatch.setattr(store, "_calc_wyckoff_snapshot", fake_calc_wyckoff_snapshot)
+    # 预填会直接用事件库命中的快照；关掉它，让伪造快照成为唯一来源。
+    monkeypatch.setattr(store, "_prefill_wyckoff_snapshots", lambda *args, **kwargs: {})
     store._signals_cache.clear()
 
     base_params = {
@@ -1154,6 +1158,8 @@ def test_signals_disk_cache_reuses_persisted_payload(
         }
 
     monkeypatch.setattr(store, "_calc_wyckoff_snapshot", _fake_snapshot)
+    # 预填会直接用事件库命中的快照；关掉它，让伪造快照成为唯一来源。
+    monkeypatch.setattr(store, "_prefill_wyckoff_snapshots", lambda *args, **kwargs: {})
     store._signals_cache = {}
 
     params = {
@@ -1305,6 +1311,8 @@ def test_signals_endpoint_board_filters(monkeypatch: pytest.MonkeyPatch) -> None
 
     monkeypatch.setattr(store, "_resolve_signal_candidates", fake_resolve_signal_candidates)
     monkeypatch.setattr(store, "_calc_wyckoff_snapshot", fake_calc_wyckoff_snapshot)
+    # 预填会直接用事件库命中的快照；关掉它，让伪造快照成为唯一来源。
+    monkeypatch.setattr(store, "_prefill_wyckoff_snapshots", lambda *args, **kwargs: {})
     store._signals_cache.clear()
 
     base_params = [
@@ -1401,6 +1409,8 @@ def test_signals_endpoint_replay_position_uses_backtest_seed_pool(monkeypatch: p
 
     monkeypatch.setattr(store, "_resolve_signal_candidates", fake_resolve_signal_candidates)
     monkeypatch.setattr(store, "_calc_wyckoff_snapshot", fake_calc_wyckoff_snapshot)
+    # 预填会直接用事件库命中的快照；关掉它，让伪造快照成为唯一来源。
+    monkeypatch.setattr(store, "_prefill_wyckoff_snapshots", lambda *args, **kwargs: {})
     monkeypatch.setattr(store, "_require_backtest_trend_pool_run", fake_require_backtest_run)
     monkeypatch.setattr(store, "_resolve_screener_step_configs", fake_resolve_step_configs)
     monkeypatch.setattr(store, "_bind_step_configs_to_screener_params", fake_bind_step_configs)
@@ -1474,6 +1484,8 @@ def test_signals_endpoint_market_filters(monkeypatch: pytest.MonkeyPatch) -> Non
 
     monkeypatch.setattr(store, "_resolve_signal_candidates", fake_resolve_signal_candidates)
     monkeypatch.setattr(store, "_calc_wyckoff_snapshot", fake_calc_wyckoff_snapshot)
+    # 预填会直接用事件库命中的快照；关掉它，让伪造快照成为唯一来源。
+    monkeypatch.setattr(store, "_prefill_wyckoff_snapshots", lambda *args, **kwargs: {})
     store._signals_cache.clear()
 
     base_params = [
@@ -2045,9 +2045,9 @@ def test_backtest_run_matrix_signal_runtime_cache_reuses_signals(monkeypatch: py
         allowed = {day: {"sz300750"} for day in scan_dates}
         return ["sz300750"], allowed, ["mock matrix universe"], scan_dates, scan_dates
 
-    def _fake_compute(bundle, *, top_n=500):  # noqa: ANN001
+    def _fake_compute(bundle, *, top_n=500, return_ranks=None):  # noqa: ANN001
         call_counter["count"] += 1
-        return _real_compute(bundle, top_n=top_n)
+        return _real_compute(bundle, top_n=top_n, return_ranks=return_ranks)
 
     monkeypatch.setenv("TDX_TREND_BACKTEST_MATRIX_ENGINE", "1")
     monkeypatch.setenv("TDX_TREND_BACKTEST_RESULT_CACHE", "0")
@@ -2081,6 +2081,64 @@ def test_backtest_run_matrix_signal_runtime_cache_reuses_signals(monkeypatch: py
     assert call_counter["count"] == 1
 
 
+def test_backtest_run_matrix_signal_ranks_shared_across_top_n(monkeypatch: pytest.MonkeyPatch) -> None:
+    from app import store as store_module
+    from app.core.backtest_signal_matrix import backtest_signal_return_ranks as _real_ranks
+    from app.core.backtest_signal_matrix import compute_backtest_signal_matrix as _real_compute
+
+    dates = _load_symbol_dates("sz300750")
+    date_from = dates[-10]
+    date_to = dates[-6]
+    rank_calls: list[object] = []
+    compute_calls: list[tuple[int, object]] = []
+
+    def _fake_universe(*args, **kwargs):  # noqa: ANN002, ANN003
+        scan_dates = store._build_backtest_scan_dates(date_from, date_to)
+        allowed = {day: {"sz300750"} for day in scan_dates}
+        return ["sz300750"], allowed, ["mock matrix universe"], scan_dates, scan_dates
+
+    def _fake_ranks(bundle):  # noqa: ANN001
+        ranks = _real_ranks(bundle)
+        rank_calls.append(ranks)
+        return ranks
+
+    def _fake_compute(bundle, *, top_n=500, return_ranks=None):  # noqa: ANN001
+        compute_calls.append((int(top_n), return_ranks))
+        return _real_compute(bundle, top_n=top_n, return_ranks=return_ranks)
+
+    monkeypatch.setenv("TDX_TREND_BACKTEST_MATRIX_ENGINE", "1")
+    monkeypatch.setenv("TDX_TREND_BACKTEST_RESULT_CACHE", "0")
+    monkeypatch.setenv("TDX_TREND_BACKTEST_SIGNAL_MATRIX_RUNTIME_CACHE", "1")
+    monkeypatch.setenv("TDX_TREND_BACKTEST_SIGNAL_MATRIX_DISK_CACHE", "0")
+    monkeypatch.setattr(store, "_build_full_market_rolling_universe", _fake_universe)
+    monkeypatch.setattr(store_module, "backtest_signal_return_ranks", _fake_ranks)
+    monkeypatch.setattr(store_module, "compute_backtest_signal_matrix", _fake_compute)
+
+    store._backtest_matrix_engine.clear_runtime_cache()
+    store._clear_backtest_signal_matrix_runtime_cache()
+
+    payload = {
+        "mode": "full_market",
+        "pool_roll_mode": "daily",
+        "date_from": date_from,
+        "date_to": date_to,
+        "window_days": 60,
+        "min_score": 55,
+        "max_symbols": 20,
+    }
+
+    # 只换 top_n：两次都要重算信号，但 s3 都从第一次排好的同一份名次切出。
+    for top_n in (300, 800):
+        monkeypatch.setattr(store._config, "top_n", top_n)
+        resp = client.post("/api/backtest/run", json=payload)
+        assert resp.status_code == 200
+        assert any("signal_cache=miss" in note for note in resp.json()["notes"])
+
+    assert len(rank_calls) == 1
+    assert [top_n for top_n, _ranks in compute_calls] == [300, 800]
+    assert all(ranks is rank_calls[0] for _top_n, ranks in compute_calls)
+
+
 def test_backtest_run_matrix_signal_disk_cache_reuses_signals(
     monkeypatch: pytest.MonkeyPatch,
     tmp_path: Path,
@@ -2097,9 +2155,9 @@ def test_backtest_run_matrix_signal_disk_cache_reuses_signals(
         allowed = {day: {"sz300750"} for day in scan_dates}
         return ["sz300750"], allowed, ["mock matrix universe"], scan_dates, scan_dates
 
-    def _fake_compute(bundle, *, top_n=500):  # noqa: ANN001
+    def _fake_compute(bundle, *, top_n=500, return_ranks=None):  # noqa: ANN001
         call_counter["count"] += 1
-        return _real_compute(bundle, top_n=top_n)
+        return _real_compute(bundle, top_n=top_n, return_ranks=return_ranks)
 
     monkeypatch.setenv("TDX_TREND_BACKTEST_MATRIX_ENGINE", "1")
     monkeypatch.setenv("TDX_TREND_BACKTEST_RESULT_CACHE", "0")
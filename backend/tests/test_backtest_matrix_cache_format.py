@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.core.backtest_matrix_engine import BacktestMatrixEngine, MatrixBundle
+
+
+def _bundle(t: int = 37, n: int = 11) -> MatrixBundle:
+    rng = np.random.default_rng(7)
+    close = np.round(rng.uniform(5, 50, size=(t, n)), 2)
+    valid = rng.random((t, n)) > 0.2
+    close[~valid] = np.nan
+    volume = np.where(valid, rng.integers(1_000, 50_000_000, size=(t, n)).astype(np.float64), np.nan)
+    return MatrixBundle(
+        dates=[f"2026-{1 + idx // 28:02d}-{1 + idx % 28:02d}" for idx in range(t)],
+        symbols=[f"sh{600000 + idx}" for idx in range(n)],
+        open=close * 0.99,
+        high=close * 1.02,
+        low=close * 0.97,
+        close=close,
+        volume=volume,
+        valid_mask=valid,
+    )
+
+
+def _assert_same(left: MatrixBundle, right: MatrixBundle) -> None:
+    assert left.dates == right.dates and left.symbols == right.symbols
+    for name in ("open", "high", "low", "close", "volume", "valid_mask"):
+        a = np.asarray(getattr(left, name))
+        b = np.asarray(getattr(right, name))
+        assert a.dtype == b.dtype and a.shape == b.shape
+        assert np.array_equal(a, b, equal_nan=a.dtype != bool)
+
+
+def test_npy_cache_round_trip_is_mmapped_and_read_only(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("TDX_TREND_BACKTEST_MATRIX_RUNTIME_CACHE", "0")
+    monkeypatch.delenv("TDX_TREND_BACKTEST_MATRIX_CACHE_FORMAT", raising=False)
+    bundle = _bundle()
+    engine = BacktestMatrixEngine(cache_dir=tmp_path)
+    engine.save_bundle_to_cache("k1", bundle)
+    assert (tmp_path / "k1.mx" / "header.json").exists()
+    assert not (tmp_path / "k1.npz").exists()
+    assert np.load(tmp_path / "k1.mx" / "valid_mask.npy").size == -(-bundle.valid_mask.size // 8)
+
+    loaded = BacktestMatrixEngine(cache_dir=tmp_path).load_bundle_from_cache("k1")
+    assert loaded is not None
+    _assert_same(loaded, bundle)
+    assert isinstance(loaded.close, np.memmap) and not loaded.close.flags.writeable
+
+
+def test_npy_cache_rejects_dtype_mismatch(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("TDX_TREND_BACKTEST_MATRIX_RUNTIME_CACHE", "0")
+    monkeypatch.delenv("TDX_TREND_BACKTEST_MATRIX_CACHE_FORMAT", raising=False)
+    bundle = _bundle()
+    engine = BacktestMatrixEngine(cache_dir=tmp_path)
+    engine.save_bundle_to_cache("k1", bundle)
+    # 外部替换了单个字段文件：形状一致但 dtype 与头部不符，按未命中处理。
+    np.save(tmp_path / "k1.mx" / "close.npy", bundle.close.astype(np.float32), allow_pickle=False)
+    assert BacktestMatrixEngine(cache_dir=tmp_path).load_bundle_from_cache("k1") is None
+
+
+def test_npy_cache_overwrite_swaps_directories(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("TDX_TREND_BACKTEST_MATRIX_RUNTIME_CACHE", "0")
+    monkeypatch.delenv("TDX_TREND_BACKTEST_MATRIX_CACHE_FORMAT", raising=False)
+    bundle = _bundle()
+    engine = BacktestMatrixEngine(cache_dir=tmp_path)
+    engine.save_bundle_to_cache("k1", bundle)
+    mapped = BacktestMatrixEngine(cache_dir=tmp_path).load_bundle_from_cache("k1")
+    assert mapped is not None
+
+    replacement = _bundle(40, 11)
+    engine.save_bundle_to_cache("k1", replacement)
+    assert sorted(item.name for item in tmp_path.iterdir()) == ["k1.mx"]
+    _assert_same(BacktestMatrixEngine(cache_dir=tmp_path).load_bundle_from_cache("k1"), replacement)
+    # 旧目录整体让位后删除：已映射的旧数组仍可读。
+    _assert_same(mapped, bundle)
+
+
+def test_legacy_npz_format_is_still_supported(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("TDX_TREND_BACKTEST_MATRIX_RUNTIME_CACHE", "0")
+    monkeypatch.setenv("TDX_TREND_BACKTEST_MATRIX_CACHE_FORMAT", "npz")
+    bundle = _bundle(5, 3)
+    engine = BacktestMatrixEngine(cache_dir=tmp_path)
+    engine.save_bundle_to_cache("legacy", bundle)
+    assert (tmp_path / "legacy.npz").exists() and not (tmp_path / "legacy.mx").exists()
+
+    monkeypatch.delenv("TDX_TREND_BACKTEST_MATRIX_CACHE_FORMAT")
+    loaded = engine.load_bundle_from_cache("legacy")
+    assert loaded is not None
+    _assert_same(loaded, bundle)
+    # 新格式写入后清理同键的旧 .npz。
+    engine.save_bundle_to_cache("legacy", loaded)
+    assert not (tmp_path / "legacy.npz").exists()
+    _assert_same(engine.load_bundle_from_cache("legacy"), bundle)
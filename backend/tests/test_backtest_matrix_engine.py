@@ -1,6 +1,7 @@
 ﻿from __future__ import annotations
 
 from pathlib import Path
+import shutil
 import sys
 
 import numpy as np
@@ -153,9 +154,9 @@ def test_matrix_runtime_cache_hit_without_disk(monkeypatch: pytest.MonkeyPatch,
     assert first_hit is False
     assert call_counter["count"] == 1
 
-    cache_file = tmp_path / f"{key}.npz"
-    assert cache_file.exists()
-    cache_file.unlink()
+    cache_path = tmp_path / f"{key}.mx"
+    assert (cache_path / "header.json").exists()
+    shutil.rmtree(cache_path)
 
     second_bundle, second_hit = engine.build_bundle(
         symbols=["sh600000"],
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.core.backtest_engine import BacktestEngine
+from app.core.backtest_matrix_engine import BacktestMatrixEngine
+from app.core.backtest_signal_matrix import compute_backtest_signal_matrix
+from app.models import BacktestRunRequest, CandlePoint
+
+
+def _trading_days(count: int) -> list[str]:
+    out: list[str] = []
+    day = date(2025, 3, 3)
+    while len(out) < count:
+        if day.weekday() < 5:
+            out.append(day.isoformat())
+        day += timedelta(days=1)
+    return out
+
+
+def _candles_map(days: list[str], symbols: list[str]) -> dict[str, list[CandlePoint]]:
+    rng = np.random.default_rng(18)
+    out: dict[str, list[CandlePoint]] = {}
+    for symbol in symbols:
+        steps = rng.normal(0.002, 0.025, size=len(days))
+        closes = np.round(np.maximum(1.0, rng.uniform(5, 60) * np.exp(np.cumsum(steps))), 2)
+        out[symbol] = [
+            CandlePoint(
+                time=day,
+                open=float(np.round(close * 0.995, 2)),
+                high=float(np.round(close * 1.02, 2)),
+                low=float(np.round(close * 0.975, 2)),
+                close=float(close),
+                volume=int(rng.integers(100_000, 80_000_000)),
+                amount=float(close) * 100_000,
+            )
+            for day, close in zip(days, closes)
+        ]
+    return out
+
+
+def _build(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, precision: str | None, candles_map, days):
+    if precision is None:
+        monkeypatch.delenv("TDX_TREND_BACKTEST_MATRIX_PRECISION", raising=False)
+    else:
+        monkeypatch.setenv("TDX_TREND_BACKTEST_MATRIX_PRECISION", precision)
+    engine = BacktestMatrixEngine(cache_dir=tmp_path / (precision or "default"))
+    key = engine.build_cache_key(
+        symbols=list(candles_map),
+        date_from=days[80],
+        date_to=days[-1],
+        data_version="precision-test",
+        window_set=(20, 60),
+        algo_version="matrix-v1",
+    )
+    bundle, _ = engine.build_bundle(
+        symbols=list(candles_map),
+        get_candles=candles_map.__getitem__,
+        date_from=days[80],
+        date_to=days[-1],
+        max_lookback_days=80,
+        cache_key=key,
+    )
+    return engine, key, bundle
+
+
+def _run(bundle, signals, days: list[str]):
+    engine = BacktestEngine(
+        get_candles=lambda _: [],
+        build_row=lambda symbol, as_of_date=None: {"symbol": symbol, "as_of_date": as_of_date},
+        calc_snapshot=lambda row, window_days, as_of_date=None: {},
+        resolve_symbol_name=lambda raw_symbol: raw_symbol,
+    )
+    payload = BacktestRunRequest(
+        mode="full_market",
+        pool_roll_mode="daily",
+        date_from=days[80],
+        date_to=days[-1],
+        window_days=60,
+        min_score=0.0,
+        require_sequence=False,
+        min_event_count=1,
+        entry_events=["E"],
+        exit_events=["X"],
+        initial_capital=1_000_000.0,
+        position_pct=0.2,
+        max_positions=5,
+        stop_loss=0.05,
+        take_profit=0.15,
+        max_hold_days=20,
+        fee_bps=3.0,
+        prioritize_signals=True,
+        priority_mode="balanced",
+        priority_topk_per_day=0,
+        enforce_t1=True,
+        max_symbols=50,
+    )
+    return engine.run(payload=payload, symbols=list(bundle.symbols), matrix_bundle=bundle, matrix_signals=signals)
+
+
+def test_float32_mode_matches_float64_results(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    days = _trading_days(220)
+    candles_map = _candles_map(days, [f"sz{300000 + idx:06d}" for idx in range(24)])
+    _, key64, bundle64 = _build(tmp_path, monkeypatch, None, candles_map, days)
+    _, key32, bundle32 = _build(tmp_path, monkeypatch, "float32", candles_map, days)
+
+    assert key64 != key32
+    assert bundle64.close.dtype == np.float64 and bundle32.close.dtype == np.float32
+    assert bundle32.volume.dtype == np.float32 and bundle32.valid_mask.dtype == bool
+    assert bundle32.close.nbytes * 2 == bundle64.close.nbytes
+    assert np.array_equal(bundle32.valid_mask, bundle64.valid_mask)
+    for name in ("open", "high", "low", "close", "volume"):
+        np.testing.assert_allclose(getattr(bundle32, name), getattr(bundle64, name), rtol=1e-6, equal_nan=True)
+
+    # 磁盘缓存保留 float32，回读后依然是同一份数据。
+    reloaded = BacktestMatrixEngine(cache_dir=tmp_path / "float32").load_bundle_from_cache(key32)
+    assert reloaded is not None and reloaded.close.dtype == np.float32
+    assert np.array_equal(reloaded.close, bundle32.close, equal_nan=True)
+
+    signals64 = compute_backtest_signal_matrix(bundle64, top_n=10)
+    signals32 = compute_backtest_signal_matrix(bundle32, top_n=10)
+    assert signals64.score.dtype == np.float64 and signals32.score.dtype == np.float32
+    # 阈值恰好落在舍入误差上的格子允许极少量翻转，其余格子分数必须一致。
+    flipped = np.zeros(signals64.score.shape, dtype=bool)
+    for name in ("s1", "s2", "s3", "s4", "s5", "s6", "s7", "s8", "s9", "in_pool", "buy_signal", "sell_signal"):
+        diff = getattr(signals32, name) != getattr(signals64, name)
+        assert np.count_nonzero(diff) <= max(1, diff.size // 1000), name
+        flipped |= diff
+    np.testing.assert_allclose(signals32.score[~flipped], signals64.score[~flipped], rtol=1e-5, atol=1e-4)
+
+    result64 = _run(bundle64, signals64, days)
+    result32 = _run(bundle32, signals32, days)
+    assert len(result64.trades) > 0
+    assert len(result32.trades) == len(result64.trades)
+    for left, right in zip(result32.trades, result64.trades):
+        assert (left.symbol, left.entry_date, left.exit_date) == (right.symbol, right.entry_date, right.exit_date)
+        assert left.entry_price == pytest.approx(right.entry_price, rel=1e-6)
+        assert left.exit_price == pytest.approx(right.exit_price, rel=1e-6)
+    assert result32.equity_curve[-1].equity == pytest.approx(result64.equity_curve[-1].equity, rel=1e-5)
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import math
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.candle_series import CandleSeries
+from app.core.backtest_matrix_engine import BacktestMatrixEngine
+from app.models import CandlePoint
+
+
+def _reference_scatter(rows_by_symbol: dict[str, list[CandlePoint]], symbols: list[str]) -> dict[str, object]:
+    # 逐根 K 线写入的原始实现，作为向量化版本的对照。
+    dates = sorted({str(item.time).strip() for rows in rows_by_symbol.values() for item in rows if str(item.time).strip()})
+    date_to_idx = {day: idx for idx, day in enumerate(dates)}
+    shape = (len(dates), len(symbols))
+    out = {name: np.full(shape, np.nan) for name in ("open", "high", "low", "close", "volume")}
+    out["valid_mask"] = np.zeros(shape, dtype=bool)
+    for col, symbol in enumerate(symbols):
+        for row in rows_by_symbol.get(symbol, []):
+            idx = date_to_idx.get(str(row.time).strip())
+            values = [float(row.open), float(row.high), float(row.low), float(row.close), float(row.volume)]
+            if idx is None or not all(math.isfinite(value) for value in values) or min(values[:4]) <= 0:
+                continue
+            for name, value in zip(("open", "high", "low", "close"), values):
+                out[name][idx, col] = value
+            out["volume"][idx, col] = max(0.0, values[4])
+            out["valid_mask"][idx, col] = True
+    out["dates"] = dates
+    return out
+
+
+def _random_rows(rng: np.random.Generator, count: int) -> list[CandlePoint]:
+    rows: list[CandlePoint] = []
+    day = date(2025, 11, 3) + timedelta(days=int(rng.integers(0, 20)))
+    for _ in range(count):
+        day += timedelta(days=int(rng.integers(1, 4)))
+        close = float(np.round(rng.uniform(3, 80), 2))
+        kind = rng.random()
+        rows.append(
+            CandlePoint(
+                time=day.isoformat(),
+                open=close * 0.99 if kind > 0.05 else 0.0,
+                high=close * 1.03 if kind > 0.03 else float("nan"),
+                low=close * 0.97,
+                close=close,
+                volume=int(rng.integers(-5, 9_000_000)),
+                amount=close * 1000,
+            )
+        )
+    if rows:
+        # 重复日期：后一根覆盖前一根。
+        last = rows[-1]
+        rows.append(last.model_copy(update={"close": last.close + 1.0}))
+    return rows
+
+
+def test_vectorized_scatter_matches_reference_loop() -> None:
+    rng = np.random.default_rng(17)
+    symbols = [f"sz{300000 + idx:06d}" for idx in range(40)]
+    rows_by_symbol = {symbol: _random_rows(rng, int(rng.integers(0, 60))) for symbol in symbols[:-3]}
+    expected = _reference_scatter(rows_by_symbol, symbols)
+
+    for as_series in (False, True):
+        columns = {
+            symbol: BacktestMatrixEngine._symbol_columns(CandleSeries.from_points(rows) if as_series else rows)
+            for symbol, rows in rows_by_symbol.items()
+        }
+        bundle = BacktestMatrixEngine._build_bundle_from_columns(columns, symbols=symbols)
+        assert bundle.dates == expected["dates"]
+        for name in ("open", "high", "low", "close", "volume"):
+            assert np.array_equal(getattr(bundle, name), expected[name], equal_nan=True), name
+        assert np.array_equal(bundle.valid_mask, expected["valid_mask"])
+
+
+def test_scatter_appends_after_existing_rows() -> None:
+    symbols = ["sh600000", "sz000001"]
+    base = BacktestMatrixEngine._build_bundle_from_columns(
+        {"sh600000": BacktestMatrixEngine._symbol_columns(_random_rows(np.random.default_rng(1), 10))},
+        symbols=symbols,
+    )
+    later_day = date.fromisoformat(base.dates[-1]) + timedelta(days=1)
+    tail = [
+        CandlePoint(time=(later_day + timedelta(days=idx)).isoformat(), open=9.0, high=9.5, low=8.5, close=9.2, volume=100, amount=920.0)
+        for idx in range(3)
+    ]
+    appended = BacktestMatrixEngine._build_bundle_from_columns(
+        {"sz000001": BacktestMatrixEngine._symbol_columns(tail)},
+        symbols=symbols,
+        existing_dates=base.dates,
+        existing_open=base.open,
+        existing_high=base.high,
+        existing_low=base.low,
+        existing_close=base.close,
+        existing_volume=base.volume,
+        existing_valid_mask=base.valid_mask,
+    )
+    t = len(base.dates)
+    assert appended.dates[:t] == base.dates and len(appended.dates) == t + 3
+    assert np.array_equal(appended.close[:t], base.close, equal_nan=True)
+    assert appended.valid_mask[t:, 1].all() and not appended.valid_mask[t:, 0].any()
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.core import backtest_matrix_shm
+from app.core.backtest_matrix_engine import BacktestMatrixEngine
+from app.models import CandlePoint
+
+
+def _candles(days: list[str], base: float) -> list[CandlePoint]:
+    return [
+        CandlePoint(
+            time=day,
+            open=base + idx,
+            high=base + idx + 0.5,
+            low=base + idx - 0.5,
+            close=base + idx + 0.2,
+            volume=1000 + idx,
+            amount=float((base + idx) * 1000),
+            price_source="vwap",
+        )
+        for idx, day in enumerate(days)
+    ]
+
+
+_ATTACH_SCRIPT = """
+import json, sys
+sys.path.insert(0, sys.argv[1])
+from app.core.backtest_matrix_engine import BacktestMatrixEngine
+bundle = BacktestMatrixEngine(cache_dir=sys.argv[2]).load_bundle_from_cache(sys.argv[3])
+print(json.dumps(None if bundle is None else {
+    "dates": bundle.dates,
+    "symbols": bundle.symbols,
+    "close_sum": float(bundle.close[bundle.valid_mask].sum()),
+    "writeable": bool(bundle.close.flags.writeable),
+}))
+"""
+
+
+def test_bundle_is_served_to_another_process_from_shared_memory(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("TDX_TREND_SHARED_MATRIX_CACHE", "1")
+    days = ["2026-01-05", "2026-01-06", "2026-01-07", "2026-01-08"]
+    candles_map = {"sh600000": _candles(days, 10.0), "sz000001": _candles(days[1:], 20.0)}
+    engine = BacktestMatrixEngine(cache_dir=tmp_path)
+    key = engine.build_cache_key(
+        symbols=list(candles_map),
+        date_from="2026-01-06",
+        date_to="2026-01-08",
+        data_version="shm-test",
+        window_set=(5,),
+        algo_version="matrix-v1",
+    )
+    bundle, _ = engine.build_bundle(
+        symbols=list(candles_map),
+        get_candles=candles_map.__getitem__,
+        date_from="2026-01-06",
+        date_to="2026-01-08",
+        max_lookback_days=1,
+        cache_key=key,
+    )
+    try:
+        # 删掉磁盘缓存，子进程只能从共享内存拿到矩阵。
+        for path in tmp_path.glob("*.npz"):
+            path.unlink()
+        env = dict(os.environ, TDX_TREND_SHARED_MATRIX_CACHE="1")
+        result = subprocess.run(
+            [sys.executable, "-c", _ATTACH_SCRIPT, str(ROOT), str(tmp_path), key],
+            capture_output=True,
+            text=True,
+            env=env,
+            timeout=60,
+            check=True,
+        )
+        payload = json.loads(result.stdout.strip().splitlines()[-1])
+        assert payload is not None
+        assert payload["dates"] == bundle.dates and payload["symbols"] == bundle.symbols
+        assert payload["close_sum"] == pytest.approx(float(bundle.close[bundle.valid_mask].sum()))
+        assert payload["writeable"] is False
+        assert "resource_tracker" not in result.stderr
+    finally:
+        backtest_matrix_shm.close_shared_matrix_segments()
+    assert backtest_matrix_shm.attach_shared_bundle(str(tmp_path), key) is None
+
+
+def test_shared_cache_is_opt_in(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("TDX_TREND_SHARED_MATRIX_CACHE", raising=False)
+    days = ["2026-01-05", "2026-01-06"]
+    engine = BacktestMatrixEngine(cache_dir=tmp_path)
+    engine.build_bundle(
+        symbols=["sh600000"],
+        get_candles=lambda _symbol: _candles(days, 10.0),
+        date_from="2026-01-05",
+        date_to="2026-01-06",
+        max_lookback_days=1,
+        cache_key="opt-in",
+    )
+    assert backtest_matrix_shm.attach_shared_bundle(str(tmp_path), "opt-in") is None
+    assert np.isfinite(engine.load_bundle_from_cache("opt-in").close).all()
+
+
+def _build(engine: BacktestMatrixEngine, key: str, base: float) -> None:
+    days = ["2026-01-05", "2026-01-06", "2026-01-07"]
+    engine.build_bundle(
+        symbols=["sh600000"],
+        get_candles=lambda _symbol: _candles(days, base),
+        date_from="2026-01-05",
+        date_to="2026-01-07",
+        max_lookback_days=1,
+        cache_key=key,
+    )
+
+
+def _segment_exists(namespace: str, key: str) -> bool:
+    name = backtest_matrix_shm._segment_name(namespace, key)
+    if os.path.isdir("/dev/shm"):
+        return os.path.exists(f"/dev/shm/{name}")
+    return name in backtest_matrix_shm.shared_segment_names()
+
+
+def test_segments_are_released_with_the_runtime_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("TDX_TREND_SHARED_MATRIX_CACHE", "1")
+    monkeypatch.setenv("TDX_TREND_BACKTEST_MATRIX_RUNTIME_CACHE_MAX_ITEMS", "1")
+    namespace = str(tmp_path)
+    engine = BacktestMatrixEngine(cache_dir=tmp_path)
+    try:
+        _build(engine, "first", 10.0)
+        assert _segment_exists(namespace, "first")
+        # 运行期缓存只留一个键：第二个矩阵挤掉第一个，第一个的共享段随之 unlink。
+        _build(engine, "second", 20.0)
+        assert not _segment_exists(namespace, "first")
+        assert _segment_exists(namespace, "second")
+        engine.clear_runtime_cache()
+        assert not _segment_exists(namespace, "second")
+        assert backtest_matrix_shm.shared_segment_names() == []
+        # 段释放后仍可从磁盘缓存读回。
+        assert np.isfinite(engine.load_bundle_from_cache("first").close).all()
+    finally:
+        backtest_matrix_shm.close_shared_matrix_segments()
+
+
+def test_published_segments_are_capped(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("TDX_TREND_SHARED_MATRIX_CACHE", "1")
+    # 3×1 矩阵段约 300 字节（头 + 索引 + 数据）：上限 450 字节只放得下一个。
+    monkeypatch.setenv("TDX_TREND_SHARED_MATRIX_MAX_MB", str(450 / (1024 * 1024)))
+    namespace = str(tmp_path)
+    engine = BacktestMatrixEngine(cache_dir=tmp_path)
+    try:
+        _build(engine, "first", 10.0)
+        _build(engine, "second", 20.0)
+        assert not _segment_exists(namespace, "first")
+        assert _segment_exists(namespace, "second")
+        assert len(backtest_matrix_shm.shared_segment_names()) == 1
+    finally:
+        backtest_matrix_shm.close_shared_matrix_segments()
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.core.backtest_matrix_engine import BacktestMatrixEngine
+from app.models import CandlePoint
+
+
+def _trading_days(count: int) -> list[str]:
+    out: list[str] = []
+    day = date(2025, 9, 1)
+    while len(out) < count:
+        if day.weekday() < 5:
+            out.append(day.isoformat())
+        day += timedelta(days=1)
+    return out
+
+
+def _candles(days: list[str], base: float) -> list[CandlePoint]:
+    return [
+        CandlePoint(
+            time=day,
+            open=base + idx * 0.1,
+            high=base + idx * 0.1 + 0.5,
+            low=base + idx * 0.1 - 0.5,
+            close=base + idx * 0.1 + 0.2,
+            volume=1000 + idx,
+            amount=float((base + idx) * 1000),
+        )
+        for idx, day in enumerate(days)
+    ]
+
+
+DAYS = _trading_days(80)
+SYMBOLS = [f"sh{600000 + idx}" for idx in range(8)]
+CANDLES = {symbol: _candles(DAYS, 10.0 + col) for col, symbol in enumerate(SYMBOLS)}
+
+
+def _build(engine: BacktestMatrixEngine, symbols: list[str], date_from: str, date_to: str, calls: list[str] | None = None):
+    group = engine.build_superset_group(data_version="view-test", window_set=(5,), algo_version="matrix-v1")
+    key = engine.build_cache_key(
+        symbols=symbols,
+        date_from=date_from,
+        date_to=date_to,
+        data_version="view-test",
+        window_set=(5,),
+        algo_version="matrix-v1",
+    )
+
+    def _get(symbol: str) -> list[CandlePoint]:
+        if calls is not None:
+            calls.append(symbol)
+        return CANDLES[symbol]
+
+    bundle, hit = engine.build_bundle(
+        symbols=symbols,
+        get_candles=_get,
+        date_from=date_from,
+        date_to=date_to,
+        max_lookback_days=5,
+        cache_key=key,
+        superset_group=group,
+    )
+    return key, bundle, hit
+
+
+def test_view_slices_rows_and_columns_without_copies(tmp_path: Path) -> None:
+    engine = BacktestMatrixEngine(cache_dir=tmp_path)
+    _key, full, _hit = _build(engine, SYMBOLS, DAYS[20], DAYS[-1])
+
+    window = full.view(symbols=SYMBOLS[2:6], date_from=DAYS[30], date_to=DAYS[50])
+    assert window is not None
+    assert window.dates == DAYS[30:51] and window.symbols == SYMBOLS[2:6]
+    assert window.calendar().dates == window.dates
+    start = full.dates.index(DAYS[30])
+    assert np.array_equal(window.close, full.close[start : start + 21, 2:6])
+    for name in ("open", "high", "low", "close", "volume", "valid_mask"):
+        assert np.shares_memory(getattr(window, name), getattr(full, name)), name
+
+    strided = full.view(symbols=SYMBOLS[1::3])
+    assert strided is not None and np.shares_memory(strided.close, full.close)
+    scattered = full.view(symbols=[SYMBOLS[5], SYMBOLS[0], SYMBOLS[6]])
+    assert scattered is not None and scattered.close.shape == (len(full.dates), 3)
+    assert np.array_equal(scattered.close[:, 1], full.close[:, 0])
+    assert full.view(symbols=[SYMBOLS[0], "sz000001"]) is None
+    assert full.view(date_from=DAYS[-1], date_to=DAYS[0]).dates == []
+
+
+def test_subset_backtest_views_into_cached_superset(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("TDX_TREND_BACKTEST_MATRIX_SUPERSET_CACHE", raising=False)
+    engine = BacktestMatrixEngine(cache_dir=tmp_path)
+    _full_key, full, _hit = _build(engine, SYMBOLS, DAYS[20], DAYS[-1])
+
+    calls: list[str] = []
+    subset = SYMBOLS[3:7]
+    key, bundle, hit = _build(engine, subset, DAYS[40], DAYS[60], calls)
+    assert hit is True and calls == []
+    assert (engine.get_build_meta(key) or {}).get("mode") == "superset_view"
+    assert np.shares_memory(bundle.close, full.close)
+    assert engine.load_bundle_from_cache(key) is bundle
+
+    rebuilt, _ = BacktestMatrixEngine(cache_dir=tmp_path / "fresh").build_bundle(
+        symbols=subset,
+        get_candles=CANDLES.__getitem__,
+        date_from=DAYS[40],
+        date_to=DAYS[60],
+        max_lookback_days=5,
+        cache_key="fresh",
+        use_cache=False,
+    )
+    assert bundle.dates == rebuilt.dates and bundle.symbols == rebuilt.symbols
+    for name in ("open", "high", "low", "close", "volume", "valid_mask"):
+        assert np.array_equal(getattr(bundle, name), getattr(rebuilt, name), equal_nan=name != "valid_mask"), name
+
+    # 超集之外的日期或标的仍走常规构建。
+    calls.clear()
+    _key, _bundle, hit = _build(engine, SYMBOLS[:2], DAYS[0], DAYS[10], calls)
+    assert hit is False and sorted(calls) == SYMBOLS[:2]
+
+    monkeypatch.setenv("TDX_TREND_BACKTEST_MATRIX_SUPERSET_CACHE", "0")
+    calls.clear()
+    _key, _bundle, hit = _build(engine, SYMBOLS[:3], DAYS[40], DAYS[60], calls)
+    assert hit is False and sorted(calls) == SYMBOLS[:3]
+
+
+def test_superset_candidates_without_the_symbols_are_not_loaded(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("TDX_TREND_BACKTEST_MATRIX_SUPERSET_CACHE", raising=False)
+    engine = BacktestMatrixEngine(cache_dir=tmp_path)
+    wide_key, _wide, _hit = _build(engine, SYMBOLS[:6], DAYS[20], DAYS[-1])
+    engine.clear_runtime_cache()
+
+    loaded: list[str] = []
+    original = engine.load_bundle_from_cache
+
+    def _spy(cache_key: str, **kwargs):
+        loaded.append(cache_key)
+        return original(cache_key, **kwargs)
+
+    monkeypatch.setattr(engine, "load_bundle_from_cache", _spy)
+    # 候选超集标的数足够但不含 SYMBOLS[7]：只读元数据即排除，不加载矩阵。
+    calls: list[str] = []
+    _key, _bundle, hit = _build(engine, [SYMBOLS[1], SYMBOLS[7]], DAYS[40], DAYS[60], calls)
+    assert hit is False and sorted(calls) == [SYMBOLS[1], SYMBOLS[7]]
+    assert wide_key not in loaded
+
+    key, _bundle, hit = _build(engine, SYMBOLS[2:4], DAYS[40], DAYS[60])
+    assert hit is True and wide_key in loaded
+    assert (engine.get_build_meta(key) or {}).get("mode") == "superset_view"
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.core.backtest_matrix_engine import MatrixBundle
+from app.core.backtest_signal_matrix import (
+    SIGNAL_MATRIX_FIELDS,
+    BacktestSignalMatrix,
+    compute_backtest_signal_matrix,
+    extend_backtest_signal_matrix,
+)
+from app.store import InMemoryStore
+
+
+def _bundle(t: int = 220, n: int = 30) -> MatrixBundle:
+    rng = np.random.default_rng(20)
+    dates: list[str] = []
+    day = date(2025, 1, 2)
+    while len(dates) < t:
+        if day.weekday() < 5:
+            dates.append(day.isoformat())
+        day += timedelta(days=1)
+    close = np.round(20 * np.exp(np.cumsum(rng.normal(0.0, 0.02, size=(t, n)), axis=0)), 2)
+    valid = rng.random((t, n)) > 0.03
+    close[~valid] = np.nan
+    volume = np.where(valid, rng.integers(10_000, 5_000_000, size=(t, n)).astype(np.float64), np.nan)
+    return MatrixBundle(
+        dates=dates,
+        symbols=[f"sz{300000 + idx:06d}" for idx in range(n)],
+        open=np.round(close * 0.995, 2),
+        high=np.round(close * 1.02, 2),
+        low=np.round(close * 0.98, 2),
+        close=close,
+        volume=volume,
+        valid_mask=valid,
+    )
+
+
+def _assert_same(left: BacktestSignalMatrix, right: BacktestSignalMatrix) -> None:
+    for name in SIGNAL_MATRIX_FIELDS:
+        a = getattr(left, name)
+        b = getattr(right, name)
+        assert a.dtype == b.dtype and a.shape == b.shape, name
+        assert np.array_equal(a, b), name
+
+
+def test_extend_matches_full_recompute() -> None:
+    bundle = _bundle()
+    full = compute_backtest_signal_matrix(bundle, top_n=8)
+    for done in (1, 30, 150, 215):
+        previous = compute_backtest_signal_matrix(bundle.view(date_to=bundle.dates[done - 1]), top_n=8)
+        _assert_same(extend_backtest_signal_matrix(bundle, previous, top_n=8), full)
+    assert extend_backtest_signal_matrix(bundle, full, top_n=8) is full
+
+
+def test_disk_cache_serves_prefix_rows_for_incremental_refresh(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("TDX_TREND_BACKTEST_SIGNAL_MATRIX_CACHE_DIR", str(tmp_path))
+    monkeypatch.delenv("TDX_TREND_BACKTEST_SIGNAL_MATRIX_DISK_CACHE", raising=False)
+    store = InMemoryStore.__new__(InMemoryStore)
+    bundle = _bundle()
+    base = bundle.view(date_to=bundle.dates[199])
+    base_matrix = compute_backtest_signal_matrix(base, top_n=8)
+    assert store._save_backtest_signal_matrix_disk_cache(cache_key="base", matrix=base_matrix, dates=base.dates)
+
+    # 精确命中要求日期完全一致。
+    exact = store._load_backtest_signal_matrix_disk_cache(
+        cache_key="base",
+        expected_shape=base.shape(),
+        expected_dates=base.dates,
+    )
+    assert exact is not None
+    _assert_same(exact, base_matrix)
+    assert (
+        store._load_backtest_signal_matrix_disk_cache(
+            cache_key="base",
+            expected_shape=bundle.shape(),
+            expected_dates=bundle.dates,
+        )
+        is None
+    )
+
+    prefix = store._load_backtest_signal_matrix_disk_cache(
+        cache_key="base",
+        expected_shape=bundle.shape(),
+        expected_dates=bundle.dates,
+        prefix_only=True,
+    )
+    assert prefix is not None and prefix.score.shape == (200, 30)
+    _assert_same(extend_backtest_signal_matrix(bundle, prefix, top_n=8), compute_backtest_signal_matrix(bundle, top_n=8))
+
+    shifted = ["1999-01-01", *bundle.dates[1:]]
+    assert (
+        store._load_backtest_signal_matrix_disk_cache(
+            cache_key="base",
+            expected_shape=bundle.shape(),
+            expected_dates=shifted,
+            prefix_only=True,
+        )
+        is None
+    )
+
+
+def test_extend_matches_full_recompute_on_long_history(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("TDX_TREND_BACKTEST_SIGNAL_MATRIX_CACHE_DIR", str(tmp_path))
+    monkeypatch.delenv("TDX_TREND_BACKTEST_SIGNAL_MATRIX_DISK_CACHE", raising=False)
+    bundle = _bundle(1500, 800)
+    full = compute_backtest_signal_matrix(bundle, top_n=400)
+    done = 1400
+    # 均值的 Kahan 累计和从第 0 行起算：只从预热起点重算会在低位上不同，并传到买卖信号与分数。
+    restarted = compute_backtest_signal_matrix(bundle.view(date_from=bundle.dates[done - 60]), top_n=400)
+    assert not np.array_equal(restarted.score[60:], full.score[done:])
+
+    base = bundle.view(date_to=bundle.dates[done - 1])
+    previous = compute_backtest_signal_matrix(base, top_n=400)
+    assert previous.mean_state_row == done - 60
+    store = InMemoryStore.__new__(InMemoryStore)
+    assert store._save_backtest_signal_matrix_disk_cache(cache_key="long", matrix=previous, dates=base.dates)
+    prefix = store._load_backtest_signal_matrix_disk_cache(
+        cache_key="long",
+        expected_shape=bundle.shape(),
+        expected_dates=bundle.dates,
+        prefix_only=True,
+    )
+    assert prefix is not None and prefix.mean_state_row == done - 60
+    for source in (previous, prefix):
+        extended = extend_backtest_signal_matrix(bundle, source, top_n=400)
+        for name in ("buy_signal", "sell_signal", "score"):
+            assert np.array_equal(getattr(extended, name), getattr(full, name)), name
+        _assert_same(extended, full)
+        assert extended.mean_state_row == full.mean_state_row
+
+    # 旧缓存没有均值状态：不做增量拼接，整段重算。
+    stateless = BacktestSignalMatrix(
+        **{name: getattr(previous, name) for name in SIGNAL_MATRIX_FIELDS},
+    )
+    _assert_same(extend_backtest_signal_matrix(bundle, stateless, top_n=400), full)
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.core.backtest_matrix_engine import MatrixBundle
+from app.core.backtest_signal_matrix import _top_n_mask_from_returns, compute_backtest_signal_matrix
+from app.core.rolling_kernels import pct_change_rows, rolling_max, rolling_mean, rolling_mean_resume, rolling_min
+
+
+def _reference_flags(bundle: MatrixBundle, top_n: int) -> dict[str, np.ndarray]:
+    # 原 pandas 实现，作为 NumPy 内核版本的对照。
+    close = pd.DataFrame(bundle.close)
+    high = pd.DataFrame(bundle.high)
+    low = pd.DataFrame(bundle.low)
+    volume = pd.DataFrame(bundle.volume)
+    ma10 = close.rolling(10, min_periods=10).mean()
+    ma20 = close.rolling(20, min_periods=20).mean()
+    ma60 = close.rolling(60, min_periods=60).mean()
+    vol_ma10 = volume.rolling(10, min_periods=10).mean()
+    vol_ma20 = volume.rolling(20, min_periods=20).mean()
+    vol_ma60 = volume.rolling(60, min_periods=60).mean()
+    range20 = high.rolling(20, min_periods=20).max() - low.rolling(20, min_periods=20).min()
+    range60 = high.rolling(60, min_periods=60).max() - low.rolling(60, min_periods=60).min()
+    ret_40d = close.pct_change(40, fill_method=None)
+    flags = {
+        "s1": range20 / range60.replace(0.0, np.nan) < 0.7,
+        "s2": vol_ma10 / vol_ma60.replace(0.0, np.nan) < 0.6,
+        "s4": (range20 / close.replace(0.0, np.nan) < 0.18) & ((close - ma20).abs() / ma20.replace(0.0, np.nan) < 0.06),
+        "s5": (close > high.rolling(20, min_periods=20).max().shift(1)) & (volume > vol_ma20 * 1.2),
+        "s6": (close > ma10) & (close.shift(1) <= ma10.shift(1)) & (close > low.rolling(10, min_periods=10).min().shift(1)),
+        "s7": (ma10 > ma20) & (ma20 > ma60),
+        "s8": (close < low.rolling(20, min_periods=20).min().shift(1)) | (close < ma20 * 0.97),
+        "s9": (close < ma10) & (volume > vol_ma20 * 1.4) & (ret_40d < 0),
+    }
+    out = {name: frame.fillna(False).to_numpy(dtype=bool) for name, frame in flags.items()}
+    out["s3"] = _top_n_mask_from_returns(ret_40d.to_numpy(dtype=np.float64), top_n=top_n)
+    return out
+
+
+def _bundle(dtype: type, t: int = 260, n: int = 40) -> MatrixBundle:
+    rng = np.random.default_rng(21)
+    close = np.round(15 * np.exp(np.cumsum(rng.normal(0.0, 0.015, size=(t, n)), axis=0)), 2)
+    # 停牌段价格不变、成交量为 0，制造均线与价格恰好相等的边界。
+    close[80:140, 3] = close[79, 3]
+    close[30:45, 4] = 12.34
+    volume = rng.integers(10_000, 3_000_000, size=(t, n)).astype(np.float64)
+    volume[80:140, 3] = 0.0
+    valid = rng.random((t, n)) > 0.02
+    valid[:, 5] = False
+    close[~valid] = np.nan
+    volume[~valid] = np.nan
+    return MatrixBundle(
+        dates=[f"d{idx:04d}" for idx in range(t)],
+        symbols=[f"s{idx}" for idx in range(n)],
+        open=close.astype(dtype),
+        high=np.round(close * 1.01, 2).astype(dtype),
+        low=np.round(close * 0.99, 2).astype(dtype),
+        close=close.astype(dtype),
+        volume=volume.astype(dtype),
+        valid_mask=valid,
+    )
+
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+def test_kernels_match_pandas(dtype: type) -> None:
+    bundle = _bundle(dtype)
+    frame = pd.DataFrame(bundle.close)
+    for window in (10, 20, 60):
+        rolling = frame.rolling(window, min_periods=window)
+        assert np.array_equal(rolling_mean(bundle.close, window), rolling.mean().to_numpy(), equal_nan=True)
+        assert np.array_equal(rolling_max(bundle.close, window), rolling.max().to_numpy(), equal_nan=True)
+        assert np.array_equal(rolling_min(bundle.close, window), rolling.min().to_numpy(), equal_nan=True)
+    expected_ret = frame.pct_change(40, fill_method=None).to_numpy()
+    ret = pct_change_rows(bundle.close, 40)
+    assert ret.dtype == expected_ret.dtype and np.array_equal(ret, expected_ret, equal_nan=True)
+
+
+def test_rolling_mean_lane_groups_match_pandas_and_resume() -> None:
+    # 跨多个行块，覆盖无掩码列（全有效非负）、未上市前全 NaN 的列、停牌段、负值列与长段常数。
+    rng = np.random.default_rng(5)
+    t, n = 700, 200
+    values = np.round(10 * np.exp(np.cumsum(rng.normal(0.0, 0.02, size=(t, n)), axis=0)), 2)
+    values[:400, 100:170] = np.nan
+    for col in range(170, 190):
+        start = int(rng.integers(0, t - 30))
+        values[start : start + int(rng.integers(1, 30)), col] = np.nan
+    values[:, 190:195] *= -1
+    values[:, 195] = 7.25
+    values[300:, 196] = 0.0
+    values[:, 197] = np.nan
+    for window in (10, 60):
+        expected = pd.DataFrame(values).rolling(window, min_periods=window).mean().to_numpy()
+        full, _state = rolling_mean_resume(values, window)
+        assert np.array_equal(full, expected, equal_nan=True)
+        for done in (1, 255, 300, 613):
+            _out, state = rolling_mean_resume(values[:done], window, capture_row=done)
+            tail, _next = rolling_mean_resume(values, window, state=state, start=done)
+            assert np.array_equal(tail, expected[done:], equal_nan=True)
+            assert state.nobs.dtype == np.int64 and state.nobs.shape == (n,)
+
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+def test_signal_matrix_matches_pandas_reference(dtype: type) -> None:
+    bundle = _bundle(dtype)
+    matrix = compute_backtest_signal_matrix(bundle, top_n=7)
+    expected = _reference_flags(bundle, top_n=7)
+    valid = bundle.valid_mask
+    for name, flags in expected.items():
+        assert np.array_equal(getattr(matrix, name), flags & valid), name
+    pool_score = expected["s1"].astype(int) + expected["s2"] + expected["s3"] + expected["s4"]
+    assert np.array_equal(matrix.in_pool, (pool_score >= 2) & valid)
+    assert np.array_equal(matrix.buy_signal, (expected["s5"] | expected["s6"]) & (pool_score >= 2) & valid)
+    assert np.array_equal(matrix.sell_signal, (expected["s8"] | expected["s9"]) & valid)
+    raw = pool_score + expected["s5"] * 2.0 + expected["s6"] * 1.5 + expected["s7"] * 1.0
+    score = np.where(valid, np.clip(raw / 8.5 * 100.0, 0.0, 100.0), 0.0).astype(matrix.score.dtype)
+    assert np.array_equal(matrix.score, score)
+    assert any(getattr(matrix, name).any() for name in expected)
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.core.backtest_matrix_engine import MatrixBundle
+from app.core.backtest_signal_matrix import (
+    UNRANKED,
+    SIGNAL_MATRIX_FIELDS,
+    _top_n_mask_from_returns,
+    backtest_signal_return_ranks,
+    compute_backtest_signal_matrix,
+    cross_sectional_ranks,
+    top_n_mask_from_ranks,
+)
+
+
+def _reference_ranks(values: np.ndarray) -> np.ndarray:
+    # 逐行按（值降序，列序升序）排序的朴素实现。
+    out = np.full(values.shape, UNRANKED, dtype=np.int64)
+    for row_idx, row in enumerate(values):
+        cols = np.flatnonzero(np.isfinite(row))
+        order = cols[np.lexsort((cols, -row[cols]))]
+        out[row_idx, order] = np.arange(order.size)
+    return out
+
+
+def _returns() -> np.ndarray:
+    rng = np.random.default_rng(22)
+    values = np.round(rng.normal(0.0, 0.1, size=(120, 45)), 2)
+    values[rng.random(values.shape) < 0.1] = np.nan
+    values[3, :40] = np.nan
+    values[7] = 0.05
+    values[9, ::4] = np.inf
+    values[11, 1::3] = -np.inf
+    values[13] = np.nan
+    return values
+
+
+def test_ranks_and_masks_match_reference() -> None:
+    values = _returns()
+    ranks = cross_sectional_ranks(values)
+    assert ranks.dtype == np.int32
+    assert np.array_equal(ranks, _reference_ranks(values))
+    for top_n in (1, 3, 10, 44, 45, 500):
+        expected = ranks < top_n
+        assert np.array_equal(top_n_mask_from_ranks(ranks, top_n=top_n), expected), top_n
+        assert np.array_equal(_top_n_mask_from_returns(values, top_n=top_n), expected), top_n
+    assert _top_n_mask_from_returns(values, top_n=10)[7].tolist() == [True] * 10 + [False] * 35
+
+
+
+def _bundle() -> MatrixBundle:
+    rng = np.random.default_rng(5)
+    close = np.round(20 * np.exp(np.cumsum(rng.normal(0.0, 0.02, size=(150, 30)), axis=0)), 2)
+    close[rng.random(close.shape) < 0.05] = np.nan
+    return MatrixBundle(
+        dates=[f"d{idx:03d}" for idx in range(150)],
+        symbols=[f"s{idx}" for idx in range(30)],
+        open=close,
+        high=close * 1.01,
+        low=close * 0.99,
+        close=close,
+        volume=np.full(close.shape, 1e6),
+        valid_mask=np.isfinite(close),
+    )
+
+
+def test_one_ranking_serves_every_top_n() -> None:
+    bundle = _bundle()
+    ranks = backtest_signal_return_ranks(bundle)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        returns = bundle.close[40:] / bundle.close[:-40] - 1.0
+    returns = np.vstack((np.full((40, returns.shape[1]), np.nan), returns))
+    for top_n in (1, 3, 8, 20, 29, 30, 500):
+        expected = _top_n_mask_from_returns(returns, top_n=top_n)
+        assert np.array_equal(top_n_mask_from_ranks(ranks, top_n=top_n), expected), top_n
+
+
+def test_signal_matrix_reuses_precomputed_ranks() -> None:
+    bundle = _bundle()
+    ranks = backtest_signal_return_ranks(bundle)
+    for top_n in (3, 8, 20):
+        direct = compute_backtest_signal_matrix(bundle, top_n=top_n)
+        reused = compute_backtest_signal_matrix(bundle, top_n=top_n, return_ranks=ranks)
+        for name in SIGNAL_MATRIX_FIELDS:
+            assert np.array_equal(getattr(direct, name), getattr(reused, name)), (top_n, name)
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import math
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.candle_series import CandleSeries
+from app.core.backtest_matrix_engine import BacktestMatrixEngine
+from app.core.candle_analyzer import CandleAnalyzer
+from app.core.signal_analyzer import SignalAnalyzer
+from app.models import CandlePoint, ScreenerResult
+from app.sim_engine import SimAccountEngine, SimEngineError
+from app.tdx_loader import DAY_RECORD, load_candle_series_for_symbol, load_candles_for_symbol
+
+
+def _points(count: int = 160) -> list[CandlePoint]:
+    out: list[CandlePoint] = []
+    day = date(2024, 1, 2)
+    price = 10.0
+    for idx in range(count):
+        while day.weekday() >= 5:
+            day += timedelta(days=1)
+        drift = math.sin(idx / 6.0) * 0.03 + (0.05 if idx % 17 == 0 else 0.0)
+        open_px = round(price, 2)
+        close_px = round(price * (1 + drift), 2)
+        out.append(
+            CandlePoint(
+                time=day.isoformat(),
+                open=open_px,
+                high=round(max(open_px, close_px) * 1.01, 2),
+                low=round(min(open_px, close_px) * 0.99, 2),
+                close=close_px,
+                volume=1_000_000 + (idx * 7919) % 900_000 * (3 if idx % 17 == 0 else 1),
+                amount=float(close_px * 1_000_000),
+                price_source="vwap",
+            )
+        )
+        price = close_px
+        day += timedelta(days=1)
+    return out
+
+
+def _row() -> ScreenerResult:
+    return ScreenerResult(
+        symbol="sz300750",
+        name="test",
+        latest_price=10.0,
+        day_change=0.1,
+        day_change_pct=0.01,
+        score=80,
+        ret40=0.25,
+        turnover20=0.08,
+        amount20=8e8,
+        amplitude20=0.05,
+        retrace20=0.03,
+        pullback_days=3,
+        ma10_above_ma20_days=8,
+        ma5_above_ma10_days=6,
+        price_vs_ma20=0.06,
+        vol_slope20=0.1,
+        up_down_volume_ratio=1.4,
+        pullback_volume_ratio=0.7,
+        has_blowoff_top=False,
+        has_divergence_5d=False,
+        has_upper_shadow_risk=False,
+        ai_confidence=0.7,
+        theme_stage="发酵中",
+        trend_class="A",
+        stage="Mid",
+        labels=[],
+        reject_reasons=[],
+        degraded=False,
+        degraded_reason=None,
+    )
+
+
+def test_series_round_trip_and_compact_size() -> None:
+    points = _points()
+    series = CandleSeries.from_points(points)
+    assert series.to_points() == points
+    assert [bar.close for bar in series[-30:]] == [point.close for point in points[-30:]]
+    assert series[-1].time == points[-1].time
+    assert series.nbytes <= 56 * len(points)
+
+
+def test_loader_series_matches_point_list(tmp_path: Path) -> None:
+    lday = tmp_path / "sh" / "lday"
+    lday.mkdir(parents=True)
+    chunks = []
+    day = date(2024, 1, 2)
+    for idx in range(150):
+        while day.weekday() >= 5:
+            day += timedelta(days=1)
+        close_raw = 1000 + (idx * 13) % 77
+        chunks.append(DAY_RECORD.pack(int(day.strftime("%Y%m%d")), close_raw - 3, close_raw + 8, close_raw - 9, close_raw, 1.5e6, 12345 + idx, 0))
+        day += timedelta(days=1)
+    (lday / "sh600000.day").write_bytes(b"".join(chunks))
+
+    series = load_candle_series_for_symbol(str(tmp_path), "sh600000", window=120, market_data_source="tdx_only")
+    points = load_candles_for_symbol(str(tmp_path), "sh600000", window=120, market_data_source="tdx_only")
+    assert series is not None and points is not None and len(points) == 120
+    assert series.to_points() == points
+
+
+def test_consumers_match_list_inputs() -> None:
+    points = _points()
+    series = CandleSeries.from_points(points)
+    for target in ("2023-12-01", "2024-02-10", "2024-03-16", "2024-05-03", "2030-01-01", "bad"):
+        assert CandleAnalyzer.align_date_to_candles(series, target) == CandleAnalyzer.align_date_to_candles(points, target)
+        sliced_series, aligned_series = CandleAnalyzer.slice_candles_as_of(series, target)
+        sliced_points, aligned_points = CandleAnalyzer.slice_candles_as_of(points, target)
+        assert aligned_series == aligned_points
+        assert CandleSeries.from_points(sliced_series).to_points() == list(sliced_points)
+
+    assert CandleAnalyzer.collect_volume_price_breakout_candidates(series) == (
+        CandleAnalyzer.collect_volume_price_breakout_candidates(points)
+    )
+    assert CandleAnalyzer.infer_recent_rebreakout_index(series) == CandleAnalyzer.infer_recent_rebreakout_index(points)
+    for window in (30, 60, 120):
+        assert SignalAnalyzer.calculate_wyckoff_snapshot(_row(), series, window) == (
+            SignalAnalyzer.calculate_wyckoff_snapshot(_row(), points, window)
+        )
+
+    engine = SimAccountEngine.__new__(SimAccountEngine)
+    for target in ("2024-02-10", "2024-03-15", "2030-01-01"):
+        assert engine._align_index_to_submit_date(series, target) == engine._align_index_to_submit_date(points, target)
+    with pytest.raises(SimEngineError):
+        engine._align_index_to_submit_date(series, "2023-06-01")
+
+
+def test_matrix_builder_accepts_series(tmp_path: Path) -> None:
+    points = {"sh600000": _points(), "sz000001": _points(140)[10:]}
+    kwargs = dict(
+        symbols=list(points),
+        date_from="2024-03-01",
+        date_to="2024-06-28",
+        max_lookback_days=20,
+        cache_key="series",
+        use_cache=False,
+    )
+    from_lists, _ = BacktestMatrixEngine(cache_dir=tmp_path).build_bundle(get_candles=points.__getitem__, **kwargs)
+    series = {symbol: CandleSeries.from_points(rows) for symbol, rows in points.items()}
+    from_series, _ = BacktestMatrixEngine(cache_dir=tmp_path).build_bundle(get_candles=series.__getitem__, **kwargs)
+    assert from_series.dates == from_lists.dates
+    for field in ("open", "high", "low", "close", "volume", "valid_mask"):
+        left = getattr(from_series, field)
+        right = getattr(from_lists, field)
+        assert left.tobytes() == right.tobytes()
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app import store as store_module
+from app.candle_series import CandleSeries
+from app.candles_cache import ByteBudgetLruCache
+
+
+def _cache(max_bytes: int, max_entries: int = 0) -> ByteBudgetLruCache[bytes]:
+    return ByteBudgetLruCache(max_bytes=max_bytes, max_entries=max_entries, sizeof=len)
+
+
+def test_byte_budget_evicts_least_recently_used() -> None:
+    cache = _cache(max_bytes=3 * (1024 + 1000))
+    for key in ("a", "b", "c"):
+        cache.put(key, b"x" * 1000)
+    assert cache.get("a") is not None
+    cache.put("d", b"x" * 1000)
+    assert "b" not in cache
+    assert all(key in cache for key in ("a", "c", "d"))
+    cache.put("big", b"x" * 10_000)
+    assert len(cache) == 1 and "big" in cache
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["evictions"] == 4
+    assert stats["bytes"] == 10_000 + 1024
+    assert cache.trim(0) == 1 and cache.stats()["bytes"] == 0
+
+
+def test_concurrent_misses_share_one_load() -> None:
+    cache = _cache(max_bytes=1 << 20)
+    calls: list[int] = []
+    start = threading.Barrier(6)
+
+    def _loader() -> bytes:
+        calls.append(1)
+        time.sleep(0.1)
+        return b"payload"
+
+    results: list[bytes] = []
+
+    def _worker() -> None:
+        start.wait()
+        results.append(cache.get_or_load("sh600000", _loader))
+
+    threads = [threading.Thread(target=_worker) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [b"payload"] * 6
+    assert len(calls) == 1
+    stats = cache.stats()
+    assert stats["misses"] == 6 and stats["coalesced_misses"] == 5 and stats["loads"] == 1
+    assert cache.get_or_load("sh600000", _loader) == b"payload"
+    assert cache.stats()["hits"] == 1
+
+
+def test_failed_load_is_not_cached() -> None:
+    cache = _cache(max_bytes=1 << 20)
+
+    def _boom() -> bytes:
+        raise OSError("disk gone")
+
+    with pytest.raises(OSError):
+        cache.get_or_load("k", _boom)
+    assert "k" not in cache and cache.stats()["load_errors"] == 1
+    assert cache.get_or_load("k", lambda: b"ok") == b"ok"
+
+
+def test_store_candles_cache_loads_each_symbol_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    series = CandleSeries.from_arrays(
+        day=np.full(200, 20240102),
+        open=np.full(200, 10.0),
+        high=np.full(200, 10.5),
+        low=np.full(200, 9.5),
+        close=np.full(200, 10.2),
+        volume=np.full(200, 1000),
+        amount=np.full(200, 10200.0),
+        price_source="vwap",
+    )
+    calls: list[str] = []
+
+    def _fake_load(_root: str, symbol: str, **_kwargs: object) -> CandleSeries:
+        calls.append(symbol)
+        time.sleep(0.05)
+        return series
+
+    monkeypatch.setattr(store_module, "load_candle_series_for_symbol", _fake_load)
+    store = store_module.store
+    store._candles_cache.clear()
+    try:
+        threads = [threading.Thread(target=store._ensure_candles, args=("SZ300750",)) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert calls == ["sz300750"]
+        assert store._ensure_candles("sz300750") is series
+        stats = store.get_candles_cache_stats()
+        assert stats.entries == 1 and stats.bytes >= series.nbytes and stats.hits >= 1
+    finally:
+        store._candles_cache.clear()
+
+
+def test_store_candles_cache_keeps_symbol_cap_by_default(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("TDX_TREND_CANDLES_RUNTIME_CACHE_MAX_SYMBOLS", raising=False)
+    monkeypatch.delenv("TDX_TREND_CANDLES_RUNTIME_CACHE_MAX_MB", raising=False)
+    assert store_module.InMemoryStore._candles_runtime_cache_max_symbols() == 1500
+    assert store_module.store.get_candles_cache_stats().max_entries == 1500
+    monkeypatch.setenv("TDX_TREND_CANDLES_RUNTIME_CACHE_MAX_SYMBOLS", "0")
+    assert store_module.InMemoryStore._candles_runtime_cache_max_symbols() == 0
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app import store as store_module
+from app.candle_series import CandleSeries
+from app.candles_cache import ByteBudgetLruCache
+from app.tdx_loader import DAY_RECORD, load_candle_series_batch, load_candle_series_for_symbol
+
+
+def _write_day_file(path: Path, *, bars: int, base: int) -> None:
+    chunks = []
+    day = date(2024, 1, 2)
+    for idx in range(bars):
+        while day.weekday() >= 5:
+            day += timedelta(days=1)
+        close_raw = base + (idx * 13) % 77
+        chunks.append(
+            DAY_RECORD.pack(int(day.strftime("%Y%m%d")), close_raw - 3, close_raw + 8, close_raw - 9, close_raw, 1.5e6, 12345 + idx, 0)
+        )
+        day += timedelta(days=1)
+    path.write_bytes(b"".join(chunks))
+
+
+def test_batch_loader_matches_single_symbol_loads(tmp_path: Path) -> None:
+    symbols = ["sz000001", "sh600000", "sh600519", "sz300750", "sh601318"]
+    for idx, symbol in enumerate(symbols):
+        lday = tmp_path / symbol[:2] / "lday"
+        lday.mkdir(parents=True, exist_ok=True)
+        _write_day_file(lday / f"{symbol}.day", bars=140 + idx, base=1000 + idx * 100)
+
+    requested = [*symbols, "SH600000", "sh688001"]
+    loaded = load_candle_series_batch(str(tmp_path), requested, window=120, market_data_source="tdx_only", max_workers=3)
+    assert set(loaded) == {*symbols, "sh688001"}
+    assert loaded["sh688001"] is None
+    for symbol in symbols:
+        single = load_candle_series_for_symbol(str(tmp_path), symbol, window=120, market_data_source="tdx_only")
+        assert single is not None and loaded[symbol] is not None
+        assert loaded[symbol].to_points() == single.to_points()
+
+
+def test_cache_batch_load_skips_hits_and_reports_missing() -> None:
+    cache: ByteBudgetLruCache[bytes] = ByteBudgetLruCache(max_bytes=1 << 20, sizeof=len)
+    cache.put("a", b"cached")
+    calls: list[list[str]] = []
+
+    def _load_many(keys: list[str]) -> dict[str, bytes]:
+        calls.append(keys)
+        return {key: key.encode() for key in keys if key != "z"}
+
+    out = cache.get_or_load_many(["a", "b", "c", "b", "z"], _load_many)
+    assert calls == [["b", "c", "z"]]
+    assert out == {"a": b"cached", "b": b"b", "c": b"c"}
+    assert "b" in cache and "z" not in cache
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["loads"] == 2 and stats["load_errors"] == 1
+
+
+def test_store_batch_fills_runtime_cache_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    series = CandleSeries.from_points(store_module.store._gen_candles(7, 30.0))
+    batches: list[list[str]] = []
+
+    def _fake_batch(_root: str, symbols: list[str], **_kwargs: object) -> dict[str, CandleSeries | None]:
+        batches.append(list(symbols))
+        return {symbol: (series if symbol != "sh600999" else None) for symbol in symbols}
+
+    def _no_single(*_args: object, **_kwargs: object) -> CandleSeries:
+        raise AssertionError("single-symbol load should not run after a prefetch")
+
+    monkeypatch.setattr(store_module, "load_candle_series_batch", _fake_batch)
+    store = store_module.store
+    store._candles_cache.clear()
+    try:
+        assert store.prefetch_candles(["SZ300750", "sh600519", "sh600999"]) == 3
+        monkeypatch.setattr(store_module, "load_candle_series_for_symbol", _no_single)
+        assert store._ensure_candles("sz300750") is series
+        assert len(store._ensure_candles("sh600999")) > 0
+        out = store.get_candles_batch(["sh600519", "sz300750"])
+        assert list(out) == ["sh600519", "sz300750"]
+        assert batches == [["sz300750", "sh600519", "sh600999"]]
+    finally:
+        store._candles_cache.clear()
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app import columnar_store as columnar_store_module
+from app.columnar_store import ColumnarMarketStore, sync_columnar_store_from_sources
+from app.tdx_loader import DAY_RECORD, _parse_day_file_columns, load_candles_for_symbol
+
+
+def _day_bytes(start: date, count: int, base_close: int) -> bytes:
+    chunks: list[bytes] = []
+    day = start
+    for idx in range(count):
+        while day.weekday() >= 5:
+            day += timedelta(days=1)
+        close_raw = base_close + (idx * 11) % 97
+        chunks.append(
+            DAY_RECORD.pack(
+                int(day.strftime("%Y%m%d")),
+                close_raw - 4,
+                close_raw + 9,
+                close_raw - 8,
+                close_raw,
+                float(close_raw * 50),
+                3000 + idx,
+                0,
+            )
+        )
+        day += timedelta(days=1)
+    return b"".join(chunks)
+
+
+def _write_sources(tdx_root: Path, csv_root: Path) -> None:
+    lday = tdx_root / "sh" / "lday"
+    lday.mkdir(parents=True, exist_ok=True)
+    (lday / "sh600000.day").write_bytes(_day_bytes(date(2024, 1, 2), 150, 1000))
+    (lday / "sh600519.day").write_bytes(_day_bytes(date(2024, 1, 2), 120, 15000))
+    csv_root.mkdir(parents=True, exist_ok=True)
+    (csv_root / "sz300750.csv").write_text(
+        "\n".join(
+            [
+                "date,open,high,low,close,volume,amount,symbol",
+                "2026-02-10,100,101,99,100.5,123400,123450000,sz300750",
+                "2026-02-11,101,102,100,101.5,133400,135450000,sz300750",
+                "2026-02-12,102,103,101,102.5,143400,147450000,sz300750",
+            ]
+        ),
+        encoding="utf-8",
+    )
+
+
+def test_columnar_store_build_read_and_append_day(tmp_path: Path) -> None:
+    tdx_root = tmp_path / "vipdoc"
+    csv_root = tmp_path / "akshare"
+    _write_sources(tdx_root, csv_root)
+    store = ColumnarMarketStore(tmp_path / "store")
+
+    counts = sync_columnar_store_from_sources(store, tdx_root=str(tdx_root), markets=["sh"], akshare_cache_dir=str(csv_root))
+    assert counts["write"] == 3
+    assert store.symbols("tdx") == ["sh600000", "sh600519"]
+    assert store.symbols("akshare") == ["sz300750"]
+
+    source = _parse_day_file_columns(tdx_root / "sh" / "lday" / "sh600000.day", "sh600000", max_bars=10_000)
+    stored = store.read_columns("tdx", "sh600000")
+    assert source is not None and stored is not None
+    for field in ("day", "open", "high", "low", "close", "amount", "volume"):
+        assert np.array_equal(stored[field], source[field])
+
+    tail = store.read_columns("tdx", "sh600000", max_bars=5, as_of_date="2024-03-01")
+    assert tail is not None
+    assert tail["close"].size == 5
+    assert int(tail["day"][-1]) <= 20240301
+
+    rows_before = store.stats()["rows"]
+    # 通达信先把新交易日写进 .day，再整日追加：源签名随同一次索引写入更新，读取仍命中列式库。
+    day_path = tdx_root / "sh" / "lday" / "sh600000.day"
+    day_path.write_bytes(day_path.read_bytes() + _day_bytes(date(2025, 1, 2), 1, 1020))
+    assert not store.is_fresh("tdx", "sh600000", day_path)
+    appended = store.append_day(
+        "tdx",
+        "2025-01-02",
+        {"sh600000": (10.0, 10.5, 9.8, 10.2, 1.0e6, 12000), "sh600519": (150.0, 151.0, 149.0, 150.5, 2.0e6, 800)},
+    )
+    assert appended == 2
+    assert store.stats()["rows"] == rows_before + 2
+    latest = store.read_columns("tdx", "sh600519", max_bars=2)
+    assert latest is not None
+    assert latest["day"].tolist()[-1] == 20250102
+    assert latest["close"].tolist()[-1] == 150.5
+    assert store.is_fresh("tdx", "sh600000", day_path)
+    assert store.entry("tdx", "sh600000")["total_bars"] == int(day_path.stat().st_size // DAY_RECORD.size)
+
+    reopened = ColumnarMarketStore(tmp_path / "store")
+    assert reopened.stats() == store.stats()
+
+
+def test_columnar_store_sync_appends_only_new_bars_and_compacts(tmp_path: Path) -> None:
+    tdx_root = tmp_path / "vipdoc"
+    csv_root = tmp_path / "akshare"
+    _write_sources(tdx_root, csv_root)
+    store = ColumnarMarketStore(tmp_path / "store")
+    sync_columnar_store_from_sources(store, tdx_root=str(tdx_root), markets=["sh"], akshare_cache_dir=str(csv_root))
+    rows_before = store.stats()["rows"]
+
+    path = tdx_root / "sh" / "lday" / "sh600000.day"
+    path.write_bytes(_day_bytes(date(2024, 1, 2), 152, 1000))
+    counts = sync_columnar_store_from_sources(store, tdx_root=str(tdx_root), markets=["sh"], akshare_cache_dir=str(csv_root))
+    assert counts["append"] == 1
+    assert counts["unchanged"] == 2
+    assert store.stats()["rows"] == rows_before + 2
+    assert store.is_fresh("tdx", "sh600000", path)
+
+    path.write_bytes(_day_bytes(date(2024, 1, 2), 152, 2000))
+    counts = sync_columnar_store_from_sources(store, tdx_root=str(tdx_root), markets=["sh"], akshare_cache_dir=str(csv_root))
+    assert counts["rewrite"] == 1
+    stats = store.stats()
+    assert stats["rows"] > stats["live_rows"]
+
+    expected = store.read_columns("tdx", "sh600000")
+    store.compact()
+    compacted = store.stats()
+    assert compacted["rows"] == compacted["live_rows"]
+    actual = store.read_columns("tdx", "sh600000")
+    assert expected is not None and actual is not None
+    assert np.array_equal(expected["close"], actual["close"])
+
+
+def test_load_candles_reads_from_columnar_store(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    tdx_root = tmp_path / "vipdoc"
+    csv_root = tmp_path / "akshare"
+    _write_sources(tdx_root, csv_root)
+    monkeypatch.setenv("TDX_TREND_TDX_MMAP_READER", "0")
+    expected_tdx = load_candles_for_symbol(str(tdx_root), "sh600000", window=80, market_data_source="tdx_only")
+    expected_csv = load_candles_for_symbol(
+        str(tdx_root),
+        "sz300750",
+        window=2,
+        market_data_source="akshare_only",
+        akshare_cache_dir=str(csv_root),
+    )
+
+    monkeypatch.setenv("TDX_TREND_COLUMNAR_STORE", "1")
+    monkeypatch.setenv("TDX_TREND_COLUMNAR_STORE_DIR", str(tmp_path / "store"))
+    monkeypatch.setattr(columnar_store_module, "_SHARED_STORES", {})
+    shared = columnar_store_module.get_shared_columnar_store()
+    assert shared is not None
+    sync_columnar_store_from_sources(shared, tdx_root=str(tdx_root), markets=["sh"], akshare_cache_dir=str(csv_root))
+
+    def _fail_parse(*_args, **_kwargs):
+        raise AssertionError("raw .day parse should be skipped when the store is fresh")
+
+    monkeypatch.setattr("app.tdx_loader._parse_day_file_columns", _fail_parse)
+    actual_tdx = load_candles_for_symbol(str(tdx_root), "sh600000", window=80, market_data_source="tdx_only")
+    actual_csv = load_candles_for_symbol(
+        str(tdx_root),
+        "sz300750",
+        window=2,
+        market_data_source="akshare_only",
+        akshare_cache_dir=str(csv_root),
+    )
+    assert actual_tdx == expected_tdx
+    assert actual_csv == expected_csv
+
+
+def test_market_data_sync_runs_columnar_sync_in_background(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    from app import store as store_module
+
+    monkeypatch.setenv("TDX_TREND_COLUMNAR_STORE", "1")
+    monkeypatch.setenv("TDX_TREND_COLUMNAR_STORE_DIR", str(tmp_path / "store"))
+    monkeypatch.setattr(columnar_store_module, "_SHARED_STORES", {})
+    release = threading.Event()
+    calls: list[str] = []
+
+    def _slow_sync(_store: ColumnarMarketStore, *, akshare_cache_dir: str, **_kwargs: object) -> dict[str, int]:
+        calls.append(akshare_cache_dir)
+        release.wait(5.0)
+        return {}
+
+    monkeypatch.setattr(store_module, "sync_columnar_store_from_sources", _slow_sync)
+    store = store_module.store
+    begin = time.perf_counter()
+    # 首轮运行中再来两次请求：只排队一轮，且使用最新的目录。
+    assert store._schedule_columnar_market_store_sync(akshare_cache_dir="a")
+    while not calls and time.perf_counter() - begin < 1.0:
+        time.sleep(0.005)
+    assert store._schedule_columnar_market_store_sync(akshare_cache_dir="b")
+    assert store._schedule_columnar_market_store_sync(akshare_cache_dir="c")
+    assert time.perf_counter() - begin < 1.0
+    release.set()
+    deadline = time.time() + 5.0
+    while store._columnar_sync_running and time.time() < deadline:
+        time.sleep(0.01)
+    assert not store._columnar_sync_running
+    assert calls == ["a", "c"]
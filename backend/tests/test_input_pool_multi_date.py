@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import random
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app import tdx_loader
+from app.tdx_loader import DAY_RECORD, load_input_pool_from_tdx, load_input_pool_from_tdx_by_dates
+from app.tdx_mmap_reader import close_shared_tdx_mmap_readers
+
+
+def _write_random_day_file(path: Path, *, start: date, count: int, seed: int) -> None:
+    rng = random.Random(seed)
+    chunks: list[bytes] = []
+    day = start
+    price = 1000 + rng.randint(0, 1500)
+    for _ in range(count):
+        while day.weekday() >= 5:
+            day += timedelta(days=1)
+        price = max(100, int(price * (1 + rng.gauss(0, 0.03))))
+        open_raw = max(1, int(price * (1 + rng.gauss(0, 0.01))))
+        high_raw = max(open_raw, price) + rng.randint(0, 30)
+        low_raw = max(1, min(open_raw, price) - rng.randint(0, 30))
+        chunks.append(
+            DAY_RECORD.pack(
+                int(day.strftime("%Y%m%d")),
+                open_raw,
+                high_raw,
+                low_raw,
+                price,
+                float(price * 1000),
+                rng.randint(1000, 100000),
+                0,
+            )
+        )
+        day += timedelta(days=1)
+    path.write_bytes(b"".join(chunks))
+
+
+def _write_market(root: Path) -> list[str]:
+    symbols: list[str] = []
+    for idx in range(8):
+        market = "sh" if idx % 2 == 0 else "sz"
+        code = f"600{idx:03d}" if market == "sh" else f"000{idx:03d}"
+        lday = root / market / "lday"
+        lday.mkdir(parents=True, exist_ok=True)
+        # 长度不一：部分标的在早期刷新日不足 40 根、部分总长度不足 251 根。
+        count = [420, 380, 300, 240, 460, 270, 500, 330][idx]
+        _write_random_day_file(lday / f"{market}{code}.day", start=date(2023, 1, 2), count=count, seed=idx)
+        symbols.append(f"{market}{code}")
+    return symbols
+
+
+@pytest.mark.parametrize("mmap_reader", ["0", "1"])
+def test_multi_date_input_pool_matches_per_date_loader(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    mmap_reader: str,
+) -> None:
+    symbols = _write_market(tmp_path)
+    float_shares = {symbol: 1e6 * (idx + 1) for idx, symbol in enumerate(symbols[:-2])}
+    monkeypatch.setattr(tdx_loader, "_cached_float_shares_from_base_dbf", lambda *_args: (float_shares, None))
+    monkeypatch.setenv("TDX_TREND_INPUT_POOL_RUNTIME_CACHE", "0")
+    monkeypatch.setenv("TDX_TREND_TDX_MMAP_READER", mmap_reader)
+
+    dates = ["2023-02-20", "2023-03-01", "2023-11-15", "2024-03-05", "2024-06-28", "2030-01-01", None]
+    try:
+        by_date = load_input_pool_from_tdx_by_dates(str(tmp_path), ["sh", "sz"], 40, dates)
+        for day in dates:
+            rows, error = load_input_pool_from_tdx(str(tmp_path), ["sh", "sz"], 40, day)
+            multi_rows, multi_error = by_date[day]
+            assert multi_error == error
+            assert [row.model_dump() for row in multi_rows] == [row.model_dump() for row in rows]
+    finally:
+        close_shared_tdx_mmap_readers()
+
+    assert by_date["2023-02-20"] == ([], "TDX_VALID_SERIES_NOT_FOUND")
+    assert by_date["2024-03-05"][1] == "PARTIAL_FLOAT_SHARES_MISSING"
+    assert len(by_date["2024-03-05"][0]) == 7
+
+
+def test_multi_date_input_pool_reports_missing_root(tmp_path: Path) -> None:
+    result = load_input_pool_from_tdx_by_dates(str(tmp_path / "missing"), ["sh"], 40, ["2024-01-02", "2024-01-03"])
+    assert result == {
+        "2024-01-02": ([], "TDX_PATH_NOT_FOUND"),
+        "2024-01-03": ([], "TDX_PATH_NOT_FOUND"),
+    }
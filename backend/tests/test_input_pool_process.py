@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app import input_pool_process
+from app.input_pool_process import _shard_candidates
+from app.tdx_loader import DAY_RECORD, load_input_pool_from_tdx, load_input_pool_from_tdx_by_dates
+
+
+def _day_bytes(start: date, count: int, base_close: int) -> bytes:
+    chunks: list[bytes] = []
+    day = start
+    for idx in range(count):
+        while day.weekday() >= 5:
+            day += timedelta(days=1)
+        close_raw = base_close + (idx * 7) % 113 + idx * (base_close % 5)
+        chunks.append(
+            DAY_RECORD.pack(
+                int(day.strftime("%Y%m%d")),
+                close_raw - 3,
+                close_raw + 10,
+                close_raw - 12,
+                close_raw,
+                float(close_raw * 100),
+                5000 + (idx * 37) % 900,
+                0,
+            )
+        )
+        day += timedelta(days=1)
+    return b"".join(chunks)
+
+
+def _write_market(root: Path) -> None:
+    for idx in range(12):
+        market = "sh" if idx % 3 == 0 else "sz"
+        code = f"600{idx:03d}" if market == "sh" else (f"300{idx:03d}" if idx % 2 else f"000{idx:03d}")
+        lday = root / market / "lday"
+        lday.mkdir(parents=True, exist_ok=True)
+        (lday / f"{market}{code}.day").write_bytes(_day_bytes(date(2024, 1, 2), 300 + idx * 5, 800 + idx * 61))
+
+
+def test_shards_group_by_prefix_and_keep_offsets_contiguous() -> None:
+    candidates = [(f"sz300{idx:03d}", Path(f"/x/sz300{idx:03d}.day")) for idx in range(300)]
+    candidates += [("sh600000", Path("/x/sh600000.day")), ("sz000001", Path("/x/sz000001.day"))]
+    shards = _shard_candidates(candidates)
+    assert [offset for offset, _chunk in shards] == [0, 1, 2, 258]
+    assert [chunk[0][0][:5] for _offset, chunk in shards] == ["sh600", "sz000", "sz300", "sz300"]
+    assert sum(len(chunk) for _offset, chunk in shards) == len(candidates)
+
+
+def test_process_pool_input_pool_matches_thread_loader(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    _write_market(tmp_path)
+    monkeypatch.setenv("TDX_TREND_INPUT_POOL_RUNTIME_CACHE", "0")
+    monkeypatch.setenv("TDX_TREND_TDX_MMAP_READER", "0")
+    monkeypatch.setenv("TDX_TREND_INPUT_POOL_PROCESS_WORKERS", "2")
+    monkeypatch.setattr(input_pool_process, "INPUT_POOL_PROCESS_MIN_CANDIDATES", 1)
+    dates = ["2024-06-03", "2024-11-15", None]
+
+    monkeypatch.setenv("TDX_TREND_INPUT_POOL_PROCESS_POOL", "0")
+    expected_single = load_input_pool_from_tdx(str(tmp_path), ["sh", "sz"], 40, "2024-11-15")
+    expected_multi = load_input_pool_from_tdx_by_dates(str(tmp_path), ["sh", "sz"], 40, dates)
+
+    monkeypatch.setenv("TDX_TREND_INPUT_POOL_PROCESS_POOL", "1")
+    got_single = load_input_pool_from_tdx(str(tmp_path), ["sh", "sz"], 40, "2024-11-15")
+    got_multi = load_input_pool_from_tdx_by_dates(str(tmp_path), ["sh", "sz"], 40, dates)
+
+    assert len(expected_single[0]) == 12
+    assert got_single[1] == expected_single[1]
+    assert [row.model_dump() for row in got_single[0]] == [row.model_dump() for row in expected_single[0]]
+    for day in dates:
+        assert got_multi[day][1] == expected_multi[day][1]
+        assert [row.model_dump() for row in got_multi[day][0]] == [row.model_dump() for row in expected_multi[day][0]]
+
+
+def test_process_pool_reports_timeout(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    _write_market(tmp_path)
+    monkeypatch.setenv("TDX_TREND_INPUT_POOL_RUNTIME_CACHE", "0")
+    monkeypatch.setenv("TDX_TREND_INPUT_POOL_PROCESS_POOL", "1")
+    monkeypatch.setattr(input_pool_process, "INPUT_POOL_PROCESS_MIN_CANDIDATES", 1)
+
+    # 子进程启动远超 1ms：没有任何分片在截止前完成。
+    rows, error = load_input_pool_from_tdx(str(tmp_path), ["sh", "sz"], 40, "2024-11-15", load_timeout_sec=0.001)
+    assert rows == []
+    assert error == "INPUT_POOL_LOAD_TIMEOUT"
+
+
+def test_process_pool_is_reused_across_calls(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    _write_market(tmp_path)
+    monkeypatch.setenv("TDX_TREND_INPUT_POOL_RUNTIME_CACHE", "0")
+    monkeypatch.setenv("TDX_TREND_TDX_MMAP_READER", "0")
+    monkeypatch.setenv("TDX_TREND_INPUT_POOL_PROCESS_POOL", "1")
+    monkeypatch.setenv("TDX_TREND_INPUT_POOL_PROCESS_WORKERS", "2")
+    monkeypatch.setattr(input_pool_process, "INPUT_POOL_PROCESS_MIN_CANDIDATES", 1)
+
+    first = load_input_pool_from_tdx(str(tmp_path), ["sh", "sz"], 40, "2024-11-15")
+    pool = input_pool_process._POOL
+    second = load_input_pool_from_tdx(str(tmp_path), ["sh", "sz"], 40, "2024-06-03")
+    assert pool is not None
+    assert input_pool_process._POOL is pool
+    assert len(first[0]) == 12
+    assert len(second[0]) == 12
+
+
+def test_shard_stops_once_deadline_passes(tmp_path: Path) -> None:
+    _write_market(tmp_path)
+    items = [(path.stem, str(path)) for path in sorted((tmp_path / "sz" / "lday").glob("*.day"))]
+    shape = (len(input_pool_process.METRIC_FIELDS) + 1, 1, len(items))
+    kwargs = dict(
+        offset=0,
+        items=items,
+        as_of_days=np.asarray([20241115], dtype=np.int64),
+        latest_needed="2024-11-15",
+        return_window_days=40,
+        float_shares={},
+    )
+
+    table = np.zeros(shape, dtype=np.float64)
+    assert input_pool_process._fill_shard(table, deadline_wall=time.time() - 1.0, **kwargs) == -1
+    assert not table.any()
+
+    assert input_pool_process._fill_shard(table, deadline_wall=time.time() + 60.0, **kwargs) == len(items)
+    assert table[input_pool_process._OK_FIELD].all()
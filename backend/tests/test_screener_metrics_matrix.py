@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.core.backtest_matrix_engine import MatrixBundle
+from app.screener_metrics import compute_bundle_row_metrics, screener_results_from_matrix_metrics
+from app.tdx_loader import _build_row
+
+
+def _random_columns(rng: np.random.Generator, count: int) -> dict[str, np.ndarray]:
+    close = np.round(np.maximum(1.0, 20 * np.cumprod(1 + rng.normal(0, 0.03, count))), 2)
+    open_ = np.round(np.maximum(0.01, close * (1 + rng.normal(0, 0.01, count))), 2)
+    high = np.round(np.maximum(open_, close) + rng.integers(0, 30, count) / 100, 2)
+    low = np.round(np.maximum(0.01, np.minimum(open_, close) - rng.integers(0, 30, count) / 100), 2)
+    volume = rng.integers(1000, 100000, count).astype(np.float64)
+    return {"open": open_, "high": high, "low": low, "close": close, "volume": volume, "amount": close * volume}
+
+
+def test_bundle_metrics_match_per_symbol_build_row() -> None:
+    rng = np.random.default_rng(7)
+    dates = [f"2024-{1 + idx // 28:02d}-{1 + idx % 28:02d}" for idx in range(300)]
+    symbols = ["sh600000", "sh600001", "sz000001", "sz000002", "sz300750"]
+    shape = (len(dates), len(symbols))
+    fields = {key: np.full(shape, np.nan) for key in ("open", "high", "low", "close", "volume", "amount")}
+    valid = np.zeros(shape, dtype=bool)
+    series_by_symbol: dict[str, dict[str, object]] = {}
+    for col, symbol in enumerate(symbols):
+        # 各标的上市时间不同且有随机停牌日。
+        rows = np.flatnonzero(rng.random(len(dates)) > 0.08)
+        rows = rows[rows >= col * 30]
+        columns = _random_columns(rng, int(rows.size))
+        for key, values in columns.items():
+            fields[key][rows, col] = values
+        valid[rows, col] = True
+        series_by_symbol[symbol] = {
+            "symbol": symbol,
+            "dates": [dates[row] for row in rows.tolist()],
+            "open": columns["open"].tolist(),
+            "high": columns["high"].tolist(),
+            "low": columns["low"].tolist(),
+            "close": columns["close"].tolist(),
+            "volume": columns["volume"].astype(np.int64).tolist(),
+            "amount": columns["amount"].tolist(),
+            "total_bars": 260 + col * 10,
+        }
+
+    bundle = MatrixBundle(
+        dates=dates,
+        symbols=symbols,
+        open=fields["open"],
+        high=fields["high"],
+        low=fields["low"],
+        close=fields["close"],
+        volume=fields["volume"],
+        valid_mask=valid,
+    )
+    float_shares = np.array([1e6, 0.0, 2e6, 3e6, 4e6])
+    total_bars = np.array([int(series["total_bars"]) for series in series_by_symbol.values()])
+    query_dates = ["2024-02-20", "2024-05-14", "2024-09-01", "2024-11-28", "2023-12-31"]
+
+    requested, metrics, ok = compute_bundle_row_metrics(
+        bundle,
+        return_window_days=40,
+        dates=query_dates,
+        amount=fields["amount"],
+        float_shares=float_shares,
+        total_bars=total_bars,
+    )
+    assert requested == query_dates
+    assert metrics["latest"].shape == (len(query_dates), len(symbols))
+    results = screener_results_from_matrix_metrics(metrics, ok, symbols=symbols, float_shares=float_shares)
+
+    for day_pos, day in enumerate(query_dates):
+        got = {row.symbol: row.model_dump() for row in results[day_pos]}
+        expected = {}
+        for col, symbol in enumerate(symbols):
+            shares = float(float_shares[col]) if float_shares[col] > 0 else None
+            row = _build_row(series_by_symbol[symbol], 40, shares, day)  # type: ignore[arg-type]
+            if row is not None:
+                expected[symbol] = row.model_dump()
+        assert got == expected
+    assert results[-1] == []
+
+
+def test_matrix_results_are_built_only_for_selected_cells() -> None:
+    rng = np.random.default_rng(3)
+    count = 80
+    columns = _random_columns(rng, count)
+    bundle = MatrixBundle(
+        dates=[f"2024-01-{idx:02d}" for idx in range(1, count + 1)],
+        symbols=["sh600000"],
+        open=columns["open"][:, None],
+        high=columns["high"][:, None],
+        low=columns["low"][:, None],
+        close=columns["close"][:, None],
+        volume=columns["volume"][:, None],
+        valid_mask=np.ones((count, 1), dtype=bool),
+    )
+    _requested, metrics, ok = compute_bundle_row_metrics(bundle, return_window_days=20)
+    assert int(ok.sum()) == count - 39
+    selected = ok & (metrics["ret_window"] > 0)
+    results = screener_results_from_matrix_metrics(metrics, selected, symbols=bundle.symbols)
+    assert sum(len(items) for items in results) == int(selected.sum())
+    assert all(row.degraded for items in results for row in items)
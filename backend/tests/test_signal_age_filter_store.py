@@ -85,6 +85,8 @@ def test_store_get_signals_supports_signal_age_filter(monkeypatch) -> None:
 
     monkeypatch.setattr(store, "_resolve_signal_candidates", fake_resolve_signal_candidates)
     monkeypatch.setattr(store, "_calc_wyckoff_snapshot", fake_snapshot)
+    # 预填会直接用事件库命中的快照；关掉它，让伪造快照成为唯一来源。
+    monkeypatch.setattr(store, "_prefill_wyckoff_snapshots", lambda *args, **kwargs: {})
     monkeypatch.setattr(store, "_ensure_candles", lambda raw_symbol: list(candles) if raw_symbol == symbol else [])
     store._signals_cache.clear()
 
@@ -158,6 +160,8 @@ def test_store_signal_age_uses_trading_day_diff_with_missing_calendar_days(monke
 
     monkeypatch.setattr(store, "_resolve_signal_candidates", fake_resolve_signal_candidates)
     monkeypatch.setattr(store, "_calc_wyckoff_snapshot", fake_snapshot)
+    # 预填会直接用事件库命中的快照；关掉它，让伪造快照成为唯一来源。
+    monkeypatch.setattr(store, "_prefill_wyckoff_snapshots", lambda *args, **kwargs: {})
     monkeypatch.setattr(store, "_ensure_candles", lambda raw_symbol: list(candles) if raw_symbol == symbol else [])
     store._signals_cache.clear()
 
@@ -223,6 +227,8 @@ def test_store_respects_key_event_confirmation_strategy_override(monkeypatch) ->
 
     monkeypatch.setattr(store, "_resolve_signal_candidates", fake_resolve_signal_candidates)
     monkeypatch.setattr(store, "_calc_wyckoff_snapshot", fake_snapshot)
+    # 预填会直接用事件库命中的快照；关掉它，让伪造快照成为唯一来源。
+    monkeypatch.setattr(store, "_prefill_wyckoff_snapshots", lambda *args, **kwargs: {})
     monkeypatch.setattr(store, "_ensure_candles", lambda raw_symbol: list(candles) if raw_symbol == symbol else [])
     store._signals_cache.clear()
 
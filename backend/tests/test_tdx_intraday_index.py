@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app import tdx_loader
+from app.tdx_loader import (
+    LC1_RECORD,
+    list_intraday_dates,
+    load_intraday_for_symbol_date,
+    load_intraday_for_symbol_dates,
+)
+
+
+def _lc1_date(year: int, month: int, day: int) -> int:
+    return ((year - 2004) << 11) | (month * 100 + day)
+
+
+def _minute_records(day: tuple[int, int, int], minutes: list[int], base: float) -> bytes:
+    chunks = []
+    for idx, minute in enumerate(minutes):
+        price = base + idx * 0.01
+        chunks.append(LC1_RECORD.pack(_lc1_date(*day), minute, price, price, price, price, price * 100, 100 + idx, 0))
+    return b"".join(chunks)
+
+
+def _write_lc1(root: Path) -> Path:
+    minline = root / "sh" / "minline"
+    minline.mkdir(parents=True)
+    path = minline / "sh600000.lc1"
+    path.write_bytes(
+        _minute_records((2024, 5, 6), [570, 571, 572], 10.0)
+        + _minute_records((2024, 5, 7), [572, 570, 571], 11.0)
+        + _minute_records((2024, 5, 8), [570, 571], 12.0)
+    )
+    return path
+
+
+def test_intraday_single_day_uses_index_and_sorts_minutes(tmp_path: Path) -> None:
+    _write_lc1(tmp_path)
+    points, selected = load_intraday_for_symbol_date(str(tmp_path), "sh600000", "2024-05-07")
+    assert selected == "2024-05-07"
+    assert points is not None
+    assert [point.time for point in points] == ["09:30", "09:31", "09:32"]
+    assert [point.price for point in points] == [11.01, 11.02, 11.0]
+    assert points[0].avg_price == points[0].price
+
+    points, selected = load_intraday_for_symbol_date(str(tmp_path), "sh600000", "2024-06-03")
+    assert selected == "2024-05-08"
+    assert points is not None and len(points) == 2
+
+
+def test_intraday_multi_day_and_index_invalidation(tmp_path: Path) -> None:
+    path = _write_lc1(tmp_path)
+    assert list_intraday_dates(str(tmp_path), "sh600000") == ["2024-05-06", "2024-05-07", "2024-05-08"]
+
+    by_day = load_intraday_for_symbol_dates(str(tmp_path), "sh600000", date_from="2024-05-07")
+    assert list(by_day) == ["2024-05-07", "2024-05-08"]
+    picked = load_intraday_for_symbol_dates(str(tmp_path), "sh600000", ["2024-05-08", "2024-05-01", "2024-05-06"])
+    assert list(picked) == ["2024-05-06", "2024-05-08"]
+
+    index = tdx_loader._lc1_index_for_file(path)
+    assert index is not None and index.runs[20240507] == [(3, 3)]
+
+    with path.open("ab") as fp:
+        fp.write(_minute_records((2024, 5, 9), [570], 13.0))
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert list_intraday_dates(str(tmp_path), "sh600000")[-1] == "2024-05-09"
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import struct
+import sys
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.tdx_loader import (
+    DAY_RECORD,
+    _decode_day_records,
+    _parse_day_file,
+    _parse_day_file_columns,
+    load_candles_for_symbol,
+)
+
+
+def _day_record(day: int, close_raw: int, *, high_raw: int | None = None, low_raw: int | None = None) -> bytes:
+    high_value = close_raw + 20 if high_raw is None else high_raw
+    low_value = close_raw - 20 if low_raw is None else low_raw
+    return DAY_RECORD.pack(day, max(0, close_raw - 5), high_value, max(0, low_value), close_raw, float(close_raw * 1000), 1000 + close_raw, 0)
+
+
+def _write_day_file(path: Path, count: int = 80) -> list[int]:
+    days: list[int] = []
+    chunks: list[bytes] = []
+    for idx in range(count):
+        day = 20250101 + (idx // 28) * 100 + (idx % 28)
+        days.append(day)
+        chunks.append(_day_record(day, 1000 + idx))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"".join(chunks))
+    return days
+
+
+def test_decode_day_records_validates_scales_and_swaps() -> None:
+    raw = b"".join(
+        [
+            _day_record(20250102, 1234),
+            _day_record(19900101, 1234),
+            _day_record(20250103, 0),
+            _day_record(20250106, 1500, high_raw=1400, low_raw=1600),
+            _day_record(20250107, 1501),
+        ]
+    )
+    columns = _decode_day_records(raw + b"\x00" * 7, date_to=20250106)
+
+    assert columns["day"].tolist() == [20250102, 20250106]
+    assert columns["close"].tolist() == [12.34, 15.0]
+    assert columns["high"].tolist() == [12.54, 16.0]
+    assert columns["low"].tolist() == [12.14, 14.0]
+    assert columns["volume"].dtype == np.int64
+
+
+def test_parse_day_file_matches_struct_decoding(tmp_path: Path) -> None:
+    file_path = tmp_path / "sh600000.day"
+    days = _write_day_file(file_path, count=90)
+
+    parsed = _parse_day_file(file_path, "sh600000", max_bars=70)
+    assert parsed is not None
+    assert parsed["total_bars"] == 90
+    assert len(parsed["dates"]) == 70
+
+    raw = file_path.read_bytes()
+    for offset, (day_text, close) in enumerate(zip(parsed["dates"], parsed["close"])):
+        record = DAY_RECORD.unpack(raw[(20 + offset) * DAY_RECORD.size : (21 + offset) * DAY_RECORD.size])
+        assert day_text == f"{str(record[0])[0:4]}-{str(record[0])[4:6]}-{str(record[0])[6:8]}"
+        assert close == record[4] / 100.0
+        assert isinstance(parsed["volume"][offset], int)
+    assert days[-1] == int(parsed["dates"][-1].replace("-", ""))
+
+    trimmed = _parse_day_file_columns(file_path, "sh600000", max_bars=3000, as_of_date="2025-03-15")
+    assert trimmed is not None
+    assert int(trimmed["day"][-1]) <= 20250315
+    assert int(trimmed["close"].size) == sum(1 for day in days if day <= 20250315)
+
+
+def test_load_candles_for_symbol_reads_vectorized_tail(tmp_path: Path) -> None:
+    _write_day_file(tmp_path / "sz" / "lday" / "sz000001.day", count=100)
+
+    candles = load_candles_for_symbol(str(tmp_path), "sz000001", window=30, market_data_source="tdx_only")
+    assert candles is not None
+    assert len(candles) == 30
+    assert candles[-1].close == 10.99
+    assert candles[-1].price_source == "vwap"
+    assert [item.time for item in candles] == sorted(item.time for item in candles)
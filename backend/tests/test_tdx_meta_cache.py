@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import os
+import struct
+import sys
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app import tdx_loader
+from app.tdx_loader import _load_float_shares_from_base_dbf, _load_symbol_name_map_from_tnf
+from app.tdx_meta_cache import clear_tdx_meta_memory_cache
+
+
+def _write_base_dbf(path: Path, rows: list[tuple[bytes, bytes, bytes]]) -> None:
+    fields = [(b"SC", 1), (b"GPDM", 6), (b"LTAG", 12)]
+    header_len = 32 + 32 * len(fields) + 1
+    record_len = 1 + sum(length for _name, length in fields)
+    out = bytearray(struct.pack("<BBBBIHH20x", 3, 24, 1, 1, len(rows), header_len, record_len))
+    for name, length in fields:
+        out += name.ljust(11, b"\x00") + b"C" + b"\x00" * 4 + bytes([length]) + b"\x00" * 15
+    out += b"\x0d"
+    for marker, (sc, code, ltag) in zip([b" ", b" ", b"*", b" ", b" "], rows):
+        out += marker + sc + code + ltag.rjust(12)
+    path.write_bytes(bytes(out) + b"\x1a")
+
+
+def _write_tnf(path: Path, rows: list[tuple[bytes, str]]) -> None:
+    out = bytearray(b"\x00" * 50)
+    for code, name in rows:
+        record = bytearray(360)
+        record[0:6] = code
+        encoded = name.encode("gbk")
+        record[31 : 31 + len(encoded)] = encoded
+        out += record
+    path.write_bytes(bytes(out))
+
+
+@pytest.fixture()
+def tdx_root(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[Path]:
+    monkeypatch.setenv("TDX_TREND_TDX_META_CACHE_DIR", str(tmp_path / "meta-cache"))
+    clear_tdx_meta_memory_cache()
+    hq_cache = tmp_path / "T0002" / "hq_cache"
+    hq_cache.mkdir(parents=True)
+    _write_base_dbf(
+        hq_cache / "base.dbf",
+        [
+            (b"1", b"600000", b"1000.5"),
+            (b"0", b"000001", b"20"),
+            (b"0", b"000002", b"30"),
+            (b"2", b"830799", b""),
+            (b"0", b"00000X", b"40"),
+        ],
+    )
+    _write_tnf(hq_cache / "shs.tnf", [(b"600000", "浦发银行"), (b"60000A", "坏记录"), (b"600519", "")])
+    vipdoc = tmp_path / "vipdoc"
+    vipdoc.mkdir()
+    yield vipdoc
+    clear_tdx_meta_memory_cache()
+
+
+def test_float_shares_and_names_decode(tdx_root: Path) -> None:
+    shares, error = _load_float_shares_from_base_dbf(str(tdx_root), ["sh", "sz", "bj"])
+    assert error is None
+    # 删除标记、空 LTAG、非法代码均被跳过。
+    assert shares == {"sh600000": 10005000.0, "sz000001": 200000.0}
+    assert _load_float_shares_from_base_dbf(str(tdx_root), ["bj"]) == ({}, "FLOAT_SHARES_DBF_EMPTY")
+    assert _load_symbol_name_map_from_tnf(str(tdx_root), ["sh", "sz"]) == {"sh600000": "浦发银行"}
+
+
+def test_meta_cache_reuses_disk_copy_until_source_changes(tdx_root: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    expected = _load_float_shares_from_base_dbf(str(tdx_root), ["sh", "sz"])
+    clear_tdx_meta_memory_cache()
+
+    def _fail_decode(_raw: bytes) -> None:
+        raise AssertionError("unchanged base.dbf must not be decoded again")
+
+    monkeypatch.setattr(tdx_loader, "_decode_base_dbf_float_shares", _fail_decode)
+    assert _load_float_shares_from_base_dbf(str(tdx_root), ["sh", "sz"]) == expected
+    assert _load_float_shares_from_base_dbf(str(tdx_root), ["sz"]) == ({"sz000001": 200000.0}, None)
+    monkeypatch.undo()
+
+    dbf_path = tdx_root.parent / "T0002" / "hq_cache" / "base.dbf"
+    _write_base_dbf(dbf_path, [(b"1", b"600000", b"1"), (b"1", b"601318", b"2")])
+    stat = dbf_path.stat()
+    os.utime(dbf_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert _load_float_shares_from_base_dbf(str(tdx_root), ["sh"]) == ({"sh600000": 10000.0, "sh601318": 20000.0}, None)
+
+
+def test_cached_helpers_memoize_until_sources_change(tdx_root: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    shares = tdx_loader._cached_float_shares_from_base_dbf(str(tdx_root), ("sh", "sz"))
+    names = tdx_loader._cached_symbol_name_map_from_tnf(str(tdx_root), ("sh", "sz"))
+    assert names == {"sh600000": "浦发银行"}
+
+    def _fail_load(*_args: object) -> None:
+        raise AssertionError("unchanged sources must reuse the in-process result")
+
+    monkeypatch.setattr(tdx_loader, "_load_float_shares_from_base_dbf", _fail_load)
+    monkeypatch.setattr(tdx_loader, "_load_symbol_name_map_from_tnf", _fail_load)
+    assert tdx_loader._cached_float_shares_from_base_dbf(str(tdx_root), ("sh", "sz")) is shares
+    assert tdx_loader._cached_symbol_name_map_from_tnf(str(tdx_root), ("sh", "sz")) is names
+    monkeypatch.undo()
+
+    tnf_path = tdx_root.parent / "T0002" / "hq_cache" / "shs.tnf"
+    _write_tnf(tnf_path, [(b"600000", "浦发银行"), (b"601318", "中国平安")])
+    stat = tnf_path.stat()
+    os.utime(tnf_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert tdx_loader._cached_symbol_name_map_from_tnf(str(tdx_root), ("sh", "sz")) == {
+        "sh600000": "浦发银行",
+        "sh601318": "中国平安",
+    }
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.tdx_loader import DAY_RECORD, load_input_pool_from_tdx
+from app import tdx_mmap_reader
+from app.tdx_mmap_reader import TdxMmapReader, close_shared_tdx_mmap_readers, get_shared_tdx_mmap_reader
+
+
+def _day_bytes(start: date, count: int, base_close: int) -> bytes:
+    chunks: list[bytes] = []
+    day = start
+    for idx in range(count):
+        while day.weekday() >= 5:
+            day += timedelta(days=1)
+        close_raw = base_close + (idx * 7) % 113 + idx
+        chunks.append(
+            DAY_RECORD.pack(
+                int(day.strftime("%Y%m%d")),
+                close_raw - 3,
+                close_raw + 10,
+                close_raw - 12,
+                close_raw,
+                float(close_raw * 100),
+                5000 + (idx * 37) % 900,
+                0,
+            )
+        )
+        day += timedelta(days=1)
+    return b"".join(chunks)
+
+
+def _write_market(root: Path) -> None:
+    for market, code, base_close in [("sh", "600000", 1000), ("sz", "000001", 800), ("sz", "300750", 1500)]:
+        lday = root / market / "lday"
+        lday.mkdir(parents=True, exist_ok=True)
+        (lday / f"{market}{code}.day").write_bytes(_day_bytes(date(2024, 1, 2), 320, base_close))
+
+
+def test_mmap_reader_slices_records_by_date(tmp_path: Path) -> None:
+    _write_market(tmp_path)
+    reader = TdxMmapReader(str(tmp_path))
+    reader.refresh()
+    try:
+        assert reader.symbols() == ["sh600000", "sz000001", "sz300750"]
+        assert reader.symbols("sz") == ["sz000001", "sz300750"]
+
+        total_bars, first_day, last_day = reader.bounds("sh600000")
+        assert total_bars == 320
+        assert first_day == 20240102
+
+        window = reader.slice("sh600000", date_from="2024-02-01", date_to="2024-02-29")
+        assert window is not None
+        assert window["date"][0] >= 20240201
+        assert window["date"][-1] <= 20240229
+        assert not window.flags.owndata
+
+        columns = reader.read_columns("sh600000", max_bars=100, as_of_date="2024-06-28")
+        assert columns is not None
+        assert int(columns["day"][-1]) <= 20240628
+        assert int(columns["close"].size) == 100
+        assert columns["total_bars"] == 320
+        assert last_day is not None and last_day > 20240628
+    finally:
+        reader.close()
+
+
+def test_mmap_reader_refresh_picks_up_appended_bars(tmp_path: Path) -> None:
+    _write_market(tmp_path)
+    reader = TdxMmapReader(str(tmp_path), markets=("sh",))
+    reader.refresh()
+    try:
+        before = reader.bounds("sh600000")
+        path = tmp_path / "sh" / "lday" / "sh600000.day"
+        path.write_bytes(path.read_bytes() + _day_bytes(date(2025, 6, 2), 1, 2000))
+        reader.refresh()
+        after = reader.bounds("sh600000")
+        assert before is not None and after is not None
+        assert after[0] == before[0] + 1
+        assert after[2] == 20250602
+    finally:
+        reader.close()
+
+
+def test_mmap_reader_remaps_a_changed_file_on_read(tmp_path: Path) -> None:
+    _write_market(tmp_path)
+    reader = TdxMmapReader(str(tmp_path), markets=("sh",))
+    reader.refresh()
+    try:
+        before = reader.bounds("sh600000")
+        path = tmp_path / "sh" / "lday" / "sh600000.day"
+        path.write_bytes(path.read_bytes() + _day_bytes(date(2025, 6, 2), 1, 2000))
+        # 不重扫目录：读取时按 size/mtime 复核该文件并换入新映射。
+        after = reader.bounds("sh600000")
+        assert before is not None and after is not None
+        assert after[0] == before[0] + 1 and after[2] == 20250602
+        path.unlink()
+        assert reader.records("sh600000") is None
+        assert reader.symbols() == []
+    finally:
+        reader.close()
+
+
+def test_shared_reader_rescans_in_background(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    _write_market(tmp_path)
+    monkeypatch.setenv("TDX_TREND_TDX_MMAP_READER", "1")
+    monkeypatch.setenv("TDX_TREND_TDX_MMAP_REFRESH_SEC", "0")
+    try:
+        reader = get_shared_tdx_mmap_reader(str(tmp_path))
+        assert reader is not None and len(reader.symbols()) == 3
+        lday = tmp_path / "sz" / "lday"
+        (lday / "sz000002.day").write_bytes(_day_bytes(date(2024, 1, 2), 80, 900))
+
+        started: list[float] = []
+        original = TdxMmapReader.refresh
+
+        def slow_refresh(self: TdxMmapReader) -> None:
+            started.append(time.time())
+            time.sleep(0.3)
+            original(self)
+
+        monkeypatch.setattr(TdxMmapReader, "refresh", slow_refresh)
+        begin = time.perf_counter()
+        assert get_shared_tdx_mmap_reader(str(tmp_path)) is reader
+        # 重扫在后台线程：调用方与全局注册表锁都不等待。
+        assert time.perf_counter() - begin < 0.2
+        assert tdx_mmap_reader._SHARED_READERS_LOCK.acquire(timeout=0.1)
+        tdx_mmap_reader._SHARED_READERS_LOCK.release()
+        deadline = time.time() + 5.0
+        while "sz000002" not in reader.symbols() and time.time() < deadline:
+            time.sleep(0.02)
+        assert "sz000002" in reader.symbols()
+        assert len(started) == 1
+    finally:
+        close_shared_tdx_mmap_readers()
+
+
+def test_input_pool_matches_with_and_without_mmap_reader(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    _write_market(tmp_path)
+    monkeypatch.setenv("TDX_TREND_INPUT_POOL_RUNTIME_CACHE", "0")
+
+    monkeypatch.setenv("TDX_TREND_TDX_MMAP_READER", "0")
+    rows_file, error_file = load_input_pool_from_tdx(str(tmp_path), ["sh", "sz"], 40, "2024-10-15")
+    monkeypatch.setenv("TDX_TREND_TDX_MMAP_READER", "1")
+    try:
+        rows_mmap, error_mmap = load_input_pool_from_tdx(str(tmp_path), ["sh", "sz"], 40, "2024-10-15")
+    finally:
+        close_shared_tdx_mmap_readers()
+
+    assert error_file == error_mmap
+    assert len(rows_file) == 3
+    assert [row.model_dump() for row in rows_file] == [row.model_dump() for row in rows_mmap]
+
+
+def test_unmapped_files_fall_back_to_path_reads(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    _write_market(tmp_path)
+    monkeypatch.setenv("TDX_TREND_INPUT_POOL_RUNTIME_CACHE", "0")
+    monkeypatch.setenv("TDX_TREND_TDX_MMAP_READER", "0")
+    rows_file, _error = load_input_pool_from_tdx(str(tmp_path), ["sh", "sz"], 40, "2024-10-15")
+
+    # 映射预算只够一个文件（模拟 fd 上限）：其余文件不映射，但仍按路径进入输入池。
+    monkeypatch.setenv("TDX_TREND_TDX_MMAP_MAX_FILES", "1")
+    reader = TdxMmapReader(str(tmp_path))
+    reader.refresh()
+    try:
+        assert len(reader.symbols()) == 1
+        assert reader.unmapped_count == 2
+        unmapped = [symbol for symbol, _path in reader.unmapped_files()]
+        assert all(reader.records(symbol) is None and reader.path_of(symbol) is not None for symbol in unmapped)
+    finally:
+        reader.close()
+
+    monkeypatch.setenv("TDX_TREND_TDX_MMAP_READER", "1")
+    try:
+        rows_mmap, _error = load_input_pool_from_tdx(str(tmp_path), ["sh", "sz"], 40, "2024-10-15")
+    finally:
+        close_shared_tdx_mmap_readers()
+    assert [row.model_dump() for row in rows_mmap] == [row.model_dump() for row in rows_file]
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import os
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app import tdx_scan_index
+from app.tdx_loader import DAY_RECORD, _list_input_pool_candidates, _probe_day_file_bounds
+from app.tdx_scan_index import TdxScanIndex, reset_shared_tdx_scan_indexes
+
+
+def _day_bytes(start: date, count: int) -> bytes:
+    chunks: list[bytes] = []
+    day = start
+    for idx in range(count):
+        while day.weekday() >= 5:
+            day += timedelta(days=1)
+        close_raw = 1000 + idx
+        chunks.append(
+            DAY_RECORD.pack(int(day.strftime("%Y%m%d")), close_raw, close_raw + 5, close_raw - 5, close_raw, 1e5, 1000, 0)
+        )
+        day += timedelta(days=1)
+    return b"".join(chunks)
+
+
+def _write(root: Path, name: str, count: int) -> Path:
+    lday = root / name[:2] / "lday"
+    lday.mkdir(parents=True, exist_ok=True)
+    path = lday / f"{name}.day"
+    path.write_bytes(_day_bytes(date(2024, 1, 2), count))
+    return path
+
+
+def test_scan_index_persists_and_skips_unchanged_directories(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    root = tmp_path / "vipdoc"
+    _write(root, "sh600000", 120)
+    _write(root, "sh600519", 80)
+    index_path = tmp_path / "index" / "scan.json"
+
+    index = TdxScanIndex(str(root), index_path)
+    entries = index.market_entries("sh")
+    assert [entry.symbol for entry in entries] == ["sh600000", "sh600519"]
+    assert entries[0].bars == 120
+    assert entries[0].first_day == "2024-01-02"
+    assert index_path.exists()
+
+    def _fail_probe(*_args: object) -> None:
+        raise AssertionError("unchanged directory must not be probed")
+
+    monkeypatch.setattr(tdx_scan_index, "_probe_entry", _fail_probe)
+    reloaded = TdxScanIndex(str(root), index_path)
+    assert [(entry.symbol, entry.bars, entry.last_day) for entry in reloaded.market_entries("sh")] == [
+        (entry.symbol, entry.bars, entry.last_day) for entry in entries
+    ]
+    monkeypatch.undo()
+
+    new_path = _write(root, "sh601318", 70)
+    os.utime(new_path.parent, ns=(1, entries[0].mtime_ns + 10**9))
+    assert [entry.symbol for entry in reloaded.market_entries("sh")] == ["sh600000", "sh600519", "sh601318"]
+
+
+def test_scan_index_backs_candidates_and_bounds(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("TDX_TREND_TDX_SCAN_INDEX_DIR", str(tmp_path / "index"))
+    reset_shared_tdx_scan_indexes()
+    root = tmp_path / "vipdoc"
+    long_path = _write(root, "sz000001", 100)
+    short_path = _write(root, "sz000002", 30)
+    _write(root, "sz159915", 100)
+    market_dir = root / "sz" / "lday"
+    try:
+        assert [symbol for symbol, _path in _list_input_pool_candidates(market_dir, "sz", None)] == ["sz000001"]
+
+        # 原地追加不改变目录 mtime：新股达到 60 根后仍应进入候选，bounds 也应反映新尾日。
+        dir_mtime_ns = market_dir.stat().st_mtime_ns
+        short_path.write_bytes(_day_bytes(date(2024, 1, 2), 90))
+        long_path.write_bytes(_day_bytes(date(2024, 1, 2), 101))
+        os.utime(market_dir, ns=(dir_mtime_ns, dir_mtime_ns))
+        assert [symbol for symbol, _path in _list_input_pool_candidates(market_dir, "sz", None)] == [
+            "sz000001",
+            "sz000002",
+        ]
+        bounds = _probe_day_file_bounds(long_path)
+        assert bounds is not None and bounds[0] == 101
+        assert _probe_day_file_bounds(root / "sz" / "lday" / "sz000003.day") is None
+    finally:
+        reset_shared_tdx_scan_indexes()
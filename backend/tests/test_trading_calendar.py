@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import sys
+from bisect import bisect_right
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.candle_series import CandleSeries
+from app.core.backtest_matrix_engine import BacktestMatrixEngine, MatrixBundle
+from app.store import InMemoryStore
+from app.trading_calendar import TradingCalendar, date_texts_to_day_ints, weekday_dates
+
+
+def _sessions(count: int = 90) -> list[str]:
+    out: list[str] = []
+    day = date(2025, 12, 22)
+    while len(out) < count:
+        # 周末与每月 1 号休市，制造不连续的交易日。
+        if day.weekday() < 5 and day.day != 1:
+            out.append(day.isoformat())
+        day += timedelta(days=1)
+    return out
+
+
+def test_calendar_matches_string_lookups() -> None:
+    dates = _sessions()
+    calendar = TradingCalendar.from_dates([*reversed(dates), dates[3]])
+    assert calendar.dates == dates
+    assert date_texts_to_day_ints(["2026-01-05", "bad", ""]).tolist() == [20260105, 0, 0]
+
+    probes = ["2025-12-01", dates[0], "2026-01-01", "2026-01-03", dates[40], "2026-02-01", dates[-1], "2030-01-01"]
+    for probe in probes:
+        assert calendar.index_on_or_before(probe) == bisect_right(dates, probe) - 1
+        assert calendar.index_of(probe) == (dates.index(probe) if probe in dates else -1)
+        expected = [idx for idx, day in enumerate(dates) if "2026-01-03" <= day <= probe]
+        start, stop = calendar.range("2026-01-03", probe)
+        assert list(range(start, stop)) == expected
+        assert np.flatnonzero(calendar.range_mask("2026-01-03", probe)).tolist() == expected
+    aligned = calendar.align_on_or_before(date_texts_to_day_ints(probes))
+    assert aligned.tolist() == [bisect_right(dates, probe) - 1 for probe in probes]
+    assert calendar.diff(dates[5], dates[25]) == 20
+    assert calendar.diff("2020-01-01", dates[2]) == 2
+    assert calendar.diff(dates[9], dates[2]) == 0
+
+
+def test_weekday_dates_and_scan_dates() -> None:
+    expected = []
+    cursor = date(2026, 1, 1)
+    while cursor <= date(2026, 3, 31):
+        if cursor.weekday() < 5:
+            expected.append(cursor.isoformat())
+        cursor += timedelta(days=1)
+    assert weekday_dates("2026-03-31", "2026-01-01") == expected
+    assert weekday_dates("2026-13-01", "2026-01-01") == []
+    store = InMemoryStore.__new__(InMemoryStore)
+    assert store._build_backtest_scan_dates("2026-01-01", "2026-03-31") == expected
+    assert store._build_backtest_scan_dates("20260101", "2026-03-31") == []
+    assert InMemoryStore._next_scan_date(expected, "2026-01-02") == "2026-01-05"
+    assert InMemoryStore._next_scan_date(expected, expected[-1]) is None
+
+
+def test_trading_days_diff_and_bundle_calendar() -> None:
+    dates = _sessions(60)
+    size = len(dates)
+    series = CandleSeries.from_arrays(
+        day=date_texts_to_day_ints(dates),
+        open=np.full(size, 10.0),
+        high=np.full(size, 10.5),
+        low=np.full(size, 9.5),
+        close=np.full(size, 10.2),
+        volume=np.full(size, 1000),
+        amount=np.full(size, 10200.0),
+    )
+    points = series.to_points()
+    for start, end in ((dates[3], dates[30]), ("2026-01-01", "2026-01-20"), ("2000-01-01", dates[10]), (dates[20], dates[4])):
+        assert InMemoryStore._trading_days_diff(series, start_date=start, end_date=end) == (
+            InMemoryStore._trading_days_diff(points, start_date=start, end_date=end)
+        )
+
+    matrix = np.ones((size, 1))
+    bundle = MatrixBundle(
+        dates=dates,
+        symbols=["sh600000"],
+        open=matrix,
+        high=matrix,
+        low=matrix,
+        close=matrix,
+        volume=matrix,
+        valid_mask=matrix.astype(bool),
+    )
+    assert bundle.calendar() is bundle.calendar()
+    sliced = BacktestMatrixEngine._slice_bundle_by_date_to(bundle, date_to="2026-01-03")
+    assert sliced is not None and sliced.dates == [day for day in dates if day <= "2026-01-03"]
+    assert BacktestMatrixEngine._slice_bundle_by_date_to(bundle, date_to="2025-01-01") is None
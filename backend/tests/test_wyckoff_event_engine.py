@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import random
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.core.signal_analyzer import SignalAnalyzer
+from app.core.wyckoff_event_engine import volume_ratio_series
+from app.models import CandlePoint, ScreenerResult
+
+PROFILES: list[dict[str, object] | None] = [
+    None,
+    {
+        "sc_anchor_vol_ratio_min": 0.5,
+        "sc_tr_pos_max": 0.99,
+        "sc_vol_ratio_min": 0.3,
+        "ar_rebound_min": 1.0,
+        "st_low_near_sc_tol": 0.4,
+        "st_vol_vs_sc_max": 2.0,
+        "spring_break_prior_low_max": 1.2,
+        "spring_close_reclaim_min": 0.6,
+        "spring_vol_ratio_min": 0.1,
+        "tso_break_prior_low_max": 1.3,
+        "tso_close_reclaim_min": 0.6,
+        "tso_vol_ratio_min": 0.1,
+    },
+    {
+        "bc_anchor_tr_pos_min": 0.3,
+        "bc_anchor_vol_ratio_min": 0.5,
+        "bc_close_near_high_ratio_max": 1.0,
+        "bc_tr_pos_min": 0.0,
+        "bc_vol_ratio_min": 0.2,
+        "ard_decline_close_bc_max": 1.0,
+        "std_high_near_bc_tol": 0.3,
+        "std_vol_vs_bc_max": 2.0,
+        "std_close_high_max": 1.2,
+        "utad_upper_shadow_min": 0.0,
+        "utad_vol_ratio_min": 0.2,
+        "lpsy_short_window_days": 3,
+        "lpsy_long_window_days": 30,
+        "lpsy_lower_high_max": 1.5,
+        "lpsy_close_ma20_max": 1.5,
+    },
+    {
+        "lookback_core_days": 120,
+        "sc_scan_lookback_days": 5,
+        "pattern_window_days": 80,
+        "enable_st": "off",
+        "lps_anchor_max_gap_days": 30,
+        "lps_vol_vs_prev5_max": 2.0,
+        "sos_ret10_min": -0.8,
+        "joc_vol_ratio_min": "0.1",
+    },
+]
+
+
+def _segment(seed: int, count: int) -> tuple[list[str], list[float], list[float], list[float], list[float], list[int]]:
+    rng = random.Random(seed)
+    dates: list[str] = []
+    day = date(2024, 1, 2)
+    while len(dates) < count:
+        if day.weekday() < 5 and rng.random() > 0.03:
+            dates.append(day.isoformat())
+        # 偶尔跳过一整周，制造长假后的放量修正。
+        day += timedelta(days=8 if rng.random() < 0.02 else 1)
+    opens: list[float] = []
+    highs: list[float] = []
+    lows: list[float] = []
+    closes: list[float] = []
+    volumes: list[int] = []
+    price = 10.0
+    regime = 0
+    for _ in range(count):
+        if rng.random() < 0.08:
+            regime = rng.choice([-1, 0, 1])
+        open_px = round(price, 2)
+        close_px = open_px if rng.random() < 0.1 else round(max(0.5, open_px * (1 + rng.gauss(0.004 * regime, 0.025))), 2)
+        opens.append(open_px)
+        closes.append(close_px)
+        highs.append(round(max(open_px, close_px) * (1 + abs(rng.gauss(0, 0.01))), 2))
+        lows.append(round(min(open_px, close_px) * (1 - abs(rng.gauss(0, 0.01))), 2))
+        volume = int(rng.lognormvariate(13, 0.5) * (3 if rng.random() < 0.1 else 1))
+        volumes.append(volumes[-1] if volumes and rng.random() < 0.05 else volume)
+        price = close_px
+    return dates, opens, highs, lows, closes, volumes
+
+
+def _row() -> ScreenerResult:
+    return ScreenerResult(
+        symbol="sz300750",
+        name="test",
+        latest_price=10.0,
+        day_change=0.1,
+        day_change_pct=0.01,
+        score=80,
+        ret40=0.25,
+        turnover20=0.08,
+        amount20=8e8,
+        amplitude20=0.05,
+        retrace20=0.03,
+        pullback_days=3,
+        ma10_above_ma20_days=8,
+        ma5_above_ma10_days=6,
+        price_vs_ma20=0.06,
+        vol_slope20=0.1,
+        up_down_volume_ratio=1.4,
+        pullback_volume_ratio=0.7,
+        has_blowoff_top=False,
+        has_divergence_5d=False,
+        has_upper_shadow_risk=False,
+        ai_confidence=0.7,
+        theme_stage="发酵中",
+        trend_class="A",
+        stage="Mid",
+        labels=[],
+        reject_reasons=[],
+        degraded=False,
+        degraded_reason=None,
+    )
+
+
+def _expected_ratios(volumes: list[int] | list[float], dates: list[str]) -> list[float]:
+    return [
+        SignalAnalyzer._volume_ratio_with_calendar_adjustment(volumes=volumes, dates=dates, idx=idx, window=20)
+        for idx in range(len(volumes))
+    ]
+
+
+def test_volume_ratio_series_matches_per_index_helper() -> None:
+    for seed in range(12):
+        dates, _opens, _highs, _lows, _closes, volumes = _segment(seed, 150)
+        assert volume_ratio_series(volumes, dates).tolist() == _expected_ratios(volumes, dates)
+        # 含小数的成交量走逐点路径；无法解析的日期不参与星期与长假修正。
+        fractional = [value + 0.37 for value in volumes]
+        broken = [*dates[:40], "bad-date", *dates[41:]]
+        assert volume_ratio_series(fractional, broken).tolist() == _expected_ratios(fractional, broken)
+    flat = [1000] * 30 + [5000] + [1000] * 9
+    days = _segment(0, 40)[0]
+    assert volume_ratio_series(flat, days).tolist() == _expected_ratios(flat, days)
+    assert volume_ratio_series([], []).size == 0
+
+
+def test_mask_engine_matches_legacy_detector() -> None:
+    seen: set[str] = set()
+    for seed in range(60):
+        count = random.Random(seed).choice([20, 25, 40, 60, 90, 120])
+        dates, opens, highs, lows, closes, volumes = _segment(seed, count)
+        args = (highs, lows, closes, volumes, dates, 0.0, 0.0, 0.0, None, 0.0, 0.0, opens)
+        for profile in PROFILES:
+            expected = SignalAnalyzer._detect_wyckoff_events_legacy(*args, event_rule_values=profile)
+            actual = SignalAnalyzer._detect_wyckoff_events(*args, event_rule_values=profile)
+            assert actual == expected, (seed, count, profile)
+            seen.update(expected[0])
+    # 随机行情需覆盖全部 16 类事件，否则对照没有意义。
+    assert len(seen) == 16, sorted(seen)
+
+
+def test_snapshot_is_unchanged_by_engine_switch(monkeypatch: pytest.MonkeyPatch) -> None:
+    dates, opens, highs, lows, closes, volumes = _segment(7, 120)
+    candles = [
+        CandlePoint(time=d, open=o, high=h, low=lo, close=c, volume=v, amount=float(v) * c)
+        for d, o, h, lo, c, v in zip(dates, opens, highs, lows, closes, volumes)
+    ]
+    row = _row()
+    monkeypatch.delenv("TDX_TREND_WYCKOFF_VECTOR_EVENTS", raising=False)
+    vectorized = SignalAnalyzer.calculate_wyckoff_snapshot(row, candles, 90)
+    monkeypatch.setenv("TDX_TREND_WYCKOFF_VECTOR_EVENTS", "0")
+    legacy = SignalAnalyzer.calculate_wyckoff_snapshot(row, candles, 90)
+    assert vectorized["event_dates"] and vectorized == legacy
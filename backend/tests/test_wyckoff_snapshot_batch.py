@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.candle_series import CandleSeries
+from app.core.backtest_matrix_engine import MatrixBundle
+from app.core.signal_analyzer import SignalAnalyzer
+from app.core.wyckoff_event_store import WyckoffEventStore
+from app.models import CandlePoint, ScreenerResult
+from app.screener_metrics import compute_bundle_row_metrics, screener_results_from_matrix_metrics
+
+LOOSE_PROFILE: dict[str, object] = {
+    "score_mode": "dimension_weighted",
+    "dimensions": [
+        {"metric_key": "event_confirmation_score", "weight": 2.0},
+        {"metric_key": "weekly_context_score", "weight": 1.0},
+        {"metric_key": "risk_score", "weight": 1.0, "invert": True},
+    ],
+    "rule_values": [
+        {"rule_key": "sc_anchor_vol_ratio_min", "value": 0.5},
+        {"rule_key": "sc_tr_pos_max", "value": 0.99},
+        {"rule_key": "sc_vol_ratio_min", "value": 0.3},
+        {"rule_key": "ar_rebound_min", "value": 1.0},
+        {"rule_key": "spring_break_prior_low_max", "value": 1.2},
+        {"rule_key": "spring_vol_ratio_min", "value": 0.1},
+        {"rule_key": "bc_anchor_tr_pos_min", "value": 0.3},
+        {"rule_key": "bc_anchor_vol_ratio_min", "value": 0.5},
+        {"rule_key": "bc_close_near_high_ratio_max", "value": 1.0},
+        {"rule_key": "bc_tr_pos_min", "value": 0.0},
+        {"rule_key": "bc_vol_ratio_min", "value": 0.2},
+        {"rule_key": "lps_anchor_max_gap_days", "value": 30},
+        {"rule_key": "lps_vol_vs_prev5_max", "value": 2.0},
+        {"rule_key": "sos_ret10_min", "value": -0.8},
+    ],
+}
+
+
+def _trading_dates(count: int) -> list[str]:
+    out: list[str] = []
+    day = date(2023, 1, 3)
+    while len(out) < count:
+        if day.weekday() < 5:
+            out.append(day.isoformat())
+        # 偶尔整周休市，制造长假后的量比修正与跨周聚合。
+        day += timedelta(days=8 if len(out) % 67 == 0 else 1)
+    return out
+
+
+def _bundle(seed: int) -> MatrixBundle:
+    rng = np.random.default_rng(seed)
+    dates = _trading_dates(260)
+    symbols = [f"sz{300000 + idx:06d}" for idx in range(12)]
+    shape = (len(dates), len(symbols))
+    fields = {key: np.full(shape, np.nan) for key in ("open", "high", "low", "close", "volume")}
+    valid = np.zeros(shape, dtype=bool)
+    for col in range(len(symbols)):
+        # 上市时间错开（部分标的在早期查询日不足 25 根），并有随机停牌。
+        rows = np.flatnonzero(rng.random(len(dates)) > 0.06)
+        rows = rows[rows >= col * 15]
+        price = 10.0
+        regime = 0
+        for row in rows.tolist():
+            if rng.random() < 0.08:
+                regime = int(rng.choice([-1, 0, 1]))
+            open_px = round(price, 2)
+            close_px = round(max(0.5, open_px * (1 + rng.normal(0.004 * regime, 0.025))), 2)
+            fields["open"][row, col] = open_px
+            fields["close"][row, col] = close_px
+            fields["high"][row, col] = round(max(open_px, close_px) * (1 + abs(rng.normal(0, 0.01))), 2)
+            fields["low"][row, col] = round(min(open_px, close_px) * (1 - abs(rng.normal(0, 0.01))), 2)
+            fields["volume"][row, col] = float(int(rng.lognormal(13, 0.5) * (3 if rng.random() < 0.1 else 1)))
+            price = close_px
+        valid[rows, col] = True
+    return MatrixBundle(dates=dates, symbols=symbols, valid_mask=valid, **fields)
+
+
+def _candles_as_of(bundle: MatrixBundle, symbol: str, as_of_date: str) -> list[CandlePoint]:
+    col = bundle.symbols.index(symbol)
+    return [
+        CandlePoint(
+            time=day,
+            open=float(bundle.open[row, col]),
+            high=float(bundle.high[row, col]),
+            low=float(bundle.low[row, col]),
+            close=float(bundle.close[row, col]),
+            volume=int(bundle.volume[row, col]),
+            amount=float(bundle.volume[row, col] * bundle.close[row, col]),
+        )
+        for row, day in enumerate(bundle.dates)
+        if bundle.valid_mask[row, col] and day <= as_of_date
+    ]
+
+
+def _derived_rows(bundle: MatrixBundle, query_dates: list[str]) -> list[dict[str, ScreenerResult]]:
+    _requested, metrics, ok = compute_bundle_row_metrics(bundle, return_window_days=40, dates=query_dates)
+    return [
+        {row.symbol: row for row in day_rows}
+        for day_rows in screener_results_from_matrix_metrics(metrics, ok, symbols=bundle.symbols)
+    ]
+
+
+def test_batch_snapshots_match_per_symbol_snapshots() -> None:
+    seen: set[str] = set()
+    for seed in (3, 11):
+        bundle = _bundle(seed)
+        # 最后一个查询日落在两根K线之间，应按之前最后一个交易日计算。
+        query_dates = [bundle.dates[90], bundle.dates[171], bundle.dates[-1], "2023-12-31"]
+        rows = _derived_rows(bundle, query_dates)
+        for window_days, profile in ((60, None), (120, LOOSE_PROFILE), (30, None)):
+            batch = SignalAnalyzer.calculate_wyckoff_snapshots(
+                bundle,
+                query_dates,
+                window_days,
+                event_judgment_profile=profile,
+            )
+            assert [set(cells) for cells in batch] == [set(day_rows) for day_rows in rows]
+            assert sum(len(cells) for cells in batch) > 20
+            for day, cells, day_rows in zip(query_dates, batch, rows):
+                for symbol, snapshot in cells.items():
+                    expected = SignalAnalyzer.calculate_wyckoff_snapshot(
+                        day_rows[symbol],
+                        _candles_as_of(bundle, symbol, day),
+                        window_days,
+                        event_judgment_profile=profile,
+                    )
+                    assert snapshot == expected, (seed, day, symbol, window_days)
+                    seen.update(snapshot["event_dates"])
+    assert len(seen) == 16, sorted(seen)
+
+
+def test_explicit_rows_cover_short_histories_and_unknown_symbols() -> None:
+    bundle = _bundle(5)
+    day = bundle.dates[200]
+    template = next(iter(_derived_rows(bundle, [day])[0].values()))
+    # 最后一列上市较晚：在 bundle.dates[180] 只有十几根K线，走数据不足的快照。
+    late = bundle.symbols[-1]
+    early_day = bundle.dates[180]
+    rows = [
+        {symbol: template.model_copy(update={"symbol": symbol}) for symbol in [*bundle.symbols[:3], "sh999999"]},
+        {late: template.model_copy(update={"symbol": late})},
+    ]
+    batch = SignalAnalyzer.calculate_wyckoff_snapshots(bundle, [day, early_day], 90, rows=rows)
+    assert set(batch[0]) == set(bundle.symbols[:3])
+    for symbol, snapshot in batch[0].items():
+        assert snapshot == SignalAnalyzer.calculate_wyckoff_snapshot(rows[0][symbol], _candles_as_of(bundle, symbol, day), 90)
+    candles = _candles_as_of(bundle, late, early_day)
+    assert len(candles) < 25
+    assert batch[1][late] == SignalAnalyzer.calculate_wyckoff_snapshot(rows[1][late], candles, 90)
+
+
+def test_snapshot_series_matches_daily_snapshots_on_consecutive_dates() -> None:
+    bundle = _bundle(7)
+    symbol = bundle.symbols[2]
+    candles = _candles_as_of(bundle, symbol, bundle.dates[-1])
+    template = next(iter(_derived_rows(bundle, [bundle.dates[-1]])[0].values())).model_copy(update={"symbol": symbol})
+    # 连续交易日滑动（含数据不足的早期日期），外加一个重复日期与一个乱序日期。
+    days = [point.time for point in candles[10:120]]
+    points = [(day, template) for day in [*days, days[40], days[5]]]
+    for source in (candles, CandleSeries.from_points(candles)):
+        for window_days, profile in ((60, None), (45, LOOSE_PROFILE)):
+            got = SignalAnalyzer.calculate_wyckoff_snapshot_series(
+                source,
+                points,
+                window_days,
+                event_judgment_profile=profile,
+            )
+            assert len(got) == len(points)
+            for (day, row), snapshot in zip(points, got):
+                expected = SignalAnalyzer.calculate_wyckoff_snapshot(
+                    row,
+                    [point for point in candles if point.time <= day],
+                    window_days,
+                    event_judgment_profile=profile,
+                )
+                assert snapshot == expected, (day, window_days)
+    assert SignalAnalyzer.calculate_wyckoff_snapshot_series(candles, [], 60) == []
+
+
+def test_candle_batch_matches_per_symbol_snapshots() -> None:
+    bundle = _bundle(13)
+    day = bundle.dates[150]
+    template = next(iter(_derived_rows(bundle, [day])[0].values()))
+    rows = {symbol: template.model_copy(update={"symbol": symbol}) for symbol in bundle.symbols}
+    # 各标的按自身停牌/上市日历切到查询日，含不足 25 根的晚上市标的。
+    candles = {symbol: _candles_as_of(bundle, symbol, day) for symbol in bundle.symbols}
+    candles[bundle.symbols[0]] = CandleSeries.from_points(candles[bundle.symbols[0]])
+    for window_days, profile in ((60, None), (120, LOOSE_PROFILE)):
+        got = SignalAnalyzer.calculate_wyckoff_snapshots_for_candles(
+            candles,
+            rows,
+            window_days,
+            event_judgment_profile=profile,
+        )
+        assert set(got) == {symbol for symbol, items in candles.items() if len(items) > 0}
+        assert any(len(items) < 25 for items in candles.values() if len(items) > 0)
+        for symbol, snapshot in got.items():
+            expected = SignalAnalyzer.calculate_wyckoff_snapshot(
+                rows[symbol],
+                candles[symbol],
+                window_days,
+                event_judgment_profile=profile,
+            )
+            assert snapshot == expected, (symbol, window_days)
+
+
+def test_signal_scan_prefill_matches_per_symbol_path(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    # 延迟导入：全局 store 在导入时按环境变量定位事件库，不能抢在 test_api 设置测试目录之前创建。
+    from app.store import store
+
+    bundle = _bundle(17)
+    day = bundle.dates[-1]
+    rows = list(_derived_rows(bundle, [day])[0].values())
+    history = {symbol: _candles_as_of(bundle, symbol, day) for symbol in bundle.symbols}
+    monkeypatch.setattr(store, "_ensure_candles", lambda raw_symbol: list(history.get(str(raw_symbol), [])))
+    monkeypatch.setattr(
+        store,
+        "_wyckoff_event_store",
+        WyckoffEventStore(tmp_path / "per_symbol.sqlite", enabled=True, read_only=False),
+    )
+    expected = [store._calc_wyckoff_snapshot(row, 60, as_of_date=day) for row in rows]
+    assert len(rows) > 5
+
+    def metric(key: str) -> int:
+        return int(store._wyckoff_metrics.get(key, 0) or 0)
+
+    # 整批向量化；低于阈值时只返回命中，未命中由逐只路径补齐。
+    for name, min_symbols in (("batch", "1"), ("small", "1000")):
+        monkeypatch.setenv("TDX_TREND_WYCKOFF_BATCH_MIN_SYMBOLS", min_symbols)
+        monkeypatch.setattr(
+            store,
+            "_wyckoff_event_store",
+            WyckoffEventStore(tmp_path / f"{name}.sqlite", enabled=True, read_only=False),
+        )
+        hits, misses = metric("cache_hits"), metric("cache_misses")
+        first = store._prefill_wyckoff_snapshots(rows, 60, as_of_date=day)
+        assert len(first) == (len(rows) if name == "batch" else 0)
+        got = [first.get(row.symbol) or store._calc_wyckoff_snapshot(row, 60, as_of_date=day) for row in rows]
+        assert got == expected
+        # 每只只记一次未命中。
+        assert (metric("cache_hits"), metric("cache_misses")) == (hits, misses + len(rows))
+        # 已全部写入事件库：再次预填只读不重算，每只记一次命中。
+        second = store._prefill_wyckoff_snapshots(rows, 60, as_of_date=day)
+        assert [second[row.symbol] for row in rows] == expected
+        assert (metric("cache_hits"), metric("cache_misses")) == (hits + len(rows), misses + len(rows))